@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark parse HTML (không network, không mock server).
+
+Parse 1 corpus cố định các fixture page (lichngaytot.com + xemngay.com) và
+báo cáo pages/s, ms/page cho từng parser. Với --baseline REV, cùng corpus
+được parse thêm bằng package src/parsers ở git revision REV để so speedup và
+kiểm tra output giống hệt (DayData / XemNgayData bằng nhau từng trang).
+Bản hiện tại được đo với từng parser backend trong --backends (bs4, lxml,
+auto), nên bảng cũng cho thấy các backend ra cùng kết quả.
+
+--fields-only dựng sẵn ParseContext (cây + text) cho mọi trang trước khi đo,
+nên chỉ đo phần field extraction (regex, scan vocab) - phần bị che khuất bởi
+chi phí dựng cây khi đo cả trang. Cần ParseContext ở cả 2 revision.
+
+--chrome N lặp lại header (menu) và footer (bài liên quan) của mỗi trang N lần,
+để thấy chi phí parse tăng theo "page chrome" thế nào.
+
+--batch-workers 1,2,4 đo parse_many (process pool, batch.py) với từng số
+workers thay cho bảng trên: pages/s gồm cả khởi động pool và IPC, throughput
+từng worker, kiểm tra kết quả theo đúng thứ tự và giống parse tuần tự. Corpus
+nhỏ hơn --min-pool-pages được parse inline như parse_many thật; đặt 0 để đo pool.
+
+Usage (từ thư mục scraper/):
+    python -m benchmarks.bench_parsers
+    python -m benchmarks.bench_parsers --pages 200 --repeat 5
+    python -m benchmarks.bench_parsers --baseline HEAD~1
+    python -m benchmarks.bench_parsers --baseline HEAD~1 --fields-only
+    python -m benchmarks.bench_parsers --backends lxml,bs4
+    python -m benchmarks.bench_parsers --baseline HEAD~1 --fields-only --chrome 8
+    python -m benchmarks.bench_parsers --pages 1000 --batch-workers 1,2,4 --chunk-size 16
+    python -m benchmarks.bench_parsers --json data/bench/parsers.json
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fixtures import lichngaytot_page, xemngay_page
+from src.parsers import BatchParser, LichNgayTotParser, XemNgayParser
+from src.parsers.backends import BACKENDS
+from src.parsers.batch import DEFAULT_CHUNK_SIZE, MIN_POOL_PAGES
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_DIR = Path(__file__).parent.parent
+
+# bs4 đầu tiên: không có --baseline thì speedup tính so với đường BeautifulSoup
+DEFAULT_BACKENDS = ("bs4", "lxml", "auto")
+
+# Parser class name -> fixture page của nguồn tương ứng
+PARSERS = {
+    "lichngaytot": ("LichNgayTotParser", lichngaytot_page),
+    "xemngay": ("XemNgayParser", xemngay_page),
+}
+
+
+def scale_chrome(html: str, factor: int) -> str:
+    """Lặp lại block <header> và <footer> của trang factor lần."""
+    for tag in ("header", "footer"):
+        start = html.find(f"<{tag}")
+        end = html.find(f"</{tag}>", start)
+        if start < 0 or end < 0:
+            continue
+        end += len(f"</{tag}>")
+        html = html[:start] + html[start:end] * factor + html[end:]
+    return html
+
+
+def build_corpus(start: date, pages: int, chrome: int = 1) -> dict[str, list[tuple[date, str]]]:
+    """Corpus (ngày, html) cho từng nguồn, deterministic theo start + pages."""
+    dates = [start + timedelta(days=i) for i in range(pages)]
+    return {
+        source: [(target_date, scale_chrome(render(target_date), chrome)) for target_date in dates]
+        for source, (_, render) in PARSERS.items()
+    }
+
+
+def load_baseline(rev: str) -> dict[str, type]:
+    """
+    Load package src/parsers ở git revision rev (bên cạnh bản hiện tại).
+
+    Các file .py của src/parsers ở rev được ghi ra thư mục tạm và import thành
+    package src._baseline_parsers, nên import tương đối (..models) vẫn trỏ về
+    src.models của working tree.
+
+    Returns:
+        Tên nguồn -> parser class ở rev
+    """
+    listing = subprocess.run(
+        ["git", "ls-tree", "--name-only", rev, "src/parsers/"],
+        cwd=SCRAPER_DIR, check=True, capture_output=True, text=True,
+    ).stdout.split()
+
+    package_dir = Path(tempfile.mkdtemp(prefix="baseline_parsers_"))
+    for path in listing:
+        if path.endswith(".py"):
+            source = subprocess.run(
+                ["git", "show", f"{rev}:./{path}"],
+                cwd=SCRAPER_DIR, check=True, capture_output=True, text=True,
+            ).stdout
+            (package_dir / Path(path).name).write_text(source, encoding="utf-8")
+
+    module_name = "src._baseline_parsers"
+    spec = importlib.util.spec_from_file_location(
+        module_name, package_dir / "__init__.py", submodule_search_locations=[str(package_dir)]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = package
+    spec.loader.exec_module(package)
+    return {source: getattr(package, class_name) for source, (class_name, _) in PARSERS.items()}
+
+
+def bench_parser(
+    parse: Callable[[str, date], object],
+    corpus: list[tuple[date, str]],
+    repeat: int,
+) -> tuple[float, list]:
+    """
+    Parse cả corpus repeat lần, lấy lần nhanh nhất.
+
+    Returns:
+        (seconds của lần nhanh nhất, kết quả parse của lần cuối)
+    """
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [parse(html, target_date) for target_date, html in corpus]
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+@contextmanager
+def prebuilt_contexts(parser, corpus: list[tuple[date, str]]):
+    """
+    Trong block, parser.parse nhận lại ParseContext đã dựng (và đã tính text,
+    containers) ở lần parse warm-up thay vì dựng từ html - chỉ còn field
+    extraction được đo.
+    """
+    module = sys.modules[type(parser).__module__]
+    # make_context (có backends) hoặc ParseContext (revision cũ hơn)
+    factory_name = next((name for name in ("make_context", "ParseContext") if hasattr(module, name)), None)
+    if factory_name is None:
+        raise SystemExit(f"{module.__name__} has no ParseContext, --fields-only needs one")
+    factory = getattr(module, factory_name)
+
+    contexts = {}
+
+    def prebuilt(html, *args, **kwargs):
+        ctx = contexts.get(html)
+        if ctx is None:
+            ctx = contexts[html] = factory(html, *args, **kwargs)
+        return ctx
+
+    setattr(module, factory_name, prebuilt)
+    try:
+        for target_date, html in corpus:
+            parser.parse(html, target_date)
+        yield
+    finally:
+        setattr(module, factory_name, factory)
+
+
+def _dump(results: list) -> list[Optional[dict]]:
+    return [result.model_dump() if result is not None else None for result in results]
+
+
+def run(
+    corpus: dict[str, list[tuple[date, str]]],
+    repeat: int,
+    baseline: Optional[dict[str, type]] = None,
+    fields_only: bool = False,
+    backends: tuple[str, ...] = DEFAULT_BACKENDS,
+) -> list[dict]:
+    """
+    Chạy benchmark cho từng nguồn: baseline (nếu có) rồi current với từng backend.
+
+    Args:
+        corpus: Corpus theo nguồn (build_corpus)
+        repeat: Số lần chạy mỗi variant, lấy lần nhanh nhất
+        baseline: Parser classes ở revision baseline
+        fields_only: Chỉ đo field extraction (ParseContext dựng sẵn)
+        backends: Parser backends của bản hiện tại
+
+    Speedup và identical tính so với variant đầu tiên.
+
+    Returns:
+        List kết quả, mỗi phần tử là 1 (nguồn, variant)
+    """
+    current = {"lichngaytot": LichNgayTotParser, "xemngay": XemNgayParser}
+    rows = []
+    for source, pages in corpus.items():
+        variants = [(f"current:{backend}", current[source](backend)) for backend in backends]
+        if baseline:
+            variants.insert(0, ("baseline", baseline[source]()))
+
+        reference = None
+        reference_seconds = None
+        for variant, parser in variants:
+            setup = prebuilt_contexts(parser, pages) if fields_only else nullcontext()
+            with setup:
+                seconds, results = bench_parser(parser.parse, pages, repeat)
+            dumped = _dump(results)
+            if reference is None:
+                reference, reference_seconds = dumped, seconds
+            rows.append({
+                "parser": source,
+                "variant": variant,
+                "pages": len(pages),
+                "parsed": sum(result is not None for result in results),
+                "pages_per_s": round(len(pages) / seconds, 1),
+                "ms_per_page": round(seconds * 1000 / len(pages), 3),
+                "speedup": round(reference_seconds / seconds, 2),
+                "identical": dumped == reference,
+            })
+    return rows
+
+
+def run_batch(
+    corpus: dict[str, list[tuple[date, str]]],
+    workers_list: tuple[int, ...],
+    chunk_size: int,
+    backend: str = "auto",
+    min_pool_pages: int = MIN_POOL_PAGES,
+) -> list[dict]:
+    """
+    Đo parse_many với từng số workers, so với kết quả parse tuần tự.
+
+    Args:
+        corpus: Corpus theo nguồn (build_corpus)
+        workers_list: Các số worker process cần đo
+        chunk_size: Số trang mỗi chunk
+        backend: Parser backend
+        min_pool_pages: Ngưỡng parse inline của BatchParser (0 = luôn dùng pool)
+
+    Returns:
+        List kết quả, mỗi phần tử là 1 (nguồn, số workers)
+    """
+    current = {"lichngaytot": LichNgayTotParser, "xemngay": XemNgayParser}
+    rows = []
+    for source, pages in corpus.items():
+        parser = current[source](backend)
+        reference = _dump([parser.parse(html, target_date) for target_date, html in pages])
+        reference_seconds = None
+        for workers in workers_list:
+            batch = BatchParser(parser, workers, chunk_size, min_pool_pages=min_pool_pages)
+            started = time.perf_counter()
+            results = list(batch.parse_many(pages))
+            seconds = time.perf_counter() - started
+            if reference_seconds is None:
+                reference_seconds = seconds
+            per_worker = batch.stats.snapshot()["per_worker"]
+            rows.append({
+                "parser": source,
+                "workers": workers,
+                "pages": len(pages),
+                "pages_per_s": round(len(pages) / seconds, 1),
+                "ms_per_page": round(seconds * 1000 / len(pages), 3),
+                "speedup": round(reference_seconds / seconds, 2),
+                "in_order": [target_date for target_date, _ in results] == [target_date for target_date, _ in pages],
+                "identical": _dump([data for _, data in results]) == reference,
+                "per_worker": list(per_worker.values()),
+            })
+    return rows
+
+
+def _print_batch_report(rows: list[dict], config: dict) -> None:
+    print(
+        f"\nBatch parse benchmark (parse_many): {config['pages']} pages per parser, "
+        f"chrome x{config['chrome']}, chunk size {config['chunk_size']}, "
+        f"inline below {config['min_pool_pages']} pages"
+    )
+    print(
+        f"{'parser':<13}{'workers':>8}{'pages/s':>10}{'ms/page':>10}{'speedup':>9}"
+        f"{'in order':>10}{'identical':>11}  per-worker pages/s"
+    )
+    for row in rows:
+        per_worker = ", ".join(str(worker["pages_per_s"]) for worker in row["per_worker"])
+        print(
+            f"{row['parser']:<13}{row['workers']:>8}{row['pages_per_s']:>10}{row['ms_per_page']:>10}"
+            f"{row['speedup']:>8}x{str(row['in_order']):>10}{str(row['identical']):>11}  {per_worker}"
+        )
+
+
+def _print_report(rows: list[dict], config: dict) -> None:
+    scope = "field extraction only" if config["fields_only"] else "full parse"
+    print(
+        f"\nParser benchmark ({scope}): {config['pages']} pages per parser, "
+        f"chrome x{config['chrome']}, best of {config['repeat']}"
+    )
+    print(f"{'parser':<13}{'variant':<15}{'pages/s':>10}{'ms/page':>10}{'speedup':>9}{'identical':>11}")
+    for row in rows:
+        print(
+            f"{row['parser']:<13}{row['variant']:<15}{row['pages_per_s']:>10}"
+            f"{row['ms_per_page']:>10}{row['speedup']:>8}x{str(row['identical']):>11}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse throughput benchmark on fixture pages")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1), help="First date (YYYY-MM-DD)")
+    parser.add_argument("--pages", type=int, default=100, help="Pages per parser")
+    parser.add_argument("--chrome", type=int, default=1, help="Repeat each page's header/footer N times")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (best is reported)")
+    parser.add_argument("--baseline", help="Also benchmark src/parsers at this git revision (e.g. HEAD~1)")
+    parser.add_argument(
+        "--backends",
+        default=",".join(DEFAULT_BACKENDS),
+        help=f"Comma-separated parser backends to benchmark ({', '.join(BACKENDS)})",
+    )
+    parser.add_argument("--fields-only", action="store_true", help="Prebuild soup/text, time field extraction only")
+    parser.add_argument(
+        "--batch-workers",
+        help="Comma-separated worker counts: benchmark parse_many (process pool) instead",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Pages per chunk for --batch-workers")
+    parser.add_argument(
+        "--min-pool-pages",
+        type=int,
+        default=MIN_POOL_PAGES,
+        help=f"--batch-workers: parse inline below this many pages (default: {MIN_POOL_PAGES}, 0 = always use the pool)",
+    )
+    parser.add_argument("--json", type=Path, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.baseline and not re.fullmatch(r"[\w./~^@{}-]+", args.baseline):
+        parser.error(f"Invalid git revision: {args.baseline}")
+    backends = tuple(backend.strip() for backend in args.backends.split(",") if backend.strip())
+    unknown = [backend for backend in backends if backend not in BACKENDS]
+    if unknown or not backends:
+        parser.error(f"Unknown backends: {', '.join(unknown) or '(none)'}")
+
+    corpus = build_corpus(args.start, args.pages, args.chrome)
+
+    if args.batch_workers:
+        try:
+            workers_list = tuple(int(workers) for workers in args.batch_workers.split(",") if workers.strip())
+        except ValueError:
+            parser.error(f"Invalid --batch-workers: {args.batch_workers}")
+        if not workers_list or min(workers_list) < 1 or args.chunk_size < 1:
+            parser.error("--batch-workers and --chunk-size must be >= 1")
+        config = {
+            "pages": args.pages,
+            "chrome": args.chrome,
+            "chunk_size": args.chunk_size,
+            "min_pool_pages": args.min_pool_pages,
+            "batch_workers": list(workers_list),
+        }
+        rows = run_batch(corpus, workers_list, args.chunk_size, min_pool_pages=args.min_pool_pages)
+        _print_batch_report(rows, config)
+    else:
+        baseline = load_baseline(args.baseline) if args.baseline else None
+        config = {
+            "pages": args.pages,
+            "repeat": args.repeat,
+            "chrome": args.chrome,
+            "baseline": args.baseline,
+            "fields_only": args.fields_only,
+            "backends": list(backends),
+        }
+
+        rows = run(corpus, args.repeat, baseline, fields_only=args.fields_only, backends=backends)
+        _print_report(rows, config)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps({"config": config, "results": rows}, indent=2), encoding="utf-8")
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end scrape throughput trên mock server (không cần network).
+
+Chạy từng chế độ scrape (sync, async, staged, dual-source, sharded) trên cùng
+khoảng ngày, với 2 mock server (lichngaytot + xemngay), và báo cáo:
+    - days/s
+    - p50 / p99 latency mỗi ngày (từ lúc bắt đầu fetch tới khi có DayData)
+    - CPU mỗi ngày (user + system, gồm cả worker processes)
+
+Usage (từ thư mục scraper/):
+    python -m benchmarks.bench_scrape
+    python -m benchmarks.bench_scrape --days 120 --latency 0.2 --concurrency 8
+    python -m benchmarks.bench_scrape --modes sync,async --error-rate 0.02 --throttle-rate 0.01
+    python -m benchmarks.bench_scrape --json data/bench/scrape.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.mock_server import MockServer
+from src.pipeline.dual_source import DualSourcePipeline
+from src.pipeline.sharded import scrape_range
+from src.pipeline.staged import StagedPipeline
+from src.scrapers.lichngaytot import (
+    LichNgayTotScraper,
+    XemNgayScraper,
+    AsyncLichNgayTotScraper,
+    AsyncXemNgayScraper,
+)
+from src.scrapers.rate_limiter import AdaptiveRateLimiter, set_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sync", "async", "staged", "dual", "sharded")
+
+
+def _percentile(values: list[float], pct: float) -> Optional[float]:
+    """Percentile theo nearest-rank, None nếu không có dữ liệu."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def _cpu_seconds() -> float:
+    """CPU time của process hiện tại + các child process đã kết thúc."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+@contextmanager
+def _point_scrapers_at(primary_url: str, secondary_url: str):
+    """Tạm đổi BASE_URL của các scraper sang mock servers (worker processes fork kế thừa)."""
+    originals = {
+        cls: cls.BASE_URL
+        for cls in (LichNgayTotScraper, AsyncLichNgayTotScraper, XemNgayScraper, AsyncXemNgayScraper)
+    }
+    LichNgayTotScraper.BASE_URL = AsyncLichNgayTotScraper.BASE_URL = primary_url
+    XemNgayScraper.BASE_URL = AsyncXemNgayScraper.BASE_URL = secondary_url
+    try:
+        yield
+    finally:
+        for cls, url in originals.items():
+            cls.BASE_URL = url
+
+
+def _reset_limiters(urls: list[str], rate: float, burst: int) -> None:
+    """Limiter mới cho mỗi chế độ, để backoff của lần chạy trước không ảnh hưởng."""
+    for url in urls:
+        set_rate_limiter(
+            urlparse(url).netloc,
+            AdaptiveRateLimiter(rate=rate, max_rate=rate, min_rate=min(1.0, rate), burst=burst, cooldown=1.0),
+        )
+
+
+def _bench_sync(dates: list[date], args) -> tuple[list[float], int]:
+    latencies = []
+    ok = 0
+    with LichNgayTotScraper() as scraper:
+        for target_date in dates:
+            started = time.perf_counter()
+            result = scraper.scrape_day_result(target_date)
+            latencies.append(time.perf_counter() - started)
+            ok += result.ok
+    return latencies, ok
+
+
+async def _bench_async(dates: list[date], args) -> tuple[list[float], int]:
+    latencies = []
+    ok = 0
+    window = asyncio.Semaphore(args.concurrency * 2)
+
+    async with AsyncLichNgayTotScraper(max_concurrency=args.concurrency) as scraper:
+        async def timed(target_date: date) -> None:
+            nonlocal ok
+            async with window:
+                started = time.perf_counter()
+                result = await scraper.scrape_day_result(target_date)
+                latencies.append(time.perf_counter() - started)
+                ok += result.ok
+
+        await asyncio.gather(*(timed(d) for d in dates))
+    return latencies, ok
+
+
+async def _bench_staged(dates: list[date], args) -> tuple[list[float], int]:
+    latencies = []
+    ok = 0
+    fetch_started: dict[date, float] = {}
+
+    async with AsyncLichNgayTotScraper(max_concurrency=args.concurrency) as scraper:
+        fetch_page = scraper.fetch_page
+
+        async def timed_fetch(url: str, target_date: date):
+            fetch_started[target_date] = time.perf_counter()
+            return await fetch_page(url, target_date)
+
+        scraper.fetch_page = timed_fetch
+        pipeline = StagedPipeline(scraper, parse_workers=args.parse_workers)
+        async for result in pipeline.stream(dates):
+            started = fetch_started.get(result.solar_date)
+            if started is not None:
+                latencies.append(time.perf_counter() - started)
+            ok += result.ok
+    return latencies, ok
+
+
+async def _bench_dual(dates: list[date], args) -> tuple[list[float], int]:
+    latencies = []
+    ok = 0
+    window = asyncio.Semaphore(args.concurrency * 2)
+    pipeline = DualSourcePipeline(
+        primary=AsyncLichNgayTotScraper(max_concurrency=args.concurrency),
+        secondary=AsyncXemNgayScraper(max_concurrency=args.concurrency),
+    )
+
+    async def timed(target_date: date) -> None:
+        nonlocal ok
+        async with window:
+            started = time.perf_counter()
+            result = await pipeline.process_day(target_date)
+            latencies.append(time.perf_counter() - started)
+            ok += result.merged is not None
+
+    try:
+        await asyncio.gather(*(timed(d) for d in dates))
+    finally:
+        await pipeline.close()
+    return latencies, ok
+
+
+def _bench_sharded(dates: list[date], args) -> tuple[list[float], int]:
+    # Workers tự tạo limiter từ delay_range (chia đều ngân sách); latency từng
+    # ngày nằm trong worker nên không đo được ở đây
+    delay = 1 / args.rate
+    results = scrape_range(
+        dates[0],
+        dates[-1],
+        workers=args.workers,
+        delay_range=(delay, delay),
+        concurrency=args.concurrency,
+    )
+    return [], len(results)
+
+
+_RUNNERS = {
+    "sync": _bench_sync,
+    "async": _bench_async,
+    "staged": _bench_staged,
+    "dual": _bench_dual,
+    "sharded": _bench_sharded,
+}
+
+
+def run_mode(mode: str, dates: list[date], servers: list[MockServer], args) -> dict:
+    """
+    Chạy 1 chế độ scrape và đo throughput / latency / CPU.
+
+    Args:
+        mode: Tên chế độ (xem MODES)
+        dates: Các ngày cần scrape
+        servers: [server lichngaytot, server xemngay]
+        args: CLI args
+
+    Returns:
+        Dict kết quả của chế độ
+    """
+    _reset_limiters([server.url for server in servers], args.rate, burst=args.concurrency)
+    requests_before = sum(server.stats.requests for server in servers)
+
+    runner = _RUNNERS[mode]
+    cpu_started = _cpu_seconds()
+    started = time.perf_counter()
+    if asyncio.iscoroutinefunction(runner):
+        latencies, ok = asyncio.run(runner(dates, args))
+    else:
+        latencies, ok = runner(dates, args)
+    elapsed = time.perf_counter() - started
+    cpu = _cpu_seconds() - cpu_started
+
+    p50 = _percentile(latencies, 50)
+    p99 = _percentile(latencies, 99)
+    return {
+        "mode": mode,
+        "days": len(dates),
+        "ok": ok,
+        "failed": len(dates) - ok,
+        "elapsed": round(elapsed, 3),
+        "days_per_s": round(len(dates) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+        "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+        "cpu_ms_per_day": round(cpu * 1000 / len(dates), 2),
+        "requests": sum(server.stats.requests for server in servers) - requests_before,
+    }
+
+
+def _print_report(results: list[dict], config: dict) -> None:
+    print("\n" + "=" * 78)
+    print("SCRAPE BENCHMARK")
+    print("=" * 78)
+    print("Config: " + ", ".join(f"{key}={value}" for key, value in config.items()))
+    print(f"\n{'mode':<9}{'days':>6}{'ok':>6}{'elapsed s':>11}{'days/s':>9}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'cpu ms/day':>12}{'requests':>10}")
+    for row in results:
+        def fmt(value):
+            return "-" if value is None else value
+        print(f"{row['mode']:<9}{row['days']:>6}{row['ok']:>6}{row['elapsed']:>11}"
+              f"{fmt(row['days_per_s']):>9}{fmt(row['p50_ms']):>9}{fmt(row['p99_ms']):>9}"
+              f"{row['cpu_ms_per_day']:>12}{row['requests']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scrape benchmark against a local mock server")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes ({', '.join(MODES)})")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1), help="First date (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=60, help="Number of days per mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests (async, staged, dual)")
+    parser.add_argument("--parse-workers", type=int, default=2, help="Parse processes (staged)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (sharded)")
+    parser.add_argument("--rate", type=float, default=200.0, help="Rate limit per host (requests/second)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock server base latency (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Mock server random extra latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of 429 (seconds)")
+    parser.add_argument("--seed", type=int, default=0, help="Mock server RNG seed")
+    parser.add_argument("--json", type=Path, help="Also write results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show scraper logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"Unknown modes: {', '.join(unknown)}")
+
+    dates = [args.start + timedelta(days=i) for i in range(args.days)]
+    server_kwargs = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "throttle_rate": args.throttle_rate,
+        "retry_after": args.retry_after,
+        "seed": args.seed,
+    }
+    config = {
+        "days": args.days,
+        "concurrency": args.concurrency,
+        "parse_workers": args.parse_workers,
+        "workers": args.workers,
+        "rate": args.rate,
+        **server_kwargs,
+    }
+
+    results = []
+    with MockServer(**server_kwargs) as primary, MockServer(**server_kwargs) as secondary:
+        servers = [primary, secondary]
+        with _point_scrapers_at(primary.url, secondary.url):
+            for mode in modes:
+                print(f"Running {mode}...", flush=True)
+                results.append(run_mode(mode, dates, servers, args))
+        server_stats = {"lichngaytot": primary.stats.snapshot(), "xemngay": secondary.stats.snapshot()}
+
+    _print_report(results, config)
+    print(f"\nMock servers: {server_stats}")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(
+            json.dumps({"config": config, "results": results, "servers": server_stats}, indent=2),
+            encoding="utf-8",
+        )
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Fixture pages cho benchmarks - HTML giả lập lichngaytot.com và xemngay.com.
+
+Trang được sinh deterministic theo ngày: Can Chi ngày tính từ Julian Day
+Number, Sao / Trực / hướng... xoay vòng theo ngày, nên 2 nguồn luôn khớp nhau
+(cross-validation ra consistent). Cấu trúc và kích thước trang (menu, footer,
+script, bài liên quan) mô phỏng trang thật để chi phí parse sát thực tế.
+"""
+from datetime import date
+
+from src.parsers.patterns import CANS, CHIS
+
+# (tên, ngũ hành, con vật)
+STARS_28 = [
+    ('Giác', 'Mộc', 'Giao'), ('Cang', 'Kim', 'Long'), ('Đê', 'Thổ', 'Lạc'),
+    ('Phòng', 'Nhật', 'Thố'), ('Tâm', 'Nguyệt', 'Hồ'), ('Vĩ', 'Hỏa', 'Hổ'),
+    ('Cơ', 'Thủy', 'Báo'), ('Đẩu', 'Mộc', 'Giải'), ('Ngưu', 'Kim', 'Ngưu'),
+    ('Nữ', 'Thổ', 'Bức'), ('Hư', 'Nhật', 'Thử'), ('Nguy', 'Nguyệt', 'Yến'),
+    ('Thất', 'Hỏa', 'Trư'), ('Bích', 'Thủy', 'Du'), ('Khuê', 'Mộc', 'Lang'),
+    ('Lâu', 'Kim', 'Cẩu'), ('Vị', 'Thổ', 'Trĩ'), ('Mão', 'Nhật', 'Kê'),
+    ('Tất', 'Nguyệt', 'Ô'), ('Chủy', 'Hỏa', 'Hầu'), ('Sâm', 'Thủy', 'Viên'),
+    ('Tỉnh', 'Mộc', 'Hãn'), ('Quỷ', 'Kim', 'Dương'), ('Liễu', 'Thổ', 'Chương'),
+    ('Tinh', 'Nhật', 'Mã'), ('Trương', 'Nguyệt', 'Lộc'), ('Dực', 'Hỏa', 'Xà'),
+    ('Chẩn', 'Thủy', 'Dẫn'),
+]
+
+TRUC_12 = ['Kiến', 'Trừ', 'Mãn', 'Bình', 'Định', 'Chấp', 'Phá', 'Nguy', 'Thành', 'Thu', 'Khai', 'Bế']
+
+TIET_KHI = [
+    'Tiểu hàn', 'Đại hàn', 'Lập xuân', 'Vũ thủy', 'Kinh trập', 'Xuân phân',
+    'Thanh minh', 'Cốc vũ', 'Lập hạ', 'Tiểu mãn', 'Mang chủng', 'Hạ chí',
+    'Tiểu thử', 'Đại thử', 'Lập thu', 'Xử thử', 'Bạch lộ', 'Thu phân',
+    'Hàn lộ', 'Sương giáng', 'Lập đông', 'Tiểu tuyết', 'Đại tuyết', 'Đông chí',
+]
+
+LUNAR_MONTH_NAMES = [
+    'GIÊNG', 'HAI', 'BA', 'TƯ', 'NĂM', 'SÁU',
+    'BẢY', 'TÁM', 'CHÍN', 'MƯỜI', 'MƯỜI MỘT', 'CHẠP',
+]
+
+DIRECTIONS = ['Đông Bắc', 'Tây Bắc', 'Tây Nam', 'Chính Nam', 'Đông Nam', 'Chính Đông', 'Chính Bắc', 'Chính Tây']
+
+GOOD_ACTIVITIES = [
+    'cúng tế', 'cầu phúc', 'cầu tự', 'họp mặt', 'xuất hành', 'nhậm chức',
+    'đính hôn', 'ăn hỏi', 'cưới gả', 'động thổ', 'đổ mái', 'sửa kho',
+    'khai trương', 'ký kết', 'giao dịch', 'nạp tài', 'mở kho', 'an táng',
+]
+BAD_ACTIVITIES = [
+    'chữa bệnh', 'đào đất', 'săn bắn', 'đánh cá', 'trồng cây', 'chặt cây',
+    'kiện tụng', 'tranh chấp', 'đi thuyền', 'sửa bếp', 'dỡ nhà', 'phá thổ',
+]
+GOOD_STARS = [
+    ('Nguyệt Đức', 'Tốt mọi việc'), ('Minh tinh', 'Tốt mọi việc'),
+    ('Thiên Phú', 'Tốt mọi việc, nhất là xây dựng nhà cửa, khai trương'),
+    ('Lộc khố', 'Tốt cho việc cầu tài, khai trương, giao dịch'),
+    ('Mẫu Thương', 'Tốt về cầu tài lộc, khai trương'),
+    ('Tục Thế', 'Tốt mọi việc, nhất là giá thú'),
+]
+BAD_STARS = [
+    ('Tiểu Hao', 'Xấu về giao dịch, mua bán'), ('Hoang vu', 'Xấu mọi việc'),
+    ('Thổ phủ', 'Kỵ xây dựng, động thổ'), ('Thiên Lại', 'Xấu mọi việc'),
+    ('Ngũ Quỹ', 'Kỵ xuất hành'), ('Băng tiêu ngọa hãm', 'Xấu mọi việc'),
+]
+LY_THUAN_PHONG = [
+    ('Tốc hỷ', 'TỐT', 'Tin vui sắp tới, nếu cầu lộc, cầu tài thì đi hướng Nam. Đi việc gặp gỡ có nhiều may mắn.'),
+    ('Lưu niên', 'XẤU', 'Nghiệp khó thành, cầu tài mờ mịt. Kiện cáo nên hoãn lại. Người đi chưa có tin về.'),
+    ('Xích khẩu', 'XẤU', 'Hay cãi cọ gây chuyện đói kém, phải nên đề phòng. Người ra đi nên hoãn lại.'),
+    ('Tiểu cát', 'TỐT', 'Rất tốt lành, đi thường gặp may mắn. Buôn bán có lời. Phụ nữ có tin mừng.'),
+    ('Không vong', 'XẤU', 'Làm việc gì đều không thành, cầu tài không có lợi hay bị trái ý.'),
+    ('Đại an', 'TỐT', 'Mọi việc đều tốt lành, cầu tài đi hướng Tây Nam. Nhà cửa yên lành.'),
+]
+HOUR_RANGES = ['23h-1h', '1h-3h', '3h-5h', '5h-7h', '7h-9h', '9h-11h',
+               '11h-13h', '13h-15h', '15h-17h', '17h-19h', '19h-21h', '21h-23h']
+
+# Mốc trăng mới (6/1/2000) và độ dài tháng giao hội để ước lượng ngày âm
+_NEW_MOON_ORDINAL = date(2000, 1, 6).toordinal()
+_SYNODIC_MONTH = 29.530588
+
+
+def day_info(target_date: date) -> dict:
+    """
+    Thông tin lịch (giả lập, deterministic) cho 1 ngày.
+
+    Args:
+        target_date: Ngày dương lịch
+
+    Returns:
+        Dict các trường dùng để render fixture
+    """
+    ordinal = target_date.toordinal()
+    jdn = ordinal + 1721425
+
+    moon_age = (ordinal - _NEW_MOON_ORDINAL) % _SYNODIC_MONTH
+    lunar_day = int(moon_age) + 1
+    lunar_month = (target_date.month - 2) % 12 + 1 if target_date.day < lunar_day else (target_date.month - 1) % 12 + 1
+    lunar_year = target_date.year - 1 if lunar_month > 10 and target_date.month < 3 else target_date.year
+
+    year_can = CANS[(lunar_year + 6) % 10]
+    year_chi = CHIS[(lunar_year + 8) % 12]
+    month_chi = CHIS[(lunar_month + 1) % 12]
+    month_can = CANS[((lunar_year + 6) % 10 * 2 + lunar_month + 1) % 10]
+    day_can = CANS[(jdn + 9) % 10]
+    day_chi_index = (jdn + 1) % 12
+    day_chi = CHIS[day_chi_index]
+
+    star_name, star_element, star_animal = STARS_28[(ordinal + 11) % 28]
+    truc = TRUC_12[(ordinal - lunar_month) % 12]
+    tiet_khi = TIET_KHI[((target_date.timetuple().tm_yday - 6) // 15) % 24]
+
+    # Giờ hoàng đạo: 6 giờ theo chi của ngày
+    hoang_dao = [(day_chi_index * 2 + offset) % 12 for offset in (0, 1, 4, 5, 7, 10)]
+
+    return {
+        'date': target_date,
+        'lunar_day': lunar_day,
+        'lunar_month': lunar_month,
+        'lunar_year': lunar_year,
+        'year_can_chi': f'{year_can} {year_chi}',
+        'month_can_chi': f'{month_can} {month_chi}',
+        'day_can_chi': f'{day_can} {day_chi}',
+        'star': star_name,
+        'star_element': star_element,
+        'star_animal': star_animal,
+        'truc': truc,
+        'tiet_khi': tiet_khi,
+        'hoang_dao': sorted(set(hoang_dao)),
+        'hy_than': DIRECTIONS[ordinal % 8],
+        'tai_than': DIRECTIONS[(ordinal + 3) % 8],
+        'hac_than': DIRECTIONS[(ordinal + 5) % 8],
+        'good': [GOOD_ACTIVITIES[(ordinal + i) % len(GOOD_ACTIVITIES)] for i in range(0, 14, 2)],
+        'bad': [BAD_ACTIVITIES[(ordinal + i) % len(BAD_ACTIVITIES)] for i in range(0, 8, 2)],
+        'xung_ngay': [f'{CANS[(jdn + k) % 10]} {CHIS[(day_chi_index + 6) % 12]}' for k in (1, 3, 5, 7)],
+        'xung_thang': [f'{CANS[(jdn + k) % 10]} {CHIS[(lunar_month + 7) % 12]}' for k in (2, 4, 6)],
+    }
+
+
+def _site_chrome(site: str, related: int, related_title: str) -> tuple[str, str]:
+    """Header (menu) và footer (bài liên quan, script) chung cho mọi trang."""
+    menu = ''.join(
+        f'<li class="menu-item"><a href="/{site}/chuyen-muc-{i}">Chuyên mục phong thủy {i}</a>'
+        f'<ul class="sub-menu">'
+        + ''.join(f'<li><a href="/{site}/bai-{i}-{j}">Bài viết {i}.{j}</a></li>' for j in range(6))
+        + '</ul></li>'
+        for i in range(24)
+    )
+    header = (
+        f'<header id="header"><div class="logo"><a href="/">{site}</a></div>'
+        f'<nav class="main-menu"><ul>{menu}</ul></nav>'
+        f'<form class="search"><input type="text" name="q" placeholder="Tìm kiếm..."></form></header>'
+    )
+    articles = ''.join(
+        f'<div class="news-item"><a href="/tin-tuc/{i}"><img src="/img/{i}.jpg" alt="bai {i}"></a>'
+        f'<h4><a href="/tin-tuc/{i}">Tử vi hàng tuần số {i}: dự đoán vận trình 12 con giáp</a></h4>'
+        f'<p class="desc">Cùng xem tử vi và phong thủy tuần này để biết vận may tài lộc, công danh, '
+        f'tình duyên của bạn có gì thay đổi.</p></div>'
+        for i in range(related)
+    )
+    script = '<script>' + ''.join(
+        f'window.dataLayer=window.dataLayer||[];dataLayer.push({{"event":"view","slot":{i}}});'
+        for i in range(40)
+    ) + '</script>'
+    footer = (
+        f'<footer id="footer"><div class="related"><h3>{related_title}</h3>{articles}</div>'
+        f'<div class="copyright">© {site} - Giữ bản quyền nội dung.</div></footer>{script}'
+    )
+    return header, footer
+
+
+_LICHNGAYTOT_CHROME = _site_chrome('lichngaytot.com', related=60, related_title='Bài viết liên quan')
+_XEMNGAY_CHROME = _site_chrome('xemngay.com', related=30, related_title='Có thể bạn quan tâm')
+
+
+def lichngaytot_page(target_date: date) -> str:
+    """HTML giả lập trang lichngaytot.com/xem-ngay-tot-xau-DD-MM-YYYY."""
+    info = day_info(target_date)
+    header, footer = _LICHNGAYTOT_CHROME
+    d = target_date
+
+    hoang_dao = ', '.join(
+        f'{CANS[(i + d.toordinal()) % 10]} {CHIS[i]} ({HOUR_RANGES[i]})' for i in info['hoang_dao']
+    )
+    hac_dao = ', '.join(
+        f'{CANS[(i + d.toordinal()) % 10]} {CHIS[i]} ({HOUR_RANGES[i]})'
+        for i in range(12) if i not in info['hoang_dao']
+    )
+    good_stars = ' '.join(f'{name}: {desc};' for name, desc in GOOD_STARS[d.toordinal() % 3:][:4])
+    bad_stars = ' '.join(f'{name}: {desc};' for name, desc in BAD_STARS[d.toordinal() % 2:][:4])
+    ly_thuan_phong = ''.join(
+        f'<p>{HOUR_RANGES[i]} {HOUR_RANGES[i + 6]} {name}: {rating} {desc}</p>'
+        for i, (name, rating, desc) in enumerate(LY_THUAN_PHONG)
+    )
+
+    return f'''<!DOCTYPE html>
+<html lang="vi"><head><meta charset="utf-8">
+<title>Lịch âm {info['lunar_day']}-{info['lunar_month']}-{info['lunar_year']} - Xem ngày tốt xấu {d:%d/%m/%Y}</title>
+<meta name="description" content="Xem ngày tốt xấu {d:%d/%m/%Y}, lịch vạn niên, giờ hoàng đạo, hướng xuất hành.">
+<link rel="stylesheet" href="/css/style.css"></head>
+<body>{header}
+<div id="main"><div class="breadcrumb"><a href="/">Trang chủ</a> » <a href="/xem-ngay-tot-xau">Xem ngày tốt xấu</a></div>
+<div class="calendar-box">
+<div class="calendar-info"><span class="ngay-duong">{d.day}</span><span class="thang-duong">Tháng {d.month} năm {d.year}</span></div>
+<div class="calendar-info2"><span class="ngay-am">{info['lunar_day']}</span> THÁNG {LUNAR_MONTH_NAMES[info['lunar_month'] - 1]}</div>
+<div class="calendar-box2"><p>Năm {info['year_can_chi']}</p><p>Tháng {info['month_can_chi']}</p>
+<p>Ngày {info['day_can_chi']}</p><p>Tiết khí: {info['tiet_khi']}</p></div>
+<div class="calendar-col2"><b>Giờ Hoàng Đạo:</b> {hoang_dao}</div>
+<div class="calendar-col2"><b>Giờ Hắc Đạo:</b> {hac_dao}</div>
+</div>
+<div class="content-detail">
+<h2>Xem ngày tốt xấu theo Nhị thập bát tú</h2>
+<p>Sao {info['star']} ({info['star_element']}) - con {info['star_animal']}.</p>
+<p>- Nên làm: {', '.join(info['good']).capitalize()} đều đặng vinh xương, tấn lợi.</p>
+<p>- Kỵ làm: {', '.join(info['bad']).capitalize()}, dễ gặp hoạn nạn.</p>
+<p>- Ngoại lệ: Sao {info['star']} trúng ngày {info['day_can_chi']} thì mọi việc đều tốt.</p>
+<h2>Thập nhị kiến trừ</h2><p>Trực: {info['truc']}</p>
+<h2>Cát tinh và Hung tinh</h2>
+<p>Theo Ngọc hạp thông thư, ngày hôm nay có các sao tốt là {good_stars}</p>
+<p>Các sao xấu là {bad_stars}</p>
+<h2>Hôm nay ngày gì</h2><p>Ngày {info['day_can_chi']} là ngày bình thường, không trùng ngày kỵ lớn.</p>
+<h2>Hướng xuất hành</h2>
+<p>Hỷ thần (hướng thần may mắn) - TỐT: Hướng {info['hy_than']}</p>
+<p>Tài thần (hướng thần tài) - TỐT: Hướng {info['tai_than']}</p>
+<p>Hắc thần (hướng ông thần ác) - XẤU: Hướng {info['hac_than']}</p>
+<h2>Giờ xuất hành theo Lý Thuần Phong</h2>{ly_thuan_phong}
+<h2>Tuổi xung khắc</h2>
+<p>Xung ngày: {', '.join(info['xung_ngay'])}</p>
+<p>Xung tháng: {', '.join(info['xung_thang'])}</p>
+</div></div>
+{footer}
+</body></html>'''
+
+
+def xemngay_page(target_date: date) -> str:
+    """HTML giả lập trang xemngay.com/?blog=xngay&d=DDMMYYYY."""
+    info = day_info(target_date)
+    header, footer = _XEMNGAY_CHROME
+    d = target_date
+
+    return f'''<!DOCTYPE html>
+<html lang="vi"><head><meta charset="utf-8">
+<title>Xem ngày tốt xấu {d:%d/%m/%Y} - xemngay.com</title></head>
+<body>{header}
+<table class="tbl-xemngay"><tr><td class="ngayduong">Dương lịch: {d:%d/%m/%Y}</td></tr>
+<tr><td class="ngayam">Ngày âm lịch: {info['lunar_day']}/{info['lunar_month']}/{info['lunar_year']}</td></tr>
+<tr><td>Là ngày: <b>{info['day_can_chi']}</b>, tháng: <b>{info['month_can_chi']}</b>, năm: <b>{info['year_can_chi']}</b></td></tr>
+<tr><td>Sao: {info['star']} (Thuộc hành: {info['star_element']}, Con vật: {info['star_animal']})</td></tr>
+<tr><td>Trực: [{info['truc']}]</td></tr>
+<tr><td>Hướng tài lộc: [{info['tai_than']}] | Hỷ thần: [{info['hy_than']}] | Hướng bất lợi: [{info['hac_than']}]</td></tr>
+<tr><td>Nên làm: {', '.join(info['good'])}</td></tr>
+<tr><td>Không nên: {', '.join(info['bad'])}</td></tr>
+</table>
+{footer}
+</body></html>'''
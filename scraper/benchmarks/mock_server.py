@@ -0,0 +1,242 @@
+"""
+Mock server giả lập lichngaytot.com và xemngay.com cho benchmarks.
+
+Phục vụ cả 2 dạng URL bằng fixture pages (benchmarks/fixtures.py):
+    /xem-ngay-tot-xau-DD-MM-YYYY     -> trang lichngaytot
+    /?blog=xngay&d=DDMMYYYY          -> trang xemngay
+
+Có thể cấu hình latency (+ jitter), tỉ lệ lỗi 5xx và tỉ lệ 429 kèm
+Retry-After để đo hành vi của scraper khi host chậm hoặc bị throttle.
+Response được nén gzip/deflate theo Accept-Encoding như server thật.
+
+Chạy độc lập:
+    python -m benchmarks.mock_server --port 8000 --latency 0.1 --error-rate 0.02
+"""
+import argparse
+import gzip
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from .fixtures import lichngaytot_page, xemngay_page
+
+_LICHNGAYTOT_PATH = re.compile(r'^/xem-ngay-tot-xau-(\d{2})-(\d{2})-(\d{4})/?$')
+
+
+class MockServerStats:
+    """Đếm request theo kết quả."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.ok = 0
+        self.errors = 0
+        self.throttled = 0
+        self.not_found = 0
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            self.requests += 1
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "ok": self.ok,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "not_found": self.not_found,
+            }
+
+
+def _route(path: str) -> Optional[str]:
+    """Map request path -> HTML fixture, None nếu không khớp URL nào."""
+    parsed = urlparse(path)
+
+    match = _LICHNGAYTOT_PATH.match(parsed.path)
+    if match:
+        day, month, year = (int(part) for part in match.groups())
+        return lichngaytot_page(date(year, month, day))
+
+    query = parse_qs(parsed.query)
+    if parsed.path in ("", "/") and query.get("blog") == ["xngay"] and "d" in query:
+        target_date = datetime.strptime(query["d"][0], "%d%m%Y").date()
+        return xemngay_page(target_date)
+
+    return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MockServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.simulate_latency()
+
+        outcome = server.draw_outcome()
+        if outcome == "throttled":
+            server.stats.count("throttled")
+            self._send(429, b"Too Many Requests", {"Retry-After": str(server.retry_after)})
+            return
+        if outcome == "error":
+            server.stats.count("errors")
+            self._send(503, b"Service Unavailable")
+            return
+
+        try:
+            html = _route(self.path)
+        except ValueError:
+            html = None
+        if html is None:
+            server.stats.count("not_found")
+            self._send(404, b"Not Found")
+            return
+
+        server.stats.count("ok")
+        body = html.encode("utf-8")
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        accept = self.headers.get("Accept-Encoding", "")
+        if server.compress and "gzip" in accept:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        elif server.compress and "deflate" in accept:
+            body = zlib.compress(body)
+            headers["Content-Encoding"] = "deflate"
+        self._send(200, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer(ThreadingHTTPServer):
+    """HTTP server giả lập 2 nguồn, chạy trên background thread."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        compress: bool = True,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            host: Địa chỉ bind
+            port: Port (0 = chọn port trống)
+            latency: Latency cơ bản mỗi request (seconds)
+            jitter: Latency cộng thêm ngẫu nhiên trong [0, jitter] seconds
+            error_rate: Tỉ lệ request trả 503
+            throttle_rate: Tỉ lệ request trả 429 kèm Retry-After
+            retry_after: Giá trị Retry-After (seconds) của response 429
+            compress: Nén gzip/deflate theo Accept-Encoding
+            seed: Seed cho RNG (latency / lỗi), để các lần chạy so sánh được
+        """
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.compress = compress
+        self.stats = MockServerStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def simulate_latency(self) -> None:
+        with self._rng_lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def draw_outcome(self) -> str:
+        """'throttled', 'error' hoặc 'ok' theo throttle_rate / error_rate."""
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return "throttled"
+        if roll < self.throttle_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+    def start(self) -> "MockServer":
+        """Chạy server trên background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Dừng server và giải phóng port."""
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock lichngaytot.com / xemngay.com server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Base latency (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of 429 (seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Serving on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Stats: {server.stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
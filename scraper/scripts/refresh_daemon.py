@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Daemon refresh dữ liệu cho các tháng sắp tới.
+
+Ngày gần hôm nay được refresh thường xuyên, ngày xa hiếm hơn; chỉ ngày thay
+đổi được ghi vào SQLite và chỉ năm có thay đổi được export lại.
+
+Usage:
+    python scripts/refresh_daemon.py                      # 6 tháng tới, chu kỳ 15 phút
+    python scripts/refresh_daemon.py --months 12 --tick-minutes 30
+    python scripts/refresh_daemon.py --once               # chạy 1 chu kỳ rồi thoát (cron)
+"""
+import argparse
+import logging
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.pipeline.refresh import RefreshPolicy, RefreshScheduler
+from src.scrapers.lichngaytot import LichNgayTotScraper
+from src.storage.dead_letter import DeadLetterStore
+from src.storage.html_cache import HTMLCache
+from src.storage.json_exporter import JSONExporter
+from src.storage.sqlite_storage import SQLiteStorage
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler('refresh.log'),
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Keep upcoming days fresh: re-scrape by staleness and proximity to today'
+    )
+    parser.add_argument(
+        '--months',
+        type=int,
+        default=6,
+        help='Refresh horizon in months from today (default: 6)'
+    )
+    parser.add_argument(
+        '--tick-minutes',
+        type=float,
+        default=15,
+        help='Minutes between refresh cycles (default: 15)'
+    )
+    parser.add_argument(
+        '--max-per-cycle',
+        type=int,
+        default=50,
+        help='Maximum days refreshed per cycle (default: 50)'
+    )
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='Run a single cycle and exit'
+    )
+    parser.add_argument(
+        '--db',
+        type=Path,
+        default=Path('data/fengshui.db'),
+        help='SQLite database (default: data/fengshui.db)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=Path,
+        default=Path('data/export'),
+        help='Export directory for changed years (default: data/export)'
+    )
+    parser.add_argument(
+        '--no-export',
+        action='store_true',
+        help='Only update the database, do not export'
+    )
+    parser.add_argument(
+        '--dead-letters',
+        type=Path,
+        default=Path('data/processed/dead_letters.db'),
+        help='Dead-letter store for days that fail to refresh '
+             '(default: data/processed/dead_letters.db)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=Path('data/raw'),
+        help='Raw HTML cache directory, used for conditional requests (default: data/raw)'
+    )
+    parser.add_argument(
+        '--delay-min',
+        type=float,
+        default=1.0,
+        help='Minimum delay between requests in seconds (default: 1.0)'
+    )
+    parser.add_argument(
+        '--delay-max',
+        type=float,
+        default=2.0,
+        help='Maximum delay between requests in seconds (default: 2.0)'
+    )
+    args = parser.parse_args()
+
+    storage = SQLiteStorage(args.db)
+    exporter = None if args.no_export else JSONExporter(args.output)
+    policy = RefreshPolicy(horizon_days=args.months * 31, max_per_cycle=args.max_per_cycle)
+
+    # ttl=0: mọi trang đều gửi conditional request, 304 thì không parse lại
+    cache = HTMLCache(args.cache_dir, ttl=timedelta(0))
+
+    with LichNgayTotScraper(delay_range=(args.delay_min, args.delay_max), cache=cache) as scraper:
+        refresher = RefreshScheduler(
+            scraper, storage, exporter, policy, DeadLetterStore(args.dead_letters)
+        )
+        if args.once:
+            stats = refresher.run_cycle()
+            print(
+                f"Refreshed {stats['due']} days: {stats['changed']} changed, "
+                f"{stats['unchanged']} unchanged, {stats['failed']} failed, "
+                f"{stats['backing_off']} backing off"
+                + (f"; exported {stats['exported_years']}" if stats['exported_years'] else "")
+            )
+        else:
+            refresher.start(tick=timedelta(minutes=args.tick_minutes))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,19 +6,63 @@ Usage:
     python scripts/scrape_year.py 2025
     python scripts/scrape_year.py 2025 --output data/export
     python scripts/scrape_year.py 2025 --start-month 6 --end-month 12
+    python scripts/scrape_year.py 2025 --concurrency 4
+    python scripts/scrape_year.py 2025 --cache-ttl 0      # revalidate mọi trang đã cache
+    python scripts/scrape_year.py 2025 --resume           # tiếp tục job bị dừng
+    python scripts/scrape_year.py 2025 --with-xemngay     # cross-validate + merge với xemngay.com
+    python scripts/scrape_year.py 2025 --lazy-xemngay     # chỉ fetch xemngay.com cho ngày đáng ngờ
+    python scripts/scrape_year.py 1900 --end-year 2100 --workers 8  # backfill nhiều năm, đa process
+    python scripts/scrape_year.py 2025 --concurrency 4 --parse-workers 2  # fetch/parse pipeline
+    python scripts/scrape_year.py 2025 --record data/archive/2025.zip     # ghi archive khi scrape
+    python scripts/scrape_year.py 2025 --replay data/archive/2025.zip     # chạy lại offline từ archive
+    python scripts/scrape_year.py 2025 --force    # parse + export lại cả những ngày không đổi
+    python scripts/scrape_year.py 2025 --retry-failed     # chỉ fetch lại các ngày trong dead letters
+    python scripts/scrape_year.py 2025 --reparse          # parse lại HTML đã cache sau khi sửa parser
 """
 import argparse
+import asyncio
+import hashlib
 import logging
 import sys
 from datetime import date, timedelta
+from itertools import groupby
 from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.scrapers.lichngaytot import LichNgayTotScraper
+from src.scrapers.lichngaytot import (
+    LichNgayTotScraper,
+    AsyncLichNgayTotScraper,
+    AsyncXemNgayScraper,
+    XemNgayScraper,
+)
+from src.parsers import BatchParser, LichNgayTotParser
+from src.parsers.version import versioned_hash
+from src.pipeline.dual_source import DualSourcePipeline
+from src.scrapers.core import DayResult
+from src.pipeline.sharded import scrape_range
+from src.pipeline.staged import StagedPipeline
+from src.scrapers.coalesce import coalescer_stats
+from src.scrapers.metrics import PHASES, request_metrics, write_request_metrics
+from src.scrapers.rate_limiter import (
+    DEFAULT_MAX_RATE,
+    AdaptiveRateLimiter,
+    limiter_kwargs_from_delay_range,
+    rate_limiter_stats,
+    set_rate_limiter,
+)
+from src.scrapers.resilience import circuit_breaker_stats, get_retry_budget
+from src.scrapers.transfer import transfer_stats
+from src.storage.dead_letter import DeadLetterStore
 from src.storage.json_exporter import JSONExporter
-from src.models.day_data import DayData
+from src.storage.html_archive import HTMLArchive
+from src.storage.html_cache import HTMLCache
+from src.storage.job_journal import JobJournal
+from src.storage.sqlite_storage import SQLiteStorage
+from src.validators.cross_validator import CrossValidator
 
 # Setup logging
 logging.basicConfig(
@@ -41,15 +85,358 @@ def progress_callback(current: int, total: int) -> None:
     print(f'\r[{bar}] {percent:.1f}% ({current}/{total})', end='', flush=True)
 
 
+def print_request_metrics(metrics: dict[str, dict]) -> None:
+    """In histogram tóm tắt các phase request theo host."""
+    for host, host_metrics in metrics.items():
+        if not host_metrics['requests'] and not host_metrics['phases']:
+            continue
+        print(
+            f"Request timings {host}: {host_metrics['requests']} requests, "
+            f"{host_metrics['retries']} retries, {host_metrics['failed']} failed"
+        )
+        print(f"  {'phase':<11}{'count':>7}{'mean ms':>10}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>9}{'total s':>10}")
+        for phase in PHASES:
+            stats = host_metrics['phases'].get(phase)
+            if not stats:
+                continue
+            print(
+                f"  {phase:<11}{stats['count']:>7}{stats['mean_ms']:>10}{stats['p50_ms']:>8}"
+                f"{stats['p90_ms']:>8}{stats['p99_ms']:>8}{stats['max_ms']:>9}{stats['total_s']:>10}"
+            )
+
+
+def print_dead_letters(
+    dead_letters: DeadLetterStore,
+    sources: list[str],
+    start_date: date,
+    end_date: date,
+) -> None:
+    """In số ngày còn trong dead letters của khoảng ngày, theo exception class."""
+    pending = dead_letters.pending(sources, start_date, end_date)
+    if not pending:
+        return
+    by_error: dict[str, int] = {}
+    for letter in pending:
+        by_error[letter.error_type or "?"] = by_error.get(letter.error_type or "?", 0) + 1
+    errors = ", ".join(f"{error_type}={count}" for error_type, count in sorted(by_error.items()))
+    print(
+        f"Dead letters: {len({letter.solar_date for letter in pending})} dates still failing "
+        f"({errors}); re-run with --retry-failed"
+    )
+
+
+def _sources(with_xemngay: bool) -> list[str]:
+    """Các nguồn (host) của 1 job, dùng để lọc dead letters."""
+    scrapers = [LichNgayTotScraper, XemNgayScraper] if with_xemngay else [LichNgayTotScraper]
+    return [urlparse(scraper.BASE_URL).netloc for scraper in scrapers]
+
+
+def _configure_rate_limiters(delay_range: tuple[float, float], max_rate: float) -> None:
+    """Limiter của mỗi host: rate khởi đầu theo delay_range, AIMD tăng tối đa tới max_rate."""
+    for scraper in (LichNgayTotScraper, XemNgayScraper):
+        set_rate_limiter(
+            urlparse(scraper.BASE_URL).netloc,
+            AdaptiveRateLimiter(**limiter_kwargs_from_delay_range(delay_range, max_rate)),
+        )
+
+
+def _attach_archives(
+    scraper,
+    replay: Optional[HTMLArchive] = None,
+    recorder: Optional[HTMLArchive] = None,
+    storage: Optional[SQLiteStorage] = None,
+):
+    """Bật replay / record archive và change detection cho scraper."""
+    if replay is not None:
+        scraper.enable_replay(replay)
+    if recorder is not None:
+        scraper.enable_recording(recorder)
+    if storage is not None:
+        scraper.enable_change_detection(storage)
+    return scraper
+
+
+class ResultRecorder:
+    """
+    Ghi kết quả từng ngày vào journal, vào SQLite store nếu nội dung đổi, và
+    ngày fail vào dead-letter store.
+    """
+
+    def __init__(
+        self,
+        journal: JobJournal,
+        storage: Optional[SQLiteStorage] = None,
+        dead_letters: Optional[DeadLetterStore] = None,
+        force: bool = False,
+    ):
+        self.journal = journal
+        self.storage = storage
+        self.dead_letters = dead_letters
+        # --force: không tra page hash (parse lại mọi ngày) nhưng vẫn ghi storage
+        self.known_pages = None if force else storage
+        # Key của nguồn chính trong dead letters (cùng host với scraper)
+        self.source = urlparse(LichNgayTotScraper.BASE_URL).netloc
+        self.unchanged = 0
+        self.changed = 0
+        self.resolved = 0
+
+    def __call__(self, result: DayResult) -> None:
+        """Ghi kết quả 1 ngày ngay khi có."""
+        self.record_source(self.source, result.solar_date, None if result.ok else result)
+        if not result.day_data:
+            logger.warning(f"No data returned for {result.solar_date}")
+            self.journal.mark_failed(result.solar_date, result.error or "no data returned")
+            return
+
+        self.journal.mark_done(result.day_data)
+        if result.unchanged:
+            self.unchanged += 1
+        elif self.storage is not None and self.storage.save_day_if_changed(
+            result.day_data, result.page_hash
+        ):
+            self.changed += 1
+
+    def record_source(
+        self,
+        source: str,
+        target_date: date,
+        failure: Optional[DayResult] = None,
+    ) -> None:
+        """Ghi lỗi của 1 nguồn vào dead letters, hoặc resolve nếu nguồn đó đã thành công."""
+        if self.dead_letters is None:
+            return
+        if failure is None:
+            self.resolved += self.dead_letters.resolve(source, target_date)
+        else:
+            self.dead_letters.add(
+                source, target_date, failure.url, failure.error_type, failure.error
+            )
+
+
+async def _scrape_dates_async(
+    dates: list[date],
+    record: ResultRecorder,
+    delay_range: tuple[float, float],
+    concurrency: int,
+    cache: Optional[HTMLCache] = None,
+    replay: Optional[HTMLArchive] = None,
+    recorder: Optional[HTMLArchive] = None,
+    max_retries: int = 3,
+    retry_backoff: tuple[float, float] = (2.0, 10.0),
+) -> None:
+    """Scrape các ngày với AsyncLichNgayTotScraper, journal từng ngày khi xong."""
+    async with AsyncLichNgayTotScraper(
+        delay_range=delay_range,
+        max_concurrency=concurrency,
+        cache=cache,
+        max_retries=max_retries,
+        retry_backoff=retry_backoff,
+    ) as scraper:
+        _attach_archives(scraper, replay, recorder, record.known_pages)
+        async for result in scraper.iter_dates(dates, progress_callback):
+            record(result)
+        # Ngày fail vì lỗi tạm thời (host lỗi, circuit mở): thử lại 1 lượt
+        async for result in scraper.iter_retry_queue():
+            record(result)
+
+
+async def _scrape_dates_staged(
+    dates: list[date],
+    record: ResultRecorder,
+    delay_range: tuple[float, float],
+    concurrency: int,
+    parse_workers: int,
+    cache: Optional[HTMLCache] = None,
+    replay: Optional[HTMLArchive] = None,
+    recorder: Optional[HTMLArchive] = None,
+    max_retries: int = 3,
+    retry_backoff: tuple[float, float] = (2.0, 10.0),
+) -> dict:
+    """
+    Scrape qua StagedPipeline: fetch song song, parse trong process pool.
+
+    Returns:
+        Pipeline stats snapshot
+    """
+    async with AsyncLichNgayTotScraper(
+        delay_range=delay_range,
+        max_concurrency=concurrency,
+        cache=cache,
+        max_retries=max_retries,
+        retry_backoff=retry_backoff,
+    ) as scraper:
+        _attach_archives(scraper, replay, recorder, record.known_pages)
+        pipeline = StagedPipeline(scraper, parse_workers=parse_workers)
+        stats = await pipeline.run(dates, record, progress_callback)
+        async for result in scraper.iter_retry_queue():
+            record(result)
+        return stats
+
+
+async def _scrape_dates_dual_source(
+    dates: list[date],
+    record: ResultRecorder,
+    delay_range: tuple[float, float],
+    concurrency: int,
+    cache: Optional[HTMLCache] = None,
+    replay: Optional[HTMLArchive] = None,
+    recorder: Optional[HTMLArchive] = None,
+    max_retries: int = 3,
+    retry_backoff: tuple[float, float] = (2.0, 10.0),
+    lazy_secondary: bool = False,
+) -> tuple[dict, Optional[dict]]:
+    """
+    Scrape lichngaytot.com + xemngay.com song song, journal DayData đã merge.
+    Lỗi của từng nguồn được ghi riêng vào dead letters. Lazy mode chỉ fetch
+    xemngay.com cho ngày mà lichngaytot.com không qua kiểm tra nhanh.
+
+    Returns:
+        (Cross-validation summary, thống kê fetch nguồn phụ nếu lazy mode)
+    """
+    total = len(dates)
+    done_count = 0
+    validations = []
+
+    primary = AsyncLichNgayTotScraper(
+        delay_range=delay_range,
+        max_concurrency=concurrency,
+        cache=cache,
+        max_retries=max_retries,
+        retry_backoff=retry_backoff,
+    )
+    secondary = AsyncXemNgayScraper(
+        max_concurrency=concurrency,
+        cache=cache,
+        max_retries=max_retries,
+        retry_backoff=retry_backoff,
+    )
+    _attach_archives(primary, replay, recorder)
+    _attach_archives(secondary, replay, recorder)
+
+    async with DualSourcePipeline(
+        primary, secondary, storage=record.known_pages, lazy_secondary=lazy_secondary
+    ) as pipeline:
+        async for result in pipeline.stream(dates):
+            failure = result.failures.get(primary.host)
+            record(DayResult(
+                result.solar_date,
+                result.merged,
+                error=failure.error if failure else None,
+                page_hash=result.page_hash,
+                unchanged=result.unchanged,
+                url=failure.url if failure else None,
+                error_type=failure.error_type if failure else None,
+            ))
+            # Lazy mode không fetch nguồn phụ thì không biết nó đã hết lỗi hay chưa
+            if result.secondary_fetched:
+                record.record_source(
+                    secondary.host, result.solar_date, result.failures.get(secondary.host)
+                )
+            if result.validation:
+                validations.append(result.validation)
+            done_count += 1
+            progress_callback(done_count, total)
+
+        secondary_stats = pipeline.secondary_stats.snapshot() if lazy_secondary else None
+        return pipeline.validator.summarize(validations), secondary_stats
+
+
+def _scrape_dates_sync(
+    dates: list[date],
+    record: ResultRecorder,
+    delay_range: tuple[float, float],
+    cache: Optional[HTMLCache] = None,
+    replay: Optional[HTMLArchive] = None,
+    recorder: Optional[HTMLArchive] = None,
+    max_retries: int = 3,
+    retry_backoff: tuple[float, float] = (2.0, 10.0),
+) -> None:
+    """Scrape tuần tự từng ngày với LichNgayTotScraper, journal từng ngày khi xong."""
+    with LichNgayTotScraper(
+        delay_range=delay_range,
+        cache=cache,
+        max_retries=max_retries,
+        retry_backoff=retry_backoff,
+    ) as scraper:
+        _attach_archives(scraper, replay, recorder, record.known_pages)
+        for result in scraper.iter_dates(dates, progress_callback):
+            record(result)
+        for result in scraper.iter_retry_queue():
+            record(result)
+
+
+def _date_range(year: int, start_month: int, end_month: int, end_year: int) -> tuple[date, date]:
+    """Ngày đầu tháng start_month của year -> ngày cuối tháng end_month của end_year."""
+    start_date = date(year, start_month, 1)
+    if end_month == 12:
+        end_date = date(end_year, 12, 31)
+    else:
+        # Ngày cuối của tháng end_month
+        next_month = date(end_year, end_month + 1, 1)
+        end_date = next_month - timedelta(days=1)
+    return start_date, end_date
+
+
+def _job_id(
+    start_date: date,
+    end_date: date,
+    with_xemngay: bool,
+    replay: Optional[HTMLArchive] = None,
+) -> str:
+    """ID của job journal cho khoảng ngày + nguồn."""
+    source = "merged" if with_xemngay else "lichngaytot.com"
+    if replay is not None:
+        # Job replay tách riêng, không ghi đè tiến độ của job scrape thật
+        source = f"replay:{source}"
+    return f"{source}:{start_date}:{end_date}"
+
+
+def _export_results(
+    results: list,
+    output_dir: Path,
+    storage: Optional[SQLiteStorage] = None,
+) -> None:
+    """Export kết quả, 1 file mỗi năm (năm không đổi thì bỏ qua nếu có storage)."""
+    if not results:
+        return
+    logger.info(f"Exporting {len(results)} days to JSON...")
+    exporter = JSONExporter(output_dir)
+    for result_year, year_days in groupby(results, key=lambda d: d.solar_date.year):
+        if storage is not None:
+            output_path = exporter.export_days_list_if_changed(list(year_days), result_year, storage)
+        else:
+            output_path = exporter.export_days_list(list(year_days), result_year)
+        if output_path:
+            logger.info(f"Exported to {output_path}")
+
+
 def scrape_year(
     year: int,
     output_dir: Path,
     start_month: int = 1,
     end_month: int = 12,
     delay_range: tuple[float, float] = (1.0, 2.0),
+    concurrency: int = 1,
+    cache: Optional[HTMLCache] = None,
+    journal_path: Optional[Path] = None,
+    resume: bool = False,
+    with_xemngay: bool = False,
+    lazy_xemngay: bool = False,
+    end_year: Optional[int] = None,
+    workers: int = 1,
+    parse_workers: int = 0,
+    replay: Optional[HTMLArchive] = None,
+    recorder: Optional[HTMLArchive] = None,
+    storage: Optional[SQLiteStorage] = None,
+    metrics_path: Optional[Path] = None,
+    dead_letters: Optional[DeadLetterStore] = None,
+    force: bool = False,
+    max_rate: float = DEFAULT_MAX_RATE,
+    max_retries: int = 3,
+    retry_backoff: tuple[float, float] = (2.0, 10.0),
 ) -> None:
     """
-    Scrape data cho 1 năm hoặc range tháng.
+    Scrape data cho 1 năm hoặc range tháng (có thể kéo dài tới end_year).
 
     Args:
         year: Năm cần scrape
@@ -57,83 +444,411 @@ def scrape_year(
         start_month: Tháng bắt đầu (1-12)
         end_month: Tháng kết thúc (1-12)
         delay_range: Khoảng delay giữa các request
+        concurrency: Số request song song tới lichngaytot.com (1 = tuần tự)
+        cache: HTML cache, trang đã có trong cache không fetch lại
+        journal_path: File SQLite của job journal
+        resume: Tiếp tục job cũ - bỏ qua ngày đã xong, retry ngày lỗi
+        with_xemngay: Fetch thêm xemngay.com song song để cross-validate và merge
+        lazy_xemngay: Với with_xemngay, chỉ fetch xemngay.com cho ngày đáng ngờ
+        end_year: Năm kết thúc cho backfill nhiều năm, mặc định = year
+        workers: Số worker process; > 1 thì chia shard theo tháng trên nhiều process
+        parse_workers: Số parse process cho fetch/parse pipeline (0 = parse inline)
+        replay: Archive để replay offline thay vì fetch qua network
+        recorder: Archive ghi lại mọi trang fetch được
+        storage: SQLite store cho change detection: trang không đổi không parse
+            lại, năm không đổi không export lại
+        metrics_path: File JSON ghi request timings (sleep, connect, TTFB, parse...)
+        dead_letters: Dead-letter store ghi các ngày fail để --retry-failed
+        force: Parse + export lại mọi ngày (không tra page hash), vẫn ghi storage
+        max_rate: Trần rate (requests/second) mỗi host; với workers > 1 chia đều
+            cho các worker process
+        max_retries: Số lần retry mỗi request (retry budget của process cũng
+            được chia theo giá trị này)
+        retry_backoff: Khoảng chờ (min, max) seconds giữa các retry
     """
-    logger.info(f"Starting scrape for year {year}, months {start_month}-{end_month}")
-
-    # Tính ngày bắt đầu và kết thúc
-    start_date = date(year, start_month, 1)
-    if end_month == 12:
-        end_date = date(year, 12, 31)
-    else:
-        # Ngày cuối của tháng end_month
-        next_month = date(year, end_month + 1, 1)
-        end_date = next_month - timedelta(days=1)
+    end_year = end_year or year
+    logger.info(
+        f"Starting scrape for {year}-{end_year}, months {start_month}-{end_month}"
+    )
 
+    start_date, end_date = _date_range(year, start_month, end_month, end_year)
     total_days = (end_date - start_date).days + 1
     logger.info(f"Will scrape {total_days} days from {start_date} to {end_date}")
 
-    # Initialize scraper
-    scraper = LichNgayTotScraper(delay_range=delay_range)
-
-    # Stats
-    success_count = 0
-    error_count = 0
-    results: list[DayData] = []
+    journal = JobJournal(_job_id(start_date, end_date, with_xemngay, replay), journal_path)
+    journal.start(start_date, end_date, resume=resume)
+    dates = journal.remaining_dates()
+    # Replay không ghi dead letters: lỗi của archive không phải lỗi của host
+    record = ResultRecorder(journal, storage, dead_letters if replay is None else None, force)
+    validation_summary = None
+    secondary_stats = None
+    pipeline_stats = None
 
     try:
-        # Scrape từng ngày
-        current = start_date
-        day_num = 0
-
-        while current <= end_date:
-            day_num += 1
-            progress_callback(day_num, total_days)
-
-            try:
-                day_data = scraper.scrape_day(current)
-                if day_data:
-                    results.append(day_data)
-                    success_count += 1
-                else:
-                    error_count += 1
-                    logger.warning(f"No data returned for {current}")
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Error scraping {current}: {e}")
-
-            current += timedelta(days=1)
-
+        if dates and with_xemngay:
+            validation_summary, secondary_stats = asyncio.run(
+                _scrape_dates_dual_source(
+                    dates, record, delay_range, concurrency, cache, replay, recorder,
+                    lazy_secondary=lazy_xemngay, max_retries=max_retries,
+                    retry_backoff=retry_backoff,
+                )
+            )
+        elif dates and workers > 1:
+            scrape_range(
+                start_date,
+                end_date,
+                workers=workers,
+                delay_range=delay_range,
+                concurrency=concurrency,
+                cache_dir=cache.cache_dir if cache else None,
+                cache_ttl=cache.ttl if cache else None,
+                journal=journal,
+                progress_callback=progress_callback,
+                replay_path=replay.path if replay is not None else None,
+                known_pages_path=record.known_pages.db_path if record.known_pages else None,
+                writer=record,
+                max_rate=max_rate,
+                max_retries=max_retries,
+                retry_backoff=retry_backoff,
+            )
+        elif dates and parse_workers > 0:
+            pipeline_stats = asyncio.run(
+                _scrape_dates_staged(
+                    dates, record, delay_range, concurrency, parse_workers, cache,
+                    replay, recorder, max_retries=max_retries, retry_backoff=retry_backoff,
+                )
+            )
+        elif dates and concurrency > 1:
+            asyncio.run(
+                _scrape_dates_async(
+                    dates, record, delay_range, concurrency, cache, replay, recorder,
+                    max_retries=max_retries, retry_backoff=retry_backoff,
+                )
+            )
+        elif dates:
+            _scrape_dates_sync(
+                dates, record, delay_range, cache, replay, recorder,
+                max_retries=max_retries, retry_backoff=retry_backoff,
+            )
         print()  # New line after progress bar
+    except KeyboardInterrupt:
+        progress = journal.get_progress()
+        print(
+            f"\nInterrupted: {progress['done']}/{progress['total']} days saved to "
+            f"{journal.db_path}. Re-run with --resume to continue."
+        )
+        raise SystemExit(130)
 
-    finally:
-        scraper.close()
+    # Stats
+    results = journal.get_results()
+    progress = journal.get_progress()
+    success_count = progress['done']
+    error_count = progress['failed']
+
+    _export_results(results, output_dir, None if force else storage)
 
-    # Export results
-    if results:
-        logger.info(f"Exporting {len(results)} days to JSON...")
-        exporter = JSONExporter(output_dir)
-        output_path = exporter.export_days_list(results, year)
-        logger.info(f"Exported to {output_path}")
+    if validation_summary:
+        CrossValidator().print_summary(validation_summary)
+    if secondary_stats and secondary_stats['checked']:
+        reasons = ", ".join(f"{reason}={count}" for reason, count in secondary_stats['reasons'].items())
+        print(
+            f"Lazy xemngay.com: fetched for {secondary_stats['fetched']}/{secondary_stats['checked']} "
+            f"parsed days ({secondary_stats['skipped']} passed the local check)"
+            + (f"; reasons: {reasons}" if reasons else "")
+        )
 
     # Summary
     print("\n" + "=" * 50)
     print("SCRAPE COMPLETE")
     print("=" * 50)
-    print(f"Year: {year}")
+    print(f"Year: {year}" if end_year == year else f"Years: {year}-{end_year}")
     print(f"Date range: {start_date} to {end_date}")
     print(f"Total days: {total_days}")
     print(f"Successful: {success_count}")
     print(f"Errors: {error_count}")
+    print(f"Scraped this run: {len(dates)}")
+    if storage is not None and dates:
+        print(
+            f"Change detection: {record.unchanged} pages unchanged (not re-parsed), "
+            f"{record.changed} days changed"
+        )
     print(f"Success rate: {(success_count / total_days) * 100:.1f}%")
+    if record.dead_letters is not None:
+        print_dead_letters(record.dead_letters, _sources(with_xemngay), start_date, end_date)
+    print(f"Output: {output_dir}")
+    if cache:
+        cache_stats = cache.get_stats()
+        print(
+            f"HTML cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['revalidated']} revalidated (304, {cache_stats['bytes_saved_kb']} KB saved) "
+            f"({cache_stats['entries']} pages, {cache_stats['compressed_size_kb']} KB)"
+        )
+    for host, stats in rate_limiter_stats().items():
+        print(
+            f"Rate limiter {host}: {stats['rate']:.2f} req/s ({stats['state']}), "
+            f"backoffs={stats.get('backoffs', 0)}, throttled={stats.get('throttled', 0)}"
+        )
+    for host, stats in circuit_breaker_stats().items():
+        if stats['opened'] or stats['rejected']:
+            print(
+                f"Circuit breaker {host}: {stats['state']}, opened {stats['opened']}x, "
+                f"{stats['rejected']} requests failed fast"
+            )
+    budget = get_retry_budget().snapshot()
+    if budget['retries'] or budget['exhausted']:
+        print(
+            f"Retries: {budget['retries']} for {budget['requests']} requests "
+            f"(budget {budget['ratio']:.0%}, {budget['exhausted']} denied)"
+        )
+    for host, stats in coalescer_stats().items():
+        if stats['saved']:
+            print(
+                f"Request dedup {host}: {stats['saved']} fetches saved "
+                f"({stats['coalesced']} coalesced in flight, {stats['deduplicated']} duplicate URLs)"
+            )
+    if pipeline_stats:
+        for name, stage in pipeline_stats['stages'].items():
+            print(
+                f"Stage {name}: {stage['throughput']:.2f} days/s, "
+                f"utilization {stage['utilization']:.0%} ({stage['workers']} workers)"
+            )
+        for name, queue in pipeline_stats['queues'].items():
+            print(
+                f"Queue {name}: avg depth {queue['avg_depth']}, "
+                f"max {queue['max_depth']}/{queue['maxsize']}"
+            )
+    for host, stats in transfer_stats().items():
+        encodings = ", ".join(f"{enc}={n}" for enc, n in stats['encodings'].items())
+        print(
+            f"Transfer {host}: {stats['raw_kb']} KB on the wire, {stats['decoded_kb']} KB decoded "
+            f"({stats['saved_kb']} KB saved; {encodings})"
+        )
+    print_request_metrics(request_metrics())
+    print("=" * 50)
+
+    if metrics_path:
+        write_request_metrics(metrics_path, {
+            "run": {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "scraped": len(dates),
+                "delay_range": list(delay_range),
+                "concurrency": concurrency,
+                "workers": workers,
+                "parse_workers": parse_workers,
+            },
+        })
+        print(f"Request metrics: {metrics_path}")
+
+
+def retry_failed(
+    year: int,
+    output_dir: Path,
+    dead_letters: DeadLetterStore,
+    start_month: int = 1,
+    end_month: int = 12,
+    end_year: Optional[int] = None,
+    delay_range: tuple[float, float] = (1.0, 2.0),
+    concurrency: int = 1,
+    parse_workers: int = 0,
+    max_retries: int = 5,
+    retry_backoff: tuple[float, float] = (5.0, 60.0),
+    cache: Optional[HTMLCache] = None,
+    journal_path: Optional[Path] = None,
+    with_xemngay: bool = False,
+    storage: Optional[SQLiteStorage] = None,
+    force: bool = False,
+) -> None:
+    """
+    Chỉ fetch lại các ngày trong dead letters của khoảng ngày, với concurrency
+    và backoff riêng (thường chậm + kiên nhẫn hơn lượt scrape chính).
+
+    Kết quả ghi vào cùng job journal với scrape_year; năm chỉ được export lại
+    khi journal của job không còn ngày pending (tránh export 1 năm thiếu ngày).
+
+    Args:
+        year: Năm bắt đầu
+        output_dir: Thư mục output
+        dead_letters: Dead-letter store chứa các ngày fail
+        start_month: Tháng bắt đầu (1-12)
+        end_month: Tháng kết thúc (1-12)
+        end_year: Năm kết thúc, mặc định = year
+        delay_range: Khoảng delay giữa các request
+        concurrency: Số request song song khi retry (1 = tuần tự)
+        parse_workers: Số parse process (fetch/parse pipeline), 0 = parse inline
+        max_retries: Số lần retry mỗi request khi retry
+        retry_backoff: Khoảng chờ (min, max) seconds giữa các retry
+        cache: HTML cache
+        journal_path: File SQLite của job journal
+        with_xemngay: Retry cả ngày fail của xemngay.com, fetch + merge 2 nguồn
+        storage: SQLite store cho change detection
+        force: Parse + export lại mọi ngày (không tra page hash), vẫn ghi storage
+    """
+    end_year = end_year or year
+    start_date, end_date = _date_range(year, start_month, end_month, end_year)
+    sources = _sources(with_xemngay)
+    dates = dead_letters.pending_dates(sources, start_date, end_date)
+    if not dates:
+        print(f"No failed dates between {start_date} and {end_date}")
+        return
+
+    logger.info(
+        f"Retrying {len(dates)} failed dates from {start_date} to {end_date} "
+        f"(concurrency {concurrency}, max_retries {max_retries}, backoff {retry_backoff})"
+    )
+    journal = JobJournal(_job_id(start_date, end_date, with_xemngay), journal_path)
+    journal.start(start_date, end_date, resume=True)
+    record = ResultRecorder(journal, storage, dead_letters, force)
+
+    try:
+        if with_xemngay:
+            asyncio.run(
+                _scrape_dates_dual_source(
+                    dates, record, delay_range, concurrency, cache,
+                    max_retries=max_retries, retry_backoff=retry_backoff,
+                )
+            )
+        elif parse_workers > 0:
+            asyncio.run(
+                _scrape_dates_staged(
+                    dates, record, delay_range, concurrency, parse_workers, cache,
+                    max_retries=max_retries, retry_backoff=retry_backoff,
+                )
+            )
+        elif concurrency > 1:
+            asyncio.run(
+                _scrape_dates_async(
+                    dates, record, delay_range, concurrency, cache,
+                    max_retries=max_retries, retry_backoff=retry_backoff,
+                )
+            )
+        else:
+            _scrape_dates_sync(
+                dates, record, delay_range, cache,
+                max_retries=max_retries, retry_backoff=retry_backoff,
+            )
+        print()  # New line after progress bar
+    except KeyboardInterrupt:
+        print(f"\nInterrupted: {record.resolved}/{len(dates)} failed dates recovered.")
+        raise SystemExit(130)
+
+    progress = journal.get_progress()
+    if progress['pending'] == 0:
+        _export_results(journal.get_results(), output_dir, None if force else storage)
+    else:
+        logger.warning(
+            f"Not exporting: job journal has {progress['pending']} days never scraped, "
+            f"run without --retry-failed (with --resume) first"
+        )
+
+    print("\n" + "=" * 50)
+    print("RETRY COMPLETE")
+    print("=" * 50)
+    print(f"Date range: {start_date} to {end_date}")
+    print(f"Failed dates retried: {len(dates)}")
+    print(f"Dead letters resolved: {record.resolved}")
+    print_dead_letters(dead_letters, sources, start_date, end_date)
+    for host, stats in circuit_breaker_stats().items():
+        if stats['opened'] or stats['rejected']:
+            print(
+                f"Circuit breaker {host}: {stats['state']}, opened {stats['opened']}x, "
+                f"{stats['rejected']} requests failed fast"
+            )
+    print_request_metrics(request_metrics())
+    print("=" * 50)
+
+
+def reparse(
+    year: int,
+    output_dir: Path,
+    storage: SQLiteStorage,
+    start_month: int = 1,
+    end_month: int = 12,
+    end_year: Optional[int] = None,
+    cache: Optional[HTMLCache] = None,
+    replay: Optional[HTMLArchive] = None,
+    parse_workers: Optional[int] = None,
+    force: bool = False,
+) -> None:
+    """
+    Parse lại các trang lichngaytot.com đã lưu (archive nếu có, không thì HTML
+    cache) sau khi sửa parser, không gửi request nào.
+
+    Trang được đọc dần theo thứ tự ngày và parse trên process pool
+    (BatchParser); DayData và page hash theo PARSER_VERSION hiện tại được ghi
+    vào storage, nên lần scrape sau coi các trang này là không đổi. Các năm
+    trong khoảng ngày được export lại từ storage.
+
+    Args:
+        year: Năm bắt đầu
+        output_dir: Thư mục output
+        storage: SQLite store được cập nhật
+        start_month: Tháng bắt đầu (1-12)
+        end_month: Tháng kết thúc (1-12)
+        end_year: Năm kết thúc, mặc định = year
+        cache: HTML cache để đọc trang (khi không có replay)
+        replay: Archive để đọc trang
+        parse_workers: Số parse process, None = số CPU
+        force: Export lại cả năm không đổi
+    """
+    end_year = end_year or year
+    start_date, end_date = _date_range(year, start_month, end_month, end_year)
+    source = replay if replay is not None else cache
+    page_hashes: dict[date, str] = {}
+
+    def pages():
+        for target_date, html in source.iter_by_date(LichNgayTotScraper.BASE_URL, start_date, end_date):
+            # Cùng page hash với FetchResult.page_hash khi scrape
+            page_hashes[target_date] = versioned_hash(hashlib.sha256(html.encode("utf-8")).hexdigest())
+            yield target_date, html
+
+    logger.info(f"Re-parsing stored pages from {start_date} to {end_date}")
+    batch = BatchParser(LichNgayTotParser(), parse_workers)
+    changed = unchanged = failed = 0
+    try:
+        for target_date, day_data in batch.parse_many(pages()):
+            page_hash = page_hashes.pop(target_date)
+            if day_data is None:
+                failed += 1
+                logger.warning(f"Re-parse returned no data for {target_date}")
+            elif storage.save_day_if_changed(day_data, page_hash):
+                changed += 1
+            else:
+                unchanged += 1
+    except KeyboardInterrupt:
+        print(f"\nInterrupted: {changed + unchanged} days re-parsed and saved to {storage.db_path}.")
+        raise SystemExit(130)
+
+    _export_results(storage.get_days_range(start_date, end_date), output_dir, None if force else storage)
+
+    stats = batch.stats.snapshot()
+    print("\n" + "=" * 50)
+    print("REPARSE COMPLETE")
+    print("=" * 50)
+    print(f"Date range: {start_date} to {end_date}")
+    print(f"Source: {replay.path if replay is not None else cache.cache_dir}")
+    print(f"Pages parsed: {stats['pages']} ({stats['failed']} failed)")
+    print(f"Days changed: {changed}, unchanged: {unchanged}")
+    print(
+        f"Throughput: {stats['throughput']} pages/s in {stats['elapsed']}s "
+        f"({stats['workers']} workers, chunk size {stats['chunk_size']})"
+    )
     print(f"Output: {output_dir}")
     print("=" * 50)
 
 
-def scrape_single_day(target_date: date, output_dir: Path) -> None:
+def scrape_single_day(
+    target_date: date,
+    output_dir: Path,
+    cache: Optional[HTMLCache] = None,
+    replay: Optional[HTMLArchive] = None,
+    recorder: Optional[HTMLArchive] = None,
+) -> None:
     """Scrape data cho 1 ngày để test."""
     logger.info(f"Scraping single day: {target_date}")
 
-    scraper = LichNgayTotScraper(delay_range=(0.5, 1.0))
+    scraper = LichNgayTotScraper(delay_range=(0.5, 1.0), cache=cache)
+    _attach_archives(scraper, replay, recorder)
 
     try:
         day_data = scraper.scrape_day(target_date)
@@ -204,25 +919,280 @@ def main():
         default=2.0,
         help='Maximum delay between requests in seconds (default: 2.0)'
     )
+    parser.add_argument(
+        '--max-rate',
+        type=float,
+        default=DEFAULT_MAX_RATE,
+        help='Ceiling in requests/second per host that the adaptive limiter may ramp up to; '
+             f'--delay-min/--delay-max only set the starting rate (default: {DEFAULT_MAX_RATE})'
+    )
+
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Number of concurrent requests (default: 1 = sequential)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes, sharded by month (default: 1)'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=0,
+        help='Parse HTML in this many processes, pipelined with fetching (default: 0 = inline)'
+    )
+    parser.add_argument(
+        '--end-year',
+        type=int,
+        default=None,
+        help='Last year of a multi-year backfill (default: same as year)'
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=Path('data/raw'),
+        help='Raw HTML cache directory (default: data/raw)'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=None,
+        help='Revalidate cached pages older than this many hours '
+             '(default: 168, 0 = always, negative = never)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable the raw HTML cache'
+    )
+
+    parser.add_argument(
+        '--replay',
+        type=Path,
+        default=None,
+        help='Replay pages from an HTML archive (directory or .zip) instead of the network'
+    )
+    parser.add_argument(
+        '--record',
+        type=Path,
+        default=None,
+        help='Record every fetched page into a new HTML archive (directory or .zip)'
+    )
+
+    parser.add_argument(
+        '--db',
+        type=Path,
+        default=Path('data/fengshui.db'),
+        help='SQLite store with page/content hashes for change detection (default: data/fengshui.db)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-parse and re-export every day even if its page is unchanged (still updates --db)'
+    )
+
+    parser.add_argument(
+        '--metrics',
+        type=Path,
+        default=Path('data/processed/request_metrics.json'),
+        help='Write per-host request phase timings to this JSON file '
+             '(default: data/processed/request_metrics.json)'
+    )
+
+    parser.add_argument(
+        '--journal',
+        type=Path,
+        default=Path('data/processed/jobs.db'),
+        help='Job journal SQLite file (default: data/processed/jobs.db)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume the previous run: skip finished dates, retry failed ones'
+    )
+
+    parser.add_argument(
+        '--dead-letters',
+        type=Path,
+        default=Path('data/processed/dead_letters.db'),
+        help='Dead-letter store of failed dates (default: data/processed/dead_letters.db)'
+    )
+    parser.add_argument(
+        '--max-retries',
+        type=int,
+        default=3,
+        help='Retries per request; the process-wide retry budget scales with it (default: 3)'
+    )
+    parser.add_argument(
+        '--backoff',
+        type=float,
+        nargs=2,
+        default=[2.0, 10.0],
+        metavar=('MIN', 'MAX'),
+        help='Exponential backoff bounds in seconds between retries (default: 2 10)'
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Only re-fetch the dates recorded in the dead-letter store for this range'
+    )
+    parser.add_argument(
+        '--retry-concurrency',
+        type=int,
+        default=1,
+        help='Concurrent requests for --retry-failed (default: 1)'
+    )
+    parser.add_argument(
+        '--retry-max-retries',
+        type=int,
+        default=5,
+        help='Retries per request for --retry-failed (default: 5)'
+    )
+    parser.add_argument(
+        '--retry-backoff',
+        type=float,
+        nargs=2,
+        default=[5.0, 60.0],
+        metavar=('MIN', 'MAX'),
+        help='Exponential backoff bounds in seconds for --retry-failed (default: 5 60)'
+    )
+
+    parser.add_argument(
+        '--reparse',
+        action='store_true',
+        help='Re-parse lichngaytot.com pages already in the --replay archive or the HTML cache '
+             '(no network) and update --db; parses in --parse-workers processes (default: all CPUs)'
+    )
+
+    parser.add_argument(
+        '--with-xemngay',
+        action='store_true',
+        help='Also fetch xemngay.com concurrently, cross-validate and merge'
+    )
+    parser.add_argument(
+        '--lazy-xemngay',
+        action='store_true',
+        help='Like --with-xemngay, but only fetch xemngay.com for days whose '
+             'lichngaytot.com data fails a quick local check'
+    )
 
     args = parser.parse_args()
+    if args.replay and args.record:
+        parser.error('--replay and --record cannot be combined')
+    if args.record and args.workers > 1:
+        parser.error('--record needs a single process (--workers 1)')
+    if args.workers > 1 and (args.with_xemngay or args.lazy_xemngay):
+        parser.error('--with-xemngay / --lazy-xemngay need a single process (--workers 1)')
+    if args.workers > 1 and args.parse_workers > 0 and not args.reparse:
+        parser.error('--parse-workers needs a single scrape process (--workers 1); '
+                     'sharded workers parse inline')
+    if args.retry_failed and (args.replay or args.single_day):
+        parser.error('--retry-failed cannot be combined with --replay or --single-day')
+    if args.reparse and (args.retry_failed or args.single_day or args.record):
+        parser.error('--reparse cannot be combined with --retry-failed, --single-day or --record')
+    if args.reparse and (args.with_xemngay or args.lazy_xemngay):
+        parser.error('--reparse only rebuilds lichngaytot.com data (no --with-xemngay / --lazy-xemngay)')
+    if args.reparse and args.no_cache and not args.replay:
+        parser.error('--reparse needs pages to read: --replay ARCHIVE or the HTML cache')
+    if args.max_rate <= 0:
+        parser.error('--max-rate must be > 0')
+    if args.max_retries < 0 or args.retry_max_retries < 0:
+        parser.error('--max-retries / --retry-max-retries must be >= 0')
 
     # Create output directory
     args.output.mkdir(parents=True, exist_ok=True)
 
-    if args.single_day:
-        # Test mode: scrape single day
-        target_date = date.fromisoformat(args.single_day)
-        scrape_single_day(target_date, args.output)
-    else:
-        # Full scrape
-        scrape_year(
-            year=args.year,
-            output_dir=args.output,
-            start_month=args.start_month,
-            end_month=args.end_month,
-            delay_range=(args.delay_min, args.delay_max),
-        )
+    replay = HTMLArchive(args.replay) if args.replay else None
+    recorder = HTMLArchive(args.record, mode="w") if args.record else None
+
+    cache = None
+    if not args.no_cache and replay is None:
+        if args.cache_ttl is None:
+            cache = HTMLCache(args.cache_dir)
+        else:
+            ttl = timedelta(hours=args.cache_ttl) if args.cache_ttl >= 0 else None
+            cache = HTMLCache(args.cache_dir, ttl=ttl)
+
+    _configure_rate_limiters((args.delay_min, args.delay_max), args.max_rate)
+
+    dead_letters = DeadLetterStore(args.dead_letters)
+    storage = SQLiteStorage(args.db)
+
+    try:
+        if args.retry_failed:
+            retry_failed(
+                year=args.year,
+                output_dir=args.output,
+                dead_letters=dead_letters,
+                start_month=args.start_month,
+                end_month=args.end_month,
+                end_year=args.end_year,
+                delay_range=(args.delay_min, args.delay_max),
+                concurrency=args.retry_concurrency,
+                parse_workers=args.parse_workers,
+                max_retries=args.retry_max_retries,
+                retry_backoff=tuple(args.retry_backoff),
+                cache=cache,
+                journal_path=args.journal,
+                with_xemngay=args.with_xemngay or args.lazy_xemngay,
+                storage=storage,
+                force=args.force,
+            )
+        elif args.reparse:
+            reparse(
+                year=args.year,
+                output_dir=args.output,
+                storage=storage,
+                start_month=args.start_month,
+                end_month=args.end_month,
+                end_year=args.end_year,
+                cache=cache,
+                replay=replay,
+                parse_workers=args.parse_workers or None,
+                force=args.force,
+            )
+        elif args.single_day:
+            # Test mode: scrape single day
+            target_date = date.fromisoformat(args.single_day)
+            scrape_single_day(target_date, args.output, cache, replay, recorder)
+        else:
+            # Full scrape
+            scrape_year(
+                year=args.year,
+                output_dir=args.output,
+                start_month=args.start_month,
+                end_month=args.end_month,
+                delay_range=(args.delay_min, args.delay_max),
+                concurrency=args.concurrency,
+                cache=cache,
+                journal_path=args.journal,
+                resume=args.resume,
+                with_xemngay=args.with_xemngay or args.lazy_xemngay,
+                lazy_xemngay=args.lazy_xemngay,
+                end_year=args.end_year,
+                workers=args.workers,
+                parse_workers=args.parse_workers,
+                replay=replay,
+                recorder=recorder,
+                storage=storage,
+                metrics_path=args.metrics,
+                dead_letters=dead_letters,
+                force=args.force,
+                max_rate=args.max_rate,
+                max_retries=args.max_retries,
+                retry_backoff=tuple(args.backoff),
+            )
+    finally:
+        # Ghi nốt index của recorder (zip chỉ đọc được sau khi đóng), kể cả khi bị Ctrl-C
+        for archive in (replay, recorder):
+            if archive is not None:
+                archive.close()
 
 
 if __name__ == '__main__':
@@ -5,7 +5,8 @@ Validate dữ liệu đã scrape với lunar-javascript.
 Usage:
     python scripts/validate_data.py --dir data/export
     python scripts/validate_data.py --file data/export/day_2025-12-12.json
-    python scripts/validate_data.py --year 2025
+    python scripts/validate_data.py --year 2025          # chỉ ngày đổi từ lần validate pass trước
+    python scripts/validate_data.py --year 2025 --all
 """
 import argparse
 import json
@@ -65,6 +66,18 @@ def load_from_db(db_path: Path, year: int) -> list[DayData]:
     return storage.get_days_range(start, end)
 
 
+def skip_validated(storage: SQLiteStorage, days: list[DayData]) -> list[DayData]:
+    """Bỏ các ngày có nội dung không đổi kể từ lần validate pass gần nhất."""
+    if not days:
+        return days
+    hashes = storage.get_hashes(days[0].solar_date, days[-1].solar_date)
+    return [
+        day for day in days
+        if day.solar_date not in hashes
+        or hashes[day.solar_date].validated_hash != day.content_hash()
+    ]
+
+
 def print_results(summary: dict) -> None:
     """Print validation results."""
     print("\n" + "=" * 60)
@@ -134,6 +147,11 @@ def main():
         type=int,
         help="Year to validate from database",
     )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="With --year: also re-validate days unchanged since their last passing validation",
+    )
     parser.add_argument(
         "--output",
         type=Path,
@@ -152,6 +170,7 @@ def main():
 
     # Load data
     days = []
+    storage = None
 
     if args.file:
         logger.info(f"Loading from file: {args.file}")
@@ -162,6 +181,14 @@ def main():
     elif args.year:
         logger.info(f"Loading year {args.year} from database: {args.db}")
         days = load_from_db(args.db, args.year)
+        storage = SQLiteStorage(args.db)
+        if not args.all:
+            loaded = len(days)
+            days = skip_validated(storage, days)
+            if loaded and not days:
+                print(f"All {loaded} days unchanged since last validation, nothing to do")
+                sys.exit(0)
+            logger.info(f"Skipping {loaded - len(days)} days unchanged since last validation")
     else:
         # Default: load from data/export
         default_dir = Path("data/export")
@@ -195,6 +222,13 @@ def main():
         logger.info("  npm install lunar-javascript")
         sys.exit(1)
 
+    # Ghi nhận ngày pass để lần sau bỏ qua nếu nội dung không đổi
+    if storage is not None:
+        invalid_dates = {error['date'] for error in summary['errors']}
+        for day in days:
+            if day.solar_date.isoformat() not in invalid_dates:
+                storage.mark_validated(day.solar_date, day.content_hash())
+
     # Print results
     print_results(summary)
 
@@ -1,8 +1,9 @@
 """
 Pydantic models cho dữ liệu ngày âm lịch và phong thủy.
 """
+import hashlib
 from datetime import date
-from typing import Optional
+from typing import Iterable, Optional
 from pydantic import BaseModel, Field
 
 
@@ -165,6 +166,19 @@ class DayData(BaseModel):
             }
         }
 
+    def content_hash(self) -> str:
+        """sha256 của nội dung ngày, bỏ qua scraped_at (scrape lại trang y hệt cho cùng hash)."""
+        payload = self.model_dump_json(exclude={"scraped_at"})
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def days_content_hash(days: Iterable[DayData]) -> str:
+    """Hash của cả danh sách ngày (theo thứ tự), dùng để bỏ qua export khi không đổi."""
+    digest = hashlib.sha256()
+    for day in days:
+        digest.update(day.content_hash().encode("ascii"))
+    return digest.hexdigest()
+
 
 class YearData(BaseModel):
     """Dữ liệu cho cả năm."""
@@ -1,4 +1,5 @@
 from .lichngaytot_parser import LichNgayTotParser
 from .xemngay_parser import XemNgayParser
+from .batch import BatchParser, BatchStats, parse_many
 
-__all__ = ['LichNgayTotParser', 'XemNgayParser']
+__all__ = ['LichNgayTotParser', 'XemNgayParser', 'BatchParser', 'BatchStats', 'parse_many']
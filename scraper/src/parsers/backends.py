@@ -0,0 +1,158 @@
+"""
+Parser backends: cách dựng ParseContext từ HTML.
+
+    bs4   BeautifulSoup(html, 'lxml') - đường cũ, dựng cả cây Python object
+    lxml  cây lxml (C) + XPath compile sẵn cho các container đã biết,
+          không dựng cây BeautifulSoup (nhanh hơn vài lần)
+    auto  lxml, fallback về bs4 khi lxml không parse được hoặc trang thiếu
+          container mà parser cần (cấu trúc trang lạ)
+
+Cả 2 backend đều dùng libxml2 để parse HTML và trích text theo quy tắc của
+soup.get_text() (bỏ <script>, <style>, <template>, comment), nên text bên trong
+phần tử <html> giống hệt nhau. Khác biệt nằm ngoài phần tử gốc: tree builder
+của bs4 giữ whitespace sau </html> và dựng thêm 1 <html> cho nội dung viết sau
+</html> (HTML lỗi), còn cây lxml bỏ cả hai. Parser chỉ đọc các container và
+tìm pattern trong text nên DayData như nhau với mọi backend
+(tests/test_backends.py so 2 backend trên bộ fixture).
+"""
+import logging
+from functools import cached_property
+from typing import Iterable, Optional
+
+from bs4 import BeautifulSoup, Tag
+from lxml import etree
+
+from .context import CONTAINERS, ParseContext
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('auto', 'lxml', 'bs4')
+
+# Tag mà soup.get_text() bỏ qua text bên trong
+_SKIPPED_TAGS = ('script', 'style', 'template')
+
+
+class SoupContext(ParseContext):
+    """ParseContext dựng bằng BeautifulSoup (lxml tree builder)."""
+
+    backend = 'bs4'
+
+    def __init__(self, html: str):
+        """
+        Args:
+            html: HTML của trang
+        """
+        self.soup = BeautifulSoup(html, 'lxml')
+
+    @cached_property
+    def _containers(self) -> dict[tuple[str, str], list[Tag]]:
+        """Container nodes theo (tag, class), tìm trong 1 lần duyệt DOM duy nhất."""
+        wanted = {}
+        for name, class_name in CONTAINERS:
+            wanted.setdefault(name, set()).add(class_name)
+
+        found: dict[tuple[str, str], list[Tag]] = {key: [] for key in CONTAINERS}
+        for node in self.soup.descendants:
+            if not isinstance(node, Tag) or node.name not in wanted:
+                continue
+            for class_name in node.get('class') or ():
+                if class_name in wanted[node.name]:
+                    found[(node.name, class_name)].append(node)
+        return found
+
+    def _page_text(self) -> str:
+        return self.soup.get_text()
+
+    def _title(self) -> Optional[str]:
+        title = self.soup.find('title')
+        return title.get_text() if title else None
+
+    def container_texts(self, name: str, class_name: str) -> list[str]:
+        return [node.get_text() for node in self._containers[(name, class_name)]]
+
+
+def _class_xpath(name: str, class_name: str) -> etree.XPath:
+    return etree.XPath(
+        f"//{name}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+    )
+
+
+class LxmlContext(ParseContext):
+    """ParseContext dựng thẳng từ cây lxml, container tìm bằng XPath compile sẵn."""
+
+    backend = 'lxml'
+
+    _CONTAINER_XPATHS = {key: _class_xpath(*key) for key in CONTAINERS}
+    _TITLE_XPATH = etree.XPath('//title')
+
+    def __init__(self, html: str):
+        """
+        Args:
+            html: HTML của trang
+
+        Raises:
+            ValueError: lxml không parse được html (vd: rỗng, có XML encoding declaration)
+        """
+        root = etree.fromstring(html, etree.HTMLParser())
+        if root is None:
+            raise ValueError("Empty document")
+        # Text trong script / style / template không tính (giống soup.get_text()), giữ tail
+        etree.strip_elements(root, *_SKIPPED_TAGS, with_tail=False)
+        self.root = root
+        self._texts: dict[tuple[str, str], list[str]] = {}
+
+    @staticmethod
+    def _node_text(node: etree._Element) -> str:
+        return etree.tostring(node, method='text', encoding='unicode', with_tail=False)
+
+    def _page_text(self) -> str:
+        return self._node_text(self.root)
+
+    def _title(self) -> Optional[str]:
+        titles = self._TITLE_XPATH(self.root)
+        return self._node_text(titles[0]) if titles else None
+
+    def container_texts(self, name: str, class_name: str) -> list[str]:
+        key = (name, class_name)
+        texts = self._texts.get(key)
+        if texts is None:
+            texts = [self._node_text(node) for node in self._CONTAINER_XPATHS[key](self.root)]
+            self._texts[key] = texts
+        return texts
+
+
+def make_context(
+    html: str,
+    backend: str = 'auto',
+    required: Iterable[tuple[str, str]] = (),
+) -> ParseContext:
+    """
+    Dựng ParseContext cho 1 trang bằng backend đã chọn.
+
+    Args:
+        html: HTML của trang
+        backend: "auto", "lxml" hoặc "bs4"
+        required: Các container (tag, class) parser cần; với "auto", thiếu
+            container nào thì fallback về bs4
+
+    Returns:
+        ParseContext
+    """
+    if backend == 'bs4':
+        return SoupContext(html)
+    if backend == 'lxml':
+        return LxmlContext(html)
+    if backend != 'auto':
+        raise ValueError(f"Unknown parser backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+    try:
+        ctx = LxmlContext(html)
+    except (ValueError, etree.LxmlError) as e:
+        logger.debug(f"lxml fast path failed ({e}), falling back to BeautifulSoup")
+        return SoupContext(html)
+
+    missing = [key for key in required if not ctx.has_container(*key)]
+    if missing:
+        logger.debug(f"Containers not found by lxml fast path {missing}, falling back to BeautifulSoup")
+        return SoupContext(html)
+    return ctx
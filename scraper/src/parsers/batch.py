@@ -0,0 +1,246 @@
+"""
+Parse hàng loạt HTML đã lưu (cache / archive) trên nhiều process.
+
+Parse lại HTML sau khi sửa parser chỉ tốn CPU, không có network wait: chạy
+tuần tự parser.parse() từng trang chỉ dùng được 1 core. BatchParser chia
+input (ngày, html) thành các chunk, gửi chunk sang ProcessPoolExecutor (mỗi
+worker tạo parser 1 lần lúc khởi động) và trả kết quả về dạng stream:
+
+- Tối đa max_pending chunk đang xử lý cùng lúc, input được đọc dần nên
+  không cần giữ toàn bộ HTML của nhiều năm trong bộ nhớ
+- Kết quả được yield theo đúng thứ tự input (chunk xong trước được giữ lại
+  đến khi các chunk trước nó xong): input theo ngày -> output theo ngày
+- Throughput từng worker process (pages, busy time, pages/s) ghi trong
+  BatchStats để chỉnh số workers / chunk size
+- Input ít hơn MIN_POOL_PAGES trang thì parse inline: khởi động pool + IPC
+  tốn hơn phần parse song song tiết kiệm được (bench_parsers: 100 trang,
+  2 workers chỉ đạt 0.69x so với tuần tự)
+"""
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import chain, islice
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 16
+
+# Dưới số trang này parse_many parse inline (~0.4s parse tuần tự trang
+# lichngaytot.com, đủ bù chi phí khởi động pool)
+MIN_POOL_PAGES = 256
+
+# Parser của worker process, tạo 1 lần bởi _init_worker
+_worker_parser = None
+
+
+def _init_worker(parser_cls: type, backend: str) -> None:
+    global _worker_parser
+    _worker_parser = parser_cls(backend)
+
+
+def _parse_pages(parser, chunk: list[tuple[date, str]]) -> tuple[list[tuple[date, object]], int, float]:
+    """
+    Parse 1 chunk.
+
+    Returns:
+        (kết quả (ngày, data hoặc None) theo thứ tự chunk, pid, thời gian parse)
+    """
+    started = time.perf_counter()
+    results = [(target_date, parser.parse(html, target_date)) for target_date, html in chunk]
+    return results, os.getpid(), time.perf_counter() - started
+
+
+def _parse_chunk_in_worker(chunk: list[tuple[date, str]]) -> tuple[list[tuple[date, object]], int, float]:
+    """Parse 1 chunk bằng parser của worker process."""
+    return _parse_pages(_worker_parser, chunk)
+
+
+@dataclass
+class WorkerStats:
+    """Thống kê 1 worker process."""
+    pid: int
+    chunks: int = 0
+    pages: int = 0
+    failed: int = 0
+    busy_time: float = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "chunks": self.chunks,
+            "pages": self.pages,
+            "failed": self.failed,
+            "busy_time": round(self.busy_time, 3),
+            # Throughput khi đang parse (không tính thời gian chờ chunk / IPC)
+            "pages_per_s": round(self.pages / self.busy_time, 1) if self.busy_time > 0 else 0.0,
+        }
+
+
+@dataclass
+class BatchStats:
+    """Thống kê 1 lần parse_many."""
+    workers: int = 0
+    chunk_size: int = 0
+    pages: int = 0
+    failed: int = 0
+    per_worker: dict[int, WorkerStats] = field(default_factory=dict)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def record_chunk(self, pid: int, results: list[tuple[date, object]], busy_time: float) -> None:
+        worker = self.per_worker.get(pid)
+        if worker is None:
+            worker = self.per_worker[pid] = WorkerStats(pid)
+        failed = sum(data is None for _, data in results)
+        worker.chunks += 1
+        worker.pages += len(results)
+        worker.failed += failed
+        worker.busy_time += busy_time
+        self.pages += len(results)
+        self.failed += failed
+
+    def snapshot(self) -> dict:
+        elapsed = self.elapsed
+        return {
+            "elapsed": round(elapsed, 2),
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "pages": self.pages,
+            "failed": self.failed,
+            "throughput": round(self.pages / elapsed, 1) if elapsed > 0 else 0.0,
+            "per_worker": {pid: worker.snapshot() for pid, worker in self.per_worker.items()},
+        }
+
+
+class BatchParser:
+    """Parse nhiều trang (ngày, html) bằng 1 parser, fan-out trên process pool."""
+
+    def __init__(
+        self,
+        parser,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_pending: Optional[int] = None,
+        min_pool_pages: int = MIN_POOL_PAGES,
+    ):
+        """
+        Args:
+            parser: LichNgayTotParser hoặc XemNgayParser; worker tạo parser cùng
+                class và backend
+            workers: Số worker process, mặc định = số CPU; <= 1 thì parse
+                ngay trong process hiện tại
+            chunk_size: Số trang mỗi chunk gửi sang worker
+            max_pending: Số chunk tối đa đang xử lý, mặc định = 2 * workers
+            min_pool_pages: Input ít hơn số trang này thì parse inline
+                (0 = luôn dùng pool khi workers > 1)
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+        self.parser = parser
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * max(1, self.workers)
+        self.min_pool_pages = min_pool_pages
+        self.stats = BatchStats()
+
+    def _chunks(self, pages: Iterable[tuple[date, str]]) -> Iterator[list[tuple[date, str]]]:
+        pages = iter(pages)
+        while True:
+            chunk = list(islice(pages, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _parse_inline(self, chunks: Iterator[list[tuple[date, str]]]) -> Iterator[tuple[date, object]]:
+        for chunk in chunks:
+            results, pid, busy_time = _parse_pages(self.parser, chunk)
+            self.stats.record_chunk(pid, results, busy_time)
+            yield from results
+
+    def _parse_pool(self, chunks: Iterator[list[tuple[date, str]]]) -> Iterator[tuple[date, object]]:
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(type(self.parser), self.parser.backend),
+        )
+        pending: deque[Future] = deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(_parse_chunk_in_worker, chunk))
+                if len(pending) >= self.max_pending:
+                    yield from self._collect(pending.popleft())
+            while pending:
+                yield from self._collect(pending.popleft())
+        finally:
+            # Consumer dừng sớm (break / exception): bỏ các chunk chưa chạy
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _collect(self, future: Future) -> list[tuple[date, object]]:
+        results, pid, busy_time = future.result()
+        self.stats.record_chunk(pid, results, busy_time)
+        return results
+
+    def parse_many(self, pages: Iterable[tuple[date, str]]) -> Iterator[tuple[date, object]]:
+        """
+        Parse các trang, yield kết quả theo đúng thứ tự input.
+
+        Args:
+            pages: Iterable (ngày, html), nên theo thứ tự ngày; được đọc dần
+                (đọc trước tối đa min_pool_pages trang để chọn inline / pool)
+
+        Yields:
+            (ngày, DayData / XemNgayData hoặc None nếu parse fail)
+        """
+        started_at = time.monotonic()
+        pages = iter(pages)
+        head = list(islice(pages, self.min_pool_pages)) if self.workers > 1 else []
+        inline = self.workers <= 1 or len(head) < self.min_pool_pages
+        if inline and self.workers > 1:
+            logger.debug(f"Only {len(head)} pages (< {self.min_pool_pages}), parsing inline")
+
+        self.stats = BatchStats(
+            workers=1 if inline else self.workers,
+            chunk_size=self.chunk_size,
+            started_at=started_at,
+        )
+        chunks = self._chunks(chain(head, pages))
+        try:
+            if inline:
+                yield from self._parse_inline(chunks)
+            else:
+                yield from self._parse_pool(chunks)
+        finally:
+            self.stats.finished_at = time.monotonic()
+            logger.info(f"Batch parse stats: {self.stats.snapshot()}")
+
+
+def parse_many(
+    parser,
+    pages: Iterable[tuple[date, str]],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[tuple[date, object]]:
+    """
+    Parse nhiều trang trên process pool (xem BatchParser).
+
+    Args:
+        parser: LichNgayTotParser hoặc XemNgayParser
+        pages: Iterable (ngày, html), nên theo thứ tự ngày
+        workers: Số worker process, mặc định = số CPU (ít hơn MIN_POOL_PAGES
+            trang thì parse inline)
+        chunk_size: Số trang mỗi chunk
+
+    Yields:
+        (ngày, data hoặc None), theo thứ tự input
+    """
+    yield from BatchParser(parser, workers, chunk_size).parse_many(pages)
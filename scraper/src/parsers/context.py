@@ -0,0 +1,89 @@
+"""
+Parse context: những gì các field parser cần từ 1 trang, tính 1 lần / trang.
+
+Trước đây mỗi field parser tự gọi soup.get_text() (duyệt cả DOM, tạo lại
+chuỗi vài chục KB), 1 trang lichngaytot.com bị get_text() hơn chục lần.
+ParseContext cache lại full text, lowercase text, title và text của các
+container chính; mọi thứ được tính lazily ở lần dùng đầu tiên.
+
+Cách dựng cây và trích text do backend quyết định (backends.py): BeautifulSoup
+hoặc lxml trực tiếp. Mọi backend trích text như soup.get_text() (bỏ qua
+<script>, <style>, <template> và comment); text nằm sau </html> có thể khác
+nhau giữa các backend (xem backends.py).
+"""
+from abc import ABC, abstractmethod
+from functools import cached_property
+from typing import Optional
+
+# (tag, class) của các container được index
+CONTAINERS = (
+    ('span', 'ngay-am'),
+    ('div', 'calendar-box2'),
+    ('div', 'calendar-info2'),
+    ('div', 'calendar-col2'),
+)
+
+
+class ParseContext(ABC):
+    """Text đã trích xuất của 1 trang, dùng chung cho mọi field parser."""
+
+    # Tên backend (vd: "bs4", "lxml")
+    backend: str = ""
+
+    @abstractmethod
+    def _page_text(self) -> str:
+        """Toàn bộ text của trang."""
+        pass
+
+    @abstractmethod
+    def _title(self) -> Optional[str]:
+        """Text của thẻ <title> đầu tiên, None nếu không có."""
+        pass
+
+    @abstractmethod
+    def container_texts(self, name: str, class_name: str) -> list[str]:
+        """Text của từng container (tag, class) trong CONTAINERS, theo thứ tự trong trang."""
+        pass
+
+    def has_container(self, name: str, class_name: str) -> bool:
+        """Trang có ít nhất 1 container (tag, class)."""
+        return bool(self.container_texts(name, class_name))
+
+    def _first_text(self, name: str, class_name: str) -> Optional[str]:
+        texts = self.container_texts(name, class_name)
+        return texts[0] if texts else None
+
+    @cached_property
+    def text(self) -> str:
+        """Toàn bộ text của trang (như soup.get_text())."""
+        return self._page_text()
+
+    @cached_property
+    def text_lower(self) -> str:
+        """text đã lowercase."""
+        return self.text.lower()
+
+    @cached_property
+    def title_text(self) -> Optional[str]:
+        """Text của thẻ <title>, None nếu không có."""
+        return self._title()
+
+    @cached_property
+    def ngay_am_text(self) -> Optional[str]:
+        """Text của span.ngay-am (ngày âm lịch), None nếu không có."""
+        return self._first_text('span', 'ngay-am')
+
+    @cached_property
+    def calendar_box2_text(self) -> Optional[str]:
+        """Text của div.calendar-box2 (Can Chi năm / tháng / ngày, tiết khí)."""
+        return self._first_text('div', 'calendar-box2')
+
+    @cached_property
+    def calendar_info2_text(self) -> Optional[str]:
+        """Text của div.calendar-info2 (tên tháng âm lịch)."""
+        return self._first_text('div', 'calendar-info2')
+
+    @cached_property
+    def calendar_col2_texts(self) -> list[str]:
+        """Text của từng div.calendar-col2 (giờ hoàng đạo / hắc đạo)."""
+        return self.container_texts('div', 'calendar-col2')
@@ -0,0 +1,107 @@
+"""
+Quét 1 lần tìm mọi keyword của 1 từ vựng cố định (tiết khí, địa chi, hướng,
+giờ Lý Thuần Phong...) trong text, kèm vị trí.
+
+Trước đây các field parser lặp theo từ vựng: 24 regex IGNORECASE cho 24 tiết
+khí (mỗi regex quét lại toàn bộ text, tiết khí cuối list tốn 24 lần quét),
+12 regex cho 12 địa chi, 6 regex cho 6 giờ Lý Thuần Phong... KeywordScanner
+tìm tất cả keyword trong 1 lần quét tuyến tính, field parser chỉ kiểm tra
+ngữ cảnh (nhãn "Tiết khí:", dấu "(" sau địa chi...) quanh từng hit.
+
+Output giống Aho-Corasick: mọi lần xuất hiện của mọi keyword, kể cả chồng
+lấn nhau. Automaton không chạy bằng vòng lặp Python từng ký tự (chậm hơn các
+regex cũ) mà được biên dịch thành 1 regex dạng trie ("l(?:ập (?:xuân|hạ|...)")
+cho re quét ở tốc độ C; mỗi hit chỉ lùi 1 ký tự để không bỏ sót hit chồng lấn,
+các keyword ngắn hơn cùng vị trí bắt đầu được lấy bằng cách đi trên trie.
+
+Scanner không phân biệt hoa thường (ignore_case=True) quét text đã lower()
+(vd: ctx.text_lower) thay vì dùng re.IGNORECASE (chậm hơn ~6 lần).
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .patterns import register
+
+# Key đánh dấu node kết thúc 1 keyword trong trie (không trùng ký tự nào)
+_END = ''
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    """1 lần xuất hiện của keyword: [start, end) trong text được quét."""
+    keyword: str
+    start: int
+    end: int
+
+
+def _trie_pattern(trie: dict) -> str:
+    """Regex khớp keyword dài nhất bắt đầu tại 1 vị trí, theo cấu trúc trie."""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(trie.items()) if ch != _END]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if _END in trie:
+        # Keyword kết thúc ở đây nhưng có keyword dài hơn: phần còn lại optional (greedy)
+        return f'(?:{body})?'
+    return body
+
+
+class KeywordScanner:
+    """Tìm mọi keyword của 1 từ vựng cố định trong 1 lần quét."""
+
+    def __init__(self, name: str, keywords: Iterable[str], ignore_case: bool = False):
+        """
+        Args:
+            name: Tên pattern trong registry (vd: "lichngaytot.tiet_khi.keywords")
+            keywords: Từ vựng; hit trả về keyword đúng như trong list
+            ignore_case: Keyword được lower(), text đưa vào scan() phải là text đã lower()
+        """
+        self.ignore_case = ignore_case
+        self._trie: dict = {}
+        for keyword in keywords:
+            key = keyword.lower() if ignore_case else keyword
+            if not key:
+                raise ValueError(f"Empty keyword in {name}")
+            node = self._trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            # 2 keyword trùng nhau sau lower(): giữ keyword đầu tiên
+            node.setdefault(_END, keyword)
+        self.pattern = register(name, _trie_pattern(self._trie))
+
+    def _keywords_at(self, text: str, start: int, end: int) -> list[KeywordHit]:
+        """Mọi keyword bắt đầu tại start (keyword dài nhất kết thúc tại end)."""
+        hits = []
+        node = self._trie
+        for pos in range(start, end):
+            node = node[text[pos]]
+            keyword = node.get(_END)
+            if keyword is not None:
+                hits.append(KeywordHit(keyword, start, pos + 1))
+        return hits
+
+    def scan(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> list[KeywordHit]:
+        """
+        Tìm mọi lần xuất hiện của mọi keyword trong text[pos:endpos].
+
+        Args:
+            text: Text cần quét (đã lower() nếu ignore_case)
+            pos: Vị trí bắt đầu
+            endpos: Vị trí kết thúc (mặc định: hết text)
+
+        Returns:
+            List KeywordHit theo (start, end) tăng dần, gồm cả hit chồng lấn
+        """
+        if endpos is None:
+            endpos = len(text)
+        search = self.pattern.search
+        hits: list[KeywordHit] = []
+        while True:
+            match = search(text, pos, endpos)
+            if match is None:
+                return hits
+            start = match.start()
+            hits.extend(self._keywords_at(text, start, match.end()))
+            # Lùi về start + 1 (không nhảy tới match.end()) để giữ hit chồng lấn
+            pos = start + 1
@@ -3,10 +3,23 @@ Parser cho lichngaytot.com
 """
 import re
 import logging
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from datetime import date
-from bs4 import BeautifulSoup
-
+from .backends import BACKENDS, make_context
+from .batch import DEFAULT_CHUNK_SIZE, BatchParser
+from .context import ParseContext
+from .keywords import KeywordHit, KeywordScanner
+from .sections import Heading, Sections, Segmenter
+from .patterns import (
+    CAN_ALT,
+    CHI_ALT,
+    DIRECTION_ALT,
+    PARENTHETICAL,
+    TIET_KHI,
+    WHITESPACE,
+    alternation,
+    register,
+)
 from ..models.day_data import (
     DayData,
     LunarDate,
@@ -45,6 +58,171 @@ class LichNgayTotParser:
         'Tinh': False, 'Trương': True, 'Dực': False, 'Chẩn': True,
     }
 
+    # Giờ xuất hành theo Lý Thuần Phong với đánh giá
+    LY_THUAN_PHONG_RATING = {
+        'Tốc hỷ': True,
+        'Đại an': True,
+        'Tiểu cát': True,
+        'Lưu niên': False,
+        'Xích khẩu': False,
+        'Không vong': False,
+    }
+
+    # 12 giờ địa chi và khung giờ
+    CHI_HOURS = [
+        ('Tý', '23:00 - 01:00'),
+        ('Sửu', '01:00 - 03:00'),
+        ('Dần', '03:00 - 05:00'),
+        ('Mão', '05:00 - 07:00'),
+        ('Thìn', '07:00 - 09:00'),
+        ('Tỵ', '09:00 - 11:00'),
+        ('Ngọ', '11:00 - 13:00'),
+        ('Mùi', '13:00 - 15:00'),
+        ('Thân', '15:00 - 17:00'),
+        ('Dậu', '17:00 - 19:00'),
+        ('Tuất', '19:00 - 21:00'),
+        ('Hợi', '21:00 - 23:00'),
+    ]
+
+    # Ngũ hành theo thiên can
+    CAN_NGU_HANH = {
+        'Giáp': 'Mộc', 'Ất': 'Mộc',
+        'Bính': 'Hỏa', 'Đinh': 'Hỏa',
+        'Mậu': 'Thổ', 'Kỷ': 'Thổ',
+        'Canh': 'Kim', 'Tân': 'Kim',
+        'Nhâm': 'Thủy', 'Quý': 'Thủy',
+    }
+
+    # Container mà fast path lxml phải tìm thấy, thiếu thì fallback về BeautifulSoup
+    REQUIRED_CONTAINERS = (('div', 'calendar-box2'),)
+
+    # Heading các section của trang, theo thứ tự xuất hiện (sections.py)
+    SEGMENTER = Segmenter('lichngaytot', [
+        Heading('hoang_dao', r'Giờ\s+[Hh]oàng\s+[Đđ]ạo|giờ\s+[Hh]oàng\s+[Đđ]ạo'),
+        Heading('hac_dao', r'Giờ\s+[Hh]ắc|giờ\s+[Hh]ắc'),
+        Heading('star28', r'Nhị\s+thập\s+bát\s+tú'),
+        Heading('good_activities', r'Nên làm(?=[:\s])', bullet=True),
+        Heading('bad_activities', r'Kỵ\s*làm(?=[:\s])|Kiêng\s*cữ(?=[:\s])', bullet=True),
+        Heading('exceptions', r'Ngoại\s*lệ', bullet=True),
+        Heading('nhan_than', r'Nhân thần'),
+        Heading('truc12', r'Thập\s+nhị\s+kiến\s+trừ'),
+        # "Cát tinh và Hung tinh": 1 section cho cả sao tốt và sao xấu
+        Heading('stars', r'Cát\s*tinh|cát\s*tinh'),
+        Heading('today', r'Hôm nay ngày gì'),
+        Heading('directions', r'Hướng xuất hành'),
+        Heading('ly_thuan_phong', r'Giờ xuất hành theo Lý Thuần Phong'),
+        Heading('conflicting_ages', r'Tuổi xung khắc'),
+        Heading('related', r'Bài viết liên quan'),
+    ])
+
+    # Regex compile 1 lần lúc import (registry: patterns.py)
+    # "Lịch âm 22-10-2025" hoặc "Lịch âm 22/10/2025"
+    LUNAR_TITLE_RE = register(
+        'lichngaytot.lunar_date.title',
+        r'[Ll]ịch\s+[Ââ]m\s+(\d{1,2})[-/](\d{1,2})[-/](\d{4})',
+    )
+    LUNAR_TEXT_RES = [
+        register('lichngaytot.lunar_date.text_lich_am', r'[Ll]ịch\s+[Ââ]m\s+(\d{1,2})[-/](\d{1,2})'),
+        register('lichngaytot.lunar_date.text_am', r'(\d{1,2})[-/](\d{1,2})\s*[Ââ]m'),
+        register('lichngaytot.lunar_date.text_ngay_thang', r'[Nn]gày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+[Ââ]m'),
+    ]
+    LEAP_MONTH_RE = register('lichngaytot.lunar_date.leap', r'tháng\s+nhuận|nhuận', re.I)
+
+    # "Năm Ất Tị", "Tháng Đinh Hợi", "Ngày Giáp Dần" trong calendar-box2
+    CAN_CHI_BOX_RES = {
+        'year': register('lichngaytot.can_chi.box_year', rf'[Nn]ăm\s*({CAN_ALT})\s*({CHI_ALT})'),
+        'month': register('lichngaytot.can_chi.box_month', rf'[Tt]háng\s*({CAN_ALT})\s*({CHI_ALT})'),
+        'day': register('lichngaytot.can_chi.box_day', rf'[Nn]gày\s*({CAN_ALT})\s*({CHI_ALT})'),
+    }
+    CAN_CHI_TEXT_RES = {
+        'day': register('lichngaytot.can_chi.text_day', rf'[Nn]gày[:\s]*({CAN_ALT})\s*({CHI_ALT})'),
+        'month': register('lichngaytot.can_chi.text_month', rf'[Tt]háng[:\s]*({CAN_ALT})\s*({CHI_ALT})'),
+        'year': register('lichngaytot.can_chi.text_year', rf'[Nn]ăm[:\s]*({CAN_ALT})\s*({CHI_ALT})'),
+    }
+
+    # "Tiết khí: Lập đông" - tên tiết khí quét 1 lần trên text_lower (keywords.py),
+    # thứ tự ưu tiên theo list TIET_KHI
+    TIET_KHI_SCANNER = KeywordScanner('lichngaytot.tiet_khi.keywords', TIET_KHI, ignore_case=True)
+    TIET_KHI_PRIORITY = {tk: i for i, tk in enumerate(TIET_KHI)}
+
+    # "Sao Giác", "Trực: Kiến"
+    STAR28_RE = register('lichngaytot.star28', r'[Ss]ao\s+(' + alternation(STAR_28_RATING) + ')')
+    TRUC12_RE = register('lichngaytot.truc12', r'[Tt]rực[:\s]*(' + alternation(TRUC_12_RATING) + ')')
+
+    # 12 địa chi của CHI_HOURS, vd: "Giáp Tý (23h-1h)" trong calendar-col2
+    CHI_HOUR_SCANNER = KeywordScanner('lichngaytot.hoang_dao.chi_keywords', [chi for chi, _ in CHI_HOURS])
+    HOANG_DAO_SECTION_RE = register(
+        'lichngaytot.hoang_dao.section',
+        r'[Gg]iờ\s+[Hh]oàng\s+[Đđ]ạo[:\s]*(.*?)(?:[Gg]iờ\s+[Hh]ắc|$)',
+        re.DOTALL,
+    )
+    HOANG_DAO_LINE_RE = register('lichngaytot.hoang_dao.line', r'[Hh]oàng\s+[Đđ]ạo[:\s]*([^\n]+)')
+
+    # "Hỷ thần (hướng thần may mắn) - TỐT: Hướng Đông Bắc"
+    DIRECTION_RES = [
+        (register('lichngaytot.directions.hy_than', rf'[Hh]ỷ\s*thần[^:]*:\s*[Hh]ướng\s+({DIRECTION_ALT})'), 'Hỷ thần', 5),
+        (register('lichngaytot.directions.tai_than', rf'[Tt]ài\s*thần[^:]*:\s*[Hh]ướng\s+({DIRECTION_ALT})'), 'Tài thần', 5),
+        (register('lichngaytot.directions.hac_than', rf'[Hh]ắc\s*thần[^:]*:\s*[Hh]ướng\s+({DIRECTION_ALT})'), 'Hắc thần', 1),
+    ]
+
+    # "- Nên làm:" đến "Kỵ làm" / "Kiêng cữ" / "Ngoại lệ"
+    GOOD_ACTIVITIES_RE = register(
+        'lichngaytot.activities.good',
+        r'-?\s*Nên làm[:\s]+(.+?)(?=-?\s*Kỵ\s*làm|-?\s*Kiêng\s*cữ|-?\s*Ngoại\s*lệ|$)',
+        re.DOTALL,
+    )
+    # "Kỵ làm:" hoặc "Kiêng cữ:" đến "Ngoại lệ" hoặc section boundary
+    BAD_ACTIVITIES_RE = register(
+        'lichngaytot.activities.bad',
+        r'-?\s*(?:Kỵ\s*làm|Kiêng\s*cữ)[:\s]+(.+?)(?=-?\s*Ngoại\s*lệ|Sao\s+\w+\s+trúng|Nhân thần|$)',
+        re.DOTALL,
+    )
+
+    STARS_SECTION_RE = register(
+        'lichngaytot.stars.section',
+        r'[Cc]át\s*tinh.*?[Hh]ung\s*tinh.*?(?=Hôm nay ngày gì|Hướng xuất hành|$)',
+        re.DOTALL,
+    )
+    GOOD_STARS_RE = register('lichngaytot.stars.good', r'sao tốt là\s*([^C]+?)(?:Các sao xấu|$)')
+    BAD_STARS_RE = register('lichngaytot.stars.bad', r'sao xấu là\s*(.+?)(?:Hôm nay ngày gì|$)', re.DOTALL)
+    # "Nguyệt Đức: Tốt mọi việc;" -> "Nguyệt Đức"
+    STAR_NAME_RE = register('lichngaytot.stars.name', r'([^;:]+):')
+    GOOD_STAR_NOISE_RE = register('lichngaytot.stars.good_noise', r'(Xem|ngày|năm|tháng)')
+    BAD_STAR_NOISE_RE = register('lichngaytot.stars.bad_noise', r'(Xem|ngày|năm|tháng|cầu)', re.I)
+
+    LY_THUAN_PHONG_SECTION_RE = register(
+        'lichngaytot.ly_thuan_phong.section',
+        r'Giờ xuất hành theo Lý Thuần Phong(.+?)(?:Tuổi xung khắc|Hướng xuất hành|$)',
+        re.DOTALL,
+    )
+    # "11h-13h 23h-1h Tốc hỷ: TỐT description..." - tên giờ quét 1 lần (keywords.py),
+    # time ranges ngay trước tên giờ, đánh giá + mô tả ngay sau
+    LY_THUAN_PHONG_SCANNER = KeywordScanner('lichngaytot.ly_thuan_phong.keywords', LY_THUAN_PHONG_RATING)
+    LY_THUAN_PHONG_RANGES_RE = register(
+        'lichngaytot.ly_thuan_phong.ranges',
+        r'((?:\d{1,2}h\s*-\s*\d{1,2}h\s*)+)\s*\Z',
+    )
+    LY_THUAN_PHONG_RATING_RE = register(
+        'lichngaytot.ly_thuan_phong.rating',
+        r'[:\s]*(TỐT|XẤU)\s*(.+?)(?=\d{1,2}h\s*-\s*\d{1,2}h\s+(?:Tốc|Đại|Tiểu|Lưu|Xích|Không)|$)',
+        re.DOTALL,
+    )
+    TIME_RANGE_RE = register('lichngaytot.ly_thuan_phong.time_range', r'\d{1,2}h\s*-\s*\d{1,2}h')
+
+    # "Xung ngày: Kỷ Dậu, Đinh Dậu" / "Xung tháng: Kỷ Tị, Quý Tị"
+    XUNG_NGAY_RE = register('lichngaytot.conflicting_ages.ngay', r'Xung ngày[:\s]*([^\n]+?)(?:Xung tháng|Sao tốt|$)')
+    XUNG_THANG_RE = register('lichngaytot.conflicting_ages.thang', r'Xung tháng[:\s]*([^\n]+?)(?:Sao tốt|Ngày kỵ|$)')
+
+    def __init__(self, backend: str = 'auto'):
+        """
+        Args:
+            backend: Backend dựng cây HTML: "auto" (lxml, fallback BeautifulSoup),
+                "lxml" hoặc "bs4" (xem backends.py)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown parser backend: {backend} (expected one of {', '.join(BACKENDS)})")
+        self.backend = backend
+
     def parse(self, html: str, target_date: date) -> Optional[DayData]:
         """
         Parse HTML và trả về DayData.
@@ -57,21 +235,23 @@ class LichNgayTotParser:
             DayData object hoặc None nếu parse fail
         """
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            # Cây + text dựng 1 lần, dùng chung cho mọi field parser
+            ctx = make_context(html, self.backend, self.REQUIRED_CONTAINERS)
+            sections = self.SEGMENTER.segment(ctx.text)
 
             # Parse từng phần
-            lunar_date = self._parse_lunar_date(soup, target_date)
-            can_chi = self._parse_can_chi(soup)
-            tiet_khi = self._parse_tiet_khi(soup)
-            star28 = self._parse_star28(soup)
-            truc12 = self._parse_truc12(soup)
-            hoang_dao_hours = self._parse_hoang_dao_hours(soup)
-            directions = self._parse_directions(soup)
-            good_activities = self._parse_activities(soup, 'good')
-            bad_activities = self._parse_activities(soup, 'bad')
-            good_stars, bad_stars = self._parse_stars(soup)
-            ly_thuan_phong_hours = self._parse_ly_thuan_phong_hours(soup)
-            conflicting_ages = self._parse_conflicting_ages(soup)
+            lunar_date = self._parse_lunar_date(ctx, target_date)
+            can_chi = self._parse_can_chi(ctx)
+            tiet_khi = self._parse_tiet_khi(ctx)
+            star28 = self._parse_star28(ctx)
+            truc12 = self._parse_truc12(ctx)
+            hoang_dao_hours = self._parse_hoang_dao_hours(ctx, sections)
+            directions = self._parse_directions(ctx, sections)
+            good_activities = self._parse_activities(ctx, sections, 'good')
+            bad_activities = self._parse_activities(ctx, sections, 'bad')
+            good_stars, bad_stars = self._parse_stars(ctx, sections)
+            ly_thuan_phong_hours = self._parse_ly_thuan_phong_hours(ctx, sections)
+            conflicting_ages = self._parse_conflicting_ages(ctx)
 
             return DayData(
                 solar_date=target_date,
@@ -95,6 +275,44 @@ class LichNgayTotParser:
             logger.error(f"Error parsing {target_date}: {e}")
             return None
 
+    def parse_many(
+        self,
+        pages: Iterable[tuple[date, str]],
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[tuple[date, Optional[DayData]]]:
+        """
+        Parse nhiều trang đã lưu trên process pool (batch.py), kết quả theo thứ tự input.
+
+        Args:
+            pages: Iterable (ngày, html content từ lichngaytot.com), nên theo thứ tự ngày
+            workers: Số worker process, mặc định = số CPU (<= 1 hoặc ít hơn
+                MIN_POOL_PAGES trang: parse trong process hiện tại)
+            chunk_size: Số trang mỗi chunk gửi sang worker
+
+        Returns:
+            Iterator (ngày, DayData hoặc None nếu parse fail)
+        """
+        return BatchParser(self, workers, chunk_size).parse_many(pages)
+
+    @staticmethod
+    def _search_section(
+        pattern: re.Pattern,
+        ctx: ParseContext,
+        sections: Sections,
+        name: str,
+    ) -> Optional[re.Match]:
+        """
+        Search pattern trong section name; trang không có section đó (hoặc
+        pattern không khớp trong section) thì search trên toàn bộ text.
+        """
+        span_text = sections.span_text(name)
+        if span_text is not None:
+            match = pattern.search(span_text)
+            if match:
+                return match
+        return pattern.search(ctx.text)
+
     # Mapping tên tháng âm lịch sang số
     LUNAR_MONTH_MAP = {
         'giêng': 1, 'một': 1, 'nhất': 1,
@@ -110,59 +328,51 @@ class LichNgayTotParser:
         'mười một': 11,
         'mười hai': 12, 'chạp': 12,
     }
+    # Tên dài trước: 'tháng mười một' / 'tháng mười hai' cũng chứa 'tháng mười'
+    LUNAR_MONTH_ITEMS = tuple(sorted(LUNAR_MONTH_MAP.items(), key=lambda item: -len(item[0])))
 
-    def _parse_lunar_date(self, soup: BeautifulSoup, target_date: date) -> LunarDate:
+    def _parse_lunar_date(self, ctx: ParseContext, target_date: date) -> LunarDate:
         """Parse ngày âm lịch."""
         lunar_day = 1
         lunar_month = 1
         is_leap = False
 
         # Method 1: Tìm trong title - "Lịch âm DD-MM-YYYY"
-        title = soup.find('title')
-        if title:
-            title_text = title.get_text()
-            # Pattern: "Lịch âm 22-10-2025" hoặc "Lịch âm 22/10/2025"
-            match = re.search(r'[Ll]ịch\s+[Ââ]m\s+(\d{1,2})[-/](\d{1,2})[-/](\d{4})', title_text)
+        title_text = ctx.title_text
+        if title_text is not None:
+            match = self.LUNAR_TITLE_RE.search(title_text)
             if match:
                 lunar_day = int(match.group(1))
                 lunar_month = int(match.group(2))
 
         # Method 2: Tìm span.ngay-am cho ngày
-        ngay_am = soup.find('span', class_='ngay-am')
-        if ngay_am:
+        if ctx.ngay_am_text is not None:
             try:
-                lunar_day = int(ngay_am.get_text().strip())
+                lunar_day = int(ctx.ngay_am_text.strip())
             except ValueError:
                 pass
 
         # Method 3: Tìm tháng từ div.calendar-info2 - "THÁNG MƯỜI"
-        calendar_info2 = soup.find('div', class_='calendar-info2')
-        if calendar_info2:
-            info_text = calendar_info2.get_text().lower()
+        if ctx.calendar_info2_text is not None:
+            info_text = ctx.calendar_info2_text.lower()
             # Tìm tháng
-            for month_name, month_num in self.LUNAR_MONTH_MAP.items():
+            for month_name, month_num in self.LUNAR_MONTH_ITEMS:
                 if f'tháng {month_name}' in info_text:
                     lunar_month = month_num
                     break
 
         # Method 4: Fallback - tìm trong text
         if lunar_day == 1 and lunar_month == 1:
-            text = soup.get_text()
-            patterns = [
-                r'[Ll]ịch\s+[Ââ]m\s+(\d{1,2})[-/](\d{1,2})',
-                r'(\d{1,2})[-/](\d{1,2})\s*[Ââ]m',
-                r'[Nn]gày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+[Ââ]m',
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, text)
+            text = ctx.text
+            for pattern in self.LUNAR_TEXT_RES:
+                match = pattern.search(text)
                 if match:
                     lunar_day = int(match.group(1))
                     lunar_month = int(match.group(2))
                     break
 
         # Check tháng nhuận
-        text = soup.get_text()
-        if re.search(r'tháng\s+nhuận|nhuận', text, re.I):
+        if self.LEAP_MONTH_RE.search(ctx.text):
             is_leap = True
 
         # Năm âm lịch (có thể khác năm dương nếu trước Tết)
@@ -177,15 +387,8 @@ class LichNgayTotParser:
             is_leap_month=is_leap,
         )
 
-    def _parse_can_chi(self, soup: BeautifulSoup) -> CanChiInfo:
+    def _parse_can_chi(self, ctx: ParseContext) -> CanChiInfo:
         """Parse Can Chi ngày/tháng/năm."""
-        # Các thiên can và địa chi (bao gồm cả biến thể Unicode)
-        cans = ['Giáp', 'Ất', 'Bính', 'Đinh', 'Mậu', 'Kỷ', 'Canh', 'Tân', 'Nhâm', 'Quý']
-        # Thêm cả 2 biến thể: Tỵ và Tị
-        chis = ['Tý', 'Sửu', 'Dần', 'Mão', 'Thìn', 'Tỵ', 'Tị', 'Ngọ', 'Mùi', 'Thân', 'Dậu', 'Tuất', 'Hợi']
-        can_pattern = '|'.join(cans)
-        chi_pattern = '|'.join(chis)
-
         day_can, day_chi = 'Giáp', 'Tý'
         month_can, month_chi = 'Giáp', 'Tý'
         year_can, year_chi = 'Giáp', 'Thìn'
@@ -195,106 +398,95 @@ class LichNgayTotParser:
             return 'Tỵ' if chi == 'Tị' else chi
 
         # Method 1: Tìm trong calendar-box2 - chứa "Năm Ất Tị", "Tháng Đinh Hợi", "Ngày Giáp Dần"
-        calendar_box2 = soup.find('div', class_='calendar-box2')
-        if calendar_box2:
-            box_text = calendar_box2.get_text()
-
+        box_text = ctx.calendar_box2_text
+        if box_text is not None:
             # Parse năm - "Năm Ất Tị" hoặc "Năm Ất Tỵ"
-            year_match = re.search(rf'[Nn]ăm\s*({can_pattern})\s*({chi_pattern})', box_text)
+            year_match = self.CAN_CHI_BOX_RES['year'].search(box_text)
             if year_match:
                 year_can = year_match.group(1)
                 year_chi = normalize_chi(year_match.group(2))
 
             # Parse tháng - "Tháng Đinh Hợi"
-            month_match = re.search(rf'[Tt]háng\s*({can_pattern})\s*({chi_pattern})', box_text)
+            month_match = self.CAN_CHI_BOX_RES['month'].search(box_text)
             if month_match:
                 month_can = month_match.group(1)
                 month_chi = normalize_chi(month_match.group(2))
 
             # Parse ngày - "Ngày Giáp Dần"
-            day_match = re.search(rf'[Nn]gày\s*({can_pattern})\s*({chi_pattern})', box_text)
+            day_match = self.CAN_CHI_BOX_RES['day'].search(box_text)
             if day_match:
                 day_can = day_match.group(1)
                 day_chi = normalize_chi(day_match.group(2))
 
         # Method 2: Fallback - tìm trong toàn bộ text
         if day_can == 'Giáp' and day_chi == 'Tý':
-            text = soup.get_text()
+            text = ctx.text
 
-            day_match = re.search(rf'[Nn]gày[:\s]*({can_pattern})\s*({chi_pattern})', text)
+            day_match = self.CAN_CHI_TEXT_RES['day'].search(text)
             if day_match:
                 day_can = day_match.group(1)
                 day_chi = day_match.group(2)
 
-            month_match = re.search(rf'[Tt]háng[:\s]*({can_pattern})\s*({chi_pattern})', text)
+            month_match = self.CAN_CHI_TEXT_RES['month'].search(text)
             if month_match:
                 month_can = month_match.group(1)
                 month_chi = month_match.group(2)
 
-            year_match = re.search(rf'[Nn]ăm[:\s]*({can_pattern})\s*({chi_pattern})', text)
+            year_match = self.CAN_CHI_TEXT_RES['year'].search(text)
             if year_match:
                 year_can = year_match.group(1)
                 year_chi = year_match.group(2)
 
-        # Xác định ngũ hành của ngày
-        can_ngu_hanh = {
-            'Giáp': 'Mộc', 'Ất': 'Mộc',
-            'Bính': 'Hỏa', 'Đinh': 'Hỏa',
-            'Mậu': 'Thổ', 'Kỷ': 'Thổ',
-            'Canh': 'Kim', 'Tân': 'Kim',
-            'Nhâm': 'Thủy', 'Quý': 'Thủy',
-        }
-
         return CanChiInfo(
             year=CanChi(can=year_can, chi=year_chi),
             month=CanChi(can=month_can, chi=month_chi),
             day=CanChi(can=day_can, chi=day_chi),
-            ngu_hanh=can_ngu_hanh.get(day_can, 'Mộc'),
+            ngu_hanh=self.CAN_NGU_HANH.get(day_can, 'Mộc'),
         )
 
-    def _parse_tiet_khi(self, soup: BeautifulSoup) -> Optional[str]:
+    @staticmethod
+    def _has_tiet_khi_label(text_lower: str, start: int) -> bool:
+        """Ngay trước start là nhãn "tiết khí" rồi ":" / khoảng trắng (như regex cũ "tiết\\s+khí[:\\s]*<tên>")."""
+        pos = start
+        while pos > 0 and (text_lower[pos - 1] == ':' or text_lower[pos - 1].isspace()):
+            pos -= 1
+        if not text_lower.endswith('khí', 0, pos):
+            return False
+        pos -= 3
+        words_end = pos
+        while pos > 0 and text_lower[pos - 1].isspace():
+            pos -= 1
+        return pos < words_end and text_lower.endswith('tiết', 0, pos)
+
+    def _first_tiet_khi(self, hits: list[KeywordHit]) -> Optional[str]:
+        """Tiết khí đứng đầu list TIET_KHI trong các hit, None nếu không có hit."""
+        if not hits:
+            return None
+        return min((hit.keyword for hit in hits), key=self.TIET_KHI_PRIORITY.__getitem__)
+
+    def _parse_tiet_khi(self, ctx: ParseContext) -> Optional[str]:
         """Parse tiết khí."""
-        tiet_khi_list = [
-            'Tiểu hàn', 'Đại hàn', 'Lập xuân', 'Vũ thủy',
-            'Kinh trập', 'Xuân phân', 'Thanh minh', 'Cốc vũ',
-            'Lập hạ', 'Tiểu mãn', 'Mang chủng', 'Hạ chí',
-            'Tiểu thử', 'Đại thử', 'Lập thu', 'Xử thử',
-            'Bạch lộ', 'Thu phân', 'Hàn lộ', 'Sương giáng',
-            'Lập đông', 'Tiểu tuyết', 'Đại tuyết', 'Đông chí',
-        ]
-
-        # Method 1: Tìm trực tiếp tên tiết khí trong text (ưu tiên nhất vì chính xác)
-        text = soup.get_text()
-        for tk in tiet_khi_list:
-            # Tìm với word boundary hoặc sau "Tiết khí:"
-            if re.search(rf'[Tt]iết\s+khí[:\s]*{re.escape(tk)}', text, re.IGNORECASE):
-                return tk
+        text_lower = ctx.text_lower
+        hits = self.TIET_KHI_SCANNER.scan(text_lower)
+
+        # Method 1: Tên tiết khí ngay sau "Tiết khí:" (ưu tiên nhất vì chính xác)
+        labelled = [hit for hit in hits if self._has_tiet_khi_label(text_lower, hit.start)]
+        if labelled:
+            return self._first_tiet_khi(labelled)
 
         # Method 2: Tìm trong calendar-box2 với list match
-        calendar_box2 = soup.find('div', class_='calendar-box2')
-        if calendar_box2:
-            box_text = calendar_box2.get_text().lower()
-            for tk in tiet_khi_list:
-                if tk.lower() in box_text:
-                    return tk
+        if ctx.calendar_box2_text is not None:
+            box_tk = self._first_tiet_khi(self.TIET_KHI_SCANNER.scan(ctx.calendar_box2_text.lower()))
+            if box_tk:
+                return box_tk
 
         # Method 3: Fallback - tìm tên tiết khí ở bất kỳ đâu
-        text_lower = text.lower()
-        for tk in tiet_khi_list:
-            if tk.lower() in text_lower:
-                return tk
-
-        return None
+        return self._first_tiet_khi(hits)
 
-    def _parse_star28(self, soup: BeautifulSoup) -> Optional[Star28Info]:
+    def _parse_star28(self, ctx: ParseContext) -> Optional[Star28Info]:
         """Parse 28 Sao."""
-        text = soup.get_text()
-
-        # Pattern: "Sao Giác", "Nhị thập bát tú: Giác"
-        star_names = list(self.STAR_28_RATING.keys())
-        pattern = r'[Ss]ao\s+(' + '|'.join(star_names) + ')'
-
-        match = re.search(pattern, text)
+        # Pattern: "Sao Giác"
+        match = self.STAR28_RE.search(ctx.text)
         if match:
             name = match.group(1)
             return Star28Info(
@@ -304,14 +496,9 @@ class LichNgayTotParser:
 
         return None
 
-    def _parse_truc12(self, soup: BeautifulSoup) -> Optional[Truc12Info]:
+    def _parse_truc12(self, ctx: ParseContext) -> Optional[Truc12Info]:
         """Parse 12 Trực."""
-        text = soup.get_text()
-
-        truc_names = list(self.TRUC_12_RATING.keys())
-        pattern = r'[Tt]rực[:\s]*(' + '|'.join(truc_names) + ')'
-
-        match = re.search(pattern, text)
+        match = self.TRUC12_RE.search(ctx.text)
         if match:
             name = match.group(1)
             return Truc12Info(
@@ -321,66 +508,51 @@ class LichNgayTotParser:
 
         return None
 
-    def _parse_hoang_dao_hours(self, soup: BeautifulSoup) -> list[HourInfo]:
+    @staticmethod
+    def _is_can_chi_hour(text: str, hit: KeywordHit) -> bool:
+        """Địa chi đứng sau 1 từ (can) và trước "(" (như regex cũ "\\b\\w+\\s+<chi>\\s*\\(")."""
+        pos = hit.start
+        while pos > 0 and text[pos - 1].isspace():
+            pos -= 1
+        if pos == hit.start or pos == 0 or not (text[pos - 1].isalnum() or text[pos - 1] == '_'):
+            return False
+        pos = hit.end
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        return pos < len(text) and text[pos] == '('
+
+    def _parse_hoang_dao_hours(self, ctx: ParseContext, sections: Sections) -> list[HourInfo]:
         """Parse giờ hoàng đạo."""
         hours = []
-
-        chi_hours = [
-            ('Tý', '23:00 - 01:00'),
-            ('Sửu', '01:00 - 03:00'),
-            ('Dần', '03:00 - 05:00'),
-            ('Mão', '05:00 - 07:00'),
-            ('Thìn', '07:00 - 09:00'),
-            ('Tỵ', '09:00 - 11:00'),
-            ('Ngọ', '11:00 - 13:00'),
-            ('Mùi', '13:00 - 15:00'),
-            ('Thân', '15:00 - 17:00'),
-            ('Dậu', '17:00 - 19:00'),
-            ('Tuất', '19:00 - 21:00'),
-            ('Hợi', '21:00 - 23:00'),
-        ]
-
         hoang_dao_chis = set()
 
         # Method 1: Tìm trong calendar-col2 - chứa danh sách giờ hoàng đạo
         # Format: "Giáp Tý (23h-1h)", "Ất Sửu (1h-3h)"
-        calendar_col2_list = soup.find_all('div', class_='calendar-col2')
-        for col2 in calendar_col2_list:
-            col2_text = col2.get_text()
+        for col2_text in ctx.calendar_col2_texts:
             if 'Hoàng Đạo' in col2_text or 'hoàng đạo' in col2_text.lower():
                 # Tìm tất cả địa chi trong section này
-                for chi, _ in chi_hours:
+                for hit in self.CHI_HOUR_SCANNER.scan(col2_text):
                     # Match patterns like "Giáp Tý", "Ất Sửu" trong giờ hoàng đạo
-                    if re.search(rf'\b\w+\s+{chi}\s*\(', col2_text):
-                        hoang_dao_chis.add(chi)
+                    if self._is_can_chi_hour(col2_text, hit):
+                        hoang_dao_chis.add(hit.keyword)
 
-        # Method 2: Tìm trong toàn bộ text với pattern cụ thể hơn
+        # Method 2: Tìm trong section "Giờ Hoàng Đạo" với pattern cụ thể hơn
         if not hoang_dao_chis:
-            text = soup.get_text()
-
-            # Tìm section "Giờ Hoàng Đạo" và lấy các giờ sau đó
-            hoang_dao_section = re.search(
-                r'[Gg]iờ\s+[Hh]oàng\s+[Đđ]ạo[:\s]*(.*?)(?:[Gg]iờ\s+[Hh]ắc|$)',
-                text,
-                re.DOTALL
-            )
+            # Lấy các giờ sau heading "Giờ Hoàng Đạo"
+            hoang_dao_section = self._search_section(self.HOANG_DAO_SECTION_RE, ctx, sections, 'hoang_dao')
             if hoang_dao_section:
                 hoang_dao_text = hoang_dao_section.group(1)
-                for chi, _ in chi_hours:
-                    if chi in hoang_dao_text:
-                        hoang_dao_chis.add(chi)
+                hoang_dao_chis.update(hit.keyword for hit in self.CHI_HOUR_SCANNER.scan(hoang_dao_text))
 
         # Method 3: Fallback - tìm pattern đơn giản
         if not hoang_dao_chis:
-            text = soup.get_text()
-            hoang_dao_match = re.search(r'[Hh]oàng\s+[Đđ]ạo[:\s]*([^\n]+)', text)
+            text = ctx.text
+            hoang_dao_match = self.HOANG_DAO_LINE_RE.search(text)
             if hoang_dao_match:
                 hoang_dao_text = hoang_dao_match.group(1)
-                for chi, _ in chi_hours:
-                    if chi in hoang_dao_text:
-                        hoang_dao_chis.add(chi)
+                hoang_dao_chis.update(hit.keyword for hit in self.CHI_HOUR_SCANNER.scan(hoang_dao_text))
 
-        for chi, time_range in chi_hours:
+        for chi, time_range in self.CHI_HOURS:
             hours.append(HourInfo(
                 chi=chi,
                 time_range=time_range,
@@ -390,28 +562,12 @@ class LichNgayTotParser:
 
         return hours
 
-    def _parse_directions(self, soup: BeautifulSoup) -> list[DirectionInfo]:
+    def _parse_directions(self, ctx: ParseContext, sections: Sections) -> list[DirectionInfo]:
         """Parse hướng xuất hành."""
         directions = []
-        text = soup.get_text()
-
-        # Valid direction names in Vietnamese (ordered from longest to shortest for proper matching)
-        valid_directions = [
-            'Chính Đông', 'Chính Tây', 'Chính Nam', 'Chính Bắc',
-            'Đông Bắc', 'Đông Nam', 'Tây Bắc', 'Tây Nam',
-            'Đông', 'Tây', 'Nam', 'Bắc',
-        ]
-        direction_regex = '|'.join(re.escape(d) for d in valid_directions)
-
-        # Pattern: "Hỷ thần (hướng thần may mắn) - TỐT: Hướng Đông Bắc"
-        direction_patterns = [
-            (rf'[Hh]ỷ\s*thần[^:]*:\s*[Hh]ướng\s+({direction_regex})', 'Hỷ thần', 5),
-            (rf'[Tt]ài\s*thần[^:]*:\s*[Hh]ướng\s+({direction_regex})', 'Tài thần', 5),
-            (rf'[Hh]ắc\s*thần[^:]*:\s*[Hh]ướng\s+({direction_regex})', 'Hắc thần', 1),
-        ]
-
-        for pattern, name, rating in direction_patterns:
-            match = re.search(pattern, text)
+
+        for pattern, name, rating in self.DIRECTION_RES:
+            match = self._search_section(pattern, ctx, sections, 'directions')
             if match:
                 direction_text = match.group(1).strip()
                 if direction_text:
@@ -423,7 +579,12 @@ class LichNgayTotParser:
 
         return directions
 
-    def _parse_activities(self, soup: BeautifulSoup, activity_type: str) -> list[ActivityInfo]:
+    def _parse_activities(
+        self,
+        ctx: ParseContext,
+        sections: Sections,
+        activity_type: str,
+    ) -> list[ActivityInfo]:
         """
         Parse việc nên làm / không nên làm.
 
@@ -432,27 +593,16 @@ class LichNgayTotParser:
         - Kỵ làm: Chôn cất hoạn nạn ba năm...
         """
         activities = []
-        text = soup.get_text()
 
         if activity_type == 'good':
-            # Pattern: "- Nên làm:" hoặc "Nên làm:" đến "Kỵ làm" / "Kiêng cữ" / "Ngoại lệ"
-            match = re.search(
-                r'-?\s*Nên làm[:\s]+(.+?)(?=-?\s*Kỵ\s*làm|-?\s*Kiêng\s*cữ|-?\s*Ngoại\s*lệ|$)',
-                text,
-                re.DOTALL
-            )
+            match = self._search_section(self.GOOD_ACTIVITIES_RE, ctx, sections, 'good_activities')
         else:
-            # Pattern: "Kỵ làm:" hoặc "Kiêng cữ:" đến "Ngoại lệ" hoặc section boundary
-            match = re.search(
-                r'-?\s*(?:Kỵ\s*làm|Kiêng\s*cữ)[:\s]+(.+?)(?=-?\s*Ngoại\s*lệ|Sao\s+\w+\s+trúng|Nhân thần|$)',
-                text,
-                re.DOTALL
-            )
+            match = self._search_section(self.BAD_ACTIVITIES_RE, ctx, sections, 'bad_activities')
 
         if match:
             activities_text = match.group(1).strip()
             # Clean up text
-            activities_text = re.sub(r'\s+', ' ', activities_text)  # Normalize whitespace
+            activities_text = WHITESPACE.sub(' ', activities_text)  # Normalize whitespace
 
             # Add as single activity (text description)
             if activities_text and len(activities_text) > 5:
@@ -485,55 +635,51 @@ class LichNgayTotParser:
 
         return 'general'
 
-    def _parse_stars(self, soup: BeautifulSoup) -> tuple[list[str], list[str]]:
+    def _parse_stars(self, ctx: ParseContext, sections: Sections) -> tuple[list[str], list[str]]:
         """
         Parse cát tinh và hung tinh.
 
         Format: "sao tốt là Nguyệt Đức: Tốt mọi việc; Minh tinh: Tốt mọi việc;
                  Các sao xấu là Tiểu Hao: Xấu về giao dịch; Hoang vu: Xấu mọi việc;"
         """
-        text = soup.get_text()
+        text = ctx.text
         good_stars = []
         bad_stars = []
 
         # Find stars section and limit scope to avoid footer noise
-        stars_section = re.search(
-            r'[Cc]át\s*tinh.*?[Hh]ung\s*tinh.*?(?=Hôm nay ngày gì|Hướng xuất hành|$)',
-            text,
-            re.DOTALL
-        )
+        stars_section = self._search_section(self.STARS_SECTION_RE, ctx, sections, 'stars')
         if stars_section:
             section_text = stars_section.group(0)
         else:
             section_text = text[:5000]  # Limit to first 5000 chars as fallback
 
         # Cát tinh: extract star names before colon, after "sao tốt là"
-        cat_match = re.search(r'sao tốt là\s*([^C]+?)(?:Các sao xấu|$)', section_text)
+        cat_match = self.GOOD_STARS_RE.search(section_text)
         if cat_match:
             stars_text = cat_match.group(1)
             # Pattern: "Nguyệt Đức: Tốt mọi việc;" -> extract "Nguyệt Đức"
-            star_names = re.findall(r'([^;:]+):', stars_text)
+            star_names = self.STAR_NAME_RE.findall(stars_text)
             for name in star_names:
                 name = name.strip()
                 # Filter valid star names (short, no noise)
-                if name and 2 <= len(name) <= 30 and not re.search(r'(Xem|ngày|năm|tháng)', name):
+                if name and 2 <= len(name) <= 30 and not self.GOOD_STAR_NOISE_RE.search(name):
                     good_stars.append(name)
 
         # Hung tinh: extract after "sao xấu là" (more flexible pattern)
-        hung_match = re.search(r'sao xấu là\s*(.+?)(?:Hôm nay ngày gì|$)', section_text, re.DOTALL)
+        hung_match = self.BAD_STARS_RE.search(section_text)
         if hung_match:
             stars_text = hung_match.group(1)
-            star_names = re.findall(r'([^;:]+):', stars_text)
+            star_names = self.STAR_NAME_RE.findall(stars_text)
             for name in star_names:
                 name = name.strip()
                 # Remove any parenthetical text like "(Cẩu Giảo)"
-                name = re.sub(r'\([^)]*\)', '', name).strip()
-                if name and 2 <= len(name) <= 20 and not re.search(r'(Xem|ngày|năm|tháng|cầu)', name, re.I):
+                name = PARENTHETICAL.sub('', name).strip()
+                if name and 2 <= len(name) <= 20 and not self.BAD_STAR_NOISE_RE.search(name):
                     bad_stars.append(name)
 
         return good_stars, bad_stars
 
-    def _parse_ly_thuan_phong_hours(self, soup: BeautifulSoup) -> list[LyThuanPhongHour]:
+    def _parse_ly_thuan_phong_hours(self, ctx: ParseContext, sections: Sections) -> list[LyThuanPhongHour]:
         """
         Parse giờ xuất hành theo Lý Thuần Phong.
 
@@ -542,46 +688,40 @@ class LichNgayTotParser:
                  Tiểu cát (TỐT), Không vong (XẤU), Đại an (TỐT)
         """
         hours = []
-        text = soup.get_text()
 
         # Tìm section Lý Thuần Phong
-        section_match = re.search(
-            r'Giờ xuất hành theo Lý Thuần Phong(.+?)(?:Tuổi xung khắc|Hướng xuất hành|$)',
-            text,
-            re.DOTALL
-        )
+        section_match = self._search_section(self.LY_THUAN_PHONG_SECTION_RE, ctx, sections, 'ly_thuan_phong')
         if not section_match:
             return hours
 
         section_text = section_match.group(1)
 
-        # Các giờ và đánh giá
-        hour_types = {
-            'Tốc hỷ': True,
-            'Đại an': True,
-            'Tiểu cát': True,
-            'Lưu niên': False,
-            'Xích khẩu': False,
-            'Không vong': False,
-        }
-
         # Pattern: "11h-13h 23h-1h Tốc hỷ: TỐT description..."
-        for hour_name, is_good in hour_types.items():
-            # Tìm pattern với time ranges trước tên giờ
-            pattern = rf'((?:\d{{1,2}}h\s*-\s*\d{{1,2}}h\s*)+)\s*{re.escape(hour_name)}[:\s]*(TỐT|XẤU)\s*(.+?)(?=\d{{1,2}}h\s*-\s*\d{{1,2}}h\s+(?:Tốc|Đại|Tiểu|Lưu|Xích|Không)|$)'
-            match = re.search(pattern, section_text, re.DOTALL)
-
-            if match:
-                time_ranges_str = match.group(1).strip()
-                rating = match.group(2)
-                description = match.group(3).strip()
+        # Mỗi giờ lấy lần xuất hiện đầu tiên có time ranges trước và TỐT / XẤU sau
+        found: dict[str, tuple[re.Match, re.Match]] = {}
+        ranges_pos = 0
+        for hit in self.LY_THUAN_PHONG_SCANNER.scan(section_text):
+            if hit.keyword not in found:
+                ranges_match = self.LY_THUAN_PHONG_RANGES_RE.search(section_text, ranges_pos, hit.start)
+                rating_match = ranges_match and self.LY_THUAN_PHONG_RATING_RE.match(section_text, hit.end)
+                if rating_match:
+                    found[hit.keyword] = (ranges_match, rating_match)
+            # Time ranges của hit sau không thể bắt đầu trước tên giờ này
+            ranges_pos = hit.end
+
+        for hour_name in self.LY_THUAN_PHONG_RATING:
+            if hour_name in found:
+                ranges_match, rating_match = found[hour_name]
+                time_ranges_str = ranges_match.group(1).strip()
+                rating = rating_match.group(1)
+                description = rating_match.group(2).strip()
 
                 # Normalize time ranges
-                time_ranges = re.findall(r'\d{1,2}h\s*-\s*\d{1,2}h', time_ranges_str)
+                time_ranges = self.TIME_RANGE_RE.findall(time_ranges_str)
                 time_range = ', '.join(time_ranges)
 
                 # Clean description - chỉ lấy phần chính
-                description = re.sub(r'\s+', ' ', description)
+                description = WHITESPACE.sub(' ', description)
                 # Cắt ở dấu chấm đầu tiên hoặc giới hạn 300 ký tự
                 if '.' in description:
                     first_sentences = description.split('.')[:2]
@@ -597,7 +737,7 @@ class LichNgayTotParser:
 
         return hours
 
-    def _parse_conflicting_ages(self, soup: BeautifulSoup) -> Optional[ConflictingAge]:
+    def _parse_conflicting_ages(self, ctx: ParseContext) -> Optional[ConflictingAge]:
         """
         Parse tuổi xung khắc.
 
@@ -605,13 +745,13 @@ class LichNgayTotParser:
         Xung ngày: Kỷ Dậu, Đinh Dậu, Tân Mùi, Tân Sửu
         Xung tháng: Kỷ Tị, Quý Tị, Quý Mùi, Quý Sửu, Quý Hợi
         """
-        text = soup.get_text()
+        text = ctx.text
 
         xung_ngay = []
         xung_thang = []
 
         # Parse xung ngày
-        ngay_match = re.search(r'Xung ngày[:\s]*([^\n]+?)(?:Xung tháng|Sao tốt|$)', text)
+        ngay_match = self.XUNG_NGAY_RE.search(text)
         if ngay_match:
             ngay_text = ngay_match.group(1).strip()
             # Split by comma and clean
@@ -619,7 +759,7 @@ class LichNgayTotParser:
             xung_ngay = [item for item in items if item and len(item) <= 20]
 
         # Parse xung tháng
-        thang_match = re.search(r'Xung tháng[:\s]*([^\n]+?)(?:Sao tốt|Ngày kỵ|$)', text)
+        thang_match = self.XUNG_THANG_RE.search(text)
         if thang_match:
             thang_text = thang_match.group(1).strip()
             items = [item.strip() for item in thang_text.split(',')]
@@ -0,0 +1,82 @@
+"""
+Registry các regex đã compile sẵn cho HTML parsers.
+
+Trước đây mỗi lần parse 1 trang, các field parser lại ghép alternation từ list
+('|'.join(cans), '|'.join(star_names), pattern f-string theo từng giờ...) rồi
+để re tra / compile qua cache nội bộ (giới hạn kích thước, key gồm cả flags).
+Giờ mọi pattern được build và compile 1 lần lúc import class / module, đăng ký
+theo tên "<parser>.<field>" để benchmark và debug tra lại được.
+"""
+import re
+from typing import Iterable
+
+# Từ vựng cố định dùng chung cho các parser
+CANS = ['Giáp', 'Ất', 'Bính', 'Đinh', 'Mậu', 'Kỷ', 'Canh', 'Tân', 'Nhâm', 'Quý']
+
+# 12 Chi theo thứ tự chu kỳ (index dùng để tính Can Chi)
+CHIS = ['Tý', 'Sửu', 'Dần', 'Mão', 'Thìn', 'Tỵ', 'Ngọ', 'Mùi', 'Thân', 'Dậu', 'Tuất', 'Hợi']
+
+# Cho regex: cả 2 biến thể Unicode Tỵ và Tị
+CHI_VARIANTS = CHIS[:6] + ['Tị'] + CHIS[6:]
+
+# Dài trước ngắn để alternation khớp "Đông Bắc" trước "Đông"
+DIRECTIONS = [
+    'Chính Đông', 'Chính Tây', 'Chính Nam', 'Chính Bắc',
+    'Đông Bắc', 'Đông Nam', 'Tây Bắc', 'Tây Nam',
+    'Đông', 'Tây', 'Nam', 'Bắc',
+]
+
+TIET_KHI = [
+    'Tiểu hàn', 'Đại hàn', 'Lập xuân', 'Vũ thủy',
+    'Kinh trập', 'Xuân phân', 'Thanh minh', 'Cốc vũ',
+    'Lập hạ', 'Tiểu mãn', 'Mang chủng', 'Hạ chí',
+    'Tiểu thử', 'Đại thử', 'Lập thu', 'Xử thử',
+    'Bạch lộ', 'Thu phân', 'Hàn lộ', 'Sương giáng',
+    'Lập đông', 'Tiểu tuyết', 'Đại tuyết', 'Đông chí',
+]
+
+_registry: dict[str, re.Pattern] = {}
+
+
+def alternation(words: Iterable[str], escape: bool = False) -> str:
+    """Ghép list từ thành alternation 'a|b|c' (giữ nguyên thứ tự)."""
+    return '|'.join(re.escape(word) if escape else word for word in words)
+
+
+CAN_ALT = alternation(CANS)
+CHI_ALT = alternation(CHI_VARIANTS)
+DIRECTION_ALT = alternation(DIRECTIONS, escape=True)
+
+
+def register(name: str, pattern: str, flags: int = 0) -> re.Pattern:
+    """
+    Compile pattern và đăng ký theo tên.
+
+    Args:
+        name: Tên duy nhất, dạng "<parser>.<field>"
+        pattern: Regex
+        flags: Flags của re
+
+    Returns:
+        Pattern đã compile
+    """
+    if name in _registry:
+        raise ValueError(f"Pattern already registered: {name}")
+    compiled = re.compile(pattern, flags)
+    _registry[name] = compiled
+    return compiled
+
+
+def get_pattern(name: str) -> re.Pattern:
+    """Pattern đã đăng ký theo tên (KeyError nếu chưa có)."""
+    return _registry[name]
+
+
+def registered_patterns() -> dict[str, re.Pattern]:
+    """Tất cả pattern đã đăng ký, keyed by tên."""
+    return dict(_registry)
+
+
+# Pattern dùng chung
+WHITESPACE = register('common.whitespace', r'\s+')
+PARENTHETICAL = register('common.parenthetical', r'\([^)]*\)')
@@ -0,0 +1,118 @@
+"""
+Chia text của trang thành các section theo heading, trong 1 lần quét.
+
+Các field parser (việc nên làm / kỵ làm, cát tinh / hung tinh, giờ Lý Thuần
+Phong...) trước đây chạy regex DOTALL với .+? lazy và lookahead trên toàn bộ
+text, chi phí tăng theo menu / footer / bài liên quan của trang. Segmenter
+tìm tất cả heading đã biết bằng 1 regex duy nhất (1 lần finditer), mỗi section
+kéo dài từ heading của nó đến heading kế tiếp (bất kỳ) hoặc hết text; field
+parser chỉ quét slice của section mình.
+
+Regex quét là alternation phẳng (không named group) của các heading, mỗi
+nhánh bắt đầu bằng ký tự literal: re lọc vị trí theo tập ký tự đầu nên nhanh
+hơn hàng chục lần so với alternation các named group. Tên heading của mỗi hit
+được xác định lại bằng pattern riêng của từng heading (chỉ vài chục hit / trang).
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from .patterns import register
+
+
+@dataclass(frozen=True)
+class Section:
+    """1 section: [start, end) trong text của trang."""
+    name: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class Heading:
+    """
+    Heading của 1 section.
+
+    Attributes:
+        name: Tên section
+        pattern: Regex của heading, không có capture group; mọi nhánh "|" ở
+            top-level phải bắt đầu bằng ký tự literal ("Giờ...|giờ...", không
+            dùng "[Gg]iờ...")
+        bullet: Heading có thể đứng sau gạch đầu dòng ("- Kỵ làm"); section
+            bắt đầu từ dấu "-" và khoảng trắng ngay trước heading
+    """
+    name: str
+    pattern: str
+    bullet: bool = False
+
+
+class Sections:
+    """Kết quả segment 1 trang: section theo tên (lần xuất hiện đầu tiên của heading)."""
+
+    def __init__(self, text: str, spans: dict[str, Section]):
+        self._text = text
+        self.spans = spans
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.spans
+
+    def get(self, name: str) -> Optional[Section]:
+        """Section theo tên, None nếu trang không có heading đó."""
+        return self.spans.get(name)
+
+    def span_text(self, name: str) -> Optional[str]:
+        """Text của section (gồm cả heading), None nếu trang không có heading đó."""
+        span = self.spans.get(name)
+        return self._text[span.start:span.end] if span is not None else None
+
+
+class Segmenter:
+    """Segment text theo 1 danh sách heading cố định."""
+
+    def __init__(self, name: str, headings: list[Heading]):
+        """
+        Args:
+            name: Tên parser, dùng cho tên pattern trong registry ("<name>.sections")
+            headings: Các heading cần tìm
+        """
+        self.headings = headings
+        self.pattern = register(f'{name}.sections', '|'.join(heading.pattern for heading in headings))
+        # Pattern riêng để xác định heading của 1 hit, cùng thứ tự với alternation
+        self._heading_patterns = [(heading, re.compile(heading.pattern)) for heading in headings]
+
+    def _heading_at(self, text: str, pos: int) -> Heading:
+        """Heading khớp tại pos (nhánh đầu tiên khớp, giống alternation)."""
+        for heading, pattern in self._heading_patterns:
+            if pattern.match(text, pos):
+                return heading
+        raise AssertionError(f"No heading matches at {pos}")
+
+    def segment(self, text: str) -> Sections:
+        """
+        Tìm mọi heading trong 1 lần quét và chia text thành section.
+
+        Args:
+            text: Text của trang
+
+        Returns:
+            Sections
+        """
+        starts: list[tuple[str, int]] = []
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            heading = self._heading_at(text, start)
+            if heading.bullet:
+                # Giống lookahead "-?\s*Heading": lùi qua khoảng trắng, rồi 1 dấu "-" nếu có
+                while start > 0 and text[start - 1].isspace():
+                    start -= 1
+                if start > 0 and text[start - 1] == '-':
+                    start -= 1
+            starts.append((heading.name, start))
+
+        spans: dict[str, Section] = {}
+        for i, (name, start) in enumerate(starts):
+            if name in spans:
+                continue
+            end = starts[i + 1][1] if i + 1 < len(starts) else len(text)
+            spans[name] = Section(name=name, start=start, end=max(start, end))
+        return Sections(text, spans)
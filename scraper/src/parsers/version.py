@@ -0,0 +1,48 @@
+"""
+Phiên bản của code parse, để change detection biết khi nào phải parse lại.
+
+Change detection so page hash của trang vừa fetch với page hash đã lưu: trùng
+thì dùng lại DayData đã lưu. Nếu page hash chỉ là hash của HTML thì sửa
+parser không có tác dụng với trang không đổi. PARSER_VERSION là hash của
+source code parsers + models (tự đổi khi sửa parser, không cần nhớ tăng số
+phiên bản) và được trộn vào page hash bằng versioned_hash().
+"""
+import hashlib
+from pathlib import Path
+
+_SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def code_fingerprint(*packages: str) -> str:
+    """
+    Hash của source code các package trong src (theo tên file, bỏ qua __pycache__).
+
+    Args:
+        packages: Tên package, vd: "parsers", "models"
+
+    Returns:
+        16 ký tự hex đầu của sha256
+    """
+    digest = hashlib.sha256()
+    for package in packages:
+        for path in sorted((_SRC_DIR / package).glob("*.py")):
+            digest.update(f"{package}/{path.name}\0".encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+PARSER_VERSION = code_fingerprint("parsers", "models")
+
+
+def versioned_hash(html_hash: str, version: str = PARSER_VERSION) -> str:
+    """
+    Page hash lưu trong storage: hash của HTML kèm phiên bản code đã parse nó.
+
+    Args:
+        html_hash: sha256 của HTML (hoặc của cặp trang)
+        version: Phiên bản code, mặc định PARSER_VERSION
+
+    Returns:
+        sha256 hex
+    """
+    return hashlib.sha256(f"{html_hash}:{version}".encode("ascii")).hexdigest()
@@ -4,10 +4,13 @@ Cung cấp thông tin 28 Sao chi tiết với ngũ hành và con vật.
 """
 import re
 import logging
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from datetime import date
-from bs4 import BeautifulSoup
-
+from .backends import BACKENDS, make_context
+from .batch import DEFAULT_CHUNK_SIZE, BatchParser
+from .context import ParseContext
+from .keywords import KeywordHit, KeywordScanner
+from .patterns import CAN_ALT, CHI_ALT, DIRECTIONS, WHITESPACE, alternation, register
 from ..models.day_data import (
     XemNgayData,
     LunarDate,
@@ -42,6 +45,83 @@ class XemNgayParser:
         'Tinh': False, 'Trương': True, 'Dực': False, 'Chẩn': True,
     }
 
+    # Ngũ hành theo thiên can
+    CAN_NGU_HANH = {
+        'Giáp': 'Mộc', 'Ất': 'Mộc',
+        'Bính': 'Hỏa', 'Đinh': 'Hỏa',
+        'Mậu': 'Thổ', 'Kỷ': 'Thổ',
+        'Canh': 'Kim', 'Tân': 'Kim',
+        'Nhâm': 'Thủy', 'Quý': 'Thủy',
+    }
+
+    # xemngay.com chỉ dùng full text, không cần container nào
+    REQUIRED_CONTAINERS = ()
+
+    # Regex compile 1 lần lúc import (registry: patterns.py)
+    # "Ngày âm lịch: DD/MM/YYYY" hoặc "DD/MM âm lịch"
+    LUNAR_DATE_RES = [
+        register('xemngay.lunar_date.ngay_am_lich', r'[Nn]gày\s+[Ââ]m\s+lịch[:\s]*(\d{1,2})[/-](\d{1,2})[/-]?(\d{4})?'),
+        register('xemngay.lunar_date.suffix', r'(\d{1,2})[/-](\d{1,2})\s*[Ââ]m\s*lịch'),
+        register('xemngay.lunar_date.am_lich', r'[Ââ]m\s+lịch[:\s]*(\d{1,2})[/-](\d{1,2})'),
+    ]
+
+    # "ngày: Mậu Ngọ, tháng: Đinh Hợi, năm: Ất Tỵ" (có thể in đậm **...**)
+    CAN_CHI_RES = {
+        'day': register('xemngay.can_chi.day', rf'[Nn]gày[:\s]*\*?\*?({CAN_ALT})\*?\*?\s*\*?\*?({CHI_ALT})\*?\*?'),
+        'month': register('xemngay.can_chi.month', rf'[Tt]háng[:\s]*\*?\*?({CAN_ALT})\*?\*?\s*\*?\*?({CHI_ALT})\*?\*?'),
+        'year': register('xemngay.can_chi.year', rf'[Nn]ăm[:\s]*\*?\*?({CAN_ALT})\*?\*?\s*\*?\*?({CHI_ALT})\*?\*?'),
+    }
+
+    # "Sao: [Name] (Thuộc hành: [Element], Con vật: [Animal])"
+    STAR28_FULL_RE = register(
+        'xemngay.star28.full',
+        r'[Ss]ao[:\s]*\[?([A-Za-zÀ-ỹ]+)\]?\s*\([Tt]huộc\s*hành[:\s]*\*?\*?([A-Za-zÀ-ỹ]+)\*?\*?\s*,\s*[Cc]on\s*vật[:\s]*\*?\*?([A-Za-zÀ-ỹ\s]+?)\*?\*?\)',
+    )
+    # "Sao Tâm thuộc hành Hoả"
+    STAR28_ELEMENT_RE = register('xemngay.star28.element', r'[Ss]ao\s*\[?([A-Za-zÀ-ỹ]+)\]?\s*thuộc\s*hành\s*([A-Za-zÀ-ỹ]+)')
+    # "Sao: Tâm" or "Sao [Tâm]"
+    STAR28_NAME_RE = register('xemngay.star28.name', r'[Ss]ao[:\s]*\[?([A-Za-zÀ-ỹ]+)\]?')
+
+    # "Trực: [Phá]" or "Trực: Phá"
+    TRUC12_RE = register('xemngay.truc12', r'[Tt]rực[:\s]*\[?(' + alternation(TRUC_12_RATING) + r')\]?')
+
+    # "Hướng tài lộc: [Bắc] | Nhân duyên: [Đông Nam] | Hướng bất lợi: [Đông]"
+    # Hướng quét 1 lần trên text_lower (keywords.py), nhãn kiểm tra ngay trước
+    # từng hit: (các từ của nhãn, tên, rating), nhãn đầu tiên khớp được ưu tiên
+    DIRECTION_SCANNER = KeywordScanner('xemngay.directions.keywords', DIRECTIONS, ignore_case=True)
+    DIRECTION_LABELS = [
+        (('hướng', 'tài', 'lộc'), 'Tài lộc', 5),
+        (('tài', 'lộc'), 'Tài lộc', 5),
+        (('hỷ', 'thần'), 'Hỷ thần', 5),
+        (('nhân', 'duyên'), 'Nhân duyên', 4),
+        (('hướng', 'bất', 'lợi'), 'Bất lợi', 1),
+        (('bất', 'lợi'), 'Bất lợi', 1),
+    ]
+
+    # Việc nên làm / không nên làm, pattern đầu tiên khớp được dùng
+    GOOD_ACTIVITIES_RES = [
+        register('xemngay.activities.good_nen_lam', r'[Nn]ên\s+làm[:\s]*(.+?)(?=[Kk]hông\s+nên|[Kk]iêng|[Tt]ránh|$)', re.DOTALL),
+        register('xemngay.activities.good_co_the', r'[Cc]ó\s+thể[:\s]*(.+?)(?=[Kk]hông\s+nên|[Kk]iêng|[Tt]ránh|$)', re.DOTALL),
+        register('xemngay.activities.good_thich_hop', r'[Tt]hích\s+hợp[:\s]*(.+?)(?=[Kk]hông\s+nên|[Kk]iêng|[Tt]ránh|$)', re.DOTALL),
+    ]
+    BAD_ACTIVITIES_RES = [
+        register('xemngay.activities.bad_khong_nen', r'[Kk]hông\s+nên[:\s]*(.+?)(?=[Nn]ên\s+làm|[Cc]ó\s+thể|$)', re.DOTALL),
+        register('xemngay.activities.bad_kieng', r'[Kk]iêng[:\s]*(.+?)(?=[Nn]ên\s+làm|[Cc]ó\s+thể|$)', re.DOTALL),
+        register('xemngay.activities.bad_tranh', r'[Tt]ránh[:\s]*(.+?)(?=[Nn]ên\s+làm|[Cc]ó\s+thể|$)', re.DOTALL),
+    ]
+    # Ghi chú trong ngoặc (kèm khoảng trắng 2 bên)
+    ACTIVITY_NOTE_RE = register('xemngay.activities.note', r'\s*\([^)]*\)\s*')
+
+    def __init__(self, backend: str = 'auto'):
+        """
+        Args:
+            backend: Backend dựng cây HTML: "auto" (lxml, fallback BeautifulSoup),
+                "lxml" hoặc "bs4" (xem backends.py)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown parser backend: {backend} (expected one of {', '.join(BACKENDS)})")
+        self.backend = backend
+
     def parse(self, html: str, target_date: date) -> Optional[XemNgayData]:
         """
         Parse HTML và trả về XemNgayData.
@@ -54,16 +134,17 @@ class XemNgayParser:
             XemNgayData object hoặc None nếu parse fail
         """
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            # Cây + text dựng 1 lần, dùng chung cho mọi field parser
+            ctx = make_context(html, self.backend, self.REQUIRED_CONTAINERS)
 
             # Parse từng phần
-            lunar_date = self._parse_lunar_date(soup, target_date)
-            can_chi = self._parse_can_chi(soup)
-            star28 = self._parse_star28_detailed(soup)
-            truc12 = self._parse_truc12(soup)
-            directions = self._parse_directions(soup)
-            good_activities = self._parse_activities(soup, 'good')
-            bad_activities = self._parse_activities(soup, 'bad')
+            lunar_date = self._parse_lunar_date(ctx, target_date)
+            can_chi = self._parse_can_chi(ctx)
+            star28 = self._parse_star28_detailed(ctx)
+            truc12 = self._parse_truc12(ctx)
+            directions = self._parse_directions(ctx)
+            good_activities = self._parse_activities(ctx, 'good')
+            bad_activities = self._parse_activities(ctx, 'bad')
 
             return XemNgayData(
                 solar_date=target_date,
@@ -81,22 +162,35 @@ class XemNgayParser:
             logger.error(f"Error parsing xemngay.com for {target_date}: {e}")
             return None
 
-    def _parse_lunar_date(self, soup: BeautifulSoup, target_date: date) -> Optional[LunarDate]:
+    def parse_many(
+        self,
+        pages: Iterable[tuple[date, str]],
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[tuple[date, Optional[XemNgayData]]]:
+        """
+        Parse nhiều trang đã lưu trên process pool (batch.py), kết quả theo thứ tự input.
+
+        Args:
+            pages: Iterable (ngày, html content từ xemngay.com), nên theo thứ tự ngày
+            workers: Số worker process, mặc định = số CPU (<= 1 hoặc ít hơn
+                MIN_POOL_PAGES trang: parse trong process hiện tại)
+            chunk_size: Số trang mỗi chunk gửi sang worker
+
+        Returns:
+            Iterator (ngày, XemNgayData hoặc None nếu parse fail)
+        """
+        return BatchParser(self, workers, chunk_size).parse_many(pages)
+
+    def _parse_lunar_date(self, ctx: ParseContext, target_date: date) -> Optional[LunarDate]:
         """
         Parse ngày âm lịch.
         Pattern: "Ngày âm lịch: 26/10/2025"
         """
-        text = soup.get_text()
+        text = ctx.text
 
-        # Pattern: "Ngày âm lịch: DD/MM/YYYY" hoặc "DD/MM âm lịch"
-        patterns = [
-            r'[Nn]gày\s+[Ââ]m\s+lịch[:\s]*(\d{1,2})[/-](\d{1,2})[/-]?(\d{4})?',
-            r'(\d{1,2})[/-](\d{1,2})\s*[Ââ]m\s*lịch',
-            r'[Ââ]m\s+lịch[:\s]*(\d{1,2})[/-](\d{1,2})',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in self.LUNAR_DATE_RES:
+            match = pattern.search(text)
             if match:
                 lunar_day = int(match.group(1))
                 lunar_month = int(match.group(2))
@@ -115,18 +209,12 @@ class XemNgayParser:
 
         return None
 
-    def _parse_can_chi(self, soup: BeautifulSoup) -> Optional[CanChiInfo]:
+    def _parse_can_chi(self, ctx: ParseContext) -> Optional[CanChiInfo]:
         """
         Parse Can Chi ngày/tháng/năm.
         Pattern: "ngày: Mậu Ngọ, tháng: Đinh Hợi, năm: Ất Tỵ"
         """
-        # Các thiên can và địa chi
-        cans = ['Giáp', 'Ất', 'Bính', 'Đinh', 'Mậu', 'Kỷ', 'Canh', 'Tân', 'Nhâm', 'Quý']
-        chis = ['Tý', 'Sửu', 'Dần', 'Mão', 'Thìn', 'Tỵ', 'Tị', 'Ngọ', 'Mùi', 'Thân', 'Dậu', 'Tuất', 'Hợi']
-        can_pattern = '|'.join(cans)
-        chi_pattern = '|'.join(chis)
-
-        text = soup.get_text()
+        text = ctx.text
 
         def normalize_chi(chi: str) -> str:
             """Normalize chi - Tị -> Tỵ"""
@@ -137,19 +225,19 @@ class XemNgayParser:
         year_can, year_chi = None, None
 
         # Parse ngày - "ngày: Mậu Ngọ" hoặc "Ngày Mậu Ngọ"
-        day_match = re.search(rf'[Nn]gày[:\s]*\*?\*?({can_pattern})\*?\*?\s*\*?\*?({chi_pattern})\*?\*?', text)
+        day_match = self.CAN_CHI_RES['day'].search(text)
         if day_match:
             day_can = day_match.group(1)
             day_chi = normalize_chi(day_match.group(2))
 
         # Parse tháng - "tháng: Đinh Hợi"
-        month_match = re.search(rf'[Tt]háng[:\s]*\*?\*?({can_pattern})\*?\*?\s*\*?\*?({chi_pattern})\*?\*?', text)
+        month_match = self.CAN_CHI_RES['month'].search(text)
         if month_match:
             month_can = month_match.group(1)
             month_chi = normalize_chi(month_match.group(2))
 
         # Parse năm - "năm: Ất Tỵ"
-        year_match = re.search(rf'[Nn]ăm[:\s]*\*?\*?({can_pattern})\*?\*?\s*\*?\*?({chi_pattern})\*?\*?', text)
+        year_match = self.CAN_CHI_RES['year'].search(text)
         if year_match:
             year_can = year_match.group(1)
             year_chi = normalize_chi(year_match.group(2))
@@ -157,33 +245,22 @@ class XemNgayParser:
         if not (day_can and day_chi):
             return None
 
-        # Xác định ngũ hành của ngày
-        can_ngu_hanh = {
-            'Giáp': 'Mộc', 'Ất': 'Mộc',
-            'Bính': 'Hỏa', 'Đinh': 'Hỏa',
-            'Mậu': 'Thổ', 'Kỷ': 'Thổ',
-            'Canh': 'Kim', 'Tân': 'Kim',
-            'Nhâm': 'Thủy', 'Quý': 'Thủy',
-        }
-
         return CanChiInfo(
             year=CanChi(can=year_can or 'Giáp', chi=year_chi or 'Tý'),
             month=CanChi(can=month_can or 'Giáp', chi=month_chi or 'Tý'),
             day=CanChi(can=day_can, chi=day_chi),
-            ngu_hanh=can_ngu_hanh.get(day_can, 'Mộc'),
+            ngu_hanh=self.CAN_NGU_HANH.get(day_can, 'Mộc'),
         )
 
-    def _parse_star28_detailed(self, soup: BeautifulSoup) -> Optional[Star28DetailedInfo]:
+    def _parse_star28_detailed(self, ctx: ParseContext) -> Optional[Star28DetailedInfo]:
         """
         Parse 28 Sao với chi tiết ngũ hành và con vật.
         Pattern: "Sao: Tâm (Thuộc hành: Hoả, Con vật: Hồ)"
         """
-        text = soup.get_text()
+        text = ctx.text
 
         # Primary pattern with element and animal
-        # Pattern: "Sao: [Name] (Thuộc hành: [Element], Con vật: [Animal])"
-        full_pattern = r'[Ss]ao[:\s]*\[?([A-Za-zÀ-ỹ]+)\]?\s*\([Tt]huộc\s*hành[:\s]*\*?\*?([A-Za-zÀ-ỹ]+)\*?\*?\s*,\s*[Cc]on\s*vật[:\s]*\*?\*?([A-Za-zÀ-ỹ\s]+?)\*?\*?\)'
-        match = re.search(full_pattern, text)
+        match = self.STAR28_FULL_RE.search(text)
 
         if match:
             name = match.group(1).strip()
@@ -199,8 +276,7 @@ class XemNgayParser:
 
         # Fallback: simpler patterns
         # Pattern 2: "Sao Tâm thuộc hành Hoả"
-        alt_pattern = r'[Ss]ao\s*\[?([A-Za-zÀ-ỹ]+)\]?\s*thuộc\s*hành\s*([A-Za-zÀ-ỹ]+)'
-        match2 = re.search(alt_pattern, text)
+        match2 = self.STAR28_ELEMENT_RE.search(text)
         if match2:
             name = match2.group(1).strip()
             element = match2.group(2).strip()
@@ -212,8 +288,7 @@ class XemNgayParser:
 
         # Fallback: just star name
         # Pattern 3: "Sao: Tâm" or "Sao [Tâm]"
-        simple_pattern = r'[Ss]ao[:\s]*\[?([A-Za-zÀ-ỹ]+)\]?'
-        match3 = re.search(simple_pattern, text)
+        match3 = self.STAR28_NAME_RE.search(text)
         if match3:
             name = match3.group(1).strip()
             # Filter out non-star words
@@ -225,18 +300,12 @@ class XemNgayParser:
 
         return None
 
-    def _parse_truc12(self, soup: BeautifulSoup) -> Optional[Truc12Info]:
+    def _parse_truc12(self, ctx: ParseContext) -> Optional[Truc12Info]:
         """
         Parse 12 Trực.
         Pattern: "Trực: [Phá]" or "Trực: Phá"
         """
-        text = soup.get_text()
-
-        truc_names = list(self.TRUC_12_RATING.keys())
-        # Pattern: "Trực: [Name]" or "Trực: Name"
-        pattern = r'[Tt]rực[:\s]*\[?(' + '|'.join(truc_names) + r')\]?'
-
-        match = re.search(pattern, text)
+        match = self.TRUC12_RE.search(ctx.text)
         if match:
             name = match.group(1).strip()
             return Truc12Info(
@@ -246,37 +315,56 @@ class XemNgayParser:
 
         return None
 
-    def _parse_directions(self, soup: BeautifulSoup) -> list[DirectionInfo]:
+    @staticmethod
+    def _label_start(text_lower: str, hit: KeywordHit, words: tuple[str, ...]) -> Optional[int]:
+        """
+        Vị trí bắt đầu của nhãn ngay trước hướng, như regex cũ
+        "<từ 1>\\s+<từ 2>[:\\s]*\\[?<hướng>" (IGNORECASE).
+
+        Returns:
+            Vị trí bắt đầu nhãn, None nếu trước hit không phải nhãn này
+        """
+        pos = hit.start
+        if pos > 0 and text_lower[pos - 1] == '[':
+            pos -= 1
+        while pos > 0 and (text_lower[pos - 1] == ':' or text_lower[pos - 1].isspace()):
+            pos -= 1
+        for i, word in enumerate(reversed(words)):
+            if i:
+                # Giữa 2 từ của nhãn: ít nhất 1 khoảng trắng
+                words_start = pos
+                while pos > 0 and text_lower[pos - 1].isspace():
+                    pos -= 1
+                if pos == words_start:
+                    return None
+            if not text_lower.endswith(word, 0, pos):
+                return None
+            pos -= len(word)
+        return pos
+
+    def _parse_directions(self, ctx: ParseContext) -> list[DirectionInfo]:
         """
         Parse hướng xuất hành.
         Pattern: "Hướng tài lộc: [Bắc] | Nhân duyên: [Đông Nam] | Hướng bất lợi: [Đông]"
         """
         directions = []
-        text = soup.get_text()
-
-        # Valid direction names
-        valid_directions = [
-            'Chính Đông', 'Chính Tây', 'Chính Nam', 'Chính Bắc',
-            'Đông Bắc', 'Đông Nam', 'Tây Bắc', 'Tây Nam',
-            'Đông', 'Tây', 'Nam', 'Bắc',
-        ]
-        direction_regex = '|'.join(re.escape(d) for d in valid_directions)
-
-        # Patterns for different direction types from xemngay.com
-        direction_patterns = [
-            (rf'[Hh]ướng\s+tài\s+lộc[:\s]*\[?({direction_regex})\]?', 'Tài lộc', 5),
-            (rf'[Tt]ài\s+lộc[:\s]*\[?({direction_regex})\]?', 'Tài lộc', 5),
-            (rf'[Hh]ỷ\s+thần[:\s]*\[?({direction_regex})\]?', 'Hỷ thần', 5),
-            (rf'[Nn]hân\s+duyên[:\s]*\[?({direction_regex})\]?', 'Nhân duyên', 4),
-            (rf'[Hh]ướng\s+bất\s+lợi[:\s]*\[?({direction_regex})\]?', 'Bất lợi', 1),
-            (rf'[Bb]ất\s+lợi[:\s]*\[?({direction_regex})\]?', 'Bất lợi', 1),
-        ]
+        text_lower = ctx.text_lower
+        # Lấy hướng theo chữ hoa / thường của trang khi lower() giữ nguyên vị trí ký tự
+        text = ctx.text if len(ctx.text) == len(text_lower) else None
+
+        # Nhiều hướng cùng vị trí bắt đầu ("Đông", "Đông Nam"): giữ hướng dài nhất
+        longest: dict[int, KeywordHit] = {}
+        for hit in self.DIRECTION_SCANNER.scan(text_lower):
+            longest[hit.start] = hit
 
         seen_names = set()
-        for pattern, name, rating in direction_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match and name not in seen_names:
-                direction_text = match.group(1).strip()
+        for words, name, rating in self.DIRECTION_LABELS:
+            if name in seen_names:
+                continue
+            # Hit đầu tiên (trong trang) đứng ngay sau nhãn
+            hit = next((hit for hit in longest.values() if self._label_start(text_lower, hit, words) is not None), None)
+            if hit:
+                direction_text = (text[hit.start:hit.end] if text is not None else hit.keyword).strip()
                 if direction_text:
                     directions.append(DirectionInfo(
                         name=name,
@@ -287,42 +375,29 @@ class XemNgayParser:
 
         return directions
 
-    def _parse_activities(self, soup: BeautifulSoup, activity_type: str) -> list[str]:
+    def _parse_activities(self, ctx: ParseContext, activity_type: str) -> list[str]:
         """
         Parse việc nên làm / không nên làm.
         Returns list of activity strings (simplified format for xemngay).
         """
         activities = []
-        text = soup.get_text()
-
-        if activity_type == 'good':
-            # Patterns for good activities
-            patterns = [
-                r'[Nn]ên\s+làm[:\s]*(.+?)(?=[Kk]hông\s+nên|[Kk]iêng|[Tt]ránh|$)',
-                r'[Cc]ó\s+thể[:\s]*(.+?)(?=[Kk]hông\s+nên|[Kk]iêng|[Tt]ránh|$)',
-                r'[Tt]hích\s+hợp[:\s]*(.+?)(?=[Kk]hông\s+nên|[Kk]iêng|[Tt]ránh|$)',
-            ]
-        else:
-            # Patterns for bad activities
-            patterns = [
-                r'[Kk]hông\s+nên[:\s]*(.+?)(?=[Nn]ên\s+làm|[Cc]ó\s+thể|$)',
-                r'[Kk]iêng[:\s]*(.+?)(?=[Nn]ên\s+làm|[Cc]ó\s+thể|$)',
-                r'[Tt]ránh[:\s]*(.+?)(?=[Nn]ên\s+làm|[Cc]ó\s+thể|$)',
-            ]
+        text = ctx.text
+
+        patterns = self.GOOD_ACTIVITIES_RES if activity_type == 'good' else self.BAD_ACTIVITIES_RES
 
         for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL)
+            match = pattern.search(text)
             if match:
                 activities_text = match.group(1).strip()
                 # Clean up and limit length
-                activities_text = re.sub(r'\s+', ' ', activities_text)
+                activities_text = WHITESPACE.sub(' ', activities_text)
                 # Split by comma if multiple activities
                 items = [item.strip() for item in activities_text.split(',')]
                 for item in items:
                     # Filter valid items
                     if item and 2 < len(item) < 200:
                         # Remove parenthetical notes for cleaner data
-                        clean_item = re.sub(r'\s*\([^)]*\)\s*', ' ', item).strip()
+                        clean_item = self.ACTIVITY_NOTE_RE.sub(' ', item).strip()
                         if clean_item:
                             activities.append(clean_item)
                 break  # Use first matching pattern
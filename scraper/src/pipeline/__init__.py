@@ -0,0 +1,16 @@
+# Pipelines
+from .dual_source import DualSourcePipeline, DualSourceResult
+from .refresh import RefreshPolicy, RefreshScheduler
+from .sharded import scrape_range, shard_by_month
+from .staged import StagedPipeline, PipelineStats
+
+__all__ = [
+    'DualSourcePipeline',
+    'DualSourceResult',
+    'RefreshPolicy',
+    'RefreshScheduler',
+    'scrape_range',
+    'shard_by_month',
+    'StagedPipeline',
+    'PipelineStats',
+]
@@ -0,0 +1,357 @@
+"""
+Dual-source pipeline: fetch lichngaytot.com và xemngay.com song song cho mỗi
+ngày, rồi cross-validate và merge từng cặp ngay khi cặp đó về đủ.
+
+Mỗi host có scraper riêng (semaphore + rate limiter riêng), nên host nhanh
+không phải chờ nhịp lịch sự của host chậm; tổng thời gian xấp xỉ thời gian
+của host chậm hơn thay vì tổng của cả hai.
+
+Nếu có storage, hash của cặp trang được so với page_hash đã lưu: cặp trang
+không đổi thì dùng lại DayData đã merge, bỏ qua parse, validate và merge.
+
+Lazy mode (lazy_secondary=True): chỉ fetch lichngaytot.com, kiểm tra nhanh
+DayData (validators.sanity) và chỉ fetch xemngay.com cho ngày đáng ngờ (Can
+Chi lệch chu kỳ, giá trị mặc định của parser, thiếu 28 Sao / 12 Trực...).
+Fetch nguồn phụ chạy trong task của từng ngày, không chặn fetch nguồn chính
+của các ngày khác.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from datetime import date
+from typing import AsyncIterator, Optional, Union
+
+from ..models.day_data import DayData, XemNgayData
+from ..parsers.version import code_fingerprint, versioned_hash
+from ..scrapers.core import NO_DATA_ERROR, DayResult, FetchResult
+from ..scrapers.lichngaytot import AsyncLichNgayTotScraper, AsyncXemNgayScraper
+from ..scrapers.resilience import is_transient
+from ..storage.sqlite_storage import SQLiteStorage
+from ..utils.concurrency import bounded_as_completed
+from ..validators.cross_validator import CrossValidator, CrossValidationResult
+from ..validators.data_merger import DataMerger
+from ..validators.sanity import suspicion_reasons
+
+logger = logging.getLogger(__name__)
+
+# DayData đã merge phụ thuộc cả parser lẫn validate + merge
+MERGE_VERSION = code_fingerprint("parsers", "models", "validators")
+
+
+@dataclass
+class DualSourceResult:
+    """Kết quả pipeline cho 1 ngày."""
+    solar_date: date
+    primary: Optional[DayData] = None
+    secondary: Optional[XemNgayData] = None
+    validation: Optional[CrossValidationResult] = None
+    merged: Optional[DayData] = None
+    page_hash: Optional[str] = None
+    unchanged: bool = False      # Cặp trang giống lần trước, merged lấy từ storage
+    failures: dict[str, DayResult] = field(default_factory=dict)  # host -> lỗi fetch/parse
+    suspicion: list[str] = field(default_factory=list)  # Lazy mode: lý do fetch nguồn phụ
+    secondary_skipped: bool = False  # Lazy mode: nguồn chính qua kiểm tra, không fetch nguồn phụ
+    secondary_fetched: bool = False  # Đã gửi request tới nguồn phụ (failures có lỗi nếu fail)
+
+
+@dataclass
+class SecondaryFetchStats:
+    """Thống kê lazy mode: bao nhiêu ngày cần tới nguồn phụ và vì sao."""
+    checked: int = 0
+    fetched: int = 0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    def record(self, reasons: list[str]) -> None:
+        self.checked += 1
+        if reasons:
+            self.fetched += 1
+        for reason in reasons:
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def snapshot(self) -> dict:
+        return {
+            "checked": self.checked,
+            "fetched": self.fetched,
+            "skipped": self.checked - self.fetched,
+            "reasons": dict(self.reasons),
+        }
+
+
+def pair_page_hash(primary: FetchResult, secondary: Optional[FetchResult]) -> str:
+    """
+    Hash của cặp trang kèm MERGE_VERSION; nguồn phụ fail cho hash khác, để
+    lần sau merge lại.
+    """
+    secondary_hash = secondary.content_hash if secondary is not None else ""
+    pair_hash = hashlib.sha256(f"{primary.content_hash}:{secondary_hash}".encode("ascii")).hexdigest()
+    return versioned_hash(pair_hash, MERGE_VERSION)
+
+
+class DualSourcePipeline:
+    """Fetch 2 nguồn song song, stream cặp kết quả vào CrossValidator và DataMerger."""
+
+    def __init__(
+        self,
+        primary: Optional[AsyncLichNgayTotScraper] = None,
+        secondary: Optional[AsyncXemNgayScraper] = None,
+        validator: Optional[CrossValidator] = None,
+        merger: Optional[DataMerger] = None,
+        storage: Optional[SQLiteStorage] = None,
+        lazy_secondary: bool = False,
+    ):
+        """
+        Khởi tạo pipeline.
+
+        Args:
+            primary: Scraper lichngaytot.com (nguồn chính)
+            secondary: Scraper xemngay.com (nguồn phụ)
+            validator: CrossValidator, mặc định tạo mới
+            merger: DataMerger, mặc định tạo mới
+            storage: Storage chứa DayData đã merge + page hash, để bỏ qua ngày không đổi
+            lazy_secondary: Chỉ fetch nguồn phụ cho ngày mà nguồn chính không qua
+                kiểm tra nhanh (suspicion_reasons)
+        """
+        self.primary = primary or AsyncLichNgayTotScraper()
+        self.secondary = secondary or AsyncXemNgayScraper()
+        self.validator = validator or CrossValidator()
+        self.merger = merger or DataMerger()
+        self.storage = storage
+        self.lazy_secondary = lazy_secondary
+        self.secondary_stats = SecondaryFetchStats()
+
+    @staticmethod
+    async def _fetch(
+        scraper: Union[AsyncLichNgayTotScraper, AsyncXemNgayScraper],
+        target_date: date,
+        failures: Optional[dict[str, DayResult]] = None,
+    ) -> Optional[FetchResult]:
+        """
+        Fetch trang của 1 nguồn, None nếu fail (lỗi tạm thời vào retry queue của
+        scraper, lỗi được ghi vào failures theo host).
+        """
+        url = scraper.build_url(target_date)
+        try:
+            page = await scraper.fetch_page(url, target_date)
+        except Exception as e:
+            logger.error(f"Failed to fetch {target_date} from {scraper.host}: {e}")
+            failure = DayResult.from_exception(target_date, e, url)
+            if failures is not None:
+                failures[scraper.host] = failure
+            if is_transient(e):
+                scraper.retry_queue.add(target_date, failure.error)
+            return None
+        scraper.retry_queue.discard(target_date)
+        return page
+
+    @staticmethod
+    async def _parse(
+        scraper: Union[AsyncLichNgayTotScraper, AsyncXemNgayScraper],
+        page: Optional[FetchResult],
+        target_date: date,
+        failures: Optional[dict[str, DayResult]] = None,
+    ):
+        """Parse trang trong thread riêng, None nếu không có trang hoặc parse fail."""
+        if page is None:
+            return None
+        started = time.monotonic()
+        try:
+            day_data = await asyncio.to_thread(scraper.parse_day, page.html, target_date)
+        except Exception as e:
+            logger.error(f"Failed to parse {target_date} from {scraper.host}: {e}")
+            if failures is not None:
+                failures[scraper.host] = DayResult.from_exception(target_date, e, page.url)
+            return None
+        scraper.request_metrics.record_parse(time.monotonic() - started)
+        if day_data is None and failures is not None:
+            failures[scraper.host] = DayResult(
+                target_date,
+                error="parse returned no data",
+                url=page.url,
+                error_type=NO_DATA_ERROR,
+            )
+        return day_data
+
+    async def _known(self, target_date: date, page_hash: str) -> Optional[DayData]:
+        """DayData đã merge từ đúng cặp trang này, None nếu cần xử lý lại (SQLite trong thread riêng)."""
+        if self.storage is None:
+            return None
+        return await asyncio.to_thread(self.storage.get_day_by_page_hash, target_date, page_hash)
+
+    async def process_day(self, target_date: date) -> DualSourceResult:
+        """
+        Fetch cả 2 nguồn cho 1 ngày cùng lúc rồi parse, validate + merge
+        (lazy mode: nguồn phụ chỉ khi cần, xem _process_day_lazy).
+
+        Args:
+            target_date: Ngày cần xử lý
+
+        Returns:
+            DualSourceResult (merged = None nếu nguồn chính fail; lỗi của từng nguồn trong failures)
+        """
+        if self.lazy_secondary:
+            return await self._process_day_lazy(target_date)
+
+        result = DualSourceResult(solar_date=target_date, secondary_fetched=True)
+        primary_page, secondary_page = await asyncio.gather(
+            self._fetch(self.primary, target_date, result.failures),
+            self._fetch(self.secondary, target_date, result.failures),
+        )
+
+        if primary_page is not None:
+            result.page_hash = pair_page_hash(primary_page, secondary_page)
+            known = await self._known(target_date, result.page_hash)
+            if known is not None:
+                result.merged = known
+                result.unchanged = True
+                return result
+
+        primary, secondary = await asyncio.gather(
+            self._parse(self.primary, primary_page, target_date, result.failures),
+            self._parse(self.secondary, secondary_page, target_date, result.failures),
+        )
+        result.primary = primary
+        result.secondary = secondary
+
+        if primary is None:
+            logger.warning(f"Primary source failed for {target_date}")
+            return result
+
+        if secondary is None:
+            logger.warning(f"Secondary source failed for {target_date}, using primary only")
+
+        result.validation = self.validator.validate(primary, secondary)
+        result.merged = self.merger.merge(primary, secondary)
+        return result
+
+    async def _process_day_lazy(self, target_date: date) -> DualSourceResult:
+        """
+        Lazy mode: fetch + parse nguồn chính, chỉ fetch nguồn phụ nếu DayData
+        đáng ngờ. Ngày không đáng ngờ được merge với nguồn chính, không validate.
+
+        Args:
+            target_date: Ngày cần xử lý
+
+        Returns:
+            DualSourceResult (secondary_skipped = True nếu không fetch nguồn phụ)
+        """
+        result = DualSourceResult(solar_date=target_date)
+        primary_page = await self._fetch(self.primary, target_date, result.failures)
+        if primary_page is None:
+            logger.warning(f"Primary source failed for {target_date}")
+            return result
+
+        # Lần trước ngày này không cần nguồn phụ và trang không đổi
+        result.page_hash = pair_page_hash(primary_page, None)
+        known = await self._known(target_date, result.page_hash)
+        if known is not None:
+            result.merged = known
+            result.unchanged = True
+            result.secondary_skipped = True
+            return result
+
+        primary = await self._parse(self.primary, primary_page, target_date, result.failures)
+        result.primary = primary
+        if primary is None:
+            logger.warning(f"Primary source failed for {target_date}")
+            return result
+
+        result.suspicion = suspicion_reasons(primary)
+        self.secondary_stats.record(result.suspicion)
+        if not result.suspicion:
+            result.secondary_skipped = True
+            result.merged = self.merger.merge(primary, None)
+            return result
+
+        logger.info(f"Fetching secondary source for {target_date}: {', '.join(result.suspicion)}")
+        result.secondary_fetched = True
+        secondary_page = await self._fetch(self.secondary, target_date, result.failures)
+        result.page_hash = pair_page_hash(primary_page, secondary_page)
+        known = await self._known(target_date, result.page_hash)
+        if known is not None:
+            result.merged = known
+            result.unchanged = True
+            return result
+
+        secondary = await self._parse(self.secondary, secondary_page, target_date, result.failures)
+        result.secondary = secondary
+        if secondary is None:
+            logger.warning(f"Secondary source failed for {target_date}, using primary only")
+
+        result.validation = self.validator.validate(primary, secondary)
+        result.merged = self.merger.merge(primary, secondary)
+        return result
+
+    async def stream(
+        self,
+        dates: list[date],
+        max_pending: Optional[int] = None,
+    ) -> AsyncIterator[DualSourceResult]:
+        """
+        Xử lý các ngày (ngày trùng URL chỉ xử lý 1 lần), yield từng kết quả
+        theo thứ tự hoàn thành.
+
+        Như AsyncBaseScraper.iter_dates: chỉ có tối đa max_pending ngày đang
+        xử lý hoặc chờ consumer lấy, ngày mới chỉ được bắt đầu khi consumer
+        lấy kết quả ra (back-pressure, bộ nhớ không tăng theo số ngày).
+
+        Args:
+            dates: Các ngày cần xử lý
+            max_pending: Số ngày tối đa đang chạy/chờ, mặc định 2 * max_concurrency
+                của nguồn chính
+
+        Yields:
+            DualSourceResult
+        """
+        dates = self.primary.coalescer.unique_dates(dates, self.primary.build_url)
+        max_pending = max_pending or 2 * self.primary.max_concurrency
+        # aclosing: consumer dừng sớm thì các task đang chạy bị hủy ngay, không chờ GC
+        async with aclosing(bounded_as_completed(dates, self.process_day, max_pending)) as results:
+            async for result in results:
+                yield result
+
+    async def run(
+        self,
+        dates: list[date],
+        progress_callback: Optional[callable] = None,
+    ) -> tuple[list[DayData], dict]:
+        """
+        Chạy pipeline cho các ngày và tổng hợp kết quả.
+
+        Args:
+            dates: Các ngày cần xử lý
+            progress_callback: Callback function (current, total)
+
+        Returns:
+            (List merged DayData theo thứ tự ngày, validation summary)
+        """
+        dates = self.primary.coalescer.unique_dates(dates, self.primary.build_url)
+        merged = []
+        validations = []
+        done_count = 0
+
+        async for result in self.stream(dates):
+            done_count += 1
+            if result.merged:
+                merged.append(result.merged)
+            if result.validation:
+                validations.append(result.validation)
+            if progress_callback:
+                progress_callback(done_count, len(dates))
+
+        merged.sort(key=lambda d: d.solar_date)
+        logger.info(f"Dual-source pipeline merged {len(merged)}/{len(dates)} days")
+        return merged, self.validator.summarize(validations)
+
+    async def close(self) -> None:
+        """Đóng cả 2 scrapers."""
+        await self.primary.close()
+        await self.secondary.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,266 @@
+"""
+Refresh daemon: giữ cho N tháng sắp tới luôn mới, thay vì scrape lại cả năm.
+
+Mỗi chu kỳ (apscheduler interval job) chọn các ngày "đến hạn" theo khoảng
+cách tới hôm nay và lần refresh gần nhất:
+
+    0-7 ngày tới      -> mỗi 6 giờ
+    8-30 ngày tới     -> mỗi ngày
+    31-90 ngày tới    -> mỗi 3 ngày
+    xa hơn (tới horizon) -> mỗi tuần
+
+Ngày đến hạn được fetch lại (conditional request nếu có HTMLCache); trang có
+page hash trùng bản đã lưu thì không parse, chỉ ngày có content hash thay đổi
+mới được ghi vào SQLite, và năm chỉ được export lại khi hash của cả năm khác
+lần export trước. Chu kỳ có 5 ngày thay đổi chỉ parse + ghi 5 ngày.
+
+Ngày refresh fail không chiếm chỗ của chu kỳ sau: nó được thử lại sau
+failure_backoff, nhân đôi sau mỗi lần fail liên tiếp (tối đa
+max_failure_backoff), và được ghi vào dead letters nếu có DeadLetterStore.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from ..scrapers.base import BaseScraper
+from ..storage.dead_letter import DeadLetterStore
+from ..storage.json_exporter import JSONExporter
+from ..storage.sqlite_storage import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RefreshTier:
+    """Ngày trong vòng within_days tới được refresh mỗi interval."""
+    within_days: int
+    interval: timedelta
+
+
+DEFAULT_TIERS = (
+    RefreshTier(7, timedelta(hours=6)),
+    RefreshTier(30, timedelta(days=1)),
+    RefreshTier(90, timedelta(days=3)),
+    RefreshTier(366, timedelta(days=7)),
+)
+
+
+@dataclass
+class RefreshPolicy:
+    """Chọn ngày cần refresh theo độ gần hôm nay và độ cũ."""
+    horizon_days: int = 180
+    tiers: tuple[RefreshTier, ...] = DEFAULT_TIERS
+    max_per_cycle: int = 50
+    failure_backoff: timedelta = timedelta(minutes=30)
+    max_failure_backoff: timedelta = timedelta(days=1)
+
+    def interval_for(self, target_date: date, today: date) -> Optional[timedelta]:
+        """
+        Khoảng refresh của 1 ngày.
+
+        Returns:
+            Interval, hoặc None nếu ngày nằm ngoài [today, today + horizon]
+        """
+        days_ahead = (target_date - today).days
+        if days_ahead < 0 or days_ahead > self.horizon_days:
+            return None
+        for tier in self.tiers:
+            if days_ahead <= tier.within_days:
+                return tier.interval
+        return self.tiers[-1].interval
+
+    def backoff_for(self, failures: int) -> timedelta:
+        """Thời gian chờ trước khi thử lại ngày đã fail failures lần liên tiếp."""
+        return min(self.failure_backoff * 2 ** max(0, failures - 1), self.max_failure_backoff)
+
+    def due_dates(
+        self,
+        now: datetime,
+        checked_at: dict[date, datetime],
+        failures: Optional[dict[date, tuple[datetime, int]]] = None,
+    ) -> list[date]:
+        """
+        Các ngày đến hạn refresh, ưu tiên ngày chưa refresh lần nào rồi tới
+        ngày quá hạn nhiều nhất (theo tỉ lệ với interval), tối đa max_per_cycle.
+        Ngày đang fail chỉ đến hạn khi hết backoff, và được xếp như ngày quá
+        hạn (theo tỉ lệ với backoff) chứ không như ngày chưa refresh.
+
+        Args:
+            now: Thời điểm hiện tại
+            checked_at: Ngày -> lần refresh gần nhất
+            failures: Ngày -> (lần fail gần nhất, số lần fail liên tiếp)
+
+        Returns:
+            List ngày theo thứ tự ưu tiên
+        """
+        today = now.date()
+        failures = failures or {}
+        due = []
+        for offset in range(self.horizon_days + 1):
+            target_date = today + timedelta(days=offset)
+            failure = failures.get(target_date)
+            if failure is not None:
+                failed_at, count = failure
+                overdue = (now - failed_at) / self.backoff_for(count)
+                if overdue >= 1:
+                    due.append((overdue, target_date))
+                continue
+            interval = self.interval_for(target_date, today)
+            last_checked = checked_at.get(target_date)
+            if last_checked is None:
+                due.append((float("inf"), target_date))
+                continue
+            overdue = (now - last_checked) / interval
+            if overdue >= 1:
+                due.append((overdue, target_date))
+
+        due.sort(key=lambda item: (-item[0], item[1]))
+        return [target_date for _, target_date in due[:self.max_per_cycle]]
+
+
+@dataclass
+class RefreshCycleStats:
+    """Kết quả 1 chu kỳ refresh."""
+    due: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    backing_off: int = 0
+    exported_years: list[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "due": self.due,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "backing_off": self.backing_off,
+            "exported_years": self.exported_years,
+            "elapsed": round(self.elapsed, 2),
+        }
+
+
+class RefreshScheduler:
+    """Daemon refresh các ngày sắp tới theo RefreshPolicy."""
+
+    def __init__(
+        self,
+        scraper: BaseScraper,
+        storage: SQLiteStorage,
+        exporter: Optional[JSONExporter] = None,
+        policy: Optional[RefreshPolicy] = None,
+        dead_letters: Optional[DeadLetterStore] = None,
+    ):
+        """
+        Khởi tạo scheduler.
+
+        Args:
+            scraper: Scraper dùng để refresh (nên có HTMLCache để gửi conditional request);
+                change detection của scraper được bật với storage
+            storage: SQLite storage chứa dữ liệu ngày, page/content hash và refresh state
+            exporter: Exporter cho export incremental, None = không export
+            policy: Chính sách chọn ngày, mặc định RefreshPolicy()
+            dead_letters: Dead-letter store ghi ngày refresh fail (resolve khi thành công)
+        """
+        self.scraper = scraper
+        self.storage = storage
+        self.exporter = exporter
+        self.policy = policy or RefreshPolicy()
+        self.dead_letters = dead_letters
+        self.scraper.enable_change_detection(storage)
+
+    def run_cycle(self, now: Optional[datetime] = None) -> dict:
+        """
+        Chạy 1 chu kỳ: refresh các ngày đến hạn, ghi ngày thay đổi, export năm bị ảnh hưởng.
+
+        Args:
+            now: Thời điểm hiện tại (mặc định datetime.now())
+
+        Returns:
+            Stats snapshot của chu kỳ
+        """
+        now = now or datetime.now()
+        started = datetime.now()
+        today = now.date()
+        horizon_end = today + timedelta(days=self.policy.horizon_days)
+        checked_at = self.storage.get_checked_at(today, horizon_end)
+        failures = self.storage.get_check_failures(today, horizon_end)
+        dates = self.policy.due_dates(now, checked_at, failures)
+        stats = RefreshCycleStats(due=len(dates))
+
+        for target_date in dates:
+            result = self.scraper.scrape_day_result(target_date)
+            if not result.ok:
+                # Không đánh dấu checked: thử lại sau backoff
+                failure_count = self.storage.mark_check_failed(target_date, now)
+                stats.failed += 1
+                if self.dead_letters is not None:
+                    self.dead_letters.add(
+                        self.scraper.host, target_date, result.url, result.error_type, result.error
+                    )
+                logger.warning(
+                    f"Refresh of {target_date} failed {failure_count} times in a row, "
+                    f"retrying in {self.policy.backoff_for(failure_count)}"
+                )
+                continue
+            if self.dead_letters is not None:
+                self.dead_letters.resolve(self.scraper.host, target_date)
+
+            changed = not result.unchanged and self.storage.save_day_if_changed(
+                result.day_data, result.page_hash
+            )
+            self.storage.mark_checked(target_date, changed, now)
+            if changed:
+                stats.changed += 1
+            else:
+                stats.unchanged += 1
+
+        # Ngày đang fail chưa hết backoff
+        stats.backing_off = len(failures.keys() - set(dates))
+
+        if self.exporter:
+            # Năm không đổi (theo hash cả năm) không export lại; năm mà lần
+            # export trước bị lỗi thì được export ở chu kỳ này
+            last_date = today + timedelta(days=self.policy.horizon_days)
+            for year in range(today.year, last_date.year + 1):
+                days = self.storage.get_days_range(date(year, 1, 1), date(year, 12, 31))
+                if days and self.exporter.export_days_list_if_changed(days, year, self.storage):
+                    stats.exported_years.append(year)
+            if stats.exported_years:
+                self.storage.set_metadata("last_export", now.isoformat())
+
+        stats.elapsed = (datetime.now() - started).total_seconds()
+        snapshot = stats.snapshot()
+        logger.info(f"Refresh cycle: {snapshot}")
+        return snapshot
+
+    def start(self, tick: timedelta = timedelta(minutes=15)) -> None:
+        """
+        Chạy daemon (blocking): mỗi tick chạy 1 chu kỳ, chu kỳ đầu chạy ngay.
+
+        Args:
+            tick: Khoảng cách giữa 2 chu kỳ
+        """
+        scheduler = BlockingScheduler()
+        scheduler.add_job(
+            self.run_cycle,
+            "interval",
+            seconds=tick.total_seconds(),
+            id="refresh_cycle",
+            next_run_time=datetime.now(),
+            # Chu kỳ chậm (host chậm / circuit mở) không bị chạy chồng
+            max_instances=1,
+            coalesce=True,
+        )
+        logger.info(
+            f"Refresh daemon started: horizon {self.policy.horizon_days} days, "
+            f"tick {tick}, max {self.policy.max_per_cycle} days/cycle"
+        )
+        try:
+            scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            logger.info("Refresh daemon stopped")
@@ -0,0 +1,274 @@
+"""
+Sharded backfill: chia khoảng ngày thành từng tháng và scrape song song trên
+nhiều process (ProcessPoolExecutor).
+
+Khi network wait đã được overlap, phần tốn CPU là parse HTML (BeautifulSoup +
+lxml + regex). Mỗi worker là 1 process riêng, có session và HTML cache handle
+riêng, nên parse scale theo số core. Ngân sách request của host được chia
+đều cho các worker: tổng rate của cả pool không vượt rate của 1 process.
+
+Kết quả gom về process cha và ghi vào 1 store (JobJournal), đọc ra theo thứ
+tự ngày nên output luôn deterministic bất kể shard nào xong trước. Với
+known_pages_path, mỗi worker mở SQLite store (chỉ đọc page hash) để không
+parse lại trang không đổi; ghi store vẫn chỉ ở process cha (writer).
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from ..models.day_data import DayData
+from ..scrapers.core import DayResult
+from ..scrapers.lichngaytot import LichNgayTotScraper, AsyncLichNgayTotScraper
+from ..scrapers.rate_limiter import (
+    DEFAULT_MAX_RATE,
+    AdaptiveRateLimiter,
+    limiter_kwargs_from_delay_range,
+    set_rate_limiter,
+)
+from ..storage.dead_letter import DeadLetterStore
+from ..storage.html_archive import HTMLArchive
+from ..storage.html_cache import DEFAULT_TTL, HTMLCache
+from ..storage.job_journal import JobJournal
+from ..storage.sqlite_storage import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+
+# State của worker process, khởi tạo 1 lần bởi _init_worker
+_worker_config: dict = {}
+
+
+def shard_by_month(dates: list[date]) -> list[list[date]]:
+    """
+    Chia danh sách ngày thành các shard theo tháng.
+
+    Args:
+        dates: Các ngày cần scrape
+
+    Returns:
+        List các shard (mỗi shard là các ngày của 1 tháng), theo thứ tự ngày
+    """
+    return [
+        list(month_dates)
+        for _, month_dates in groupby(sorted(dates), key=lambda d: (d.year, d.month))
+    ]
+
+
+def slice_rate_budget(
+    delay_range: tuple[float, float],
+    workers: int,
+    max_rate: float = DEFAULT_MAX_RATE,
+) -> dict:
+    """
+    Chia ngân sách request của host cho từng worker.
+
+    Args:
+        delay_range: Khoảng delay (min, max) seconds cho cả host (rate khởi đầu)
+        workers: Số worker process
+        max_rate: Trần rate của cả host
+
+    Returns:
+        Tham số AdaptiveRateLimiter cho 1 worker
+    """
+    budget = limiter_kwargs_from_delay_range(delay_range, max_rate)
+    return {
+        "rate": budget["rate"] / workers,
+        "max_rate": budget["max_rate"] / workers,
+        "min_rate": min(0.05, budget["rate"] / workers),
+    }
+
+
+def _init_worker(
+    limiter_kwargs: dict,
+    concurrency: int,
+    cache_dir: Optional[Path],
+    cache_ttl: Optional[timedelta],
+    replay_path: Optional[Path] = None,
+    known_pages_path: Optional[Path] = None,
+    max_retries: int = 3,
+    retry_backoff: tuple[float, float] = (2.0, 10.0),
+) -> None:
+    """
+    Khởi tạo worker process: limiter riêng (1 phần ngân sách) + cache/archive
+    handle riêng + SQLite store cho change detection.
+    """
+    host = urlparse(LichNgayTotScraper.BASE_URL).netloc
+    set_rate_limiter(host, AdaptiveRateLimiter(**limiter_kwargs))
+
+    _worker_config["concurrency"] = concurrency
+    _worker_config["cache"] = HTMLCache(cache_dir, ttl=cache_ttl) if cache_dir else None
+    _worker_config["replay"] = HTMLArchive(replay_path) if replay_path else None
+    _worker_config["known_pages"] = SQLiteStorage(known_pages_path) if known_pages_path else None
+    _worker_config["retry"] = {"max_retries": max_retries, "retry_backoff": retry_backoff}
+
+
+def _attach(scraper, replay: Optional[HTMLArchive], known_pages: Optional[SQLiteStorage]):
+    """Bật replay và change detection cho scraper của worker."""
+    if replay is not None:
+        scraper.enable_replay(replay)
+    if known_pages is not None:
+        scraper.enable_change_detection(known_pages)
+    return scraper
+
+
+async def _scrape_shard_async(
+    dates: list[date],
+    concurrency: int,
+    cache: Optional[HTMLCache],
+    replay: Optional[HTMLArchive],
+    known_pages: Optional[SQLiteStorage],
+    retry: dict,
+) -> list[DayResult]:
+    async with AsyncLichNgayTotScraper(max_concurrency=concurrency, cache=cache, **retry) as scraper:
+        _attach(scraper, replay, known_pages)
+        results = [result async for result in scraper.iter_dates(dates)]
+        results.extend([result async for result in scraper.iter_retry_queue()])
+        return results
+
+
+def _scrape_shard(dates: list[date]) -> list[DayResult]:
+    """
+    Scrape 1 shard trong worker process.
+
+    Args:
+        dates: Các ngày của shard
+
+    Returns:
+        List DayResult của shard (ngày được retry có thể xuất hiện 2 lần, kết quả sau cùng thắng)
+    """
+    concurrency = _worker_config.get("concurrency", 1)
+    cache = _worker_config.get("cache")
+    replay = _worker_config.get("replay")
+    known_pages = _worker_config.get("known_pages")
+    retry = _worker_config.get("retry", {})
+
+    if concurrency > 1:
+        return asyncio.run(_scrape_shard_async(dates, concurrency, cache, replay, known_pages, retry))
+
+    with LichNgayTotScraper(cache=cache, **retry) as scraper:
+        _attach(scraper, replay, known_pages)
+        results = list(scraper.iter_dates(dates))
+        results.extend(scraper.iter_retry_queue())
+        return results
+
+
+def scrape_range(
+    start_date: date,
+    end_date: date,
+    workers: int = 4,
+    delay_range: tuple[float, float] = (1.0, 2.0),
+    concurrency: int = 1,
+    cache_dir: Optional[Path] = None,
+    cache_ttl: Optional[timedelta] = DEFAULT_TTL,
+    journal: Optional[JobJournal] = None,
+    progress_callback: Optional[callable] = None,
+    replay_path: Optional[Path] = None,
+    dead_letters: Optional[DeadLetterStore] = None,
+    known_pages_path: Optional[Path] = None,
+    writer: Optional[Callable[[DayResult], None]] = None,
+    max_rate: float = DEFAULT_MAX_RATE,
+    max_retries: int = 3,
+    retry_backoff: tuple[float, float] = (2.0, 10.0),
+) -> list[DayData]:
+    """
+    Scrape lichngaytot.com cho khoảng ngày, chia shard theo tháng trên nhiều process.
+
+    Args:
+        start_date: Ngày bắt đầu
+        end_date: Ngày kết thúc
+        workers: Số worker process
+        delay_range: Khoảng delay (min, max) seconds cho cả host, chia đều cho workers
+        concurrency: Số request song song trong mỗi worker (1 = tuần tự)
+        cache_dir: Thư mục HTML cache (mỗi worker mở handle riêng), None = không cache
+        cache_ttl: TTL của cache, None = không hết hạn
+        journal: Job journal; nếu có thì chỉ scrape ngày còn lại và ghi từng shard khi xong
+        progress_callback: Callback function (current, total)
+        replay_path: HTMLArchive để replay offline (mỗi worker mở read-only)
+        dead_letters: Dead-letter store ghi các ngày fail (URL, exception class)
+        known_pages_path: SQLite store cho change detection trong workers (trang có
+            page hash trùng không parse lại), None = parse mọi trang
+        writer: Hàm ghi từng DayResult ở process cha (vd: ghi journal + SQLite +
+            dead letters); nếu có thì thay cho ghi journal / dead_letters ở đây
+        max_rate: Trần rate (requests/second) của cả host, chia đều cho workers
+        max_retries: Số lần retry mỗi request trong workers
+        retry_backoff: Khoảng chờ (min, max) seconds giữa các retry
+
+    Returns:
+        List of DayData theo thứ tự ngày
+    """
+    if journal:
+        dates = journal.remaining_dates()
+    else:
+        total_days = (end_date - start_date).days + 1
+        dates = [start_date + timedelta(days=i) for i in range(total_days)]
+
+    source = urlparse(LichNgayTotScraper.BASE_URL).netloc
+    shards = shard_by_month(dates)
+    workers = max(1, min(workers, len(shards)))
+    results: dict[date, DayData] = {}
+    done_count = 0
+
+    logger.info(
+        f"Scraping {len(dates)} days in {len(shards)} monthly shards "
+        f"across {workers} worker processes"
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            slice_rate_budget(delay_range, workers, max_rate),
+            concurrency,
+            cache_dir,
+            cache_ttl,
+            replay_path,
+            known_pages_path,
+            max_retries,
+            retry_backoff,
+        ),
+    ) as executor:
+        futures = {executor.submit(_scrape_shard, shard): shard for shard in shards}
+
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                shard_results = future.result()
+            except Exception as e:
+                logger.error(f"Shard {shard[0]:%Y-%m} failed: {e}")
+                shard_results = [
+                    DayResult(d, error=f"shard failed: {e}", error_type=type(e).__name__)
+                    for d in shard
+                ]
+
+            for result in shard_results:
+                if result.ok:
+                    results[result.solar_date] = result.day_data
+                if writer is not None:
+                    writer(result)
+                    continue
+                if journal:
+                    if result.ok:
+                        journal.mark_done(result.day_data)
+                    else:
+                        journal.mark_failed(result.solar_date, result.error)
+                if dead_letters is not None:
+                    if result.ok:
+                        dead_letters.resolve(source, result.solar_date)
+                    else:
+                        dead_letters.add(
+                            source, result.solar_date, result.url, result.error_type, result.error
+                        )
+
+            done_count += len(shard)
+            if progress_callback:
+                progress_callback(done_count, len(dates))
+
+    logger.info(f"Scraped {len(results)}/{len(dates)} days successfully")
+    if journal:
+        return journal.get_results()
+    return [results[d] for d in sorted(results)]
@@ -0,0 +1,324 @@
+"""
+Staged pipeline: tách fetch và parse thành các stage chạy song song.
+
+    dates -> [fetchers] -> html_queue -> [parse workers] -> result_queue -> writer
+
+- Fetchers (async, trên event loop) tải HTML và đẩy vào html_queue (bounded)
+- Parse workers gửi HTML sang ProcessPoolExecutor để chạy parser ngoài GIL
+- Writer (consumer của stream()/run()) nhận DayResult theo thứ tự hoàn thành
+
+Queue bounded nên stage chậm tự động làm chậm stage trước nó. Độ sâu queue và
+throughput từng stage được ghi lại trong PipelineStats để chỉnh số fetchers /
+parse workers cho cân.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from datetime import date
+from typing import AsyncIterator, Callable, Optional
+
+from ..scrapers.async_base import AsyncBaseScraper
+from ..scrapers.core import NO_DATA_ERROR, DayResult
+from ..scrapers.resilience import is_transient
+
+logger = logging.getLogger(__name__)
+
+# Sentinel báo hết dữ liệu cho stage sau
+_DONE = object()
+
+# Parser instances của parse worker process, tạo 1 lần theo class
+_parsers: dict[type, object] = {}
+
+
+def _parse_in_worker(parser_cls: type, html: str, target_date: date):
+    """Chạy parser trong worker process (parser được tạo 1 lần mỗi process)."""
+    parser = _parsers.get(parser_cls)
+    if parser is None:
+        parser = parser_cls()
+        _parsers[parser_cls] = parser
+    return parser.parse(html, target_date)
+
+
+@dataclass
+class StageStats:
+    """Thống kê 1 stage."""
+    name: str
+    workers: int = 0
+    processed: int = 0
+    failed: int = 0
+    busy_time: float = 0.0
+
+    def snapshot(self, elapsed: float) -> dict:
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "throughput": round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+            # Tỉ lệ thời gian workers bận: ~1.0 = stage này là nút cổ chai
+            "utilization": (
+                round(self.busy_time / (elapsed * self.workers), 2)
+                if elapsed > 0 and self.workers else 0.0
+            ),
+        }
+
+
+@dataclass
+class QueueStats:
+    """Độ sâu queue, lấy mẫu mỗi lần put."""
+    name: str
+    maxsize: int = 0
+    samples: int = 0
+    depth_sum: int = 0
+    max_depth: int = 0
+
+    def sample(self, depth: int) -> None:
+        self.samples += 1
+        self.depth_sum += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def snapshot(self) -> dict:
+        return {
+            "maxsize": self.maxsize,
+            "avg_depth": round(self.depth_sum / self.samples, 2) if self.samples else 0.0,
+            "max_depth": self.max_depth,
+        }
+
+
+@dataclass
+class PipelineStats:
+    """Thống kê toàn pipeline."""
+    fetch: StageStats = field(default_factory=lambda: StageStats("fetch"))
+    parse: StageStats = field(default_factory=lambda: StageStats("parse"))
+    write: StageStats = field(default_factory=lambda: StageStats("write", workers=1))
+    html_queue: QueueStats = field(default_factory=lambda: QueueStats("html"))
+    result_queue: QueueStats = field(default_factory=lambda: QueueStats("result"))
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def snapshot(self) -> dict:
+        elapsed = self.elapsed
+        return {
+            "elapsed": round(elapsed, 2),
+            "stages": {
+                stage.name: stage.snapshot(elapsed)
+                for stage in (self.fetch, self.parse, self.write)
+            },
+            "queues": {
+                queue.name: queue.snapshot()
+                for queue in (self.html_queue, self.result_queue)
+            },
+        }
+
+
+class StagedPipeline:
+    """Fetch -> parse (process pool) -> write, nối với nhau bằng bounded queues."""
+
+    def __init__(
+        self,
+        scraper: AsyncBaseScraper,
+        fetchers: Optional[int] = None,
+        parse_workers: int = 2,
+        queue_size: int = 32,
+    ):
+        """
+        Khởi tạo pipeline.
+
+        Args:
+            scraper: Async scraper lo phần fetch (cache, rate limit, retry);
+                parser của scraper được chạy trong process pool
+            fetchers: Số fetcher tasks, mặc định = scraper.max_concurrency
+            parse_workers: Số parse worker processes
+            queue_size: Kích thước tối đa của html_queue và result_queue
+        """
+        self.scraper = scraper
+        self.fetchers = fetchers or scraper.max_concurrency
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.stats = PipelineStats()
+
+    async def _fetch_stage(self, dates: asyncio.Queue, html_queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                target_date = dates.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            started = time.monotonic()
+            url = None
+            try:
+                url = self.scraper.build_url(target_date)
+                page = await self.scraper.fetch_page(url, target_date)
+                page_hash = page.page_hash
+                known = await self.scraper.known_day_async(target_date, page_hash)
+                if known is not None:
+                    # Trang không đổi so với bản đã lưu: bỏ qua parse
+                    item = DayResult(target_date, known, page_hash=page_hash, unchanged=True, url=url)
+                else:
+                    item = (target_date, page.html, page_hash, url)
+            except Exception as e:
+                logger.error(f"Failed to fetch {target_date}: {e}")
+                item = DayResult.from_exception(target_date, e, url)
+                if is_transient(e):
+                    self.scraper.retry_queue.add(target_date, item.error)
+                self.stats.fetch.failed += 1
+            self.stats.fetch.busy_time += time.monotonic() - started
+            self.stats.fetch.processed += 1
+
+            await html_queue.put(item)
+            self.stats.html_queue.sample(html_queue.qsize())
+
+    async def _parse_stage(
+        self,
+        executor: ProcessPoolExecutor,
+        html_queue: asyncio.Queue,
+        result_queue: asyncio.Queue,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        parser_cls = type(self.scraper.parser)
+
+        while True:
+            item = await html_queue.get()
+            if item is _DONE:
+                return
+
+            # Fetch fail / trang không đổi -> chuyển thẳng cho writer
+            if isinstance(item, DayResult):
+                await result_queue.put(item)
+                continue
+
+            target_date, html, page_hash, url = item
+            started = time.monotonic()
+            try:
+                day_data = await loop.run_in_executor(
+                    executor, _parse_in_worker, parser_cls, html, target_date
+                )
+                self.scraper.request_metrics.record_parse(time.monotonic() - started)
+                result = (
+                    DayResult(target_date, day_data, page_hash=page_hash, url=url)
+                    if day_data is not None
+                    else DayResult(
+                        target_date,
+                        error="parse returned no data",
+                        page_hash=page_hash,
+                        url=url,
+                        error_type=NO_DATA_ERROR,
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to parse {target_date}: {e}")
+                result = DayResult.from_exception(target_date, e, url)
+            if not result.ok:
+                self.stats.parse.failed += 1
+            self.stats.parse.busy_time += time.monotonic() - started
+            self.stats.parse.processed += 1
+
+            await result_queue.put(result)
+            self.stats.result_queue.sample(result_queue.qsize())
+
+    async def _run_stages(self, dates: list[date], result_queue: asyncio.Queue) -> None:
+        date_queue: asyncio.Queue = asyncio.Queue()
+        for target_date in dates:
+            date_queue.put_nowait(target_date)
+        html_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+        parsers = [
+            asyncio.create_task(self._parse_stage(executor, html_queue, result_queue))
+            for _ in range(self.parse_workers)
+        ]
+        try:
+            await asyncio.gather(*(
+                self._fetch_stage(date_queue, html_queue) for _ in range(self.fetchers)
+            ))
+            for _ in parsers:
+                await html_queue.put(_DONE)
+            await asyncio.gather(*parsers)
+        finally:
+            for task in parsers:
+                task.cancel()
+            # shutdown() chờ worker process thoát: chạy trong thread để không
+            # chặn event loop khi stream bị hủy giữa chừng
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        await result_queue.put(_DONE)
+
+    async def stream(self, dates: list[date]) -> AsyncIterator[DayResult]:
+        """
+        Chạy pipeline, yield DayResult cho writer theo thứ tự hoàn thành.
+        Ngày trùng URL chỉ được fetch 1 lần.
+
+        Args:
+            dates: Các ngày cần scrape
+
+        Yields:
+            DayResult
+        """
+        dates = self.scraper.coalescer.unique_dates(dates, self.scraper.build_url)
+        # aclosing: consumer dừng sớm thì _stream dừng pipeline ngay, không chờ GC
+        async with aclosing(self._stream(dates)) as results:
+            async for result in results:
+                yield result
+
+    async def _stream(self, dates: list[date]) -> AsyncIterator[DayResult]:
+        """stream() cho các ngày đã bỏ trùng URL."""
+        self.stats = PipelineStats(started_at=time.monotonic())
+        self.stats.fetch.workers = self.fetchers
+        self.stats.parse.workers = self.parse_workers
+        self.stats.html_queue.maxsize = self.queue_size
+        self.stats.result_queue.maxsize = self.queue_size
+
+        result_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        stages = asyncio.create_task(self._run_stages(dates, result_queue))
+        try:
+            while True:
+                result = await result_queue.get()
+                if result is _DONE:
+                    break
+                started = time.monotonic()
+                yield result
+                # Thời gian consumer xử lý kết quả = thời gian bận của writer stage
+                self.stats.write.busy_time += time.monotonic() - started
+                self.stats.write.processed += 1
+                if not result.ok:
+                    self.stats.write.failed += 1
+            await stages
+        finally:
+            stages.cancel()
+            self.stats.finished_at = time.monotonic()
+
+    async def run(
+        self,
+        dates: list[date],
+        writer: Callable[[DayResult], None],
+        progress_callback: Optional[callable] = None,
+    ) -> dict:
+        """
+        Chạy pipeline, gọi writer cho từng kết quả.
+
+        Args:
+            dates: Các ngày cần scrape
+            writer: Hàm ghi 1 DayResult (vd: ghi journal / SQLite)
+            progress_callback: Callback function (current, total)
+
+        Returns:
+            Pipeline stats snapshot
+        """
+        dates = self.scraper.coalescer.unique_dates(dates, self.scraper.build_url)
+        done_count = 0
+        async for result in self._stream(dates):
+            writer(result)
+            done_count += 1
+            if progress_callback:
+                progress_callback(done_count, len(dates))
+
+        snapshot = self.stats.snapshot()
+        logger.info(f"Staged pipeline stats: {snapshot}")
+        return snapshot
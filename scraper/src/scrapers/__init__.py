@@ -1,4 +1,17 @@
 from .base import BaseScraper
-from .lichngaytot import LichNgayTotScraper, XemNgayScraper
+from .async_base import AsyncBaseScraper
+from .lichngaytot import (
+    LichNgayTotScraper,
+    XemNgayScraper,
+    AsyncLichNgayTotScraper,
+    AsyncXemNgayScraper,
+)
 
-__all__ = ['BaseScraper', 'LichNgayTotScraper', 'XemNgayScraper']
+__all__ = [
+    'BaseScraper',
+    'AsyncBaseScraper',
+    'LichNgayTotScraper',
+    'XemNgayScraper',
+    'AsyncLichNgayTotScraper',
+    'AsyncXemNgayScraper',
+]
@@ -0,0 +1,476 @@
+"""
+Async base scraper dùng httpx - fetch nhiều ngày song song với giới hạn concurrency.
+
+Phần không phụ thuộc transport nằm trong core.ScraperCore (dùng chung với
+BaseScraper); cache, archive và SQLite là I/O đồng bộ nên được gọi qua
+asyncio.to_thread để không chặn event loop.
+"""
+import asyncio
+import time
+import logging
+from contextlib import aclosing
+from dataclasses import replace
+from datetime import date
+from typing import AsyncIterator, Iterable, Optional
+
+import httpx
+from tenacity import AsyncRetrying
+
+from .core import DayResult, FetchResult, ScraperCore
+from .metrics import HttpxTrace, RequestTiming
+from .rate_limiter import RateLimiter
+from .resilience import CircuitBreaker, RetryBudget
+from ..models.day_data import DayData
+from ..storage.html_cache import HTMLCache
+from ..utils.concurrency import bounded_as_completed
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBaseScraper(ScraperCore):
+    """
+    Base class cho async scrapers.
+
+    Mỗi scraper phục vụ 1 host, nên semaphore của instance chính là giới hạn
+    số request đang chạy (in-flight) tới host đó. Nhịp gửi request do rate
+    limiter của host quyết định (dùng chung với BaseScraper cùng host), nên
+    tăng concurrency không làm vượt ngân sách request của host.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        delay_range: tuple[float, float] = (1.0, 3.0),
+        timeout: int = 30,
+        max_retries: int = 3,
+        max_concurrency: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HTMLCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        retry_backoff: tuple[float, float] = (2.0, 10.0),
+    ):
+        """
+        Khởi tạo async scraper.
+
+        Args:
+            base_url: URL gốc của website
+            delay_range: Khoảng delay giữa các request (min, max) seconds, dùng để
+                khởi tạo rate limiter của host nếu chưa có
+            timeout: Timeout cho mỗi request (seconds)
+            max_retries: Số lần retry tối đa khi request fail (lỗi tạm thời)
+            max_concurrency: Số request tối đa đang chạy cùng lúc tới host
+            rate_limiter: Limiter tùy chỉnh, mặc định dùng limiter chung của host
+            cache: HTML cache, nếu có thì trang còn hiệu lực không cần fetch lại
+            circuit_breaker: Breaker tùy chỉnh, mặc định dùng breaker chung của host
+            retry_budget: Retry budget tùy chỉnh, mặc định dùng budget chung
+            retry_backoff: Khoảng chờ (min, max) seconds của exponential backoff giữa các retry
+        """
+        self._init_core(
+            base_url, delay_range, timeout, max_retries, rate_limiter,
+            cache, circuit_breaker, retry_budget, retry_backoff,
+        )
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            headers=self.DEFAULT_HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+
+    async def _download(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        queue_wait: Optional[float] = None,
+    ) -> httpx.Response:
+        """
+        Tải URL qua network với retry logic.
+
+        Lỗi tạm thời (kết nối, 5xx, 429) được retry tối đa max_retries lần,
+        trong giới hạn retry budget chung; 404 và 4xx khác không retry. Khi
+        circuit breaker của host mở, request fail ngay với CircuitOpenError.
+        Thời gian từng phase (kể cả retry) được ghi vào request_metrics.
+
+        Args:
+            url: URL cần fetch
+            headers: Headers bổ sung (vd: conditional headers)
+            queue_wait: Thời gian đã chờ slot concurrency (seconds)
+
+        Returns:
+            Response đã kiểm tra status (2xx hoặc 304)
+
+        Raises:
+            httpx.HTTPError: Nếu request fail sau khi hết retry
+            CircuitOpenError: Nếu circuit breaker của host đang mở
+        """
+        self.retry_budget.record_request()
+        retrying = AsyncRetrying(**self._retry_kwargs())
+        timing = RequestTiming(queue_wait=queue_wait)
+        started = time.monotonic()
+        try:
+            return await retrying(self._download_once, url, headers, timing)
+        except BaseException:
+            timing.failed = True
+            raise
+        finally:
+            self._finish_timing(timing, retrying.statistics, started)
+
+    async def _download_once(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        timing: Optional[RequestTiming] = None,
+    ) -> httpx.Response:
+        """Gửi 1 request (1 lần thử) qua circuit breaker và rate limiter."""
+        timing = timing or RequestTiming()
+        trace = HttpxTrace()
+        self.circuit_breaker.before_request(self.host)
+        try:
+            timing.sleep += await self.rate_limiter.acquire_async()
+
+            logger.info(f"Fetching: {url}")
+            started = time.monotonic()
+            response = await self.client.get(url, headers=headers, extensions={"trace": trace})
+        except httpx.HTTPError:
+            trace.apply(timing)
+            self._record_response(None, time.monotonic() - started)
+            raise
+        except BaseException:
+            # Bị hủy khi chờ limiter / request, hoặc lỗi không phải HTTP
+            self.circuit_breaker.release_probe(self.host)
+            raise
+        trace.apply(timing)
+
+        self._record_response(
+            response.status_code,
+            time.monotonic() - started,
+            response.headers.get("Retry-After"),
+        )
+        # httpx coi mọi status ngoài 2xx là lỗi, kể cả 304
+        if response.status_code != 304:
+            response.raise_for_status()
+        response.encoding = "utf-8"
+
+        # num_bytes_downloaded = bytes trên dây, trước khi httpx giải nén
+        self.transfer_stats.record(
+            response.num_bytes_downloaded,
+            len(response.content),
+            response.headers.get("Content-Encoding"),
+        )
+        return response
+
+    async def fetch_page(self, url: str, target_date: Optional[date] = None) -> FetchResult:
+        """
+        Fetch 1 trang.
+
+        Replay mode: đọc từ archive, không network, không delay. Ngoài ra fetch
+        bình thường (cache / conditional request / tải mới) và ghi vào archive
+        nếu đang record. Nếu cùng URL đang được fetch (task khác, hoặc scraper
+        khác cùng host) thì chờ và dùng chung kết quả thay vì gửi request mới.
+
+        Args:
+            url: URL cần fetch
+            target_date: Ngày mà trang mô tả
+
+        Returns:
+            FetchResult
+
+        Raises:
+            ArchiveMiss: Replay mode và URL không có trong archive
+        """
+        result, coalesced = await self.coalescer.run_async(
+            url, lambda: self._fetch_page(url, target_date)
+        )
+        return replace(result, coalesced=True) if coalesced else result
+
+    async def _fetch_page(self, url: str, target_date: Optional[date] = None) -> FetchResult:
+        """Fetch 1 trang (replay / live + record), không gộp request."""
+        if self.replay is not None:
+            return await asyncio.to_thread(self._replayed, url)
+
+        result = await self._fetch_live(url, target_date)
+        if self.recorder is not None:
+            await asyncio.to_thread(self._record_page, result, target_date)
+        return result
+
+    async def _fetch_live(self, url: str, target_date: Optional[date] = None) -> FetchResult:
+        """
+        Fetch 1 trang qua network: cache còn hiệu lực -> trả luôn; entry hết hạn ->
+        conditional request với ETag/Last-Modified; không có -> tải bình thường.
+
+        Cache hit trả về ngay, không chiếm slot concurrency. Khi phải tải,
+        request giữ 1 slot trong suốt quá trình (kể cả retry).
+
+        Args:
+            url: URL cần fetch
+            target_date: Ngày mà trang mô tả, lưu kèm trong cache index
+
+        Returns:
+            FetchResult
+        """
+        fresh, stale = None, None
+        if self.cache:
+            fresh, stale = await asyncio.to_thread(self._cache_lookup, url)
+        if fresh:
+            return fresh
+
+        headers = stale.conditional_headers() if stale else None
+        queued_at = time.monotonic()
+        async with self._semaphore:
+            response = await self._download(url, headers, queue_wait=time.monotonic() - queued_at)
+
+            if response.status_code == 304 and stale:
+                revalidated = await asyncio.to_thread(self._revalidated, url, stale)
+                if revalidated:
+                    return revalidated
+                # Body đã mất khỏi cache -> tải lại không điều kiện
+                response = await self._download(url)
+
+        if not self.cache:
+            return FetchResult(url, response.text, response.status_code)
+        return await asyncio.to_thread(
+            self._cache_store,
+            url,
+            response.text,
+            response.status_code,
+            target_date,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+    async def _fetch_url(self, url: str, target_date: Optional[date] = None) -> str:
+        """
+        Fetch HTML content từ URL, ưu tiên cache.
+
+        Args:
+            url: URL cần fetch
+            target_date: Ngày mà trang mô tả
+
+        Returns:
+            HTML content as string
+        """
+        return (await self.fetch_page(url, target_date)).html
+
+    async def fetch_with_delay(self, url: str, target_date: Optional[date] = None) -> str:
+        """
+        Fetch URL, chờ tới lượt theo rate limiter của host (trừ khi trúng cache).
+
+        Args:
+            url: URL cần fetch
+            target_date: Ngày mà trang mô tả
+
+        Returns:
+            HTML content
+        """
+        return await self._fetch_url(url, target_date)
+
+    async def scrape_day_result(self, target_date: date) -> DayResult:
+        """
+        Scrape dữ liệu cho 1 ngày, giữ lại lý do nếu fail.
+
+        Parse chạy trong thread riêng để event loop vẫn xử lý network
+        của các ngày khác trong lúc BeautifulSoup làm việc. Trang giống bản
+        đã lưu (change detection) thì không parse.
+
+        Args:
+            target_date: Ngày cần scrape
+
+        Returns:
+            DayResult
+        """
+        url = None
+        try:
+            url = self.build_url(target_date)
+            page = await self.fetch_page(url, target_date)
+            page_hash = page.page_hash
+            day_data = known = await self.known_day_async(target_date, page_hash)
+            if known is None:
+                parse_started = time.monotonic()
+                day_data = await asyncio.to_thread(self.parse_day, page.html, target_date)
+                self.request_metrics.record_parse(time.monotonic() - parse_started)
+        except Exception as e:
+            return self._failed_day(target_date, e, url)
+
+        return self._day_result(target_date, url, page_hash, day_data, unchanged=known is not None)
+
+    async def known_day_async(self, target_date: date, page_hash: str) -> Optional[DayData]:
+        """known_day với truy vấn SQLite chạy trong thread riêng."""
+        if self.known_pages is None:
+            return None
+        return await asyncio.to_thread(self.known_day, target_date, page_hash)
+
+    async def scrape_day(self, target_date: date) -> Optional[DayData]:
+        """
+        Scrape dữ liệu cho 1 ngày.
+
+        Args:
+            target_date: Ngày cần scrape
+
+        Returns:
+            DayData hoặc None nếu fail
+        """
+        return (await self.scrape_day_result(target_date)).day_data
+
+    async def refresh_day(
+        self,
+        target_date: date,
+        previous: Optional[DayData] = None,
+    ) -> tuple[Optional[DayData], bool]:
+        """
+        Scrape lại 1 ngày đã có dữ liệu, bỏ qua parse nếu server trả 304.
+
+        Args:
+            target_date: Ngày cần refresh
+            previous: DayData đã có của ngày này
+
+        Returns:
+            (DayData hoặc None nếu fail, changed)
+        """
+        try:
+            url = self.build_url(target_date)
+            result = await self.fetch_page(url, target_date)
+            if result.not_modified and previous is not None:
+                return previous, False
+            day_data = await asyncio.to_thread(self.parse_day, result.html, target_date)
+            return day_data, True
+        except Exception as e:
+            logger.error(f"Failed to refresh {target_date}: {e}")
+            return None, False
+
+    async def iter_dates(
+        self,
+        dates: Iterable[date],
+        progress_callback: Optional[callable] = None,
+        max_pending: Optional[int] = None,
+    ) -> AsyncIterator[DayResult]:
+        """
+        Scrape các ngày song song, yield từng kết quả ngay khi parse xong.
+
+        Chỉ có tối đa max_pending ngày đang xử lý hoặc chờ consumer lấy; ngày
+        mới chỉ được bắt đầu khi consumer lấy kết quả ra. Consumer chậm vì vậy
+        làm chậm việc fetch (back-pressure) và bộ nhớ không tăng theo độ dài
+        khoảng ngày. Ngày trùng URL với ngày trước đó trong dates bị bỏ qua.
+
+        Args:
+            dates: Các ngày cần scrape
+            progress_callback: Callback function (current, total), chỉ gọi khi
+                dates có len()
+            max_pending: Số ngày tối đa đang chạy/chờ, mặc định 2 * max_concurrency
+
+        Yields:
+            DayResult theo thứ tự hoàn thành
+        """
+        dates = self.coalescer.unique_dates(dates, self.build_url)
+        total_days = len(dates) if hasattr(dates, "__len__") else None
+        max_pending = max_pending or 2 * self.max_concurrency
+        done_count = 0
+
+        # aclosing: consumer dừng sớm thì các task đang chạy bị hủy ngay, không chờ GC
+        async with aclosing(
+            bounded_as_completed(dates, self.scrape_day_result, max_pending)
+        ) as results:
+            async for result in results:
+                done_count += 1
+                if progress_callback and total_days:
+                    progress_callback(done_count, total_days)
+                yield result
+
+    async def iter_retry_queue(
+        self,
+        progress_callback: Optional[callable] = None,
+        max_pending: Optional[int] = None,
+    ) -> AsyncIterator[DayResult]:
+        """
+        Scrape lại 1 lượt các ngày trong retry queue (fail vì lỗi tạm thời).
+
+        Nếu circuit breaker của host đang mở thì chờ tới lúc half-open trước.
+        Ngày vẫn fail vì lỗi tạm thời được đưa lại vào queue.
+
+        Args:
+            progress_callback: Callback function (current, total)
+            max_pending: Số ngày tối đa đang chạy/chờ consumer
+
+        Yields:
+            DayResult theo thứ tự hoàn thành
+        """
+        dates, wait = self._drain_retry_queue()
+        if not dates:
+            return
+        if wait:
+            await asyncio.sleep(wait)
+        async for result in self.iter_dates(dates, progress_callback, max_pending):
+            yield result
+
+    async def iter_date_range(
+        self,
+        start_date: date,
+        end_date: date,
+        progress_callback: Optional[callable] = None,
+        max_pending: Optional[int] = None,
+    ) -> AsyncIterator[DayResult]:
+        """
+        Async generator version của scrape_date_range.
+
+        Args:
+            start_date: Ngày bắt đầu
+            end_date: Ngày kết thúc
+            progress_callback: Callback function (current, total)
+            max_pending: Số ngày tối đa đang chạy/chờ consumer
+
+        Yields:
+            DayResult theo thứ tự hoàn thành
+        """
+        dates = self._date_range(start_date, end_date)
+        async for result in self.iter_dates(dates, progress_callback, max_pending):
+            yield result
+
+    async def scrape_date_range(
+        self,
+        start_date: date,
+        end_date: date,
+        progress_callback: Optional[callable] = None,
+    ) -> list[DayData]:
+        """
+        Scrape dữ liệu cho khoảng ngày, tối đa max_concurrency request cùng lúc,
+        sau đó retry 1 lượt các ngày fail vì lỗi tạm thời.
+
+        Args:
+            start_date: Ngày bắt đầu
+            end_date: Ngày kết thúc
+            progress_callback: Callback function (current, total)
+
+        Returns:
+            List of DayData, sắp xếp theo ngày
+        """
+        total_days = (end_date - start_date).days + 1
+        results = [
+            result.day_data
+            async for result in self.iter_date_range(
+                start_date, end_date, progress_callback, max_pending=total_days
+            )
+            if result.ok
+        ]
+        results.extend([
+            result.day_data
+            async for result in self.iter_retry_queue(max_pending=total_days)
+            if result.ok
+        ])
+        results.sort(key=lambda d: d.solar_date)
+
+        logger.info(f"Scraped {len(results)}/{total_days} days successfully")
+        return results
+
+    async def close(self) -> None:
+        """Đóng client."""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
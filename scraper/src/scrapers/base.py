@@ -1,34 +1,32 @@
 """
-Base scraper class với retry logic và rate limiting.
+Base scraper class với retry logic và rate limiting (requests, đồng bộ).
+
+Phần không phụ thuộc transport (cache, archive, change detection, DayResult)
+nằm trong core.ScraperCore, dùng chung với AsyncBaseScraper.
 """
 import time
-import random
 import logging
-from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import replace
+from typing import Iterable, Iterator, Optional
 from datetime import date
 
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import Retrying
 
+from .core import NO_DATA_ERROR, DayResult, FetchResult, ScraperCore
+from .metrics import RequestTiming, TimedHTTPAdapter, take_connect_time
+from .rate_limiter import RateLimiter
+from .resilience import CircuitBreaker, RetryBudget
 from ..models.day_data import DayData
+from ..storage.html_cache import HTMLCache
 
 logger = logging.getLogger(__name__)
 
+__all__ = ['NO_DATA_ERROR', 'BaseScraper', 'DayResult', 'FetchResult']
 
-class BaseScraper(ABC):
-    """Base class cho tất cả scrapers."""
 
-    # Default headers giả lập browser
-    # Note: Removed Accept-Encoding to avoid Brotli compression issues
-    # requests library doesn't handle 'br' (Brotli) compression automatically
-    DEFAULT_HEADERS = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7",
-        "Connection": "keep-alive",
-        "Cache-Control": "max-age=0",
-    }
+class BaseScraper(ScraperCore):
+    """Base class cho tất cả scrapers (sync)."""
 
     def __init__(
         self,
@@ -36,92 +34,244 @@ class BaseScraper(ABC):
         delay_range: tuple[float, float] = (1.0, 3.0),
         timeout: int = 30,
         max_retries: int = 3,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HTMLCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        retry_backoff: tuple[float, float] = (2.0, 10.0),
     ):
         """
         Khởi tạo scraper.
 
         Args:
             base_url: URL gốc của website
-            delay_range: Khoảng delay ngẫu nhiên giữa các request (min, max) seconds
+            delay_range: Khoảng delay giữa các request (min, max) seconds, dùng để
+                khởi tạo rate limiter của host nếu chưa có
             timeout: Timeout cho mỗi request (seconds)
-            max_retries: Số lần retry tối đa khi request fail
+            max_retries: Số lần retry tối đa khi request fail (lỗi tạm thời)
+            rate_limiter: Limiter tùy chỉnh, mặc định dùng limiter chung của host
+            cache: HTML cache, nếu có thì trang còn hiệu lực không cần fetch lại
+            circuit_breaker: Breaker tùy chỉnh, mặc định dùng breaker chung của host
+            retry_budget: Retry budget tùy chỉnh, mặc định dùng budget chung
+            retry_backoff: Khoảng chờ (min, max) seconds của exponential backoff giữa các retry
         """
-        self.base_url = base_url.rstrip("/")
-        self.delay_range = delay_range
-        self.timeout = timeout
-        self.max_retries = max_retries
+        self._init_core(
+            base_url, delay_range, timeout, max_retries, rate_limiter,
+            cache, circuit_breaker, retry_budget, retry_backoff,
+        )
         self.session = requests.Session()
         self.session.headers.update(self.DEFAULT_HEADERS)
+        # Đo thời gian connect cho request metrics
+        adapter = TimedHTTPAdapter()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
-    def _random_delay(self) -> None:
-        """Delay ngẫu nhiên để tránh bị block."""
-        delay = random.uniform(*self.delay_range)
-        logger.debug(f"Sleeping for {delay:.2f} seconds...")
-        time.sleep(delay)
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((requests.RequestException, ConnectionError)),
-    )
-    def _fetch_url(self, url: str) -> str:
+    def _download(self, url: str, headers: Optional[dict] = None) -> requests.Response:
         """
-        Fetch HTML content từ URL với retry logic.
+        Tải URL qua network với retry logic.
+
+        Lỗi tạm thời (kết nối, 5xx, 429) được retry tối đa max_retries lần,
+        trong giới hạn retry budget chung; 404 và 4xx khác không retry. Khi
+        circuit breaker của host mở, request fail ngay với CircuitOpenError.
+        Thời gian từng phase (kể cả retry) được ghi vào request_metrics.
 
         Args:
             url: URL cần fetch
+            headers: Headers bổ sung (vd: conditional headers)
 
         Returns:
-            HTML content as string
+            Response đã kiểm tra status (2xx hoặc 304)
 
         Raises:
-            requests.RequestException: Nếu request fail sau max retries
+            requests.RequestException: Nếu request fail sau khi hết retry
+            CircuitOpenError: Nếu circuit breaker của host đang mở
+        """
+        self.retry_budget.record_request()
+        retrying = Retrying(**self._retry_kwargs())
+        timing = RequestTiming()
+        started = time.monotonic()
+        try:
+            return retrying(self._download_once, url, headers, timing)
+        except BaseException:
+            timing.failed = True
+            raise
+        finally:
+            self._finish_timing(timing, retrying.statistics, started)
+
+    def _download_once(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        timing: Optional[RequestTiming] = None,
+    ) -> requests.Response:
+        """
+        Gửi 1 request (1 lần thử).
+
+        Mỗi lần thử đều qua circuit breaker và rate limiter, rồi báo lại
+        status/latency để limiter tự điều chỉnh và breaker đếm lỗi liên tiếp.
+        Body được đọc riêng (stream=True) để tách TTFB và thời gian download.
         """
-        logger.info(f"Fetching: {url}")
-        response = self.session.get(url, timeout=self.timeout)
+        timing = timing or RequestTiming()
+        self.circuit_breaker.before_request(self.host)
+        try:
+            timing.sleep += self.rate_limiter.acquire()
+
+            logger.info(f"Fetching: {url}")
+            take_connect_time()
+            started = time.monotonic()
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            headers_at = time.monotonic()
+            connect = take_connect_time()
+            timing.connect += connect
+            timing.ttfb += max(0.0, headers_at - started - connect)
+            response.content  # stream=True: đọc body ở đây để đo download riêng
+            timing.download += time.monotonic() - headers_at
+        except requests.RequestException:
+            self._record_response(None, time.monotonic() - started)
+            raise
+        except BaseException:
+            # KeyboardInterrupt khi chờ limiter / request, hoặc lỗi không phải HTTP
+            self.circuit_breaker.release_probe(self.host)
+            raise
+
+        self._record_response(
+            response.status_code,
+            time.monotonic() - started,
+            response.headers.get("Retry-After"),
+        )
         response.raise_for_status()
         response.encoding = "utf-8"
-        return response.text
 
-    def fetch_with_delay(self, url: str) -> str:
+        # raw.tell() = số bytes đã đọc từ socket, trước khi urllib3 giải nén
+        self.transfer_stats.record(
+            response.raw.tell() if response.raw else len(response.content),
+            len(response.content),
+            response.headers.get("Content-Encoding"),
+        )
+        return response
+
+    def fetch_page(self, url: str, target_date: Optional[date] = None) -> FetchResult:
         """
-        Fetch URL với random delay.
+        Fetch 1 trang.
+
+        Replay mode: đọc từ archive, không network, không delay. Ngoài ra fetch
+        bình thường (cache / conditional request / tải mới) và ghi vào archive
+        nếu đang record. Nếu cùng URL đang được fetch (thread khác, hoặc scraper
+        khác cùng host) thì chờ và dùng chung kết quả thay vì gửi request mới.
 
         Args:
             url: URL cần fetch
+            target_date: Ngày mà trang mô tả
 
         Returns:
-            HTML content
+            FetchResult
+
+        Raises:
+            ArchiveMiss: Replay mode và URL không có trong archive
         """
-        self._random_delay()
-        return self._fetch_url(url)
+        result, coalesced = self.coalescer.run(url, lambda: self._fetch_page(url, target_date))
+        return replace(result, coalesced=True) if coalesced else result
+
+    def _fetch_page(self, url: str, target_date: Optional[date] = None) -> FetchResult:
+        """Fetch 1 trang (replay / live + record), không gộp request."""
+        if self.replay is not None:
+            return self._replayed(url)
+
+        result = self._fetch_live(url, target_date)
+        self._record_page(result, target_date)
+        return result
 
-    @abstractmethod
-    def build_url(self, target_date: date) -> str:
+    def _fetch_live(self, url: str, target_date: Optional[date] = None) -> FetchResult:
         """
-        Xây dựng URL cho ngày cụ thể.
+        Fetch 1 trang qua network: cache còn hiệu lực -> trả luôn; entry hết hạn ->
+        conditional request với ETag/Last-Modified; không có -> tải bình thường.
 
         Args:
-            target_date: Ngày cần scrape
+            url: URL cần fetch
+            target_date: Ngày mà trang mô tả, lưu kèm trong cache index
 
         Returns:
-            Full URL
+            FetchResult
+
+        Raises:
+            requests.RequestException: Nếu request fail sau max retries
+        """
+        fresh, stale = self._cache_lookup(url)
+        if fresh:
+            return fresh
+
+        headers = stale.conditional_headers() if stale else None
+        response = self._download(url, headers)
+
+        if response.status_code == 304 and stale:
+            revalidated = self._revalidated(url, stale)
+            if revalidated:
+                return revalidated
+            # Body đã mất khỏi cache -> tải lại không điều kiện
+            response = self._download(url)
+
+        return self._cache_store(
+            url,
+            response.text,
+            response.status_code,
+            target_date,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def _fetch_url(self, url: str, target_date: Optional[date] = None) -> str:
         """
-        pass
+        Fetch HTML content từ URL, ưu tiên cache.
 
-    @abstractmethod
-    def parse_day(self, html: str, target_date: date) -> Optional[DayData]:
+        Args:
+            url: URL cần fetch
+            target_date: Ngày mà trang mô tả
+
+        Returns:
+            HTML content as string
+        """
+        return self.fetch_page(url, target_date).html
+
+    def fetch_with_delay(self, url: str, target_date: Optional[date] = None) -> str:
         """
-        Parse HTML và trả về DayData.
+        Fetch URL, chờ tới lượt theo rate limiter của host (trừ khi trúng cache).
 
         Args:
-            html: HTML content
-            target_date: Ngày đang parse
+            url: URL cần fetch
+            target_date: Ngày mà trang mô tả
 
         Returns:
-            DayData object hoặc None nếu parse fail
+            HTML content
         """
-        pass
+        return self._fetch_url(url, target_date)
+
+    def scrape_day_result(self, target_date: date) -> DayResult:
+        """
+        Scrape dữ liệu cho 1 ngày, giữ lại lý do nếu fail.
+
+        Nếu đã bật change detection và trang giống bản đã lưu (cùng page
+        hash) thì dùng lại DayData đã lưu, không parse.
+
+        Args:
+            target_date: Ngày cần scrape
+
+        Returns:
+            DayResult
+        """
+        url = None
+        try:
+            url = self.build_url(target_date)
+            page = self.fetch_page(url, target_date)
+            page_hash = page.page_hash
+            day_data = known = self.known_day(target_date, page_hash)
+            if known is None:
+                parse_started = time.monotonic()
+                day_data = self.parse_day(page.html, target_date)
+                self.request_metrics.record_parse(time.monotonic() - parse_started)
+        except Exception as e:
+            return self._failed_day(target_date, e, url)
+
+        return self._day_result(target_date, url, page_hash, day_data, unchanged=known is not None)
 
     def scrape_day(self, target_date: date) -> Optional[DayData]:
         """
@@ -133,13 +283,106 @@ class BaseScraper(ABC):
         Returns:
             DayData hoặc None nếu fail
         """
+        return self.scrape_day_result(target_date).day_data
+
+    def refresh_day(
+        self,
+        target_date: date,
+        previous: Optional[DayData] = None,
+    ) -> tuple[Optional[DayData], bool]:
+        """
+        Scrape lại 1 ngày đã có dữ liệu.
+
+        Nếu server trả 304 (trang không đổi so với bản cache đã dùng để tạo
+        previous) thì trả về previous luôn, không parse lại.
+
+        Args:
+            target_date: Ngày cần refresh
+            previous: DayData đã có của ngày này
+
+        Returns:
+            (DayData hoặc None nếu fail, changed)
+        """
         try:
             url = self.build_url(target_date)
-            html = self.fetch_with_delay(url)
-            return self.parse_day(html, target_date)
+            result = self.fetch_page(url, target_date)
+            if result.not_modified and previous is not None:
+                return previous, False
+            return self.parse_day(result.html, target_date), True
         except Exception as e:
-            logger.error(f"Failed to scrape {target_date}: {e}")
-            return None
+            logger.error(f"Failed to refresh {target_date}: {e}")
+            return None, False
+
+    def iter_dates(
+        self,
+        dates: Iterable[date],
+        progress_callback: Optional[callable] = None,
+    ) -> Iterator[DayResult]:
+        """
+        Scrape lần lượt các ngày, yield từng kết quả ngay khi parse xong.
+
+        Generator chỉ scrape ngày tiếp theo khi consumer lấy kết quả trước đó,
+        nên consumer chậm (ghi SQLite, validate...) tự động làm chậm việc fetch
+        và bộ nhớ không tăng theo độ dài khoảng ngày.
+        Ngày trùng URL với ngày trước đó trong dates bị bỏ qua.
+
+        Args:
+            dates: Các ngày cần scrape
+            progress_callback: Callback function (current, total), chỉ gọi khi
+                dates có len()
+
+        Yields:
+            DayResult theo thứ tự của dates
+        """
+        dates = self.coalescer.unique_dates(dates, self.build_url)
+        total_days = len(dates) if hasattr(dates, "__len__") else None
+
+        for day_count, current in enumerate(dates, start=1):
+            logger.info(f"Scraping day {day_count}/{total_days or '?'}: {current}")
+
+            yield self.scrape_day_result(current)
+
+            if progress_callback and total_days:
+                progress_callback(day_count, total_days)
+
+    def iter_retry_queue(self, progress_callback: Optional[callable] = None) -> Iterator[DayResult]:
+        """
+        Scrape lại 1 lượt các ngày trong retry queue (fail vì lỗi tạm thời).
+
+        Nếu circuit breaker của host đang mở thì chờ tới lúc half-open trước.
+        Ngày vẫn fail vì lỗi tạm thời được đưa lại vào queue.
+
+        Args:
+            progress_callback: Callback function (current, total)
+
+        Yields:
+            DayResult theo thứ tự ngày
+        """
+        dates, wait = self._drain_retry_queue()
+        if not dates:
+            return
+        if wait:
+            time.sleep(wait)
+        yield from self.iter_dates(dates, progress_callback)
+
+    def iter_date_range(
+        self,
+        start_date: date,
+        end_date: date,
+        progress_callback: Optional[callable] = None,
+    ) -> Iterator[DayResult]:
+        """
+        Generator version của scrape_date_range.
+
+        Args:
+            start_date: Ngày bắt đầu
+            end_date: Ngày kết thúc
+            progress_callback: Callback function (current, total)
+
+        Yields:
+            DayResult theo thứ tự ngày
+        """
+        yield from self.iter_dates(self._date_range(start_date, end_date), progress_callback)
 
     def scrape_date_range(
         self,
@@ -148,7 +391,8 @@ class BaseScraper(ABC):
         progress_callback: Optional[callable] = None,
     ) -> list[DayData]:
         """
-        Scrape dữ liệu cho khoảng ngày.
+        Scrape dữ liệu cho khoảng ngày, sau đó retry 1 lượt các ngày fail vì
+        lỗi tạm thời.
 
         Args:
             start_date: Ngày bắt đầu
@@ -156,27 +400,16 @@ class BaseScraper(ABC):
             progress_callback: Callback function (current, total)
 
         Returns:
-            List of DayData
+            List of DayData, sắp xếp theo ngày
         """
-        from datetime import timedelta
-
-        results = []
-        current = start_date
         total_days = (end_date - start_date).days + 1
-        day_count = 0
-
-        while current <= end_date:
-            day_count += 1
-            logger.info(f"Scraping day {day_count}/{total_days}: {current}")
-
-            day_data = self.scrape_day(current)
-            if day_data:
-                results.append(day_data)
-
-            if progress_callback:
-                progress_callback(day_count, total_days)
-
-            current += timedelta(days=1)
+        results = [
+            result.day_data
+            for result in self.iter_date_range(start_date, end_date, progress_callback)
+            if result.ok
+        ]
+        results.extend(result.day_data for result in self.iter_retry_queue() if result.ok)
+        results.sort(key=lambda d: d.solar_date)
 
         logger.info(f"Scraped {len(results)}/{total_days} days successfully")
         return results
@@ -0,0 +1,196 @@
+"""
+Gộp request trùng cho fetch layer.
+
+- RequestCoalescer.run / run_async: nhiều caller cùng fetch 1 URL trong lúc
+  request đầu tiên còn đang chạy thì chỉ có 1 network call, kết quả (hoặc
+  exception) được chia cho tất cả caller đang chờ
+- RequestCoalescer.unique_dates: bỏ ngày trùng URL trong 1 batch trước khi
+  đưa vào hàng đợi fetch
+
+Coalescer dùng chung theo host trong 1 process, nên các job chạy chồng nhau
+trong cùng process (backfill + refresh, dual-source + single-day...) không
+nhân đôi tải lên host. Giữa các process khác nhau, trang đã tải được chia sẻ
+qua HTMLCache.
+"""
+import asyncio
+import threading
+import logging
+from concurrent.futures import Future
+from datetime import date
+from typing import Awaitable, Callable, Iterable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RequestCoalescer:
+    """Gộp các request trùng key (URL) đang chạy của 1 host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+        self._in_flight_async: dict[str, asyncio.Future] = {}
+
+        # Counters cho monitoring
+        self.requests = 0
+        self.coalesced = 0
+        self.deduplicated = 0
+
+    def run(self, key: str, fetch: Callable[[], T]) -> tuple[T, bool]:
+        """
+        Chạy fetch(), hoặc chờ kết quả của lần fetch cùng key đang chạy ở thread khác.
+
+        Args:
+            key: Key của request (URL)
+            fetch: Hàm thực hiện request
+
+        Returns:
+            (kết quả, coalesced) - coalesced = True nếu dùng lại kết quả của request khác
+
+        Raises:
+            Exception của fetch() (cả với caller đang chờ)
+        """
+        with self._lock:
+            self.requests += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.debug(f"Coalesced in-flight request: {key}")
+            return future.result(), True
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def run_async(self, key: str, fetch: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Async version của run(): chờ task khác trên cùng event loop đang fetch cùng key.
+
+        Nếu task đang fetch bị cancel, các task chờ tự fetch lại thay vì nhận
+        CancelledError.
+
+        Args:
+            key: Key của request (URL)
+            fetch: Coroutine function thực hiện request
+
+        Returns:
+            (kết quả, coalesced)
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.requests += 1
+            future = self._in_flight_async.get(key)
+            leader = future is None or future.get_loop() is not loop
+            if leader:
+                future = loop.create_future()
+                self._in_flight_async[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.debug(f"Coalesced in-flight request: {key}")
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            return await fetch(), False
+
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Không có task nào chờ thì asyncio cũng không log "exception never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                if self._in_flight_async.get(key) is future:
+                    del self._in_flight_async[key]
+
+    def unique_dates(
+        self,
+        dates: Iterable[date],
+        build_url: Callable[[date], str],
+    ) -> Iterable[date]:
+        """
+        Bỏ các ngày có URL trùng với ngày đứng trước trong batch.
+
+        Args:
+            dates: Các ngày cần fetch
+            build_url: Hàm tạo URL của 1 ngày
+
+        Returns:
+            List nếu dates có len() (để progress vẫn biết tổng số), ngược lại
+            là iterator lazy
+        """
+        unique = self._iter_unique(dates, build_url)
+        return list(unique) if hasattr(dates, "__len__") else unique
+
+    def _iter_unique(
+        self,
+        dates: Iterable[date],
+        build_url: Callable[[date], str],
+    ) -> Iterator[date]:
+        seen: set[str] = set()
+        for target_date in dates:
+            url = build_url(target_date)
+            if url in seen:
+                with self._lock:
+                    self.deduplicated += 1
+                logger.debug(f"Skipping duplicate URL in batch: {url}")
+                continue
+            seen.add(url)
+            yield target_date
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "deduplicated": self.deduplicated,
+                "saved": self.coalesced + self.deduplicated,
+            }
+
+
+# Registry coalescer theo host
+_coalescers: dict[str, RequestCoalescer] = {}
+_coalescers_lock = threading.Lock()
+
+
+def get_coalescer(host: str) -> RequestCoalescer:
+    """Lấy coalescer dùng chung cho host, tạo mới nếu chưa có."""
+    with _coalescers_lock:
+        coalescer = _coalescers.get(host)
+        if coalescer is None:
+            coalescer = RequestCoalescer()
+            _coalescers[host] = coalescer
+        return coalescer
+
+
+def coalescer_stats() -> dict[str, dict]:
+    """Snapshot của tất cả coalescers, keyed by host."""
+    with _coalescers_lock:
+        coalescers = dict(_coalescers)
+    return {host: coalescer.snapshot() for host, coalescer in coalescers.items()}
@@ -0,0 +1,330 @@
+"""
+Phần dùng chung của BaseScraper (requests) và AsyncBaseScraper (httpx).
+
+ScraperCore giữ mọi thứ không phụ thuộc transport: cấu hình (rate limiter,
+circuit breaker, retry budget, cache, archive, change detection), tra cache /
+revalidate / ghi cache, replay / record archive, báo kết quả request cho
+limiter + breaker và dựng DayResult. 2 subclass chỉ còn phần I/O: gửi request,
+chờ (time.sleep / asyncio.sleep) và chạy parse (inline / thread).
+"""
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+from urllib.parse import urlparse
+
+from tenacity import stop_after_attempt, wait_exponential
+
+from .coalesce import get_coalescer
+from .metrics import RequestTiming, get_request_metrics
+from .rate_limiter import (
+    RateLimiter,
+    get_rate_limiter,
+    limiter_kwargs_from_delay_range,
+    parse_retry_after,
+)
+from .resilience import (
+    CircuitBreaker,
+    RetryBudget,
+    RetryQueue,
+    get_circuit_breaker,
+    get_retry_budget,
+    is_transient,
+    retry_predicate,
+)
+from .transfer import accept_encoding, get_transfer_stats
+from ..models.day_data import DayData
+from ..parsers.version import versioned_hash
+from ..storage.html_archive import HTMLArchive
+from ..storage.html_cache import CacheEntry, HTMLCache
+from ..storage.sqlite_storage import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+# error_type của ngày fetch được nhưng parser không trả về dữ liệu
+NO_DATA_ERROR = "NoData"
+
+
+@dataclass
+class FetchResult:
+    """Kết quả fetch 1 URL."""
+    url: str
+    html: str
+    status_code: int = 200
+    from_cache: bool = False     # Trả về từ cache, không gửi request
+    not_modified: bool = False   # Server trả 304, dùng lại body đã cache
+    from_archive: bool = False   # Replay từ HTMLArchive
+    coalesced: bool = False      # Dùng chung kết quả của request cùng URL đang chạy
+
+    @property
+    def content_hash(self) -> str:
+        """sha256 của HTML (cùng cách tính với key của HTMLCache)."""
+        return hashlib.sha256(self.html.encode("utf-8")).hexdigest()
+
+    @property
+    def page_hash(self) -> str:
+        """Hash cho change detection: content_hash + PARSER_VERSION (sửa parser thì parse lại)."""
+        return versioned_hash(self.content_hash)
+
+
+@dataclass
+class DayResult:
+    """Kết quả scrape 1 ngày: DayData nếu thành công, error nếu fail."""
+    solar_date: date
+    day_data: Optional[DayData] = None
+    error: Optional[str] = None
+    page_hash: Optional[str] = None
+    unchanged: bool = False      # Trang giống lần trước, day_data lấy từ storage, không parse
+    url: Optional[str] = None
+    error_type: Optional[str] = None   # Exception class của lỗi (cho dead-letter store)
+
+    @property
+    def ok(self) -> bool:
+        return self.day_data is not None
+
+    @classmethod
+    def from_exception(
+        cls,
+        target_date: date,
+        exc: BaseException,
+        url: Optional[str] = None,
+    ) -> "DayResult":
+        """DayResult fail từ exception, giữ lại URL và exception class."""
+        return cls(
+            target_date,
+            error=str(exc) or type(exc).__name__,
+            url=url,
+            error_type=type(exc).__name__,
+        )
+
+
+class ScraperCore(ABC):
+    """Cấu hình và logic không phụ thuộc transport, dùng chung cho sync / async scraper."""
+
+    # Default headers giả lập browser
+    # Accept-Encoding chỉ liệt kê encoding giải nén được: 'br' chỉ có khi đã
+    # cài brotli/brotlicffi (requests không tự giải nén Brotli nếu thiếu decoder)
+    DEFAULT_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Encoding": accept_encoding(),
+        "Accept-Language": "vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Connection": "keep-alive",
+        "Cache-Control": "max-age=0",
+    }
+
+    def _init_core(
+        self,
+        base_url: str,
+        delay_range: tuple[float, float],
+        timeout: int,
+        max_retries: int,
+        rate_limiter: Optional[RateLimiter],
+        cache: Optional[HTMLCache],
+        circuit_breaker: Optional[CircuitBreaker],
+        retry_budget: Optional[RetryBudget],
+        retry_backoff: tuple[float, float],
+    ) -> None:
+        """Khởi tạo phần dùng chung (tham số: xem BaseScraper.__init__)."""
+        self.base_url = base_url.rstrip("/")
+        self.host = urlparse(self.base_url).netloc
+        self.delay_range = delay_range
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            self.host, **limiter_kwargs_from_delay_range(delay_range)
+        )
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(self.host)
+        self.retry_budget = retry_budget or get_retry_budget(max_retries)
+        self.retry_queue = RetryQueue()
+        self.cache = cache
+        self.transfer_stats = get_transfer_stats(self.host)
+        self.coalescer = get_coalescer(self.host)
+        self.request_metrics = get_request_metrics(self.host)
+        self.replay: Optional[HTMLArchive] = None
+        self.recorder: Optional[HTMLArchive] = None
+        self.known_pages: Optional[SQLiteStorage] = None
+
+    # --- Retry / metrics ---
+
+    def _retry_kwargs(self) -> dict:
+        """Tham số cho tenacity Retrying / AsyncRetrying của 1 request."""
+        return {
+            "stop": stop_after_attempt(self.max_retries + 1),
+            "wait": wait_exponential(multiplier=1, min=self.retry_backoff[0], max=self.retry_backoff[1]),
+            "retry": retry_predicate(self.max_retries, self.retry_budget, self.circuit_breaker),
+            "reraise": True,
+        }
+
+    def _finish_timing(self, timing: RequestTiming, statistics: dict, started: float) -> None:
+        """Ghi timing của 1 request (gồm cả retry) vào request_metrics."""
+        timing.retries = max(0, statistics.get("attempt_number", 1) - 1)
+        timing.retry_wait = statistics.get("idle_for", 0.0)
+        timing.total = time.monotonic() - started
+        self.request_metrics.record(timing)
+
+    def _record_response(
+        self,
+        status_code: Optional[int],
+        elapsed: float,
+        retry_after: Optional[str] = None,
+    ) -> None:
+        """Báo kết quả 1 lần thử cho rate limiter và circuit breaker (None = lỗi kết nối)."""
+        self.rate_limiter.record_response(status_code, elapsed, parse_retry_after(retry_after))
+        self.circuit_breaker.record_response(status_code, self.host)
+
+    # --- Replay / record / change detection ---
+
+    def enable_replay(self, archive: HTMLArchive) -> None:
+        """Chuyển sang replay: mọi fetch đọc từ archive thay vì network."""
+        self.replay = archive
+
+    def enable_recording(self, archive: HTMLArchive) -> None:
+        """Ghi mọi trang fetch được (kể cả từ cache) vào archive."""
+        self.recorder = archive
+
+    def enable_change_detection(self, storage: SQLiteStorage) -> None:
+        """Trang có page hash trùng bản đã lưu trong storage thì dùng lại DayData, không parse."""
+        self.known_pages = storage
+
+    def known_day(self, target_date: date, page_hash: str) -> Optional[DayData]:
+        """DayData đã lưu nếu được parse từ đúng trang này, None nếu cần parse."""
+        if self.known_pages is None:
+            return None
+        return self.known_pages.get_day_by_page_hash(target_date, page_hash)
+
+    def _replayed(self, url: str) -> FetchResult:
+        """Trang trong archive replay (ArchiveMiss nếu không có)."""
+        page = self.replay.fetch(url)
+        return FetchResult(url, page.html, page.status_code, from_archive=True)
+
+    def _record_page(self, result: FetchResult, target_date: Optional[date]) -> None:
+        """Ghi trang vừa fetch vào archive nếu đang record."""
+        if self.recorder is not None:
+            self.recorder.put(
+                result.url,
+                result.html,
+                200 if result.not_modified else result.status_code,
+                target_date,
+            )
+
+    # --- HTML cache ---
+
+    def _cache_lookup(self, url: str) -> tuple[Optional[FetchResult], Optional[CacheEntry]]:
+        """
+        Tra cache trước khi tải.
+
+        Returns:
+            (FetchResult nếu cache còn hiệu lực, entry hết hạn để gửi conditional request)
+        """
+        if not self.cache:
+            return None, None
+        entry = self.cache.get(url)
+        if entry:
+            logger.debug(f"Cache hit: {url}")
+            return FetchResult(url, entry.html, entry.status_code, from_cache=True), None
+        return None, self.cache.lookup(url)
+
+    def _revalidated(self, url: str, stale: CacheEntry) -> Optional[FetchResult]:
+        """Server trả 304: dùng lại body đã cache, None nếu body đã mất (cần tải lại)."""
+        entry = self.cache.revalidate(stale)
+        if entry:
+            logger.debug(f"Not modified: {url}")
+            return FetchResult(url, entry.html, 304, not_modified=True)
+        return None
+
+    def _cache_store(
+        self,
+        url: str,
+        html: str,
+        status_code: int,
+        target_date: Optional[date],
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> FetchResult:
+        """Lưu trang vừa tải vào cache (nếu có) và trả về FetchResult."""
+        if self.cache:
+            self.cache.put(url, html, status_code, target_date, etag=etag, last_modified=last_modified)
+        return FetchResult(url, html, status_code)
+
+    # --- Kết quả từng ngày ---
+
+    def _day_result(
+        self,
+        target_date: date,
+        url: str,
+        page_hash: str,
+        day_data: Optional[DayData],
+        unchanged: bool,
+    ) -> DayResult:
+        """DayResult của ngày đã fetch được (parse xong hoặc lấy từ storage)."""
+        self.retry_queue.discard(target_date)
+        if day_data is None:
+            return DayResult(
+                target_date,
+                error="parse returned no data",
+                page_hash=page_hash,
+                url=url,
+                error_type=NO_DATA_ERROR,
+            )
+        return DayResult(target_date, day_data, page_hash=page_hash, unchanged=unchanged, url=url)
+
+    def _failed_day(self, target_date: date, exc: Exception, url: Optional[str]) -> DayResult:
+        """DayResult của ngày fail; lỗi tạm thời được đưa vào retry queue."""
+        logger.error(f"Failed to scrape {target_date}: {exc}")
+        result = DayResult.from_exception(target_date, exc, url)
+        if is_transient(exc):
+            self.retry_queue.add(target_date, result.error)
+        return result
+
+    def _drain_retry_queue(self) -> tuple[list[date], float]:
+        """
+        Lấy hết ngày trong retry queue.
+
+        Returns:
+            (các ngày cần retry, số giây cần chờ circuit breaker half-open)
+        """
+        dates = self.retry_queue.drain()
+        if not dates:
+            return [], 0.0
+        wait = self.circuit_breaker.retry_in()
+        logger.info(
+            f"Retrying {len(dates)} failed days"
+            + (f" after {wait:.1f}s (circuit open)" if wait else "")
+        )
+        return dates, wait
+
+    @staticmethod
+    def _date_range(start_date: date, end_date: date) -> list[date]:
+        return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+    @abstractmethod
+    def build_url(self, target_date: date) -> str:
+        """
+        Xây dựng URL cho ngày cụ thể.
+
+        Args:
+            target_date: Ngày cần scrape
+
+        Returns:
+            Full URL
+        """
+        pass
+
+    @abstractmethod
+    def parse_day(self, html: str, target_date: date) -> Optional[DayData]:
+        """
+        Parse HTML và trả về DayData.
+
+        Args:
+            html: HTML content
+            target_date: Ngày đang parse
+
+        Returns:
+            DayData object hoặc None nếu parse fail
+        """
+        pass
@@ -7,6 +7,10 @@ from datetime import date
 from typing import Optional
 
 from .base import BaseScraper
+from .async_base import AsyncBaseScraper
+from .rate_limiter import RateLimiter
+from .resilience import CircuitBreaker, RetryBudget
+from ..storage.html_cache import HTMLCache
 from ..models.day_data import DayData, XemNgayData
 from ..parsers.lichngaytot_parser import LichNgayTotParser
 from ..parsers.xemngay_parser import XemNgayParser
@@ -24,12 +28,22 @@ class LichNgayTotScraper(BaseScraper):
         delay_range: tuple[float, float] = (1.0, 2.0),
         timeout: int = 30,
         max_retries: int = 3,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HTMLCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        retry_backoff: tuple[float, float] = (2.0, 10.0),
     ):
         super().__init__(
             base_url=self.BASE_URL,
             delay_range=delay_range,
             timeout=timeout,
             max_retries=max_retries,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            circuit_breaker=circuit_breaker,
+            retry_budget=retry_budget,
+            retry_backoff=retry_backoff,
         )
         self.parser = LichNgayTotParser()
 
@@ -57,12 +71,22 @@ class XemNgayScraper(BaseScraper):
         delay_range: tuple[float, float] = (1.5, 2.5),
         timeout: int = 30,
         max_retries: int = 3,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HTMLCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        retry_backoff: tuple[float, float] = (2.0, 10.0),
     ):
         super().__init__(
             base_url=self.BASE_URL,
             delay_range=delay_range,
             timeout=timeout,
             max_retries=max_retries,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            circuit_breaker=circuit_breaker,
+            retry_budget=retry_budget,
+            retry_backoff=retry_backoff,
         )
         self.parser = XemNgayParser()
 
@@ -79,3 +103,73 @@ class XemNgayScraper(BaseScraper):
         Cung cấp thông tin 28 Sao chi tiết với ngũ hành và con vật.
         """
         return self.parser.parse(html, target_date)
+
+
+class AsyncLichNgayTotScraper(AsyncBaseScraper):
+    """Async scraper cho lichngaytot.com - cùng URL và parser với LichNgayTotScraper."""
+
+    BASE_URL = LichNgayTotScraper.BASE_URL
+
+    def __init__(
+        self,
+        delay_range: tuple[float, float] = (1.0, 2.0),
+        timeout: int = 30,
+        max_retries: int = 3,
+        max_concurrency: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HTMLCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        retry_backoff: tuple[float, float] = (2.0, 10.0),
+    ):
+        super().__init__(
+            base_url=self.BASE_URL,
+            delay_range=delay_range,
+            timeout=timeout,
+            max_retries=max_retries,
+            max_concurrency=max_concurrency,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            circuit_breaker=circuit_breaker,
+            retry_budget=retry_budget,
+            retry_backoff=retry_backoff,
+        )
+        self.parser = LichNgayTotParser()
+
+    build_url = LichNgayTotScraper.build_url
+    parse_day = LichNgayTotScraper.parse_day
+
+
+class AsyncXemNgayScraper(AsyncBaseScraper):
+    """Async scraper cho xemngay.com - cùng URL và parser với XemNgayScraper."""
+
+    BASE_URL = XemNgayScraper.BASE_URL
+
+    def __init__(
+        self,
+        delay_range: tuple[float, float] = (1.5, 2.5),
+        timeout: int = 30,
+        max_retries: int = 3,
+        max_concurrency: int = 2,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[HTMLCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        retry_backoff: tuple[float, float] = (2.0, 10.0),
+    ):
+        super().__init__(
+            base_url=self.BASE_URL,
+            delay_range=delay_range,
+            timeout=timeout,
+            max_retries=max_retries,
+            max_concurrency=max_concurrency,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            circuit_breaker=circuit_breaker,
+            retry_budget=retry_budget,
+            retry_backoff=retry_backoff,
+        )
+        self.parser = XemNgayParser()
+
+    build_url = XemNgayScraper.build_url
+    parse_day = XemNgayScraper.parse_day
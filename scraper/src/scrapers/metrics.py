@@ -0,0 +1,271 @@
+"""
+Đo thời gian từng phase của request trong fetch layer, theo host.
+
+Mỗi request (1 lần _download, gồm cả retry) có 1 RequestTiming:
+    sleep       chờ rate limiter (nhịp lịch sự)
+    queue_wait  chờ slot concurrency của host (chỉ async scraper)
+    connect     DNS + TCP + TLS, 0 nếu dùng lại connection keep-alive
+    ttfb        gửi request -> nhận xong response headers (không gồm connect)
+    download    nhận body
+    retry_wait  backoff giữa các lần retry
+    total       toàn bộ request, gồm tất cả các phase trên
+Thời gian parse mỗi trang được ghi riêng (phase "parse").
+
+RequestMetrics gom các phase thành histogram theo host; snapshot dùng cho
+summary cuối scrape_year.py và file JSON để chỉnh concurrency / delay.
+
+requests không có trace hook như httpx, nên connect được đo bằng connection
+class của urllib3 (TimedHTTPAdapter) và TTFB / download bằng stream=True.
+"""
+import json
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("sleep", "queue_wait", "connect", "ttfb", "download", "retry_wait", "parse", "total")
+
+# Cận trên các bucket (ms), thang log
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """Histogram thời gian với bucket cố định (không lưu từng sample)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000
+        index = len(BUCKET_BOUNDS_MS)
+        for i, bound in enumerate(BUCKET_BOUNDS_MS):
+            if ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Percentile (ms) ước lượng bằng nội suy tuyến tính trong bucket chứa
+        rank, giới hạn trong [min, max] đã gặp. None nếu chưa có sample.
+        """
+        if not self.count:
+            return None
+        rank = max(1.0, pct / 100 * self.count)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKET_BOUNDS_MS[i - 1] if i > 0 else 0.0
+                upper = BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max * 1000
+                value = lower + (upper - lower) * (rank - seen) / count
+                return round(min(max(value, self.min * 1000), self.max * 1000), 1)
+            seen += count
+        return round(self.max * 1000, 1)
+
+    def snapshot(self) -> dict:
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max * 1000, 1),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+@dataclass
+class RequestTiming:
+    """Thời gian các phase của 1 request (seconds), cộng dồn qua các lần retry."""
+    sleep: float = 0.0
+    queue_wait: Optional[float] = None
+    connect: float = 0.0
+    ttfb: float = 0.0
+    download: float = 0.0
+    retry_wait: float = 0.0
+    retries: int = 0
+    total: float = 0.0
+    failed: bool = False
+
+
+class RequestMetrics:
+    """Histogram các phase request của 1 host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {phase: Histogram() for phase in PHASES}
+        self.requests = 0
+        self.failed = 0
+        self.retries = 0
+
+    def record(self, timing: RequestTiming) -> None:
+        """Ghi nhận 1 request đã xong (thành công hoặc fail)."""
+        with self._lock:
+            self.requests += 1
+            self.failed += timing.failed
+            self.retries += timing.retries
+            for phase in ("sleep", "connect", "ttfb", "download", "retry_wait", "total"):
+                self.histograms[phase].record(getattr(timing, phase))
+            if timing.queue_wait is not None:
+                self.histograms["queue_wait"].record(timing.queue_wait)
+
+    def record_parse(self, seconds: float) -> None:
+        """Ghi nhận thời gian parse 1 trang."""
+        with self._lock:
+            self.histograms["parse"].record(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "failed": self.failed,
+                "retries": self.retries,
+                "phases": {
+                    phase: histogram.snapshot()
+                    for phase, histogram in self.histograms.items()
+                    if histogram.count
+                },
+            }
+
+
+class HttpxTrace:
+    """
+    Trace extension cho httpx (async client): ghi thời điểm các event của
+    httpcore để tách connect / TTFB / download của 1 lần gửi.
+    """
+
+    def __init__(self):
+        self.events: dict[str, float] = {}
+
+    async def __call__(self, name: str, info: dict) -> None:
+        # "connection.connect_tcp.started" -> "connect_tcp.started"
+        self.events[name.split(".", 1)[1]] = time.monotonic()
+
+    def _span(self, step: str) -> float:
+        started = self.events.get(f"{step}.started")
+        ended = self.events.get(f"{step}.complete") or self.events.get(f"{step}.failed")
+        return ended - started if started is not None and ended is not None else 0.0
+
+    def apply(self, timing: RequestTiming) -> None:
+        """Cộng connect / TTFB / download của lần gửi này vào timing."""
+        timing.connect += self._span("connect_tcp") + self._span("start_tls")
+        sent = self.events.get("send_request_headers.started")
+        headers = self.events.get("receive_response_headers.complete")
+        if sent is not None and headers is not None:
+            timing.ttfb += headers - sent
+        timing.download += self._span("receive_response_body")
+
+
+# Thời gian connect của thread hiện tại (requests / urllib3)
+_connect_time = threading.local()
+
+
+def take_connect_time() -> float:
+    """Lấy (và reset) tổng thời gian connect của thread hiện tại từ lần gọi trước."""
+    seconds = getattr(_connect_time, "seconds", 0.0)
+    _connect_time.seconds = 0.0
+    return seconds
+
+
+def _add_connect_time(seconds: float) -> None:
+    _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.monotonic()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.monotonic() - started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.monotonic()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.monotonic() - started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter đo thời gian mở connection (DNS + TCP + TLS) cho requests."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+# Registry metrics theo host
+_metrics: dict[str, RequestMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def get_request_metrics(host: str) -> RequestMetrics:
+    """Lấy RequestMetrics dùng chung cho host, tạo mới nếu chưa có."""
+    with _metrics_lock:
+        metrics = _metrics.get(host)
+        if metrics is None:
+            metrics = RequestMetrics()
+            _metrics[host] = metrics
+        return metrics
+
+
+def request_metrics() -> dict[str, dict]:
+    """Snapshot request metrics của tất cả hosts, keyed by host."""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    return {host: host_metrics.snapshot() for host, host_metrics in metrics.items()}
+
+
+def write_request_metrics(path: Path, extra: Optional[dict] = None) -> Path:
+    """
+    Ghi request metrics ra file JSON.
+
+    Args:
+        path: File output
+        extra: Thông tin thêm (vd: cấu hình của lần chạy)
+
+    Returns:
+        Path của file đã ghi
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "generated_at": datetime.now().isoformat(),
+        **(extra or {}),
+        "hosts": request_metrics(),
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.info(f"Request metrics written to {path}")
+    return path
@@ -0,0 +1,324 @@
+"""
+Rate limiter cho scrapers - thay thế random delay cố định.
+
+- RandomDelayLimiter: hành vi cũ, sleep random.uniform(*delay_range) trước mỗi request
+- AdaptiveRateLimiter: token bucket có burst + AIMD theo latency, 429/5xx và Retry-After
+
+Limiter được chia sẻ theo host qua get_rate_limiter(), nên mọi scraper (sync lẫn
+async) gọi cùng 1 host dùng chung 1 ngân sách request.
+"""
+import asyncio
+import random
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Trần rate mặc định (requests/second) khi AIMD tăng dần rate của 1 host
+DEFAULT_MAX_RATE = 4.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse header Retry-After (số giây hoặc HTTP-date).
+
+    Args:
+        value: Giá trị header
+
+    Returns:
+        Số giây cần chờ, hoặc None nếu không parse được
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter(ABC):
+    """Base class cho rate limiters."""
+
+    @abstractmethod
+    def _reserve(self) -> float:
+        """Giữ chỗ cho 1 request, trả về số giây phải chờ trước khi gửi."""
+        pass
+
+    def acquire(self) -> float:
+        """
+        Chờ (blocking) tới lượt gửi request.
+
+        Returns:
+            Số giây đã chờ
+        """
+        wait = self._reserve()
+        if wait > 0:
+            logger.debug(f"Rate limiter: sleeping for {wait:.2f} seconds...")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """
+        Chờ (async) tới lượt gửi request.
+
+        Returns:
+            Số giây đã chờ
+        """
+        wait = self._reserve()
+        if wait > 0:
+            logger.debug(f"Rate limiter: sleeping for {wait:.2f} seconds...")
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_response(
+        self,
+        status_code: Optional[int],
+        latency: float,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Ghi nhận kết quả request để limiter tự điều chỉnh.
+
+        Args:
+            status_code: HTTP status, None nếu lỗi kết nối
+            latency: Thời gian request (seconds)
+            retry_after: Giá trị Retry-After đã parse (seconds)
+        """
+        pass
+
+    @abstractmethod
+    def snapshot(self) -> dict:
+        """Trạng thái hiện tại cho monitoring."""
+        pass
+
+
+class RandomDelayLimiter(RateLimiter):
+    """Delay ngẫu nhiên cố định trước mỗi request (hành vi cũ của BaseScraper)."""
+
+    def __init__(self, delay_range: tuple[float, float] = (1.0, 3.0)):
+        """
+        Args:
+            delay_range: Khoảng delay ngẫu nhiên (min, max) seconds
+        """
+        self.delay_range = delay_range
+
+    def _reserve(self) -> float:
+        return random.uniform(*self.delay_range)
+
+    def snapshot(self) -> dict:
+        mean_delay = sum(self.delay_range) / 2
+        return {
+            "type": "random_delay",
+            "rate": 1 / mean_delay if mean_delay > 0 else None,
+            "delay_range": list(self.delay_range),
+            "state": "fixed",
+        }
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket với AIMD (additive increase, multiplicative decrease).
+
+    - Response nhanh và thành công: rate += increase_step (tối đa max_rate)
+    - Response chậm hơn latency_target: rate *= latency_decrease_factor
+    - 429 / 5xx / lỗi kết nối: rate *= decrease_factor, vào trạng thái backoff
+    - Retry-After: chặn mọi request tới host cho tới hết thời gian yêu cầu
+
+    Sau mỗi lần backoff, limiter chờ cooldown giây trước khi tăng rate lại.
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.5,
+        burst: int = 1,
+        min_rate: float = 0.05,
+        max_rate: float = 1.0,
+        increase_step: float = 0.05,
+        decrease_factor: float = 0.5,
+        latency_target: float = 3.0,
+        latency_decrease_factor: float = 0.9,
+        cooldown: float = 30.0,
+    ):
+        """
+        Args:
+            rate: Rate khởi đầu (requests/second)
+            burst: Số token tối đa trong bucket
+            min_rate: Rate tối thiểu khi backoff
+            max_rate: Rate tối đa khi tăng dần
+            increase_step: Lượng cộng thêm vào rate sau mỗi response tốt
+            decrease_factor: Hệ số nhân khi gặp 429/5xx
+            latency_target: Ngưỡng latency (seconds) coi là host đang quá tải
+            latency_decrease_factor: Hệ số nhân khi latency vượt ngưỡng
+            cooldown: Thời gian (seconds) sau backoff trước khi tăng rate lại
+        """
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.burst = max(1, burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.latency_decrease_factor = latency_decrease_factor
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_backoff = 0.0
+
+        # Counters cho monitoring
+        self.requests = 0
+        self.backoffs = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            # Đang bị chặn (Retry-After): bucket bắt đầu lại từ lúc hết chặn, nên
+            # các request xếp hàng vẫn cách nhau 1 / rate sau đó thay vì cùng lúc
+            start = max(now, self._blocked_until)
+            elapsed = start - self._last_refill
+            if elapsed > 0:
+                self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+                self._last_refill = start
+
+            # Token âm = các request đang xếp hàng chờ
+            self._tokens -= 1
+            wait = (start - now) + max(0.0, -self._tokens / self.rate)
+
+            self.requests += 1
+            self.total_wait += wait
+            return wait
+
+    def record_response(
+        self,
+        status_code: Optional[int],
+        latency: float,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            now = time.monotonic()
+
+            if status_code is None or status_code == 429 or status_code >= 500:
+                old_rate = self.rate
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._tokens = min(self._tokens, 0.0)
+                self._last_backoff = now
+                self.backoffs += 1
+                if status_code == 429:
+                    self.throttled += 1
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+                logger.warning(
+                    f"Rate limiter backoff (status={status_code}): "
+                    f"{old_rate:.2f} -> {self.rate:.2f} req/s"
+                    + (f", Retry-After {retry_after:.0f}s" if retry_after else "")
+                )
+            elif latency > self.latency_target:
+                self.rate = max(self.min_rate, self.rate * self.latency_decrease_factor)
+            elif now - self._last_backoff >= self.cooldown:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    @property
+    def state(self) -> str:
+        """'blocked' (Retry-After), 'backoff' (trong cooldown) hoặc 'steady'."""
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return "blocked"
+        if self.backoffs and now - self._last_backoff < self.cooldown:
+            return "backoff"
+        return "steady"
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "type": "adaptive",
+                "rate": round(self.rate, 4),
+                "min_rate": self.min_rate,
+                "max_rate": self.max_rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 2),
+                "state": self.state,
+                "blocked_for": round(max(0.0, self._blocked_until - now), 2),
+                "requests": self.requests,
+                "backoffs": self.backoffs,
+                "throttled": self.throttled,
+                "total_wait": round(self.total_wait, 2),
+            }
+
+
+# Registry limiter theo host
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str, **kwargs) -> RateLimiter:
+    """
+    Lấy limiter dùng chung cho host, tạo AdaptiveRateLimiter nếu chưa có.
+
+    kwargs chỉ được dùng ở lần tạo đầu tiên; các scraper sau dùng lại
+    limiter đã có để chia sẻ cùng ngân sách request.
+
+    Args:
+        host: Hostname (vd: lichngaytot.com)
+        **kwargs: Tham số cho AdaptiveRateLimiter
+
+    Returns:
+        RateLimiter của host
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(**kwargs)
+            _limiters[host] = limiter
+        return limiter
+
+
+def set_rate_limiter(host: str, limiter: RateLimiter) -> None:
+    """Đăng ký limiter tùy chỉnh cho host."""
+    with _limiters_lock:
+        _limiters[host] = limiter
+
+
+def rate_limiter_stats() -> dict[str, dict]:
+    """Snapshot của tất cả limiters, keyed by host."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {host: limiter.snapshot() for host, limiter in limiters.items()}
+
+
+def limiter_kwargs_from_delay_range(
+    delay_range: tuple[float, float],
+    max_rate: float = DEFAULT_MAX_RATE,
+) -> dict:
+    """
+    Chuyển delay_range cũ thành tham số AdaptiveRateLimiter.
+
+    delay_range chỉ quyết định rate khởi đầu (1 / delay trung bình); trần
+    max_rate là cấu hình riêng để AIMD dò lên tới rate host chịu được.
+
+    Args:
+        delay_range: Khoảng delay (min, max) seconds
+        max_rate: Trần rate (requests/second), không thấp hơn rate khởi đầu
+
+    Returns:
+        Tham số rate, max_rate cho AdaptiveRateLimiter
+    """
+    min_delay, max_delay = delay_range
+    mean_delay = (min_delay + max_delay) / 2
+    rate = 1 / mean_delay if mean_delay > 0 else max_rate
+    return {"rate": rate, "max_rate": max(max_rate, rate)}
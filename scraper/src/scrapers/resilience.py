@@ -0,0 +1,371 @@
+"""
+Resilience cho fetch layer: circuit breaker theo host, retry budget và retry queue.
+
+- CircuitBreaker: mở sau N lỗi liên tiếp tới 1 host; trong lúc mở mọi request
+  fail ngay (CircuitOpenError) thay vì chờ timeout + retry; hết reset_timeout
+  thì cho 1 request thăm dò (half-open), thành công thì đóng lại
+- RetryBudget: giới hạn tổng số retry theo tỉ lệ số request (dùng chung toàn
+  process), nên khi host sập retry không nhân số request lên max_retries lần
+- RetryQueue: các ngày fail vì lỗi tạm thời, để scrape lại sau lượt chính
+
+Khi host sập, vài request đầu mở breaker, phần còn lại của khoảng ngày fail
+ngay và vào retry queue; lượt retry chờ breaker half-open rồi thử lại 1 lần.
+"""
+import threading
+import time
+import logging
+from datetime import date
+from typing import Optional
+
+import httpx
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 4xx vẫn đáng retry: timeout phía server và bị throttle
+RETRYABLE_CLIENT_STATUSES = {408, 429}
+
+# Retry budget: trung bình mỗi request gốc được 10% số retry tối đa của nó
+# (max_retries=3 -> 0.3 retry / request)
+RETRY_BUDGET_FRACTION = 0.1
+
+
+class CircuitOpenError(Exception):
+    """Request bị chặn vì circuit breaker của host đang mở."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def response_status(exc: BaseException) -> Optional[int]:
+    """HTTP status của exception (requests / httpx), None nếu lỗi kết nối."""
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Lỗi tạm thời, thử lại sau có thể thành công.
+
+    Lỗi kết nối / timeout, 5xx, 408, 429 và circuit đang mở là tạm thời;
+    404 và các 4xx khác thì retry cũng không đổi kết quả.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return True
+    if not isinstance(exc, (requests.RequestException, httpx.HTTPError, ConnectionError)):
+        return False
+    status = response_status(exc)
+    return status is None or status >= 500 or status in RETRYABLE_CLIENT_STATUSES
+
+
+class CircuitBreaker:
+    """Circuit breaker của 1 host: closed -> open -> half-open -> closed."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Số lỗi liên tiếp để mở breaker
+            reset_timeout: Thời gian (seconds) mở trước khi cho request thăm dò
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        # Counters cho monitoring
+        self.opened = 0
+        self.rejected = 0
+
+    def retry_in(self) -> float:
+        """Số giây còn lại trước khi breaker cho request thăm dò (0 = gửi được)."""
+        with self._lock:
+            if self._state != "open":
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_request(self, host: str = "") -> None:
+        """
+        Gọi trước mỗi request.
+
+        Raises:
+            CircuitOpenError: Breaker đang mở, hoặc half-open và đã có request thăm dò
+        """
+        with self._lock:
+            if self._state == "closed":
+                return
+
+            now = time.monotonic()
+            if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+                self._state = "half_open"
+                self._probe_in_flight = False
+                logger.info(f"Circuit half-open for {host}, sending probe")
+
+            if self._state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+
+            self.rejected += 1
+            retry_in = max(0.0, self._opened_at + self.reset_timeout - now)
+        raise CircuitOpenError(host, retry_in)
+
+    def release_probe(self, host: str = "") -> None:
+        """
+        Gọi khi request đã qua before_request nhưng không có kết quả (bị hủy,
+        lỗi không phải HTTP): trả lại lượt thăm dò để request sau được thử.
+
+        Args:
+            host: Host (chỉ dùng cho log)
+        """
+        with self._lock:
+            if self._state == "half_open" and self._probe_in_flight:
+                self._probe_in_flight = False
+                logger.info(f"Circuit probe for {host} abandoned, next request will probe")
+
+    def record_response(self, status_code: Optional[int], host: str = "") -> None:
+        """
+        Ghi nhận kết quả 1 request.
+
+        Args:
+            status_code: HTTP status, None nếu lỗi kết nối / timeout
+            host: Host (chỉ dùng cho log)
+        """
+        failed = (
+            status_code is None
+            or status_code >= 500
+            or status_code in RETRYABLE_CLIENT_STATUSES
+        )
+        with self._lock:
+            if not failed:
+                if self._state != "closed":
+                    logger.info(f"Circuit closed for {host}")
+                self._state = "closed"
+                self._failures = 0
+                self._probe_in_flight = False
+                return
+
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.opened += 1
+                    logger.warning(
+                        f"Circuit open for {host} after {self._failures} consecutive failures, "
+                        f"failing fast for {self.reset_timeout:.0f}s"
+                    )
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' hoặc 'half_open'."""
+        with self._lock:
+            return self._state
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+def budget_ratio(max_retries: int) -> float:
+    """Ratio của retry budget cho scraper retry tối đa max_retries lần mỗi request."""
+    return RETRY_BUDGET_FRACTION * max(0, max_retries)
+
+
+class RetryBudget:
+    """
+    Ngân sách retry dùng chung: retries <= min_retries + ratio * requests.
+
+    max_retries của scraper vẫn giới hạn số lần thử của từng request; budget
+    giới hạn tổng retry của cả process, nên lỗi hàng loạt không làm số request
+    tăng gấp max_retries lần. Mặc định ratio suy ra từ max_retries
+    (budget_ratio) và được nới theo scraper có max_retries lớn nhất (size_for).
+    """
+
+    def __init__(self, ratio: Optional[float] = None, min_retries: int = 10, max_retries: int = 0):
+        """
+        Args:
+            ratio: Số retry được phép trên mỗi request gốc; None = budget_ratio(max_retries)
+                và tự nới theo size_for()
+            min_retries: Số retry luôn được phép (cho lúc mới chạy, ít request)
+            max_retries: max_retries của scraper dùng budget
+        """
+        self.ratio = ratio if ratio is not None else budget_ratio(max_retries)
+        self.min_retries = min_retries
+        self._sized = ratio is None
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def size_for(self, max_retries: int) -> None:
+        """Nới ratio cho scraper retry tối đa max_retries lần (ratio cố định thì giữ nguyên)."""
+        with self._lock:
+            if self._sized:
+                self.ratio = max(self.ratio, budget_ratio(max_retries))
+
+    def record_request(self) -> None:
+        """Ghi nhận 1 request gốc (không tính retry)."""
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """
+        Xin 1 lượt retry.
+
+        Returns:
+            True nếu còn budget (đã trừ), False nếu hết
+        """
+        with self._lock:
+            if self.retries < self.min_retries + self.ratio * self.requests:
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "exhausted": self.exhausted,
+                "ratio": self.ratio,
+            }
+
+
+def retry_predicate(
+    max_retries: int,
+    budget: RetryBudget,
+    breaker: Optional[CircuitBreaker] = None,
+):
+    """
+    Điều kiện retry cho tenacity: lỗi tạm thời, chưa quá max_retries lần
+    retry và còn retry budget. Không retry khi circuit đang mở - ngày đó
+    vào retry queue thay vì giữ request chờ backoff.
+
+    Args:
+        max_retries: Số lần retry tối đa của 1 request
+        budget: Retry budget dùng chung
+        breaker: Circuit breaker của host
+
+    Returns:
+        Callable(retry_state) -> bool
+    """
+    def should_retry(retry_state) -> bool:
+        exc = retry_state.outcome.exception()
+        if exc is None or isinstance(exc, CircuitOpenError) or not is_transient(exc):
+            return False
+        if retry_state.attempt_number > max_retries:
+            return False
+        if breaker is not None and breaker.retry_in() > 0:
+            return False
+        if not budget.try_spend():
+            logger.warning(f"Retry budget exhausted, not retrying: {exc}")
+            return False
+        return True
+
+    return should_retry
+
+
+class RetryQueue:
+    """Các ngày fail vì lỗi tạm thời, chờ scrape lại."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[date, str] = {}
+
+    def add(self, target_date: date, error: str) -> None:
+        with self._lock:
+            self._pending[target_date] = error
+
+    def discard(self, target_date: date) -> None:
+        with self._lock:
+            self._pending.pop(target_date, None)
+
+    def drain(self) -> list[date]:
+        """Lấy ra (và xóa khỏi queue) các ngày đang chờ, theo thứ tự ngày."""
+        with self._lock:
+            dates = sorted(self._pending)
+            self._pending.clear()
+        return dates
+
+    def pending(self) -> dict[date, str]:
+        """Ngày đang chờ -> lỗi gần nhất."""
+        with self._lock:
+            return dict(self._pending)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+# Registry breaker theo host + budget chung của process
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+# Ratio = 0 cho tới khi scraper đầu tiên gọi get_retry_budget(max_retries)
+_retry_budget = RetryBudget()
+
+
+def get_circuit_breaker(host: str, **kwargs) -> CircuitBreaker:
+    """
+    Lấy breaker dùng chung cho host, tạo mới nếu chưa có.
+
+    Args:
+        host: Hostname (vd: lichngaytot.com)
+        **kwargs: Tham số cho CircuitBreaker (chỉ dùng ở lần tạo đầu tiên)
+
+    Returns:
+        CircuitBreaker của host
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(**kwargs)
+            _breakers[host] = breaker
+        return breaker
+
+
+def set_circuit_breaker(host: str, breaker: CircuitBreaker) -> None:
+    """Đăng ký breaker tùy chỉnh cho host."""
+    with _breakers_lock:
+        _breakers[host] = breaker
+
+
+def circuit_breaker_stats() -> dict[str, dict]:
+    """Snapshot của tất cả breakers, keyed by host."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {host: breaker.snapshot() for host, breaker in breakers.items()}
+
+
+def get_retry_budget(max_retries: Optional[int] = None) -> RetryBudget:
+    """
+    Retry budget dùng chung của process.
+
+    Args:
+        max_retries: max_retries của scraper sẽ dùng budget; budget được nới
+            để đủ cho scraper này (xem RetryBudget.size_for)
+
+    Returns:
+        RetryBudget
+    """
+    if max_retries is not None:
+        _retry_budget.size_for(max_retries)
+    return _retry_budget
+
+
+def set_retry_budget(budget: RetryBudget) -> None:
+    """Thay retry budget dùng chung (vd: ratio khác)."""
+    global _retry_budget
+    _retry_budget = budget
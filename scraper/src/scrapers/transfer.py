@@ -0,0 +1,94 @@
+"""
+Compressed transfer cho fetch layer.
+
+- accept_encoding(): giá trị Accept-Encoding mà client thực sự giải nén được
+  (gzip, deflate; thêm br khi có cài brotli hoặc brotlicffi)
+- TransferStats: bytes trên dây (raw) so với bytes sau giải nén (decoded) theo host
+
+requests (urllib3) và httpx đều tự giải nén gzip/deflate, và br khi import được
+decoder brotli. Chỉ quảng cáo br khi decoder có mặt, nếu không server có thể
+trả body Brotli mà client không đọc được.
+"""
+import threading
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+
+def accept_encoding() -> str:
+    """Giá trị header Accept-Encoding theo các decoder đang có."""
+    encodings = ["gzip", "deflate"]
+    if BROTLI_AVAILABLE:
+        encodings.append("br")
+    return ", ".join(encodings)
+
+
+class TransferStats:
+    """Thống kê bytes tải về của 1 host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.raw_bytes = 0
+        self.decoded_bytes = 0
+        self.by_encoding: dict[str, int] = {}
+
+    def record(self, raw_bytes: int, decoded_bytes: int, encoding: Optional[str]) -> None:
+        """
+        Ghi nhận 1 response.
+
+        Args:
+            raw_bytes: Số bytes body nhận trên dây (trước giải nén)
+            decoded_bytes: Số bytes body sau giải nén
+            encoding: Header Content-Encoding (None = identity)
+        """
+        encoding = (encoding or "identity").lower()
+        with self._lock:
+            self.responses += 1
+            self.raw_bytes += raw_bytes
+            self.decoded_bytes += decoded_bytes
+            self.by_encoding[encoding] = self.by_encoding.get(encoding, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "responses": self.responses,
+                "raw_kb": self.raw_bytes // 1024,
+                "decoded_kb": self.decoded_bytes // 1024,
+                "ratio": round(self.raw_bytes / self.decoded_bytes, 3) if self.decoded_bytes else None,
+                "saved_kb": max(0, self.decoded_bytes - self.raw_bytes) // 1024,
+                "encodings": dict(self.by_encoding),
+            }
+
+
+# Registry stats theo host
+_stats: dict[str, TransferStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_transfer_stats(host: str) -> TransferStats:
+    """Lấy TransferStats dùng chung cho host, tạo mới nếu chưa có."""
+    with _stats_lock:
+        stats = _stats.get(host)
+        if stats is None:
+            stats = TransferStats()
+            _stats[host] = stats
+        return stats
+
+
+def transfer_stats() -> dict[str, dict]:
+    """Snapshot transfer stats của tất cả hosts, keyed by host."""
+    with _stats_lock:
+        stats = dict(_stats)
+    return {host: host_stats.snapshot() for host, host_stats in stats.items()}
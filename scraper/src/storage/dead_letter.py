@@ -0,0 +1,226 @@
+"""
+Dead-letter store (SQLite) cho các ngày scrape fail.
+
+Mỗi ngày fail được ghi lại theo nguồn (host) với URL, exception class, lỗi
+gần nhất và số lần đã fail, để lần sau chỉ cần fetch lại đúng những ngày đó
+(scrape_year.py --retry-failed) thay vì chạy lại cả năm. Ngày scrape lại
+thành công được đánh dấu resolved (giữ lại để tra cứu).
+"""
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    """1 ngày fail của 1 nguồn."""
+    source: str
+    solar_date: date
+    url: Optional[str]
+    error_type: Optional[str]
+    error: Optional[str]
+    attempts: int
+    first_failed_at: str
+    last_failed_at: str
+
+
+class DeadLetterStore:
+    """Lưu các ngày fail theo (nguồn, ngày) để retry có chọn lọc."""
+
+    STATUS_FAILED = "failed"
+    STATUS_RESOLVED = "resolved"
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Khởi tạo store.
+
+        Args:
+            db_path: Đường dẫn file SQLite, mặc định là data/processed/dead_letters.db
+        """
+        self.db_path = db_path or Path("data/processed/dead_letters.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        """Tạo table nếu chưa có."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dead_letters (
+                    source TEXT NOT NULL,
+                    solar_date TEXT NOT NULL,
+                    url TEXT,
+                    error_type TEXT,
+                    error TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    status TEXT NOT NULL,
+                    first_failed_at TEXT,
+                    last_failed_at TEXT,
+                    resolved_at TEXT,
+                    PRIMARY KEY (source, solar_date)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_dead_letters_status
+                ON dead_letters(status, solar_date)
+            """)
+
+            conn.commit()
+
+    def add(
+        self,
+        source: str,
+        target_date: date,
+        url: Optional[str] = None,
+        error_type: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Ghi nhận 1 lần fail; ngày đã có trong store thì tăng attempts và cập nhật lỗi.
+
+        Args:
+            source: Nguồn (host) bị fail
+            target_date: Ngày bị fail
+            url: URL đã fetch
+            error_type: Tên exception class
+            error: Message lỗi
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO dead_letters (
+                    source, solar_date, url, error_type, error, attempts, status,
+                    first_failed_at, last_failed_at
+                ) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)
+                ON CONFLICT(source, solar_date) DO UPDATE SET
+                    url = COALESCE(excluded.url, url),
+                    error_type = excluded.error_type,
+                    error = excluded.error,
+                    attempts = attempts + 1,
+                    status = excluded.status,
+                    first_failed_at = CASE WHEN status = ? THEN first_failed_at
+                                           ELSE excluded.first_failed_at END,
+                    last_failed_at = excluded.last_failed_at,
+                    resolved_at = NULL
+            """, (
+                source, target_date.isoformat(), url, error_type, error,
+                self.STATUS_FAILED, now, now, self.STATUS_FAILED,
+            ))
+            conn.commit()
+
+    def resolve(self, source: str, target_date: date) -> bool:
+        """
+        Đánh dấu ngày đã scrape lại thành công.
+
+        Returns:
+            True nếu ngày đang nằm trong dead letters
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE dead_letters SET status = ?, resolved_at = ?
+                WHERE source = ? AND solar_date = ? AND status = ?
+            """, (
+                self.STATUS_RESOLVED,
+                datetime.now().isoformat(),
+                source,
+                target_date.isoformat(),
+                self.STATUS_FAILED,
+            ))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def pending(
+        self,
+        sources: Optional[Iterable[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> list[DeadLetter]:
+        """
+        Các ngày đang fail, theo thứ tự ngày.
+
+        Args:
+            sources: Chỉ lấy các nguồn này (mặc định tất cả)
+            start_date: Ngày bắt đầu (inclusive)
+            end_date: Ngày kết thúc (inclusive)
+
+        Returns:
+            List DeadLetter
+        """
+        query = """
+            SELECT source, solar_date, url, error_type, error, attempts,
+                   first_failed_at, last_failed_at
+            FROM dead_letters WHERE status = ?
+        """
+        params: list = [self.STATUS_FAILED]
+        if sources is not None:
+            sources = list(sources)
+            query += f" AND source IN ({', '.join('?' for _ in sources)})"
+            params.extend(sources)
+        if start_date is not None:
+            query += " AND solar_date >= ?"
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            query += " AND solar_date <= ?"
+            params.append(end_date.isoformat())
+        query += " ORDER BY solar_date, source"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            DeadLetter(
+                source=row[0],
+                solar_date=date.fromisoformat(row[1]),
+                url=row[2],
+                error_type=row[3],
+                error=row[4],
+                attempts=row[5],
+                first_failed_at=row[6],
+                last_failed_at=row[7],
+            )
+            for row in rows
+        ]
+
+    def pending_dates(
+        self,
+        sources: Optional[Iterable[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> list[date]:
+        """Các ngày (không trùng) có ít nhất 1 nguồn đang fail, theo thứ tự ngày."""
+        return sorted({
+            letter.solar_date for letter in self.pending(sources, start_date, end_date)
+        })
+
+    def get_stats(self) -> dict:
+        """Số ngày đang fail theo nguồn và theo exception class."""
+        with self._connect() as conn:
+            by_source = dict(conn.execute("""
+                SELECT source, COUNT(*) FROM dead_letters
+                WHERE status = ? GROUP BY source
+            """, (self.STATUS_FAILED,)).fetchall())
+            by_error = dict(conn.execute("""
+                SELECT COALESCE(error_type, '?'), COUNT(*) FROM dead_letters
+                WHERE status = ? GROUP BY error_type
+            """, (self.STATUS_FAILED,)).fetchall())
+            resolved = conn.execute(
+                "SELECT COUNT(*) FROM dead_letters WHERE status = ?",
+                (self.STATUS_RESOLVED,),
+            ).fetchone()[0]
+
+        return {
+            "pending": sum(by_source.values()),
+            "resolved": resolved,
+            "by_source": by_source,
+            "by_error": by_error,
+        }
@@ -0,0 +1,272 @@
+"""
+HTML archive - bộ sưu tập response đã fetch, dùng để replay offline.
+
+Cấu trúc (thư mục hoặc file .zip cùng layout):
+    archive/
+    ├── index.json             # url -> file, status, target_date, fetched_at
+    └── pages/ab/abcdef....html
+
+Recorder ghi archive trong lúc scrape bình thường; replay đọc lại theo URL,
+không cần network và không có delay, nên chạy lại cả pipeline cho 1 năm chỉ
+mất vài giây và luôn cho cùng kết quả. Khác với HTMLCache (data/raw), archive
+là snapshot cố định, có thể copy / commit làm fixture.
+
+Ghi vào archive đã có (vd: --resume --record) thì giữ các trang cũ và ghi
+thêm. Archive thư mục ghi lại index.json sau mỗi FLUSH_EVERY trang, nên bị
+kill giữa chừng chỉ mất các trang sau lần ghi cuối; file zip chỉ đọc được sau
+close() (central directory ghi lúc đóng), nên cần record bền thì dùng thư mục.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import warnings
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveMiss(LookupError):
+    """URL không có trong archive."""
+
+
+@dataclass
+class ArchivedPage:
+    """Một response trong archive."""
+    url: str
+    html: str
+    status_code: int = 200
+    target_date: Optional[date] = None
+
+
+class HTMLArchive:
+    """Archive HTML theo URL, lưu dạng thư mục hoặc file zip."""
+
+    INDEX_NAME = "index.json"
+    # Archive thư mục: ghi index.json sau mỗi FLUSH_EVERY trang mới
+    FLUSH_EVERY = 50
+
+    def __init__(self, path: Path, mode: str = "r"):
+        """
+        Mở archive.
+
+        Args:
+            path: Thư mục archive, hoặc file .zip
+            mode: 'r' = đọc (replay), 'w' = ghi (record); archive đã có thì ghi thêm
+        """
+        if mode not in ("r", "w"):
+            raise ValueError(f"Invalid archive mode: {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.is_zip = self.path.suffix == ".zip"
+        self._index: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._unflushed = 0
+
+        if mode == "r":
+            self._open_for_read()
+        else:
+            self._open_for_write()
+
+    def _open_for_read(self) -> None:
+        if self.is_zip:
+            self._zip = zipfile.ZipFile(self.path, "r")
+            self._index = json.loads(self._zip.read(self.INDEX_NAME))
+        else:
+            self._index = json.loads((self.path / self.INDEX_NAME).read_text(encoding="utf-8"))
+        logger.info(f"Opened archive {self.path} ({len(self._index)} pages)")
+
+    def _open_for_write(self) -> None:
+        if self.is_zip:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists():
+                self._zip = zipfile.ZipFile(self.path, "a", compression=zipfile.ZIP_DEFLATED)
+                if self.INDEX_NAME in self._zip.namelist():
+                    self._index = json.loads(self._zip.read(self.INDEX_NAME))
+            else:
+                self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            index_path = self.path / self.INDEX_NAME
+            if index_path.exists():
+                self._index = json.loads(index_path.read_text(encoding="utf-8"))
+
+        if self._index:
+            logger.info(f"Appending to archive {self.path} ({len(self._index)} pages)")
+
+    @staticmethod
+    def _page_name(url: str) -> str:
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return f"pages/{url_hash[:2]}/{url_hash}.html"
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._index
+
+    def urls(self) -> list[str]:
+        """Tất cả URL trong archive."""
+        return list(self._index)
+
+    def get(self, url: str) -> Optional[ArchivedPage]:
+        """
+        Lấy response đã lưu.
+
+        Args:
+            url: URL cần lấy
+
+        Returns:
+            ArchivedPage hoặc None nếu không có
+        """
+        meta = self._index.get(url)
+        if meta is None:
+            return None
+
+        with self._lock:
+            if self._zip:
+                html = self._zip.read(meta["file"]).decode("utf-8")
+            else:
+                html = (self.path / meta["file"]).read_text(encoding="utf-8")
+
+        target_date = meta.get("target_date")
+        return ArchivedPage(
+            url=url,
+            html=html,
+            status_code=meta.get("status_code", 200),
+            target_date=date.fromisoformat(target_date) if target_date else None,
+        )
+
+    def fetch(self, url: str) -> ArchivedPage:
+        """
+        Như get(), nhưng raise nếu URL không có trong archive.
+
+        Raises:
+            ArchiveMiss: Nếu URL không có trong archive
+        """
+        page = self.get(url)
+        if page is None:
+            raise ArchiveMiss(f"Not in archive {self.path}: {url}")
+        return page
+
+    def iter_by_date(
+        self,
+        url_prefix: str = "",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Iterator[tuple[date, str]]:
+        """
+        Đọc dần các trang trong archive theo thứ tự target_date, để parse lại.
+
+        Args:
+            url_prefix: Chỉ lấy URL bắt đầu bằng prefix (vd: BASE_URL của 1 nguồn)
+            start_date: Ngày đầu (None = không giới hạn)
+            end_date: Ngày cuối (None = không giới hạn)
+
+        Yields:
+            (ngày, html) của trang 200 OK, mỗi ngày 1 trang (bản fetch mới nhất)
+        """
+        latest: dict[date, tuple[str, str]] = {}
+        for url, meta in self._index.items():
+            if not url.startswith(url_prefix) or meta.get("status_code", 200) != 200:
+                continue
+            if not meta.get("target_date"):
+                continue
+            target_date = date.fromisoformat(meta["target_date"])
+            if (start_date and target_date < start_date) or (end_date and target_date > end_date):
+                continue
+            fetched_at = meta.get("fetched_at", "")
+            if target_date not in latest or fetched_at > latest[target_date][0]:
+                latest[target_date] = (fetched_at, url)
+
+        for target_date in sorted(latest):
+            yield target_date, self.fetch(latest[target_date][1]).html
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        status_code: int = 200,
+        target_date: Optional[date] = None,
+    ) -> None:
+        """
+        Ghi 1 response vào archive (chỉ ở mode 'w').
+
+        Args:
+            url: URL đã fetch
+            html: HTML content
+            status_code: HTTP status
+            target_date: Ngày mà trang này mô tả (nếu có)
+        """
+        if self.mode != "w":
+            raise ValueError(f"Archive {self.path} is read-only")
+
+        name = self._page_name(url)
+        with self._lock:
+            if url in self._index:
+                return
+
+            if self._zip:
+                self._zip.writestr(name, html.encode("utf-8"))
+            else:
+                page_path = self.path / name
+                page_path.parent.mkdir(parents=True, exist_ok=True)
+                page_path.write_text(html, encoding="utf-8")
+
+            self._index[url] = {
+                "file": name,
+                "status_code": status_code,
+                "target_date": target_date.isoformat() if target_date else None,
+                "fetched_at": datetime.now().isoformat(),
+            }
+            self._unflushed += 1
+            if not self._zip and self._unflushed >= self.FLUSH_EVERY:
+                self._write_index()
+
+    def _write_index(self) -> None:
+        """Ghi index (gọi khi đang giữ lock)."""
+        index_json = json.dumps(self._index, ensure_ascii=False, indent=1, sort_keys=True)
+        if self._zip:
+            # Zip không xóa được entry: khi ghi thêm, index cũ vẫn nằm trong file
+            # nhưng reader luôn lấy entry cùng tên ghi sau cùng
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+                self._zip.writestr(self.INDEX_NAME, index_json)
+        else:
+            # Ghi file tạm rồi rename: bị kill lúc đang ghi vẫn còn index cũ
+            tmp_path = self.path / f"{self.INDEX_NAME}.tmp"
+            tmp_path.write_text(index_json, encoding="utf-8")
+            os.replace(tmp_path, self.path / self.INDEX_NAME)
+        self._unflushed = 0
+
+    def _needs_index(self) -> bool:
+        if self.is_zip:
+            # Zip đã đóng thì thôi; zip ghi thêm mà không có trang mới thì giữ index cũ
+            return self._zip is not None and (
+                self._unflushed > 0 or self.INDEX_NAME not in self._zip.namelist()
+            )
+        return True
+
+    def close(self) -> None:
+        """Ghi index (mode 'w') và đóng archive."""
+        with self._lock:
+            if self.mode == "w" and self._needs_index():
+                self._write_index()
+                logger.info(f"Wrote archive {self.path} ({len(self._index)} pages)")
+
+            if self._zip:
+                self._zip.close()
+                self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
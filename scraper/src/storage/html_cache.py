@@ -0,0 +1,396 @@
+"""
+HTML cache cho fetch layer - lưu raw HTML đã nén dưới data/raw.
+
+Cấu trúc:
+    data/raw/
+    ├── index.db                     # url -> content hash, status, fetched_at, validators
+    └── objects/ab/abcdef....html.gz # body nén, đặt tên theo SHA-256 của nội dung
+
+Body được lưu theo hash nội dung nên các trang giống hệt nhau chỉ tốn 1 file.
+Validators (ETag, Last-Modified) được lưu kèm để revalidate entry hết hạn
+bằng conditional request thay vì tải lại toàn bộ body. Mặc định entry hết
+hạn sau DEFAULT_TTL, nên lần chạy bình thường vẫn revalidate trang cũ (304
+rẻ hơn tải lại) thay vì dùng cache mãi mãi.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Entry cũ hơn mức này được revalidate bằng conditional request
+DEFAULT_TTL = timedelta(days=7)
+
+
+@dataclass
+class CacheEntry:
+    """Một trang đã cache."""
+    url: str
+    content_hash: str
+    status_code: int
+    fetched_at: datetime
+    target_date: Optional[date] = None
+    size: int = 0
+    compressed_size: int = 0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    html: Optional[str] = None
+
+    @property
+    def age(self) -> timedelta:
+        return datetime.now() - self.fetched_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Headers If-None-Match / If-Modified-Since từ validators đã lưu."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTMLCache:
+    """Cache HTML theo URL, body nén gzip và content-addressed."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl: Optional[timedelta] = DEFAULT_TTL,
+        compress_level: int = 6,
+    ):
+        """
+        Khởi tạo cache.
+
+        Args:
+            cache_dir: Thư mục cache, mặc định là data/raw
+            ttl: Thời gian một entry còn hiệu lực (mặc định DEFAULT_TTL),
+                None = không bao giờ hết hạn
+            compress_level: Mức nén gzip (1-9)
+        """
+        self.cache_dir = cache_dir or Path("data/raw")
+        self.objects_dir = self.cache_dir / "objects"
+        self.db_path = self.cache_dir / "index.db"
+        self.ttl = ttl
+        self.compress_level = compress_level
+
+        # Counters cho monitoring
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Tạo index table nếu chưa có."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    target_date TEXT,
+                    content_hash TEXT NOT NULL,
+                    status_code INTEGER,
+                    size INTEGER,
+                    compressed_size INTEGER,
+                    fetched_at TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pages_target_date
+                ON pages(target_date)
+            """)
+
+            # Migrate index cũ chưa có cột validators
+            cursor.execute("PRAGMA table_info(pages)")
+            columns = {row[1] for row in cursor.fetchall()}
+            for column in ("etag", "last_modified"):
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+
+            conn.commit()
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.objects_dir / content_hash[:2] / f"{content_hash}.html.gz"
+
+    def _row_to_entry(self, row: tuple) -> CacheEntry:
+        (url, target_date, content_hash, status_code, size, compressed_size,
+         fetched_at, etag, last_modified) = row
+        return CacheEntry(
+            url=url,
+            content_hash=content_hash,
+            status_code=status_code,
+            fetched_at=datetime.fromisoformat(fetched_at),
+            target_date=date.fromisoformat(target_date) if target_date else None,
+            size=size or 0,
+            compressed_size=compressed_size or 0,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Entry còn trong TTL hay không."""
+        return self.ttl is None or entry.age <= self.ttl
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """
+        Lấy metadata của entry (không đọc body, không xét TTL).
+
+        Args:
+            url: URL đã fetch
+
+        Returns:
+            CacheEntry (html=None) hoặc None
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT url, target_date, content_hash, status_code,
+                           size, compressed_size, fetched_at, etag, last_modified
+                    FROM pages WHERE url = ?
+                """, (url,))
+                row = cursor.fetchone()
+                return self._row_to_entry(row) if row else None
+        except Exception as e:
+            logger.error(f"Error reading cache index for {url}: {e}")
+            return None
+
+    def read_body(self, content_hash: str) -> Optional[str]:
+        """Đọc và giải nén body theo content hash."""
+        path = self._object_path(content_hash)
+        try:
+            return gzip.decompress(path.read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading cached body {path}: {e}")
+            return None
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Lấy trang từ cache nếu còn hiệu lực.
+
+        Args:
+            url: URL cần lấy
+
+        Returns:
+            CacheEntry có html, hoặc None nếu miss/hết hạn
+        """
+        entry = self.lookup(url)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if not self.is_fresh(entry):
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        entry.html = self.read_body(entry.content_hash)
+        if entry.html is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        status_code: int = 200,
+        target_date: Optional[date] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CacheEntry:
+        """
+        Lưu trang vào cache.
+
+        Args:
+            url: URL đã fetch
+            html: HTML content
+            status_code: HTTP status
+            target_date: Ngày mà trang này mô tả (nếu có)
+            etag: Header ETag của response
+            last_modified: Header Last-Modified của response
+
+        Returns:
+            CacheEntry vừa lưu
+        """
+        body = html.encode("utf-8")
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(content_hash)
+
+        if path.exists():
+            compressed_size = path.stat().st_size
+        else:
+            compressed = gzip.compress(body, compresslevel=self.compress_level)
+            compressed_size = len(compressed)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Ghi file tạm rồi rename để không bao giờ để lại body dở dang
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(compressed)
+            os.replace(tmp_path, path)
+
+        entry = CacheEntry(
+            url=url,
+            content_hash=content_hash,
+            status_code=status_code,
+            fetched_at=datetime.now(),
+            target_date=target_date,
+            size=len(body),
+            compressed_size=compressed_size,
+            etag=etag,
+            last_modified=last_modified,
+            html=html,
+        )
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO pages (
+                        url, target_date, content_hash, status_code,
+                        size, compressed_size, fetched_at, etag, last_modified
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    url,
+                    target_date.isoformat() if target_date else None,
+                    content_hash,
+                    status_code,
+                    entry.size,
+                    compressed_size,
+                    entry.fetched_at.isoformat(),
+                    etag,
+                    last_modified,
+                ))
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error writing cache index for {url}: {e}")
+
+        return entry
+
+    def revalidate(self, entry: CacheEntry) -> Optional[CacheEntry]:
+        """
+        Đánh dấu entry còn hiệu lực sau khi server trả 304 Not Modified.
+
+        Args:
+            entry: Entry đã gửi conditional request
+
+        Returns:
+            Entry kèm html đã lưu, hoặc None nếu body không còn trong cache
+        """
+        html = self.read_body(entry.content_hash)
+        if html is None:
+            return None
+
+        entry.html = html
+        entry.fetched_at = datetime.now()
+        try:
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE pages SET fetched_at = ? WHERE url = ?",
+                    (entry.fetched_at.isoformat(), entry.url)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error revalidating cache for {entry.url}: {e}")
+
+        self.revalidated += 1
+        self.bytes_saved += entry.size
+        return entry
+
+    def iter_by_date(
+        self,
+        url_prefix: str = "",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Iterator[tuple[date, str]]:
+        """
+        Đọc dần các trang đã cache theo thứ tự target_date (không xét TTL), để parse lại.
+
+        Args:
+            url_prefix: Chỉ lấy URL bắt đầu bằng prefix (vd: BASE_URL của 1 nguồn)
+            start_date: Ngày đầu (None = không giới hạn)
+            end_date: Ngày cuối (None = không giới hạn)
+
+        Yields:
+            (ngày, html) của trang 200 OK, mỗi ngày 1 trang (bản fetch mới nhất)
+        """
+        query = """
+            SELECT target_date, content_hash FROM pages
+            WHERE target_date IS NOT NULL AND status_code = 200
+              AND substr(url, 1, ?) = ? AND target_date >= ? AND target_date <= ?
+            ORDER BY target_date, fetched_at DESC
+        """
+        params = (
+            len(url_prefix),
+            url_prefix,
+            start_date.isoformat() if start_date else "",
+            end_date.isoformat() if end_date else "9999-12-31",
+        )
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        previous = None
+        for target_date, content_hash in rows:
+            if target_date == previous:
+                continue
+            html = self.read_body(content_hash)
+            if html is None:
+                logger.warning(f"Cached body missing for {target_date}: {content_hash}")
+                continue
+            previous = target_date
+            yield date.fromisoformat(target_date), html
+
+    def invalidate(self, url: str) -> bool:
+        """Xóa entry khỏi index (body giữ lại vì có thể dùng chung)."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM pages WHERE url = ?", (url,))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error invalidating cache for {url}: {e}")
+            return False
+
+    def get_stats(self) -> dict:
+        """Thống kê cache."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT COUNT(*), COUNT(DISTINCT content_hash),
+                           SUM(size), SUM(compressed_size)
+                    FROM pages
+                """)
+                entries, unique_bodies, size, compressed_size = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Error getting cache stats: {e}")
+            entries, unique_bodies, size, compressed_size = 0, 0, 0, 0
+
+        return {
+            "entries": entries or 0,
+            "unique_bodies": unique_bodies or 0,
+            "size_kb": (size or 0) // 1024,
+            "compressed_size_kb": (compressed_size or 0) // 1024,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "bytes_saved_kb": self.bytes_saved // 1024,
+        }
@@ -0,0 +1,202 @@
+"""
+Job journal (SQLite) cho scrape jobs dài - ghi trạng thái từng ngày ngay khi xong.
+
+Mỗi ngày của job có status pending / done / failed. DayData được lưu ngay
+khi scrape xong, nên crash hoặc Ctrl-C giữa chừng không mất dữ liệu và
+--resume chỉ cần scrape các ngày chưa done.
+"""
+import logging
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from ..models.day_data import DayData
+
+logger = logging.getLogger(__name__)
+
+
+class JobJournal:
+    """Journal theo dõi tiến độ 1 scrape job theo từng ngày."""
+
+    STATUS_PENDING = "pending"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    def __init__(self, job_id: str, db_path: Optional[Path] = None):
+        """
+        Khởi tạo journal.
+
+        Args:
+            job_id: ID của job (vd: lichngaytot.com:2025-01-01:2025-12-31)
+            db_path: Đường dẫn file SQLite, mặc định là data/processed/jobs.db
+        """
+        self.job_id = job_id
+        self.db_path = db_path or Path("data/processed/jobs.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        """Tạo tables nếu chưa có."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    created_at TEXT,
+                    updated_at TEXT
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS job_days (
+                    job_id TEXT NOT NULL,
+                    solar_date TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    error TEXT,
+                    data_json TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (job_id, solar_date)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_job_days_status
+                ON job_days(job_id, status)
+            """)
+
+            conn.commit()
+
+    def start(self, start_date: date, end_date: date, resume: bool = False) -> int:
+        """
+        Đăng ký job và các ngày cần scrape.
+
+        Args:
+            start_date: Ngày bắt đầu
+            end_date: Ngày kết thúc
+            resume: True = giữ trạng thái cũ; False = bắt đầu lại từ đầu
+
+        Returns:
+            Số ngày còn phải scrape
+        """
+        now = datetime.now().isoformat()
+        total_days = (end_date - start_date).days + 1
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+
+            if not resume:
+                cursor.execute("DELETE FROM job_days WHERE job_id = ?", (self.job_id,))
+
+            cursor.execute("""
+                INSERT INTO jobs (job_id, start_date, end_date, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET updated_at = excluded.updated_at
+            """, (self.job_id, start_date.isoformat(), end_date.isoformat(), now, now))
+
+            cursor.executemany("""
+                INSERT OR IGNORE INTO job_days (job_id, solar_date, status, updated_at)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (
+                    self.job_id,
+                    (start_date + timedelta(days=i)).isoformat(),
+                    self.STATUS_PENDING,
+                    now,
+                )
+                for i in range(total_days)
+            ])
+
+            conn.commit()
+
+        remaining = len(self.remaining_dates())
+        logger.info(
+            f"Job {self.job_id}: {total_days - remaining}/{total_days} days done, "
+            f"{remaining} remaining"
+        )
+        return remaining
+
+    def remaining_dates(self) -> list[date]:
+        """Các ngày chưa done (pending + failed), theo thứ tự ngày."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT solar_date FROM job_days
+                WHERE job_id = ? AND status != ?
+                ORDER BY solar_date
+            """, (self.job_id, self.STATUS_DONE))
+            return [date.fromisoformat(row[0]) for row in cursor.fetchall()]
+
+    def mark_done(self, day_data: DayData) -> None:
+        """Lưu DayData và đánh dấu ngày đã xong."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE job_days
+                SET status = ?, attempts = attempts + 1, error = NULL,
+                    data_json = ?, updated_at = ?
+                WHERE job_id = ? AND solar_date = ?
+            """, (
+                self.STATUS_DONE,
+                day_data.model_dump_json(),
+                datetime.now().isoformat(),
+                self.job_id,
+                day_data.solar_date.isoformat(),
+            ))
+            conn.commit()
+
+    def mark_failed(self, target_date: date, error: str) -> None:
+        """Đánh dấu ngày bị lỗi để retry ở lần --resume sau."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE job_days
+                SET status = ?, attempts = attempts + 1, error = ?, updated_at = ?
+                WHERE job_id = ? AND solar_date = ?
+            """, (
+                self.STATUS_FAILED,
+                error,
+                datetime.now().isoformat(),
+                self.job_id,
+                target_date.isoformat(),
+            ))
+            conn.commit()
+
+    def get_results(self) -> list[DayData]:
+        """Tất cả DayData đã done của job, theo thứ tự ngày."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT data_json FROM job_days
+                WHERE job_id = ? AND status = ?
+                ORDER BY solar_date
+            """, (self.job_id, self.STATUS_DONE))
+            return [
+                DayData.model_validate_json(row[0])
+                for row in cursor.fetchall()
+            ]
+
+    def get_progress(self) -> dict:
+        """Số ngày theo từng status."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT status, COUNT(*) FROM job_days
+                WHERE job_id = ? GROUP BY status
+            """, (self.job_id,))
+            counts = dict(cursor.fetchall())
+
+        return {
+            "total": sum(counts.values()),
+            "done": counts.get(self.STATUS_DONE, 0),
+            "failed": counts.get(self.STATUS_FAILED, 0),
+            "pending": counts.get(self.STATUS_PENDING, 0),
+        }
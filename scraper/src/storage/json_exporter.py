@@ -7,7 +7,8 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
 
-from ..models.day_data import DayData, YearData
+from ..models.day_data import DayData, YearData, days_content_hash
+from .sqlite_storage import SQLiteStorage
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +96,37 @@ class JSONExporter:
         year_data = YearData(year=year, days=days, total_days=len(days))
         return self.export_year(year_data)
 
+    def export_days_list_if_changed(
+        self,
+        days: list[DayData],
+        year: int,
+        storage: SQLiteStorage,
+    ) -> Optional[Path]:
+        """
+        Export như export_days_list, bỏ qua nếu nội dung giống lần export trước.
+
+        Hash của cả năm (days_content_hash) được lưu trong metadata của storage,
+        theo đường dẫn file output.
+
+        Args:
+            days: List of DayData objects
+            year: Năm
+            storage: Storage lưu hash của lần export trước
+
+        Returns:
+            Path của file đã tạo, hoặc None nếu không cần export lại
+        """
+        filepath = self.output_dir / f"fengshui_{year}.json"
+        key = f"export_hash:{filepath.resolve()}"
+        content_hash = days_content_hash(days)
+        if filepath.exists() and storage.get_metadata(key) == content_hash:
+            logger.info(f"Skipping export of {year}: unchanged since last export")
+            return None
+
+        output_path = self.export_days_list(days, year)
+        storage.set_metadata(key, content_hash)
+        return output_path
+
     def _day_to_dict(self, day: DayData) -> dict:
         """Convert DayData to full dict."""
         return {
@@ -6,6 +6,7 @@ Lưu trữ data đã scrape và validate để query nhanh và export.
 import json
 import logging
 import sqlite3
+from dataclasses import dataclass
 from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
@@ -14,6 +15,17 @@ from ..models.day_data import DayData, LunarDate, CanChi, CanChiInfo
 
 logger = logging.getLogger(__name__)
 
+# Cột hash thêm sau, DB cũ được bổ sung bằng ALTER TABLE
+_HASH_COLUMNS = ("page_hash", "content_hash", "validated_hash")
+
+
+@dataclass(frozen=True)
+class DayHashes:
+    """Hash đã lưu của 1 ngày."""
+    page_hash: Optional[str]       # sha256 của HTML nguồn (dual-source: của cả 2 trang)
+    content_hash: Optional[str]    # DayData.content_hash()
+    validated_hash: Optional[str]  # content_hash lúc validate pass gần nhất
+
 
 class SQLiteStorage:
     """SQLite storage cho dữ liệu ngày."""
@@ -58,10 +70,18 @@ class SQLiteStorage:
                     source TEXT,
                     data_json TEXT,
                     created_at TEXT,
-                    updated_at TEXT
+                    updated_at TEXT,
+                    page_hash TEXT,
+                    content_hash TEXT,
+                    validated_hash TEXT
                 )
             """)
 
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(days)")}
+            for column in _HASH_COLUMNS:
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE days ADD COLUMN {column} TEXT")
+
             # Index cho queries phổ biến
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_lunar_date
@@ -82,15 +102,36 @@ class SQLiteStorage:
                 )
             """)
 
+            # Lần refresh gần nhất của từng ngày (refresh daemon)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS refresh_state (
+                    solar_date TEXT PRIMARY KEY,
+                    checked_at TEXT NOT NULL,
+                    changed_at TEXT
+                )
+            """)
+
+            # Refresh fail liên tiếp của từng ngày (backoff của refresh daemon)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS refresh_failures (
+                    solar_date TEXT PRIMARY KEY,
+                    failures INTEGER NOT NULL,
+                    failed_at TEXT NOT NULL
+                )
+            """)
+
             conn.commit()
             logger.info(f"Database initialized at {self.db_path}")
 
-    def save_day(self, day_data: DayData) -> bool:
+    def save_day(self, day_data: DayData, page_hash: Optional[str] = None) -> bool:
         """
-        Lưu dữ liệu 1 ngày.
+        Lưu dữ liệu 1 ngày kèm content hash.
+
+        Ghi đè giữ created_at, và giữ validated_hash nếu nội dung không đổi.
 
         Args:
             day_data: DayData object
+            page_hash: Hash của HTML nguồn, để lần sau bỏ qua parse nếu trang không đổi
 
         Returns:
             True nếu thành công
@@ -105,13 +146,39 @@ class SQLiteStorage:
                 data_json = day_data.model_dump_json()
 
                 cursor.execute("""
-                    INSERT OR REPLACE INTO days (
+                    INSERT INTO days (
                         solar_date, lunar_day, lunar_month, lunar_year, is_leap_month,
                         day_can, day_chi, month_can, month_chi, year_can, year_chi,
                         ngu_hanh, tiet_khi, star28_name, star28_is_good,
                         truc12_name, truc12_is_good, day_score, source,
-                        data_json, created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        data_json, created_at, updated_at, page_hash, content_hash
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(solar_date) DO UPDATE SET
+                        lunar_day = excluded.lunar_day,
+                        lunar_month = excluded.lunar_month,
+                        lunar_year = excluded.lunar_year,
+                        is_leap_month = excluded.is_leap_month,
+                        day_can = excluded.day_can,
+                        day_chi = excluded.day_chi,
+                        month_can = excluded.month_can,
+                        month_chi = excluded.month_chi,
+                        year_can = excluded.year_can,
+                        year_chi = excluded.year_chi,
+                        ngu_hanh = excluded.ngu_hanh,
+                        tiet_khi = excluded.tiet_khi,
+                        star28_name = excluded.star28_name,
+                        star28_is_good = excluded.star28_is_good,
+                        truc12_name = excluded.truc12_name,
+                        truc12_is_good = excluded.truc12_is_good,
+                        day_score = excluded.day_score,
+                        source = excluded.source,
+                        data_json = excluded.data_json,
+                        updated_at = excluded.updated_at,
+                        page_hash = excluded.page_hash,
+                        validated_hash = CASE
+                            WHEN days.content_hash = excluded.content_hash THEN days.validated_hash
+                        END,
+                        content_hash = excluded.content_hash
                 """, (
                     day_data.solar_date.isoformat(),
                     day_data.lunar_date.day,
@@ -135,6 +202,8 @@ class SQLiteStorage:
                     data_json,
                     now,
                     now,
+                    page_hash,
+                    day_data.content_hash(),
                 ))
 
                 conn.commit()
@@ -144,6 +213,32 @@ class SQLiteStorage:
             logger.error(f"Error saving day {day_data.solar_date}: {e}")
             return False
 
+    def save_day_if_changed(self, day_data: DayData, page_hash: Optional[str] = None) -> bool:
+        """
+        Lưu dữ liệu 1 ngày chỉ khi content hash khác bản đã lưu.
+
+        Hash bỏ qua scraped_at, nên scrape lại mà nội dung không đổi thì chỉ
+        cập nhật page_hash (nếu trang đổi mà dữ liệu không đổi).
+
+        Args:
+            day_data: DayData object
+            page_hash: Hash của HTML nguồn
+
+        Returns:
+            True nếu đã ghi (ngày mới hoặc có thay đổi)
+        """
+        stored = self.get_hashes(day_data.solar_date, day_data.solar_date).get(day_data.solar_date)
+        stored_hash = stored.content_hash if stored is not None else None
+        if stored is not None and stored_hash is None:
+            # Row lưu trước khi có cột hash
+            existing = self.get_day(day_data.solar_date)
+            stored_hash = existing.content_hash() if existing is not None else None
+        if stored_hash is not None and stored_hash == day_data.content_hash():
+            if page_hash and page_hash != stored.page_hash:
+                self.set_page_hash(day_data.solar_date, page_hash)
+            return False
+        return self.save_day(day_data, page_hash)
+
     def save_days(self, days: list[DayData]) -> int:
         """
         Lưu nhiều ngày.
@@ -188,6 +283,86 @@ class SQLiteStorage:
             logger.error(f"Error getting day {solar_date}: {e}")
             return None
 
+    def get_day_by_page_hash(self, solar_date: date, page_hash: str) -> Optional[DayData]:
+        """
+        Lấy dữ liệu 1 ngày nếu được parse từ đúng trang có page_hash.
+
+        Args:
+            solar_date: Ngày dương lịch
+            page_hash: Hash của HTML vừa fetch
+
+        Returns:
+            DayData đã lưu, hoặc None nếu chưa có / trang đã đổi
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT data_json FROM days WHERE solar_date = ? AND page_hash = ?",
+                    (solar_date.isoformat(), page_hash)
+                ).fetchone()
+                return DayData.model_validate_json(row[0]) if row else None
+
+        except Exception as e:
+            logger.error(f"Error getting day {solar_date} by page hash: {e}")
+            return None
+
+    def get_hashes(self, start: date, end: date) -> dict[date, DayHashes]:
+        """
+        Lấy page / content / validated hash của các ngày trong khoảng.
+
+        Args:
+            start: Ngày bắt đầu
+            end: Ngày kết thúc
+
+        Returns:
+            Dict ngày -> DayHashes (ngày chưa có dữ liệu không có trong dict)
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT solar_date, page_hash, content_hash, validated_hash FROM days
+                    WHERE solar_date >= ? AND solar_date <= ?
+                """, (start.isoformat(), end.isoformat()))
+                return {
+                    date.fromisoformat(row[0]): DayHashes(row[1], row[2], row[3])
+                    for row in cursor.fetchall()
+                }
+
+        except Exception as e:
+            logger.error(f"Error getting hashes: {e}")
+            return {}
+
+    def set_page_hash(self, solar_date: date, page_hash: str) -> None:
+        """Cập nhật page_hash khi trang đổi nhưng dữ liệu parse ra không đổi."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE days SET page_hash = ? WHERE solar_date = ?",
+                    (page_hash, solar_date.isoformat())
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error setting page hash of {solar_date}: {e}")
+
+    def mark_validated(self, solar_date: date, content_hash: str) -> None:
+        """
+        Ghi nhận ngày đã validate pass với nội dung có content_hash.
+
+        Args:
+            solar_date: Ngày đã validate
+            content_hash: Content hash của DayData đã validate
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE days SET validated_hash = ? WHERE solar_date = ?",
+                    (content_hash, solar_date.isoformat())
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error marking {solar_date} validated: {e}")
+
     def get_days_range(self, start: date, end: date) -> list[DayData]:
         """
         Lấy dữ liệu trong khoảng ngày.
@@ -386,6 +561,121 @@ class SQLiteStorage:
         except Exception:
             return None
 
+    def mark_checked(
+        self,
+        solar_date: date,
+        changed: bool,
+        checked_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Ghi nhận 1 lần refresh của ngày.
+
+        Args:
+            solar_date: Ngày đã refresh
+            changed: Dữ liệu có thay đổi không
+            checked_at: Thời điểm refresh, mặc định là bây giờ
+        """
+        checked_at = (checked_at or datetime.now()).isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO refresh_state (solar_date, checked_at, changed_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(solar_date) DO UPDATE SET
+                        checked_at = excluded.checked_at,
+                        changed_at = COALESCE(excluded.changed_at, refresh_state.changed_at)
+                """, (solar_date.isoformat(), checked_at, checked_at if changed else None))
+                conn.execute(
+                    "DELETE FROM refresh_failures WHERE solar_date = ?",
+                    (solar_date.isoformat(),)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error marking {solar_date} checked: {e}")
+
+    def mark_check_failed(self, solar_date: date, failed_at: Optional[datetime] = None) -> int:
+        """
+        Ghi nhận 1 lần refresh fail của ngày (checked_at giữ nguyên).
+
+        Args:
+            solar_date: Ngày refresh fail
+            failed_at: Thời điểm fail, mặc định là bây giờ
+
+        Returns:
+            Số lần fail liên tiếp (xóa khi mark_checked), 0 nếu lỗi ghi DB
+        """
+        failed_at = (failed_at or datetime.now()).isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO refresh_failures (solar_date, failures, failed_at)
+                    VALUES (?, 1, ?)
+                    ON CONFLICT(solar_date) DO UPDATE SET
+                        failures = refresh_failures.failures + 1,
+                        failed_at = excluded.failed_at
+                """, (solar_date.isoformat(), failed_at))
+                row = conn.execute(
+                    "SELECT failures FROM refresh_failures WHERE solar_date = ?",
+                    (solar_date.isoformat(),)
+                ).fetchone()
+                conn.commit()
+                return row[0]
+        except Exception as e:
+            logger.error(f"Error marking {solar_date} failed: {e}")
+            return 0
+
+    def get_check_failures(self, start: date, end: date) -> dict[date, tuple[datetime, int]]:
+        """
+        Lấy các ngày đang refresh fail trong khoảng.
+
+        Args:
+            start: Ngày bắt đầu
+            end: Ngày kết thúc
+
+        Returns:
+            Dict ngày -> (lần fail gần nhất, số lần fail liên tiếp)
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT solar_date, failed_at, failures FROM refresh_failures
+                    WHERE solar_date >= ? AND solar_date <= ?
+                """, (start.isoformat(), end.isoformat()))
+                return {
+                    date.fromisoformat(row[0]): (datetime.fromisoformat(row[1]), row[2])
+                    for row in cursor.fetchall()
+                }
+        except Exception as e:
+            logger.error(f"Error getting refresh failures: {e}")
+            return {}
+
+    def get_checked_at(self, start: date, end: date) -> dict[date, datetime]:
+        """
+        Lấy thời điểm refresh gần nhất của các ngày trong khoảng.
+
+        Args:
+            start: Ngày bắt đầu
+            end: Ngày kết thúc
+
+        Returns:
+            Dict ngày -> checked_at (ngày chưa refresh lần nào không có trong dict)
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT solar_date, checked_at FROM refresh_state
+                    WHERE solar_date >= ? AND solar_date <= ?
+                """, (start.isoformat(), end.isoformat()))
+                return {
+                    date.fromisoformat(row[0]): datetime.fromisoformat(row[1])
+                    for row in cursor.fetchall()
+                }
+        except Exception as e:
+            logger.error(f"Error getting refresh state: {e}")
+            return {}
+
     def get_stats(self) -> dict:
         """Lấy thống kê database."""
         try:
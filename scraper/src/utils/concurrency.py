@@ -0,0 +1,51 @@
+"""
+Asyncio helpers dùng chung cho scrapers và pipelines.
+"""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def bounded_as_completed(
+    items: Iterable[T],
+    make_task: Callable[[T], Awaitable[R]],
+    max_pending: int,
+) -> AsyncIterator[R]:
+    """
+    Chạy make_task(item) cho từng item, yield kết quả theo thứ tự hoàn thành.
+
+    Chỉ có tối đa max_pending task đang chạy hoặc chờ consumer lấy kết quả;
+    item mới chỉ được bắt đầu khi consumer lấy kết quả ra (back-pressure), nên
+    bộ nhớ không tăng theo số item. Generator bị đóng (consumer dừng sớm, lỗi)
+    thì các task còn lại bị hủy - dùng với contextlib.aclosing để hủy ngay.
+
+    Args:
+        items: Các item cần xử lý, được đọc dần
+        make_task: Coroutine function xử lý 1 item
+        max_pending: Số task tối đa đang chạy/chờ
+
+    Yields:
+        Kết quả của make_task theo thứ tự hoàn thành
+    """
+    pending_items = iter(items)
+    in_flight: set[asyncio.Task] = set()
+
+    def fill() -> None:
+        for item in pending_items:
+            in_flight.add(asyncio.ensure_future(make_task(item)))
+            if len(in_flight) >= max_pending:
+                break
+
+    try:
+        fill()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                in_flight.discard(task)
+                yield task.result()
+            fill()
+    finally:
+        for task in in_flight:
+            task.cancel()
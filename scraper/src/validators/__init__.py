@@ -2,6 +2,7 @@
 from .lunar_validator import LunarValidator
 from .cross_validator import CrossValidator, CrossValidationResult, DiscrepancyItem
 from .data_merger import DataMerger, merge_day_data
+from .sanity import suspicion_reasons
 
 __all__ = [
     'LunarValidator',
@@ -10,4 +11,5 @@ __all__ = [
     'DiscrepancyItem',
     'DataMerger',
     'merge_day_data',
+    'suspicion_reasons',
 ]
@@ -276,6 +276,14 @@ class CrossValidator:
             result = self.validate(day, secondary, calculated)
             results.append(result)
 
+        return self.summarize(results)
+
+    def summarize(self, results: list[CrossValidationResult]) -> dict:
+        """
+        Tổng hợp kết quả validate (format giống validate_batch).
+
+        Dùng khi các ngày được validate dần (streaming) thay vì cả batch.
+        """
         # Build summary
         critical_errors = []
         warnings = []
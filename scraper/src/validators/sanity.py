@@ -0,0 +1,68 @@
+"""
+Kiểm tra nhanh (local, không network, không Node.js) 1 DayData của lichngaytot.com.
+
+Dùng để quyết định có cần fetch xemngay.com cross-validate ngày đó hay không:
+ngày qua hết các kiểm tra thì nguồn phụ gần như không thêm được gì.
+
+- Can Chi ngày phải khớp chu kỳ 60 ngày tính từ Julian Day Number
+- Can Chi năm phải khớp năm âm lịch
+- Không còn giá trị mặc định mà parser dùng khi không tìm thấy dữ liệu
+- Có đủ 28 Sao, 12 Trực và đúng 6 giờ hoàng đạo
+"""
+from datetime import date
+
+from ..models.day_data import CanChi, DayData
+from ..parsers.patterns import CANS, CHIS
+
+# Julian Day Number = date.toordinal() + JDN_OFFSET
+JDN_OFFSET = 1721425
+
+# Mỗi ngày có 6 giờ hoàng đạo / 6 giờ hắc đạo
+HOANG_DAO_HOURS_PER_DAY = 6
+
+
+def day_can_chi(target_date: date) -> CanChi:
+    """Can Chi của ngày dương lịch (chu kỳ 60 ngày theo Julian Day Number)."""
+    jdn = target_date.toordinal() + JDN_OFFSET
+    return CanChi(can=CANS[(jdn + 9) % 10], chi=CHIS[(jdn + 1) % 12])
+
+
+def year_can_chi(lunar_year: int) -> CanChi:
+    """Can Chi của năm âm lịch (năm 4 là Giáp Tý)."""
+    return CanChi(can=CANS[(lunar_year - 4) % 10], chi=CHIS[(lunar_year - 4) % 12])
+
+
+def suspicion_reasons(day: DayData) -> list[str]:
+    """
+    Lý do DayData đáng ngờ, rỗng nếu qua hết các kiểm tra.
+
+    Args:
+        day: DayData parse từ lichngaytot.com
+
+    Returns:
+        List mã lý do (vd: "day_can_chi", "missing_star28")
+    """
+    reasons = []
+
+    expected_day = day_can_chi(day.solar_date)
+    if (day.can_chi.day.can, day.can_chi.day.chi) != (expected_day.can, expected_day.chi):
+        reasons.append("day_can_chi")
+
+    expected_year = year_can_chi(day.lunar_date.year)
+    if (day.can_chi.year.can, day.can_chi.year.chi) != (expected_year.can, expected_year.chi):
+        reasons.append("year_can_chi")
+
+    # Parser giữ 1/1 khi không tìm được ngày âm; mùng 1 tháng Giêng thật chỉ rơi vào tháng 1-2
+    if day.lunar_date.day == 1 and day.lunar_date.month == 1 and day.solar_date.month > 2:
+        reasons.append("lunar_date_default")
+
+    if day.star28 is None:
+        reasons.append("missing_star28")
+    if day.truc12 is None:
+        reasons.append("missing_truc12")
+
+    hoang_dao = sum(hour.is_hoang_dao for hour in day.hoang_dao_hours)
+    if hoang_dao != HOANG_DAO_HOURS_PER_DAY:
+        reasons.append("hoang_dao_hours")
+
+    return reasons
@@ -0,0 +1,50 @@
+"""Backend lxml và bs4 cho ra cùng text và cùng DayData trên bộ fixture."""
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.fixtures import lichngaytot_page, xemngay_page
+from src.parsers import LichNgayTotParser, XemNgayParser
+from src.parsers.backends import LxmlContext, SoupContext
+from src.parsers.context import CONTAINERS
+
+# 2 năm (có tháng nhuận 2025); bước 11 ngày nguyên tố cùng nhau với chu kỳ 60 / 28 / 12
+# nên đi qua mọi Can Chi ngày, Sao và Trực
+CORPUS = [date(2024, 1, 1) + timedelta(days=i) for i in range(0, 731, 11)]
+
+SOURCES = [
+    pytest.param(LichNgayTotParser, lichngaytot_page, id="lichngaytot"),
+    pytest.param(XemNgayParser, xemngay_page, id="xemngay"),
+]
+
+
+@pytest.mark.parametrize("parser_class, page", SOURCES)
+def test_contexts_extract_same_text(parser_class, page):
+    for day in CORPUS:
+        html = page(day)
+        soup, lxml_ctx = SoupContext(html), LxmlContext(html)
+        assert lxml_ctx.text == soup.text, day
+        assert lxml_ctx.title_text == soup.title_text, day
+        for key in CONTAINERS:
+            assert lxml_ctx.container_texts(*key) == soup.container_texts(*key), (day, key)
+
+
+@pytest.mark.parametrize("parser_class, page", SOURCES)
+def test_backends_parse_same_day_data(parser_class, page):
+    soup_parser, lxml_parser = parser_class(backend="bs4"), parser_class(backend="lxml")
+    for day in CORPUS:
+        html = page(day)
+        expected = soup_parser.parse(html, day)
+        assert expected is not None, day
+        assert lxml_parser.parse(html, day) == expected, day
+
+
+@pytest.mark.parametrize("html", [
+    "<!DOCTYPE html>\n<html>\n<head><title> T </title></head>\n<body>\n<p>a</p>\n</body>\n</html>",
+    "<html><head><script>x</script><style>y</style></head><body><!-- c --><p>a&nbsp;b</p>"
+    "<template>t</template>tail</body></html>",
+    "<html><body><div><p>a<div>b</p></div>c<table><tr>t<td>d</td></tr></table></body></html>",
+    "<body>  \t x \r\n</body>",
+])
+def test_contexts_match_on_markup_edge_cases(html):
+    assert LxmlContext(html).text == SoupContext(html).text
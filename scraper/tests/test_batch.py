@@ -0,0 +1,88 @@
+"""Parse lại HTML đã lưu: đọc cache / archive theo ngày, BatchParser inline vs pool."""
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.fixtures import lichngaytot_page, xemngay_page
+from src.parsers import BatchParser, LichNgayTotParser
+from src.scrapers.lichngaytot import LichNgayTotScraper, XemNgayScraper
+from src.storage.html_archive import HTMLArchive
+from src.storage.html_cache import HTMLCache
+
+DAYS = [date(2025, 2, 1) + timedelta(days=i) for i in range(6)]
+PREFIX = LichNgayTotScraper.BASE_URL
+
+
+def _store(put) -> None:
+    """Ghi trang của 2 nguồn, không theo thứ tự ngày, kèm 1 trang lỗi và 1 trang không có ngày."""
+    primary, secondary = LichNgayTotScraper(), XemNgayScraper()
+    for day in reversed(DAYS):
+        put(primary.build_url(day), lichngaytot_page(day), 200, day)
+        put(secondary.build_url(day), xemngay_page(day), 200, day)
+    put(f"{PREFIX}/missing", "not found", 404, date(2025, 2, 3))
+    put(f"{PREFIX}/", "home", 200, None)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTMLCache(tmp_path / "raw")
+    _store(cache.put)
+    return cache
+
+
+@pytest.fixture(params=["dir", "zip"])
+def archive(tmp_path, request):
+    path = tmp_path / ("archive.zip" if request.param == "zip" else "archive")
+    with HTMLArchive(path, mode="w") as writer:
+        _store(writer.put)
+    with HTMLArchive(path) as reader:
+        yield reader
+
+
+def test_cache_iter_by_date(cache):
+    pages = list(cache.iter_by_date(PREFIX))
+    assert [day for day, _ in pages] == DAYS
+    assert [html for _, html in pages] == [lichngaytot_page(day) for day in DAYS]
+
+    window = list(cache.iter_by_date(PREFIX, DAYS[1], DAYS[3]))
+    assert [day for day, _ in window] == DAYS[1:4]
+
+
+def test_cache_iter_by_date_skips_missing_bodies(cache):
+    entry = cache.lookup(LichNgayTotScraper().build_url(DAYS[2]))
+    cache._object_path(entry.content_hash).unlink()
+    assert [day for day, _ in cache.iter_by_date(PREFIX)] == DAYS[:2] + DAYS[3:]
+
+
+def test_archive_iter_by_date(archive):
+    pages = list(archive.iter_by_date(PREFIX))
+    assert [day for day, _ in pages] == DAYS
+    assert [html for _, html in pages] == [lichngaytot_page(day) for day in DAYS]
+
+    window = list(archive.iter_by_date(PREFIX, end_date=DAYS[1]))
+    assert [day for day, _ in window] == DAYS[:2]
+
+
+@pytest.fixture(scope="module")
+def pages():
+    return [(day, lichngaytot_page(day)) for day in DAYS]
+
+
+@pytest.fixture(scope="module")
+def expected(pages):
+    parser = LichNgayTotParser()
+    return [(day, parser.parse(html, day)) for day, html in pages]
+
+
+def test_small_batch_parses_inline(pages, expected):
+    batch = BatchParser(LichNgayTotParser(), workers=4, min_pool_pages=len(pages) + 1)
+    assert list(batch.parse_many(iter(pages))) == expected
+    assert batch.stats.workers == 1
+    assert len(batch.stats.per_worker) == 1
+
+
+def test_pool_above_threshold_keeps_order(pages, expected):
+    batch = BatchParser(LichNgayTotParser(), workers=2, chunk_size=2, min_pool_pages=len(pages))
+    assert list(batch.parse_many(iter(pages))) == expected
+    assert batch.stats.workers == 2
+    assert batch.stats.pages == len(pages)
@@ -0,0 +1,52 @@
+"""bounded_as_completed: giới hạn số task đang chạy, hủy task khi consumer dừng sớm."""
+import asyncio
+from contextlib import aclosing
+
+from src.utils.concurrency import bounded_as_completed
+
+
+def test_bounds_in_flight_tasks():
+    started = []
+    running = 0
+    peak = 0
+
+    async def work(i: int) -> int:
+        nonlocal running, peak
+        started.append(i)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001 * (i % 3))
+        running -= 1
+        return i * 10
+
+    async def run() -> list[int]:
+        return [result async for result in bounded_as_completed(range(10), work, max_pending=3)]
+
+    results = asyncio.run(run())
+    assert sorted(results) == [i * 10 for i in range(10)]
+    assert started == list(range(10))
+    assert peak <= 3
+
+
+def test_early_close_cancels_pending_tasks():
+    cancelled = []
+
+    async def work(i: int) -> int:
+        if i == 0:
+            return i
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(i)
+            raise
+
+    async def run() -> None:
+        async with aclosing(bounded_as_completed(range(100), work, max_pending=4)) as results:
+            async for result in results:
+                assert result == 0
+                break
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    # Item mới chỉ bắt đầu khi consumer lấy tiếp, nên chỉ còn 3 task và cả 3 bị hủy
+    assert sorted(cancelled) == [1, 2, 3]
@@ -0,0 +1,60 @@
+"""HTMLArchive: ghi thêm vào archive đã có, ghi index định kỳ."""
+import zipfile
+from datetime import date
+
+import pytest
+
+from src.storage.html_archive import HTMLArchive
+
+
+def _url(i: int) -> str:
+    return f"https://example.com/day-{i}.html"
+
+
+@pytest.fixture(params=["dir", "zip"])
+def path(tmp_path, request):
+    return tmp_path / ("archive.zip" if request.param == "zip" else "archive")
+
+
+def test_write_appends_to_existing_archive(path):
+    with HTMLArchive(path, mode="w") as writer:
+        writer.put(_url(1), "first", target_date=date(2025, 1, 1))
+
+    # Lần record sau (vd: --resume --record) không làm mất trang cũ
+    with HTMLArchive(path, mode="w") as writer:
+        assert _url(1) in writer
+        writer.put(_url(1), "ignored")
+        writer.put(_url(2), "second", status_code=404)
+
+    with HTMLArchive(path) as reader:
+        assert sorted(reader.urls()) == [_url(1), _url(2)]
+        assert reader.fetch(_url(1)).html == "first"
+        assert reader.fetch(_url(1)).target_date == date(2025, 1, 1)
+        assert reader.fetch(_url(2)).status_code == 404
+
+
+def test_reopen_without_new_pages_keeps_index(path):
+    with HTMLArchive(path, mode="w") as writer:
+        writer.put(_url(1), "first")
+    HTMLArchive(path, mode="w").close()
+
+    with HTMLArchive(path) as reader:
+        assert reader.urls() == [_url(1)]
+    if path.suffix == ".zip":
+        assert zipfile.ZipFile(path).namelist().count(HTMLArchive.INDEX_NAME) == 1
+
+
+def test_directory_index_flushed_before_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(HTMLArchive, "FLUSH_EVERY", 2)
+    path = tmp_path / "archive"
+    writer = HTMLArchive(path, mode="w")
+    for i in range(3):
+        writer.put(_url(i), f"page {i}")
+
+    # Process bị kill trước close(): index đã có 2 trang đầu
+    with HTMLArchive(path) as reader:
+        assert sorted(reader.urls()) == [_url(0), _url(1)]
+
+    writer.close()
+    with HTMLArchive(path) as reader:
+        assert len(reader) == 3
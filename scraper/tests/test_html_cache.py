@@ -0,0 +1,140 @@
+"""HTMLCache: TTL, revalidate entry hết hạn bằng conditional request (304 dùng lại body)."""
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.scrapers.lichngaytot import LichNgayTotScraper
+from src.scrapers.rate_limiter import AdaptiveRateLimiter
+from src.scrapers.resilience import CircuitBreaker, RetryBudget
+from src.storage.html_cache import HTMLCache
+
+URL = "https://lichngaytot.com/xem-ngay-tot-xau-01-01-2025"
+
+
+def _age(cache: HTMLCache, url: str, age: timedelta) -> None:
+    """Lùi fetched_at của entry về quá khứ."""
+    with sqlite3.connect(cache.db_path) as conn:
+        conn.execute(
+            "UPDATE pages SET fetched_at = ? WHERE url = ?",
+            ((datetime.now() - age).isoformat(), url),
+        )
+
+
+def test_entry_expires_after_ttl(tmp_path):
+    cache = HTMLCache(tmp_path, ttl=timedelta(hours=1))
+    cache.put(URL, "<html>v1</html>", etag='"v1"')
+    assert cache.get(URL).html == "<html>v1</html>"
+
+    _age(cache, URL, timedelta(hours=2))
+    assert cache.get(URL) is None
+    assert cache.stale == 1
+    # Entry hết hạn vẫn còn metadata để gửi conditional request
+    stale = cache.lookup(URL)
+    assert stale.conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_no_ttl_never_expires(tmp_path):
+    cache = HTMLCache(tmp_path, ttl=None)
+    cache.put(URL, "<html>v1</html>")
+    _age(cache, URL, timedelta(days=3650))
+    assert cache.get(URL).html == "<html>v1</html>"
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    """Trả 304 nếu If-None-Match khớp ETag hiện tại, ngược lại trả body."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.end_headers()
+            return
+        body = server.body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+    server.requests = []
+    server.etag = '"v1"'
+    server.body = "<html>v1</html>"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    cache = HTMLCache(tmp_path, ttl=timedelta(hours=1))
+    with LichNgayTotScraper(
+        cache=cache,
+        rate_limiter=AdaptiveRateLimiter(rate=100.0, burst=10),
+        circuit_breaker=CircuitBreaker(),
+        retry_budget=RetryBudget(),
+        max_retries=0,
+    ) as scraper:
+        yield scraper
+
+
+def test_stale_entry_revalidated_with_304(server, scraper):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    first = scraper.fetch_page(url)
+    assert first.html == "<html>v1</html>"
+    assert "If-None-Match" not in server.requests[0]
+
+    # Còn trong TTL: không gửi request
+    assert scraper.fetch_page(url).from_cache
+    assert len(server.requests) == 1
+
+    _age(scraper.cache, url, timedelta(hours=2))
+    revalidated = scraper.fetch_page(url)
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert revalidated.not_modified
+    assert revalidated.html == "<html>v1</html>"
+    assert scraper.cache.revalidated == 1
+
+    # 304 làm mới fetched_at: entry lại còn hiệu lực
+    assert scraper.fetch_page(url).from_cache
+    assert len(server.requests) == 2
+
+
+def test_stale_entry_replaced_when_page_changed(server, scraper):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    scraper.fetch_page(url)
+    _age(scraper.cache, url, timedelta(hours=2))
+
+    server.etag, server.body = '"v2"', "<html>v2</html>"
+    result = scraper.fetch_page(url)
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert not result.not_modified
+    assert result.html == "<html>v2</html>"
+    assert scraper.cache.lookup(url).etag == '"v2"'
+
+
+def test_304_with_missing_body_refetches(server, scraper):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    scraper.fetch_page(url)
+    entry = scraper.cache.lookup(url)
+    scraper.cache._object_path(entry.content_hash).unlink()
+    _age(scraper.cache, url, timedelta(hours=2))
+
+    result = scraper.fetch_page(url)
+    # Conditional request trả 304 nhưng body đã mất -> tải lại không điều kiện
+    assert [("If-None-Match" in headers) for headers in server.requests] == [False, True, False]
+    assert result.html == "<html>v1</html>"
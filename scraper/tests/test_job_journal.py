@@ -0,0 +1,52 @@
+"""JobJournal: --resume bỏ qua ngày đã xong, retry ngày lỗi."""
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.fixtures import lichngaytot_page
+from src.parsers import LichNgayTotParser
+from src.storage.job_journal import JobJournal
+
+START = date(2025, 3, 1)
+DAYS = [START + timedelta(days=i) for i in range(5)]
+JOB_ID = "lichngaytot.com:2025-03-01:2025-03-05"
+
+
+def _day_data(day: date):
+    return LichNgayTotParser().parse(lichngaytot_page(day), day)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    """Job bị dừng giữa chừng: 2 ngày xong, 1 ngày lỗi, 2 ngày chưa chạy."""
+    journal = JobJournal(JOB_ID, tmp_path / "jobs.db")
+    assert journal.start(DAYS[0], DAYS[-1]) == 5
+    journal.mark_done(_day_data(DAYS[0]))
+    journal.mark_failed(DAYS[1], "HTTP 503")
+    journal.mark_done(_day_data(DAYS[2]))
+    return journal
+
+
+def test_resume_skips_done_and_retries_failed(journal):
+    resumed = JobJournal(JOB_ID, journal.db_path)
+    assert resumed.start(DAYS[0], DAYS[-1], resume=True) == 3
+    assert resumed.remaining_dates() == [DAYS[1], DAYS[3], DAYS[4]]
+    assert resumed.get_progress() == {"total": 5, "done": 2, "failed": 1, "pending": 2}
+    assert [d.solar_date for d in resumed.get_results()] == [DAYS[0], DAYS[2]]
+
+    # Ngày lỗi thành công ở lần chạy lại
+    resumed.mark_done(_day_data(DAYS[1]))
+    assert resumed.remaining_dates() == [DAYS[3], DAYS[4]]
+    assert resumed.get_results()[1] == _day_data(DAYS[1])
+
+
+def test_start_without_resume_resets_job(journal):
+    restarted = JobJournal(JOB_ID, journal.db_path)
+    assert restarted.start(DAYS[0], DAYS[-1]) == 5
+    assert restarted.get_results() == []
+
+
+def test_jobs_are_independent(journal):
+    other = JobJournal("xemngay.com:2025-03-01:2025-03-05", journal.db_path)
+    assert other.start(DAYS[0], DAYS[-1], resume=True) == 5
+    assert journal.remaining_dates() == [DAYS[1], DAYS[3], DAYS[4]]
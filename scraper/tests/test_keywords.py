@@ -0,0 +1,113 @@
+"""KeywordScanner so với oracle brute-force (thử mọi keyword tại mọi vị trí)."""
+import itertools
+import random
+from datetime import date, timedelta
+from typing import Optional
+
+import pytest
+
+from benchmarks.fixtures import lichngaytot_page
+from src.parsers import LichNgayTotParser
+from src.parsers.backends import make_context
+from src.parsers.keywords import KeywordHit, KeywordScanner
+from src.parsers.patterns import DIRECTIONS, TIET_KHI
+
+# Tên trong registry phải duy nhất
+_names = itertools.count()
+
+
+def make_scanner(keywords: list[str], ignore_case: bool = False) -> KeywordScanner:
+    return KeywordScanner(f'test_keywords.{next(_names)}', keywords, ignore_case=ignore_case)
+
+
+def brute_force(
+    keywords: list[str],
+    text: str,
+    pos: int = 0,
+    endpos: Optional[int] = None,
+    ignore_case: bool = False,
+) -> list[KeywordHit]:
+    """Mọi lần xuất hiện của mọi keyword trong text[pos:endpos], theo (start, end)."""
+    if endpos is None:
+        endpos = len(text)
+    # Keyword trùng nhau (sau lower()): keyword đầu tiên thắng, như KeywordScanner
+    vocabulary: dict[str, str] = {}
+    for keyword in keywords:
+        vocabulary.setdefault(keyword.lower() if ignore_case else keyword, keyword)
+    hits = [
+        KeywordHit(keyword, start, start + len(key))
+        for start in range(pos, endpos)
+        for key, keyword in vocabulary.items()
+        if start + len(key) <= endpos and text.startswith(key, start)
+    ]
+    return sorted(hits, key=lambda hit: (hit.start, hit.end))
+
+
+def test_overlapping_and_nested_hits():
+    keywords = ['he', 'she', 'his', 'hers']
+    text = 'ushers'
+    assert make_scanner(keywords).scan(text) == brute_force(keywords, text) == [
+        KeywordHit('she', 1, 4),
+        KeywordHit('he', 2, 4),
+        KeywordHit('hers', 2, 6),
+    ]
+
+
+def test_prefix_keywords_at_same_start():
+    keywords = ['a', 'ab', 'abcd']
+    text = 'abcabcd'
+    assert make_scanner(keywords).scan(text) == brute_force(keywords, text)
+
+
+def test_regex_metacharacters_are_literal():
+    keywords = ['a.b', '(x)', 'c+', '[', '\\d']
+    text = 'a.b axb (x) cc+ [\\d] \\d'
+    assert make_scanner(keywords).scan(text) == brute_force(keywords, text)
+
+
+def test_ignore_case_returns_keyword_as_listed():
+    keywords = ['Lập xuân', 'Đông', 'Chính Đông', 'đông']
+    text = 'hướng chính đông, lập xuân, đông'
+    hits = make_scanner(keywords, ignore_case=True).scan(text)
+    assert hits == brute_force(keywords, text, ignore_case=True)
+    assert {hit.keyword for hit in hits} == {'Lập xuân', 'Đông', 'Chính Đông'}
+
+
+def test_empty_keyword_rejected():
+    with pytest.raises(ValueError):
+        make_scanner(['a', ''])
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_vocabularies_match_brute_force(seed):
+    rng = random.Random(seed)
+    # Bảng chữ cái nhỏ để keyword chồng lấn / làm prefix của nhau thường xuyên
+    alphabet = 'abcđ. '
+    keywords = [
+        ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+        for _ in range(rng.randint(1, 12))
+    ]
+    ignore_case = seed % 2 == 1
+    scanner = make_scanner(keywords, ignore_case=ignore_case)
+
+    for _ in range(20):
+        text = ''.join(rng.choice(alphabet + 'x') for _ in range(rng.randint(0, 60)))
+        assert scanner.scan(text) == brute_force(keywords, text, ignore_case=ignore_case), text
+
+        pos = rng.randint(0, len(text))
+        endpos = rng.randint(pos, len(text))
+        assert scanner.scan(text, pos, endpos) == brute_force(
+            keywords, text, pos, endpos, ignore_case=ignore_case
+        ), (text, pos, endpos)
+
+
+@pytest.mark.parametrize("day", [date(2025, 1, 1) + timedelta(days=i) for i in range(0, 365, 45)])
+def test_parser_vocabularies_on_fixture_pages(day):
+    text = make_context(lichngaytot_page(day), 'bs4').text
+    text_lower = text.lower()
+
+    assert LichNgayTotParser.TIET_KHI_SCANNER.scan(text_lower) == brute_force(
+        TIET_KHI, text_lower, ignore_case=True
+    )
+    directions = make_scanner(DIRECTIONS, ignore_case=True)
+    assert directions.scan(text_lower) == brute_force(DIRECTIONS, text_lower, ignore_case=True)
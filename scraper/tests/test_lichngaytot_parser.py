@@ -0,0 +1,31 @@
+"""LichNgayTotParser: tên tháng âm lịch trong div.calendar-info2."""
+import re
+from datetime import date
+
+import pytest
+
+from benchmarks.fixtures import lichngaytot_page
+from src.parsers import LichNgayTotParser
+
+DAY = date(2024, 11, 20)
+
+
+def _page_with_month(month_name: str) -> str:
+    """Trang fixture với tên tháng âm lịch khác trong div.calendar-info2."""
+    page, count = re.subn(r'THÁNG [^<]*</div>', f'THÁNG {month_name}</div>', lichngaytot_page(DAY), count=1)
+    assert count == 1
+    return page
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+@pytest.mark.parametrize("month_name, month", [
+    ("GIÊNG", 1),
+    ("MƯỜI", 10),
+    # 'tháng mười một' / 'tháng mười hai' cũng chứa 'tháng mười'
+    ("MƯỜI MỘT", 11),
+    ("MƯỜI HAI", 12),
+    ("CHẠP", 12),
+])
+def test_lunar_month_name(backend, month_name, month):
+    day_data = LichNgayTotParser(backend=backend).parse(_page_with_month(month_name), DAY)
+    assert day_data.lunar_date.month == month
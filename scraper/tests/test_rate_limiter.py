@@ -0,0 +1,113 @@
+"""AdaptiveRateLimiter: token bucket, AIMD, Retry-After."""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.pipeline.sharded import slice_rate_budget
+from src.scrapers import rate_limiter
+from src.scrapers.rate_limiter import (
+    DEFAULT_MAX_RATE,
+    AdaptiveRateLimiter,
+    limiter_kwargs_from_delay_range,
+    parse_retry_after,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Đồng hồ giả cho rate_limiter: time.monotonic() chỉ đổi khi test tăng clock.now."""
+    fake = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+def test_bucket_allows_burst_then_spaces_requests(clock):
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=2, max_rate=1.0)
+    assert [limiter._reserve() for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+
+    # Hết hàng đợi và bucket đầy lại sau 4s
+    clock.now += 4.0
+    assert limiter._reserve() == 0.0
+
+
+def test_retry_after_keeps_spacing_after_block(clock):
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=1, max_rate=1.0)
+    limiter._reserve()
+    limiter.record_response(429, 0.1, retry_after=10)
+    assert limiter.rate == 0.5
+    assert limiter.state == "blocked"
+
+    # Request đầu đi lúc hết chặn, các request sau cách nhau 1 / rate (2s)
+    assert [limiter._reserve() for _ in range(5)] == [10.0, 12.0, 14.0, 16.0, 18.0]
+
+    clock.now += 5.0
+    assert limiter._reserve() == 15.0
+
+
+def test_retry_after_without_queue(clock):
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=1, max_rate=1.0)
+    limiter.record_response(503, 0.1, retry_after=3)
+    clock.now += 3.0
+    assert limiter.state != "blocked"
+    assert limiter._reserve() == 0.0
+
+
+def test_aimd(clock):
+    limiter = AdaptiveRateLimiter(
+        rate=1.0, min_rate=0.2, max_rate=1.2, increase_step=0.1, cooldown=30.0, latency_target=3.0,
+    )
+
+    limiter.record_response(200, 0.1)
+    assert limiter.rate == pytest.approx(1.1)
+    limiter.record_response(200, 0.1)
+    limiter.record_response(200, 0.1)
+    assert limiter.rate == pytest.approx(1.2)   # Trần max_rate
+
+    limiter.record_response(500, 0.1)
+    assert limiter.rate == pytest.approx(0.6)
+    limiter.record_response(None, 0.1)          # Lỗi kết nối
+    limiter.record_response(429, 0.1)
+    assert limiter.rate == pytest.approx(0.2)   # Sàn min_rate
+    assert limiter.backoffs == 3
+    assert limiter.throttled == 1
+
+    # Trong cooldown: response tốt không tăng rate
+    limiter.record_response(200, 0.1)
+    assert limiter.rate == pytest.approx(0.2)
+    assert limiter.state == "backoff"
+
+    clock.now += 30.0
+    limiter.record_response(200, 0.1)
+    assert limiter.rate == pytest.approx(0.3)
+    limiter.record_response(200, 5.0)           # Chậm hơn latency_target
+    assert limiter.rate == pytest.approx(0.27)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after(" 120 ") == 120.0
+    assert parse_retry_after("soon") is None
+
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(future) <= 60
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1), usegmt=True)
+    assert parse_retry_after(past) == 0.0
+
+
+def test_delay_range_sets_start_rate_not_ceiling():
+    kwargs = limiter_kwargs_from_delay_range((1.0, 2.0))
+    assert kwargs["rate"] == pytest.approx(2 / 3)
+    assert kwargs["max_rate"] == DEFAULT_MAX_RATE
+
+    assert limiter_kwargs_from_delay_range((1.0, 2.0), max_rate=2.5)["max_rate"] == 2.5
+    # Trần không thấp hơn rate khởi đầu
+    assert limiter_kwargs_from_delay_range((0.1, 0.1), max_rate=2.0)["max_rate"] == pytest.approx(10.0)
+
+
+def test_slice_rate_budget_splits_ceiling():
+    budget = slice_rate_budget((1.0, 2.0), workers=4, max_rate=4.0)
+    assert budget["rate"] == pytest.approx(1 / 6)
+    assert budget["max_rate"] == pytest.approx(1.0)
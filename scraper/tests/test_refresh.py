@@ -0,0 +1,83 @@
+"""RefreshScheduler: ngày refresh fail được backoff và ghi dead letters."""
+from datetime import date, datetime, timedelta
+
+from src.pipeline.refresh import RefreshPolicy, RefreshScheduler
+from src.scrapers.core import DayResult
+from src.storage.dead_letter import DeadLetterStore
+from src.storage.sqlite_storage import SQLiteStorage
+
+NOW = datetime(2025, 3, 1, 12, 0)
+TODAY = NOW.date()
+
+
+class FailingScraper:
+    """Scraper giả: mọi ngày đều fail với 503."""
+
+    host = "lichngaytot.com"
+
+    def __init__(self):
+        self.calls: list[date] = []
+
+    def enable_change_detection(self, storage) -> None:
+        pass
+
+    def scrape_day_result(self, target_date: date) -> DayResult:
+        self.calls.append(target_date)
+        return DayResult(target_date, error="503 Service Unavailable", error_type="HTTPError")
+
+
+def make_scheduler(tmp_path, dead_letters=None):
+    storage = SQLiteStorage(tmp_path / "days.db")
+    policy = RefreshPolicy(horizon_days=0, max_per_cycle=10)
+    return RefreshScheduler(FailingScraper(), storage, policy=policy, dead_letters=dead_letters)
+
+
+def test_backoff_doubles_and_is_capped():
+    policy = RefreshPolicy(failure_backoff=timedelta(minutes=30), max_failure_backoff=timedelta(hours=3))
+    assert policy.backoff_for(1) == timedelta(minutes=30)
+    assert policy.backoff_for(2) == timedelta(hours=1)
+    assert policy.backoff_for(3) == timedelta(hours=2)
+    assert policy.backoff_for(10) == timedelta(hours=3)
+
+
+def test_failing_day_ranks_after_unchecked_days():
+    policy = RefreshPolicy(horizon_days=2)
+    failures = {TODAY: (NOW - timedelta(hours=5), 1)}
+    due = policy.due_dates(NOW, {}, failures)
+    assert due == [TODAY + timedelta(days=1), TODAY + timedelta(days=2), TODAY]
+
+
+def test_failed_day_waits_for_backoff(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+
+    stats = scheduler.run_cycle(NOW)
+    assert stats["failed"] == 1
+    assert scheduler.storage.get_check_failures(TODAY, TODAY) == {TODAY: (NOW, 1)}
+
+    # Trước đây ngày fail luôn có ưu tiên inf và được thử lại mỗi chu kỳ
+    stats = scheduler.run_cycle(NOW + timedelta(minutes=15))
+    assert stats["due"] == 0
+    assert stats["backing_off"] == 1
+
+    later = NOW + timedelta(minutes=31)
+    scheduler.run_cycle(later)
+    assert scheduler.storage.get_check_failures(TODAY, TODAY) == {TODAY: (later, 2)}
+    # Lần fail thứ 2: chờ 1 giờ
+    assert scheduler.run_cycle(later + timedelta(minutes=45))["due"] == 0
+    assert scheduler.scraper.calls == [TODAY, TODAY]
+
+
+def test_mark_checked_clears_failures(tmp_path):
+    storage = SQLiteStorage(tmp_path / "days.db")
+    storage.mark_check_failed(TODAY, NOW)
+    storage.mark_checked(TODAY, changed=False, checked_at=NOW)
+    assert storage.get_check_failures(TODAY, TODAY) == {}
+    assert storage.get_checked_at(TODAY, TODAY) == {TODAY: NOW}
+
+
+def test_failed_day_is_dead_lettered(tmp_path):
+    dead_letters = DeadLetterStore(tmp_path / "dead.db")
+    scheduler = make_scheduler(tmp_path, dead_letters)
+    scheduler.run_cycle(NOW)
+    pending = dead_letters.pending(["lichngaytot.com"])
+    assert [(letter.solar_date, letter.error_type) for letter in pending] == [(TODAY, "HTTPError")]
@@ -0,0 +1,158 @@
+"""Circuit breaker: chuyển trạng thái, trả lại lượt thăm dò khi request bị hủy; retry budget."""
+import asyncio
+
+import pytest
+
+from src.scrapers.lichngaytot import AsyncLichNgayTotScraper, LichNgayTotScraper
+from src.scrapers.rate_limiter import RateLimiter
+from src.scrapers import resilience
+from src.scrapers.resilience import CircuitBreaker, CircuitOpenError, RetryBudget
+
+
+class BlockingLimiter(RateLimiter):
+    """Limiter không bao giờ cho gửi (async) / fail với lỗi không phải HTTP (sync)."""
+
+    def __init__(self):
+        self.waiting = asyncio.Event()
+
+    def _reserve(self) -> float:
+        return 0.0
+
+    def acquire(self) -> float:
+        raise RuntimeError("limiter broken")
+
+    async def acquire_async(self) -> float:
+        self.waiting.set()
+        await asyncio.Event().wait()
+        return 0.0
+
+    def snapshot(self) -> dict:
+        return {}
+
+
+def half_open_breaker() -> CircuitBreaker:
+    """Breaker vừa mở, reset_timeout=0 nên request kế tiếp là request thăm dò."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_response(503)
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+    breaker.record_response(503)
+    breaker.record_response(None)
+    breaker.record_response(200)  # thành công reset bộ đếm
+    breaker.record_response(503)
+    breaker.record_response(429)
+    assert breaker.state == "closed"
+
+    breaker.record_response(500)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("host")
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_client_errors_do_not_count():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_response(404)
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_single_probe():
+    breaker = half_open_breaker()
+    breaker.before_request("host")
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("host")
+
+
+def test_probe_success_closes():
+    breaker = half_open_breaker()
+    breaker.before_request("host")
+    breaker.record_response(200)
+    assert breaker.state == "closed"
+    breaker.before_request("host")
+
+
+def test_probe_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_response(503)
+    breaker._opened_at -= 60.0
+    breaker.before_request("host")
+    breaker.record_response(503)
+    assert breaker.state == "open"
+    assert breaker.retry_in() > 0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("host")
+
+
+def test_release_probe_allows_next_probe():
+    breaker = half_open_breaker()
+    breaker.before_request("host")
+    breaker.release_probe("host")
+    breaker.before_request("host")
+    assert breaker.state == "half_open"
+
+
+def test_release_probe_is_noop_when_closed():
+    breaker = CircuitBreaker()
+    breaker.release_probe("host")
+    assert breaker.state == "closed"
+
+
+def test_cancelled_async_probe_is_released():
+    breaker = half_open_breaker()
+    limiter = BlockingLimiter()
+
+    async def run() -> None:
+        async with AsyncLichNgayTotScraper(
+            rate_limiter=limiter, circuit_breaker=breaker, max_retries=0
+        ) as scraper:
+            task = asyncio.create_task(scraper._download_once("http://127.0.0.1:9/"))
+            await limiter.waiting.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(run())
+    # Probe bị hủy không được chặn host mãi mãi
+    breaker.before_request("host")
+
+
+def test_non_http_error_releases_sync_probe():
+    breaker = half_open_breaker()
+    with LichNgayTotScraper(rate_limiter=BlockingLimiter(), circuit_breaker=breaker) as scraper:
+        with pytest.raises(RuntimeError):
+            scraper._download_once("http://127.0.0.1:9/")
+    breaker.before_request("host")
+
+
+def test_retry_budget_scales_with_max_retries():
+    budget = RetryBudget(min_retries=0, max_retries=3)
+    assert budget.ratio == pytest.approx(0.3)
+    for _ in range(15):
+        budget.record_request()
+    assert sum(budget.try_spend() for _ in range(7)) == 5   # retries < 0.3 * 15
+    assert budget.exhausted == 2
+
+    budget.size_for(5)
+    assert budget.ratio == pytest.approx(0.5)
+    budget.size_for(1)  # Chỉ nới, không thu hẹp
+    assert budget.ratio == pytest.approx(0.5)
+
+
+def test_fixed_ratio_is_not_resized():
+    budget = RetryBudget(ratio=0.2)
+    budget.size_for(10)
+    assert budget.ratio == 0.2
+
+
+def test_scraper_sizes_shared_budget(monkeypatch):
+    monkeypatch.setattr(resilience, "_retry_budget", RetryBudget())
+    with LichNgayTotScraper(max_retries=2) as scraper:
+        assert scraper.retry_budget is resilience._retry_budget
+        assert scraper.retry_budget.ratio == pytest.approx(0.2)
+    with LichNgayTotScraper(max_retries=5):
+        assert resilience._retry_budget.ratio == pytest.approx(0.5)
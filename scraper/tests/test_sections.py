@@ -0,0 +1,103 @@
+"""Segmenter: biên [start, end) của từng section."""
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.fixtures import lichngaytot_page
+from src.parsers import LichNgayTotParser
+from src.parsers.backends import make_context
+from src.parsers.sections import Heading, Section, Segmenter
+
+# Tên trong registry phải duy nhất nên dựng 1 lần cho cả module
+SEGMENTER = Segmenter('test_sections', [
+    Heading('good', r'Nên làm(?=[:\s])', bullet=True),
+    Heading('bad', r'Kỵ\s*làm(?=[:\s])|Kiêng\s*cữ(?=[:\s])', bullet=True),
+    Heading('stars', r'Cát\s*tinh|cát\s*tinh'),
+    Heading('hours', r'Giờ\s+hoàng\s+đạo'),
+])
+
+
+def test_section_runs_to_next_heading_or_end():
+    text = "menu Giờ hoàng đạo: Tý, Sửu Cát tinh: Thiên đức hết"
+    sections = SEGMENTER.segment(text)
+
+    hours_start = text.index("Giờ")
+    stars_start = text.index("Cát")
+    assert sections.get('hours') == Section('hours', hours_start, stars_start)
+    assert sections.get('stars') == Section('stars', stars_start, len(text))
+    assert sections.span_text('hours') == "Giờ hoàng đạo: Tý, Sửu "
+    # Text trước heading đầu tiên không thuộc section nào
+    assert all(span.start >= hours_start for span in sections.spans.values())
+
+
+def test_missing_heading():
+    sections = SEGMENTER.segment("Cát tinh: Thiên đức")
+    assert 'good' not in sections
+    assert sections.get('good') is None
+    assert sections.span_text('good') is None
+
+
+def test_bullet_heading_starts_at_dash():
+    text = "Ngày tốt.\n - Nên làm: cưới hỏi\n-  Kỵ làm: động thổ"
+    sections = SEGMENTER.segment(text)
+
+    good = sections.get('good')
+    bad = sections.get('bad')
+    assert good.start == text.index("-")
+    assert good.end == bad.start == text.rindex("-")
+    assert sections.span_text('good') == "- Nên làm: cưới hỏi\n"
+    assert sections.span_text('bad') == "-  Kỵ làm: động thổ"
+
+
+def test_bullet_heading_without_dash_keeps_leading_whitespace():
+    text = "Cát tinh: A \n Kiêng cữ: B"
+    sections = SEGMENTER.segment(text)
+    # Không có "-": section lùi qua khoảng trắng (như lookahead "-?\s*Heading")
+    assert sections.get('bad').start == text.index("Cát") + len("Cát tinh: A")
+    assert sections.get('stars').end == sections.get('bad').start
+
+
+def test_non_bullet_heading_does_not_take_dash():
+    text = "x - Cát tinh: A"
+    assert SEGMENTER.segment(text).get('stars').start == text.index("Cát")
+
+
+def test_repeated_heading_keeps_first_but_still_ends_previous_section():
+    text = "Cát tinh: A Giờ hoàng đạo: Tý Cát tinh: B Giờ hoàng đạo: Sửu"
+    sections = SEGMENTER.segment(text)
+
+    first_hours = text.index("Giờ")
+    second_stars = text.index("Cát", 1)
+    assert sections.get('stars') == Section('stars', 0, first_hours)
+    assert sections.get('hours') == Section('hours', first_hours, second_stars)
+
+
+def test_heading_requires_delimiter():
+    # "Nên làm" trong câu (không theo sau bởi ":" / khoảng trắng) không phải heading
+    sections = SEGMENTER.segment("Nên làmđẹp Cát tinh: A")
+    assert 'good' not in sections
+    assert sections.get('stars').start == len("Nên làmđẹp ")
+
+
+def test_empty_text():
+    assert SEGMENTER.segment("").spans == {}
+
+
+@pytest.mark.parametrize("day", [date(2025, 1, 1) + timedelta(days=i) for i in range(0, 365, 30)])
+def test_fixture_sections_tile_heading_hits(day):
+    """Trên trang fixture: mỗi section bắt đầu ở 1 heading và không chứa heading nào khác."""
+    segmenter = LichNgayTotParser.SEGMENTER
+    text = make_context(lichngaytot_page(day), 'bs4').text
+    sections = segmenter.segment(text)
+    hits = [match.start() for match in segmenter.pattern.finditer(text)]
+
+    # Fixture không có "Nhân thần"
+    assert set(sections.spans) == {heading.name for heading in segmenter.headings} - {'nhan_than'}
+    for name, span in sections.spans.items():
+        assert 0 <= span.start <= span.end <= len(text)
+        section_text = text[span.start:span.end]
+        heading_start = span.start + len(section_text) - len(section_text.lstrip('- \t\r\n\xa0'))
+        assert heading_start in hits, name
+        assert segmenter._heading_at(text, heading_start).name == name
+        # Heading kế tiếp (nếu có) là biên cuối của section, không có heading nào ở giữa
+        assert [hit for hit in hits if heading_start < hit < span.end] == [], name
@@ -0,0 +1,104 @@
+"""SQLiteStorage: change detection theo page hash, kể cả DB tạo trước khi có cột hash."""
+import sqlite3
+from datetime import date
+
+import pytest
+
+from benchmarks.fixtures import lichngaytot_page
+from src.parsers import LichNgayTotParser
+from src.parsers.version import PARSER_VERSION, versioned_hash
+from src.scrapers.core import FetchResult
+from src.storage.sqlite_storage import SQLiteStorage
+
+DAY = date(2025, 3, 14)
+
+# Schema của bảng days trước khi có page_hash / content_hash / validated_hash
+LEGACY_DAYS_TABLE = """
+    CREATE TABLE days (
+        solar_date TEXT PRIMARY KEY,
+        lunar_day INTEGER NOT NULL,
+        lunar_month INTEGER NOT NULL,
+        lunar_year INTEGER NOT NULL,
+        is_leap_month INTEGER DEFAULT 0,
+        day_can TEXT, day_chi TEXT, month_can TEXT, month_chi TEXT,
+        year_can TEXT, year_chi TEXT, ngu_hanh TEXT, tiet_khi TEXT,
+        star28_name TEXT, star28_is_good INTEGER,
+        truc12_name TEXT, truc12_is_good INTEGER,
+        day_score INTEGER, source TEXT, data_json TEXT,
+        created_at TEXT, updated_at TEXT
+    )
+"""
+
+
+@pytest.fixture(scope="module")
+def page() -> FetchResult:
+    return FetchResult("https://lichngaytot.com/test", lichngaytot_page(DAY))
+
+
+@pytest.fixture(scope="module")
+def day_data(page):
+    return LichNgayTotParser().parse(page.html, DAY)
+
+
+@pytest.fixture
+def legacy_db(tmp_path, day_data):
+    """DB cũ có sẵn 1 ngày, chưa có cột hash."""
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(LEGACY_DAYS_TABLE)
+        conn.execute(
+            "INSERT INTO days (solar_date, lunar_day, lunar_month, lunar_year, data_json) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                DAY.isoformat(),
+                day_data.lunar_date.day,
+                day_data.lunar_date.month,
+                day_data.lunar_date.year,
+                day_data.model_dump_json(),
+            ),
+        )
+    return db_path
+
+
+def test_migration_adds_hash_columns(legacy_db):
+    SQLiteStorage(legacy_db)
+    with sqlite3.connect(legacy_db) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(days)")}
+    assert {"page_hash", "content_hash", "validated_hash"} <= columns
+
+
+def test_unchanged_legacy_row_only_gets_page_hash(legacy_db, day_data, page):
+    storage = SQLiteStorage(legacy_db)
+    assert storage.get_day_by_page_hash(DAY, page.page_hash) is None
+
+    # Nội dung giống row cũ: không ghi lại, chỉ lưu page hash
+    assert storage.save_day_if_changed(day_data, page.page_hash) is False
+    assert storage.get_day_by_page_hash(DAY, page.page_hash) == day_data
+    assert storage.get_hashes(DAY, DAY)[DAY].page_hash == page.page_hash
+
+
+def test_changed_content_is_saved(legacy_db, day_data, page):
+    storage = SQLiteStorage(legacy_db)
+    changed = day_data.model_copy(update={"day_score": (day_data.day_score or 0) + 1})
+    assert storage.save_day_if_changed(changed, page.page_hash) is True
+    assert storage.get_day(DAY).day_score == changed.day_score
+    assert storage.get_hashes(DAY, DAY)[DAY].content_hash == changed.content_hash()
+
+
+def test_save_day_if_changed_on_fresh_db(tmp_path, day_data, page):
+    storage = SQLiteStorage(tmp_path / "days.db")
+    assert storage.save_day_if_changed(day_data, page.page_hash) is True
+    assert storage.save_day_if_changed(day_data, page.page_hash) is False
+    assert storage.get_day_by_page_hash(DAY, page.page_hash) == day_data
+    assert storage.get_day_by_page_hash(DAY, page.content_hash) is None
+
+
+def test_parser_version_changes_page_hash(tmp_path, day_data, page):
+    storage = SQLiteStorage(tmp_path / "days.db")
+    storage.save_day_if_changed(day_data, page.page_hash)
+
+    assert page.page_hash == versioned_hash(page.content_hash, PARSER_VERSION)
+    # Sửa parser -> PARSER_VERSION khác -> trang không đổi cũng phải parse lại
+    new_version_hash = versioned_hash(page.content_hash, "fixed-parser")
+    assert new_version_hash != page.page_hash
+    assert storage.get_day_by_page_hash(DAY, new_version_hash) is None